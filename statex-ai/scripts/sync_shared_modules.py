@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Keep modules that are copied into several services identical
+
+Every service is built with its own directory as the Docker context, so a
+module used by several services is copied into each of them. The first
+service listed for a module holds the source of truth; this script copies it
+over the others, or with --check only reports copies that have drifted.
+tests/test_shared_modules.py runs the same check.
+
+Usage:
+    python statex-ai/scripts/sync_shared_modules.py [--check]
+"""
+
+import argparse
+import filecmp
+import os
+import shutil
+import sys
+from typing import List
+
+SERVICES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services")
+
+# module path inside a service -> services holding a copy, source of truth first
+SHARED_MODULES = {
+    "app/keyword_scanner.py": ["ai-orchestrator", "nlp-service", "prototype-generator"],
+}
+
+
+def drifted_copies() -> List[str]:
+    """service/module paths whose contents differ from their source of truth"""
+    drifted = []
+    for module, services in SHARED_MODULES.items():
+        source = os.path.join(SERVICES_DIR, services[0], module)
+        for service in services[1:]:
+            copy = os.path.join(SERVICES_DIR, service, module)
+            if not (os.path.exists(copy) and filecmp.cmp(source, copy, shallow=False)):
+                drifted.append(f"{service}/{module}")
+    return drifted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--check", action="store_true", help="only report drifted copies, exit 1 if any")
+    args = parser.parse_args()
+
+    drifted = drifted_copies()
+    if not args.check:
+        for path in drifted:
+            service, module = path.split("/", 1)
+            source_service = SHARED_MODULES[module][0]
+            shutil.copyfile(os.path.join(SERVICES_DIR, source_service, module), os.path.join(SERVICES_DIR, path))
+            print(f"✅ Updated {path} from {source_service}")
+        drifted = []
+
+    if drifted:
+        print(f"❌ Copies differ from their source of truth: {', '.join(drifted)}")
+        print("   Edit the first service's copy and run scripts/sync_shared_modules.py")
+        sys.exit(1)
+    if args.check:
+        print("✅ Shared modules are in sync")
+
+
+if __name__ == "__main__":
+    main()
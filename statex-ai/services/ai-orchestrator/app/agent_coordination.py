@@ -7,12 +7,14 @@ when agents fail. Provides comprehensive coordination for multi-agent workflows.
 
 import asyncio
 import logging
+import math
+import os
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Set
+from typing import Dict, List, Optional, Any, Set, Tuple
 from enum import Enum
 from pydantic import BaseModel
 import time
-import statistics
 
 from .workflow_engine import AgentTask, AgentResult, AgentInterface, TaskStatus
 
@@ -56,6 +58,90 @@ class FailurePattern(BaseModel):
     last_occurrence: datetime
     affected_tasks: List[str] = []
 
+class LatencySketch:
+    """Streaming latency histogram over a sliding time window
+    
+    Values fall into logarithmic buckets with a fixed relative error (as in
+    DDSketch/HDR histograms), so memory depends on the latency range rather
+    than the number of samples. The window is a ring of time slots; a slot is
+    cleared when it is reused, so old samples expire without a scan.
+    """
+    
+    MIN_VALUE = 1e-4  # 0.1 ms
+    
+    def __init__(self, window_seconds: float = 600.0, slots: int = 10, relative_accuracy: float = 0.01):
+        self.window_seconds = window_seconds
+        self.slot_seconds = window_seconds / slots
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.buckets: List[Counter] = [Counter() for _ in range(slots)]
+        self.epochs = [-1] * slots
+        self.sums = [0.0] * slots
+        self.maxima = [0.0] * slots
+    
+    def _slot(self, now: float) -> int:
+        epoch = int(now // self.slot_seconds)
+        index = epoch % len(self.epochs)
+        if self.epochs[index] != epoch:
+            self.epochs[index] = epoch
+            self.buckets[index].clear()
+            self.sums[index] = 0.0
+            self.maxima[index] = 0.0
+        return index
+    
+    def _active(self, now: float) -> List[int]:
+        oldest = int(now // self.slot_seconds) - len(self.epochs) + 1
+        return [index for index, epoch in enumerate(self.epochs) if epoch >= oldest]
+    
+    def record(self, seconds: float, now: Optional[float] = None):
+        index = self._slot(time.monotonic() if now is None else now)
+        value = max(seconds, self.MIN_VALUE)
+        self.buckets[index][math.ceil(math.log(value) / self.log_gamma)] += 1
+        self.sums[index] += seconds
+        self.maxima[index] = max(self.maxima[index], seconds)
+    
+    def count(self, now: Optional[float] = None) -> int:
+        now = time.monotonic() if now is None else now
+        return sum(sum(self.buckets[index].values()) for index in self._active(now))
+    
+    def quantiles(self, qs: List[float], now: Optional[float] = None) -> Dict[float, Optional[float]]:
+        """Estimated quantiles of the samples in the window (None when empty)"""
+        now = time.monotonic() if now is None else now
+        merged: Counter = Counter()
+        for index in self._active(now):
+            merged.update(self.buckets[index])
+        total = sum(merged.values())
+        if not total:
+            return {q: None for q in qs}
+        
+        results, cumulative = {}, 0
+        pending = sorted(qs)
+        for bucket in sorted(merged):
+            cumulative += merged[bucket]
+            while pending and cumulative >= pending[0] * total:
+                # Midpoint of the bucket in relative terms
+                results[pending.pop(0)] = 2 * self.gamma ** bucket / (self.gamma + 1)
+            if not pending:
+                break
+        for q in pending:
+            results[q] = 2 * self.gamma ** max(merged) / (self.gamma + 1)
+        return results
+    
+    def summary(self, now: Optional[float] = None) -> Dict[str, Any]:
+        now = time.monotonic() if now is None else now
+        active = self._active(now)
+        count = sum(sum(self.buckets[index].values()) for index in active)
+        p50, p95, p99 = (self.quantiles([0.5, 0.95, 0.99], now)[q] for q in (0.5, 0.95, 0.99))
+        return {
+            "count": count,
+            "mean": sum(self.sums[index] for index in active) / count if count else None,
+            "p50": p50,
+            "p95": p95,
+            "p99": p99,
+            "max": max((self.maxima[index] for index in active), default=None) if count else None,
+            "window_seconds": self.window_seconds
+        }
+
 class AgentCoordinator:
     """Coordinates agent tasks with health monitoring and failure handling"""
     
@@ -69,6 +155,18 @@ class AgentCoordinator:
         self.degradation_strategies: Dict[str, callable] = {}
         self._shutdown = False
         
+        # Successful task latency per agent for reporting, and per task kind for adaptive
+        # timeouts: one agent's tasks differ mostly by their static timeout (45 s analysis,
+        # 180 s generation), so that timeout stands in for the kind of work
+        self.latency_sketches: Dict[str, LatencySketch] = {}
+        self.task_kind_sketches: Dict[Tuple[str, int], LatencySketch] = {}
+        self.latency_window = float(os.getenv("AGENT_LATENCY_WINDOW_SECONDS", "600"))
+        self.adaptive_timeouts = os.getenv("ADAPTIVE_TASK_TIMEOUTS", "true").lower() == "true"
+        self.adaptive_timeout_min_samples = int(os.getenv("ADAPTIVE_TIMEOUT_MIN_SAMPLES", "20"))
+        self.adaptive_timeout_multiplier = float(os.getenv("ADAPTIVE_TIMEOUT_MULTIPLIER", "3.0"))
+        self.adaptive_timeout_min_factor = float(os.getenv("ADAPTIVE_TIMEOUT_MIN_FACTOR", "0.5"))
+        self.adaptive_timeout_max_factor = float(os.getenv("ADAPTIVE_TIMEOUT_MAX_FACTOR", "2.0"))
+        
         # Register default degradation strategies
         self._register_default_strategies()
     
@@ -80,8 +178,51 @@ class AgentCoordinator:
             agent_name=agent.agent_name
         )
         self.failure_patterns[agent.agent_type] = []
+        self.latency_sketches[agent.agent_type] = LatencySketch(self.latency_window)
         logger.info(f"Registered agent for coordination: {agent.agent_name}")
     
+    def record_task_latency(self, task: AgentTask, processing_time: float):
+        """Add a task duration to the agent's and the task kind's latency sketches
+        
+        Callers report successful tasks and timeouts (at the timeout) only. Failed
+        results come back in milliseconds while a service is down and would drag
+        the percentiles, and with them the adaptive timeouts, down.
+        """
+        sketch = self.latency_sketches.get(task.agent_type)
+        if sketch is None:
+            sketch = self.latency_sketches[task.agent_type] = LatencySketch(self.latency_window)
+        sketch.record(processing_time)
+        
+        kind = (task.agent_type, task.timeout)
+        kind_sketch = self.task_kind_sketches.get(kind)
+        if kind_sketch is None:
+            kind_sketch = self.task_kind_sketches[kind] = LatencySketch(self.latency_window)
+        kind_sketch.record(processing_time)
+        
+        metrics = self.agent_metrics.get(task.agent_type)
+        if metrics is not None:
+            metrics.avg_processing_time = sketch.summary()["mean"] or 0.0
+    
+    def get_task_timeout(self, task: AgentTask) -> float:
+        """Timeout from the recent p99 of this kind of task, bounded by its static timeout
+        
+        Falls back to task.timeout until enough samples are in the window. The
+        result stays between min_factor and max_factor times the static timeout,
+        so a run of fast tasks cannot starve a slow one and a slow spell cannot
+        stretch waits without limit.
+        """
+        sketch = self.task_kind_sketches.get((task.agent_type, task.timeout))
+        if not self.adaptive_timeouts or sketch is None or sketch.count() < self.adaptive_timeout_min_samples:
+            return float(task.timeout)
+        p99 = sketch.quantiles([0.99])[0.99]
+        adaptive = p99 * self.adaptive_timeout_multiplier
+        return min(max(adaptive, task.timeout * self.adaptive_timeout_min_factor),
+                   task.timeout * self.adaptive_timeout_max_factor)
+    
+    def get_latency_summary(self, agent_type: str) -> Dict[str, Any]:
+        sketch = self.latency_sketches.get(agent_type)
+        return sketch.summary() if sketch else LatencySketch(self.latency_window).summary()
+    
     def register_degradation_strategy(self, agent_type: str, strategy: callable):
         """Register a degradation strategy for when an agent fails"""
         self.degradation_strategies[agent_type] = strategy
@@ -200,14 +341,16 @@ class AgentCoordinator:
             return await self._handle_agent_degradation(task)
         
         # Execute the task
+        timeout = self.get_task_timeout(task)
         try:
             start_time = time.time()
-            result = await agent.execute_task(task)
+            result = await asyncio.wait_for(agent.execute_task(task), timeout=timeout)
             processing_time = time.time() - start_time
             
             # Update metrics
             metrics.total_tasks += 1
             if result.status == TaskStatus.COMPLETED:
+                self.record_task_latency(task, processing_time)
                 metrics.successful_tasks += 1
                 metrics.consecutive_failures = 0
                 metrics.last_success = datetime.now()
@@ -220,20 +363,18 @@ class AgentCoordinator:
                 failure_type = self._classify_failure(result.error_message or "Unknown error")
                 await self._record_failure_pattern(task.agent_type, failure_type, result.error_message or "")
             
-            # Update average processing time
-            if metrics.response_times:
-                metrics.avg_processing_time = statistics.mean(metrics.response_times)
-            
             return result
             
         except asyncio.TimeoutError:
+            # Timed-out tasks count at the timeout so the window does not look faster than it is
+            self.record_task_latency(task, timeout)
             await self._handle_agent_timeout(task.agent_type)
             return AgentResult(
                 task_id=task.task_id,
                 agent_type=task.agent_type,
                 agent_name=task.agent_name,
                 status=TaskStatus.TIMEOUT,
-                error_message=f"Task timed out after {task.timeout}s"
+                error_message=f"Task timed out after {timeout:.1f}s"
             )
         except Exception as e:
             await self._handle_agent_error(task.agent_type, str(e))
@@ -447,6 +588,16 @@ class AgentCoordinator:
         total_tasks = sum(m.total_tasks for m in self.agent_metrics.values())
         successful_tasks = sum(m.successful_tasks for m in self.agent_metrics.values())
         
+        latency = {}
+        for agent_type, sketch in self.latency_sketches.items():
+            summary = sketch.summary()
+            latency[agent_type] = {
+                "p50": summary["p50"],
+                "p95": summary["p95"],
+                "p99": summary["p99"],
+                "samples": summary["count"]
+            }
+        
         return {
             "total_agents": total_agents,
             "healthy_agents": healthy_agents,
@@ -455,6 +606,8 @@ class AgentCoordinator:
             "overall_health": "healthy" if offline_agents == 0 else "degraded" if degraded_agents > 0 else "critical",
             "total_tasks_processed": total_tasks,
             "success_rate": (successful_tasks / total_tasks * 100) if total_tasks > 0 else 0,
+            "latency_seconds": latency,
+            "latency_window_seconds": self.latency_window,
             "timestamp": datetime.now().isoformat()
         }
 
@@ -17,6 +17,7 @@ import re
 import json
 
 from .workflow_engine import WorkflowState, TaskStatus, AgentResult
+from .keyword_scanner import KeywordHits, KeywordScanner
 
 logger = logging.getLogger(__name__)
 
@@ -96,6 +97,34 @@ class BusinessAnalysisAggregator:
             "market": ["competition", "market", "demand", "trends", "adoption"]
         }
 
+        # Keyword checks made by the individual analysis steps
+        self.signal_keywords = {
+            "enterprise": ["microservices", "scalability", "high availability", "enterprise", "large scale"],
+            "frontend": ["web", "frontend", "ui", "interface", "dashboard"],
+            "backend": ["api", "backend", "server", "service"],
+            "python_ai": ["python", "ai", "ml"],
+            "data": ["data", "database", "storage", "records"],
+            "analytics": ["analytics"],
+            "document_db": ["nosql", "document"],
+            "ai_ml": ["ai", "ml", "machine learning", "nlp", "analysis"],
+            "mobile": ["mobile", "app", "ios", "android"],
+            "integration": ["integration", "api", "third-party"],
+            "urgency": ["urgent", "asap", "quickly", "fast"],
+            "competition": ["competitive", "market", "first-to-market"],
+            "ecommerce": ["ecommerce", "shop", "store", "payment"],
+            "automation": ["ai", "ml", "machine learning", "automation"],
+            "ai_or_ml": ["ai", "ml"],
+            "mobile_first": ["mobile"]
+        }
+
+        # Every family above in one scanner; the text of a submission is lowercased and checked once per keyword
+        self.scanner = KeywordScanner({
+            "complexity": self.complexity_keywords,
+            "technology": self.technology_patterns,
+            "risk": self.risk_patterns,
+            "signals": self.signal_keywords
+        })
+
     async def aggregate_business_analysis(self, workflow_state: WorkflowState) -> BusinessAnalysisResult:
         """
         Combine results from all AI agents into comprehensive analysis
@@ -147,7 +176,8 @@ class BusinessAnalysisAggregator:
                 "successful_agents": len([r for r in workflow_state.agent_results.values() 
                                         if r.status == TaskStatus.COMPLETED]),
                 "total_processing_time": sum([r.processing_time for r in workflow_state.agent_results.values()]),
-                "data_sources": list(combined_data.keys())
+                "data_sources": [key for key in combined_data.keys() if key != "keyword_hits"],
+                "keyword_groups": combined_data["keyword_hits"].summary()
             }
 
             result = BusinessAnalysisResult(
@@ -227,19 +257,28 @@ class BusinessAnalysisAggregator:
         ]).strip()
 
         combined_data["all_text"] = all_text
+        combined_data["keyword_hits"] = self.scanner.scan(all_text)
 
         return combined_data
 
+    def _keyword_hits(self, combined_data: Dict[str, Any]) -> KeywordHits:
+        """Hits shared by all steps; scanned here only if the data did not come from _extract_agent_data"""
+        hits = combined_data.get("keyword_hits")
+        if hits is None:
+            hits = combined_data["keyword_hits"] = self.scanner.scan(combined_data.get("all_text", ""))
+        return hits
+
     async def _assess_project_complexity(self, combined_data: Dict[str, Any]) -> ProjectComplexity:
         """Assess project complexity based on combined data"""
         all_text = combined_data.get("all_text", "").lower()
+        hits = self._keyword_hits(combined_data)
         complexity_scores = {"simple": 0, "moderate": 0, "complex": 0, "enterprise": 0}
         factors = []
 
         # Analyze text for complexity indicators
         for level, keywords in self.complexity_keywords.items():
             for keyword in keywords:
-                count = all_text.count(keyword)
+                count = hits.count(keyword)
                 complexity_scores[level] += count
                 if count > 0:
                     factors.append(f"Contains '{keyword}' ({count} times)")
@@ -258,9 +297,8 @@ class BusinessAnalysisAggregator:
             factors.append("Voice input processing")
 
         # Check for enterprise indicators
-        enterprise_indicators = ["microservices", "scalability", "high availability", "enterprise", "large scale"]
-        for indicator in enterprise_indicators:
-            if indicator in all_text:
+        for indicator in self.signal_keywords["enterprise"]:
+            if hits.contains(indicator):
                 complexity_scores["enterprise"] += 2
                 factors.append(f"Enterprise requirement: {indicator}")
 
@@ -304,26 +342,25 @@ class BusinessAnalysisAggregator:
 
         # Add specific features based on detected patterns
         features = []
-        all_text = combined_data.get("all_text", "").lower()
-
-        for pattern_type, keywords in self.technology_patterns.items():
-            if any(keyword in all_text for keyword in keywords):
-                if pattern_type == "web_app":
-                    features.append("Web application development")
-                elif pattern_type == "mobile_app":
-                    features.append("Mobile application development")
-                elif pattern_type == "api":
-                    features.append("API development and integration")
-                elif pattern_type == "database":
-                    features.append("Database design and implementation")
-                elif pattern_type == "ai_ml":
-                    features.append("AI/ML integration")
-                elif pattern_type == "ecommerce":
-                    features.append("E-commerce functionality")
-                elif pattern_type == "crm":
-                    features.append("CRM system development")
-                elif pattern_type == "analytics":
-                    features.append("Analytics and reporting")
+        hits = self._keyword_hits(combined_data)
+
+        for pattern_type in hits.matched_groups("technology"):
+            if pattern_type == "web_app":
+                features.append("Web application development")
+            elif pattern_type == "mobile_app":
+                features.append("Mobile application development")
+            elif pattern_type == "api":
+                features.append("API development and integration")
+            elif pattern_type == "database":
+                features.append("Database design and implementation")
+            elif pattern_type == "ai_ml":
+                features.append("AI/ML integration")
+            elif pattern_type == "ecommerce":
+                features.append("E-commerce functionality")
+            elif pattern_type == "crm":
+                features.append("CRM system development")
+            elif pattern_type == "analytics":
+                features.append("Analytics and reporting")
 
         if features:
             scope_parts.append(f"Key features include: {', '.join(features)}")
@@ -340,10 +377,10 @@ class BusinessAnalysisAggregator:
     async def _recommend_technology_stack(self, combined_data: Dict[str, Any], complexity: ProjectComplexity) -> List[TechnologyRecommendation]:
         """Recommend technology stack based on requirements and complexity"""
         recommendations = []
-        all_text = combined_data.get("all_text", "").lower()
+        hits = self._keyword_hits(combined_data)
 
         # Frontend recommendations
-        if any(keyword in all_text for keyword in ["web", "frontend", "ui", "interface", "dashboard"]):
+        if hits.has_group("signals", "frontend"):
             if complexity.level in ["complex", "enterprise"]:
                 recommendations.append(TechnologyRecommendation(
                     category="frontend",
@@ -360,8 +397,8 @@ class BusinessAnalysisAggregator:
                 ))
 
         # Backend recommendations
-        if any(keyword in all_text for keyword in ["api", "backend", "server", "service"]):
-            if "python" in all_text or "ai" in all_text or "ml" in all_text:
+        if hits.has_group("signals", "backend"):
+            if hits.has_group("signals", "python_ai"):
                 recommendations.append(TechnologyRecommendation(
                     category="backend",
                     technology="FastAPI (Python)",
@@ -384,15 +421,15 @@ class BusinessAnalysisAggregator:
                 ))
 
         # Database recommendations
-        if any(keyword in all_text for keyword in ["data", "database", "storage", "records"]):
-            if complexity.level in ["complex", "enterprise"] or "analytics" in all_text:
+        if hits.has_group("signals", "data"):
+            if complexity.level in ["complex", "enterprise"] or hits.has_group("signals", "analytics"):
                 recommendations.append(TechnologyRecommendation(
                     category="database",
                     technology="PostgreSQL",
                     reason="Robust relational database with advanced features",
                     confidence=0.9
                 ))
-            elif "nosql" in all_text or "document" in all_text:
+            elif hits.has_group("signals", "document_db"):
                 recommendations.append(TechnologyRecommendation(
                     category="database",
                     technology="MongoDB",
@@ -424,7 +461,7 @@ class BusinessAnalysisAggregator:
             ))
 
         # AI/ML specific recommendations
-        if any(keyword in all_text for keyword in ["ai", "ml", "machine learning", "nlp", "analysis"]):
+        if hits.has_group("signals", "ai_ml"):
             recommendations.append(TechnologyRecommendation(
                 category="ai_ml",
                 technology="Python with scikit-learn/TensorFlow",
@@ -433,7 +470,7 @@ class BusinessAnalysisAggregator:
             ))
 
         # Mobile recommendations
-        if any(keyword in all_text for keyword in ["mobile", "app", "ios", "android"]):
+        if hits.has_group("signals", "mobile"):
             recommendations.append(TechnologyRecommendation(
                 category="mobile",
                 technology="React Native",
@@ -492,7 +529,7 @@ class BusinessAnalysisAggregator:
     async def _identify_risk_factors(self, combined_data: Dict[str, Any], complexity: ProjectComplexity) -> List[RiskFactor]:
         """Identify potential risk factors based on project analysis"""
         risks = []
-        all_text = combined_data.get("all_text", "").lower()
+        hits = self._keyword_hits(combined_data)
 
         # Technical risks
         if complexity.level in ["complex", "enterprise"]:
@@ -503,7 +540,7 @@ class BusinessAnalysisAggregator:
                 mitigation="Conduct thorough technical discovery and create detailed architecture documentation"
             ))
 
-        if any(keyword in all_text for keyword in ["integration", "api", "third-party"]):
+        if hits.has_group("signals", "integration"):
             risks.append(RiskFactor(
                 category="technical",
                 description="Third-party integrations may have dependencies and limitations",
@@ -512,7 +549,7 @@ class BusinessAnalysisAggregator:
             ))
 
         # Timeline risks
-        if any(keyword in all_text for keyword in ["urgent", "asap", "quickly", "fast"]):
+        if hits.has_group("signals", "urgency"):
             risks.append(RiskFactor(
                 category="timeline",
                 description="Aggressive timeline may impact quality or require additional resources",
@@ -530,7 +567,7 @@ class BusinessAnalysisAggregator:
             ))
 
         # Market risks
-        if any(keyword in all_text for keyword in ["competitive", "market", "first-to-market"]):
+        if hits.has_group("signals", "competition"):
             risks.append(RiskFactor(
                 category="market",
                 description="Market competition may require faster delivery or unique features",
@@ -552,7 +589,7 @@ class BusinessAnalysisAggregator:
     async def _generate_market_insights(self, combined_data: Dict[str, Any], tech_stack: List[TechnologyRecommendation]) -> List[MarketInsight]:
         """Generate market insights based on project type and technology stack"""
         insights = []
-        all_text = combined_data.get("all_text", "").lower()
+        hits = self._keyword_hits(combined_data)
 
         # Technology trend insights
         modern_techs = ["react", "node.js", "python", "docker", "kubernetes"]
@@ -566,21 +603,21 @@ class BusinessAnalysisAggregator:
             ))
 
         # Industry-specific insights
-        if any(keyword in all_text for keyword in ["ecommerce", "shop", "store", "payment"]):
+        if hits.has_group("signals", "ecommerce"):
             insights.append(MarketInsight(
                 category="demand",
                 insight="E-commerce solutions continue to see strong market demand, especially with mobile-first approaches",
                 relevance=0.9
             ))
 
-        if any(keyword in all_text for keyword in ["ai", "ml", "machine learning", "automation"]):
+        if hits.has_group("signals", "automation"):
             insights.append(MarketInsight(
                 category="opportunities",
                 insight="AI/ML integration provides competitive advantage and is increasingly expected by users",
                 relevance=0.9
             ))
 
-        if any(keyword in all_text for keyword in ["mobile", "app", "ios", "android"]):
+        if hits.has_group("signals", "mobile"):
             insights.append(MarketInsight(
                 category="trends",
                 insight="Mobile-first approach is essential as mobile usage continues to dominate web traffic",
@@ -619,11 +656,11 @@ class BusinessAnalysisAggregator:
             recommendations.append("Allocate extra time for technical spikes and proof of concepts")
 
         # Technology-specific recommendations
-        all_text = combined_data.get("all_text", "").lower()
-        if "ai" in all_text or "ml" in all_text:
+        hits = self._keyword_hits(combined_data)
+        if hits.has_group("signals", "ai_or_ml"):
             recommendations.append("Start with pre-trained models before building custom AI solutions")
 
-        if "mobile" in all_text:
+        if hits.has_group("signals", "mobile_first"):
             recommendations.append("Design API-first to support both web and mobile clients")
 
         # General best practices
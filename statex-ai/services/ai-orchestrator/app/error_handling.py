@@ -7,10 +7,12 @@ and fallback mechanisms for the multi-agent AI orchestration workflow.
 
 import asyncio
 import logging
+import os
 import time
-from datetime import datetime, timedelta
+from collections import deque
+from datetime import datetime
 from enum import Enum
-from typing import Dict, Any, Optional, List, Callable
+from typing import Dict, Any, Optional, Callable
 from dataclasses import dataclass, field
 from pydantic import BaseModel
 import httpx
@@ -295,11 +297,69 @@ class GracefulDegradation:
             "fallback_reason": f"All fallback strategies failed: {str(error)[:100]}"
         }
 
+class CompactErrorRecord:
+    """Fixed-size summary of an ErrorRecord kept in the error history ring buffer"""
+    
+    __slots__ = ("error_id", "error_type", "severity", "agent_type", "timestamp", "final_outcome")
+    
+    def __init__(self, error_record: ErrorRecord):
+        self.error_id = error_record.error_id
+        self.error_type = error_record.error_type.value
+        self.severity = error_record.severity.value
+        self.agent_type = error_record.context.get("agent_type") or "none"
+        self.timestamp = error_record.timestamp.timestamp()
+        self.final_outcome = error_record.final_outcome
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "error_id": self.error_id,
+            "error_type": self.error_type,
+            "severity": self.severity,
+            "agent_type": self.agent_type,
+            "timestamp": datetime.fromtimestamp(self.timestamp).isoformat(),
+            "final_outcome": self.final_outcome
+        }
+
+class ErrorRateWindow:
+    """Error count over a sliding window, kept in a fixed ring of time buckets"""
+    
+    BUCKETS = 60
+    
+    def __init__(self, window_seconds: float):
+        self.window_seconds = window_seconds
+        self.bucket_seconds = window_seconds / self.BUCKETS
+        self.counts = [0] * self.BUCKETS
+        self.epochs = [-1] * self.BUCKETS
+    
+    def add(self, timestamp: float):
+        epoch = int(timestamp // self.bucket_seconds)
+        index = epoch % self.BUCKETS
+        if self.epochs[index] != epoch:
+            self.epochs[index] = epoch
+            self.counts[index] = 0
+        self.counts[index] += 1
+    
+    def count(self, now: float) -> int:
+        oldest = int(now // self.bucket_seconds) - self.BUCKETS + 1
+        return sum(count for count, epoch in zip(self.counts, self.epochs) if epoch >= oldest)
+    
+    def rate_per_minute(self, now: float) -> float:
+        return self.count(now) * 60.0 / self.window_seconds
+
 class ErrorRecoveryManager:
     """Manages error recovery and tracks error patterns"""
     
-    def __init__(self):
-        self.error_history: List[ErrorRecord] = []
+    RATE_WINDOWS = {"1m": 60, "5m": 300, "1h": 3600, "24h": 86400}
+    
+    def __init__(self, history_size: int = 1000):
+        # Bounded history; aggregates are updated on insert so statistics never scan it
+        self.error_history: deque = deque(maxlen=history_size)
+        self.total_errors = 0
+        self.recovery_failures = 0
+        self.error_counts_by_type: Dict[str, int] = {}
+        self.error_counts_by_severity: Dict[str, int] = {}
+        self.error_counts_by_agent: Dict[str, int] = {}
+        self.rate_windows = {name: ErrorRateWindow(seconds) for name, seconds in self.RATE_WINDOWS.items()}
         self.classifier = ErrorClassifier()
         self.graceful_degradation = GracefulDegradation()
     
@@ -315,7 +375,7 @@ class ErrorRecoveryManager:
         
         # Record the error
         error_record = self._create_error_record(exception, context, classification)
-        self.error_history.append(error_record)
+        compact_record = self._record_error(error_record)
         
         # Log the error
         self._log_error(error_record, classification)
@@ -333,9 +393,24 @@ class ErrorRecoveryManager:
         
         except Exception as recovery_error:
             logger.error(f"Error recovery failed: {recovery_error}")
-            error_record.final_outcome = "recovery_failed"
+            compact_record.final_outcome = "recovery_failed"
+            self.recovery_failures += 1
             raise recovery_error
     
+    def _record_error(self, error_record: ErrorRecord) -> CompactErrorRecord:
+        """Append to the ring buffer and update the running aggregates"""
+        compact_record = CompactErrorRecord(error_record)
+        self.error_history.append(compact_record)
+        
+        self.total_errors += 1
+        self.error_counts_by_type[compact_record.error_type] = self.error_counts_by_type.get(compact_record.error_type, 0) + 1
+        self.error_counts_by_severity[compact_record.severity] = self.error_counts_by_severity.get(compact_record.severity, 0) + 1
+        self.error_counts_by_agent[compact_record.agent_type] = self.error_counts_by_agent.get(compact_record.agent_type, 0) + 1
+        for window in self.rate_windows.values():
+            window.add(compact_record.timestamp)
+        
+        return compact_record
+    
     def _create_error_record(
         self,
         exception: Exception,
@@ -378,40 +453,34 @@ class ErrorRecoveryManager:
     
     def get_error_statistics(self) -> Dict[str, Any]:
         """Get error statistics for monitoring"""
-        if not self.error_history:
+        if not self.total_errors:
             return {"total_errors": 0}
         
-        error_counts = {}
-        severity_counts = {}
-        recent_errors = []
-        
-        cutoff_time = datetime.now() - timedelta(hours=24)
-        
-        for error in self.error_history:
-            # Count by type
-            error_type = error.error_type.value
-            error_counts[error_type] = error_counts.get(error_type, 0) + 1
-            
-            # Count by severity
-            severity = error.severity.value
-            severity_counts[severity] = severity_counts.get(severity, 0) + 1
-            
-            # Recent errors
-            if error.timestamp > cutoff_time:
-                recent_errors.append({
-                    "error_id": error.error_id,
-                    "error_type": error.error_type.value,
-                    "severity": error.severity.value,
-                    "timestamp": error.timestamp.isoformat()
-                })
+        now = time.time()
+        cutoff_time = now - 24 * 3600
+        recent_errors = [
+            self.error_history[-i].to_dict()
+            for i in range(1, min(10, len(self.error_history)) + 1)
+            if self.error_history[-i].timestamp > cutoff_time
+        ]
+        recent_errors.reverse()
         
         return {
-            "total_errors": len(self.error_history),
-            "error_counts_by_type": error_counts,
-            "error_counts_by_severity": severity_counts,
-            "recent_errors_24h": len(recent_errors),
-            "recent_error_details": recent_errors[-10:]  # Last 10 recent errors
+            "total_errors": self.total_errors,
+            "recovery_failures": self.recovery_failures,
+            "error_counts_by_type": dict(self.error_counts_by_type),
+            "error_counts_by_severity": dict(self.error_counts_by_severity),
+            "error_counts_by_agent": dict(self.error_counts_by_agent),
+            "error_counts_by_window": {name: window.count(now) for name, window in self.rate_windows.items()},
+            "errors_per_minute": {
+                name: round(window.rate_per_minute(now), 3)
+                for name, window in self.rate_windows.items() if name != "24h"
+            },
+            "recent_errors_24h": self.rate_windows["24h"].count(now),
+            "recent_error_details": recent_errors,  # Last 10 recent errors
+            "history_size": len(self.error_history),
+            "history_capacity": self.error_history.maxlen
         }
 
 # Global error recovery manager instance
-error_recovery_manager = ErrorRecoveryManager()
\ No newline at end of file
+error_recovery_manager = ErrorRecoveryManager(history_size=int(os.getenv("ERROR_HISTORY_SIZE", "1000")))
\ No newline at end of file
@@ -10,7 +10,7 @@ import os
 from fastapi import FastAPI, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Set, Tuple, Callable, Awaitable
 from enum import Enum
 import uvicorn
 import uuid
@@ -115,6 +115,8 @@ class WorkflowStep(BaseModel):
     output_data: Optional[Dict[str, Any]] = None
     error_message: Optional[str] = None
     processing_time: Optional[float] = None
+    started_at: Optional[str] = None
+    duration: Optional[float] = None
 
 class SubmissionResponse(BaseModel):
     submission_id: str
@@ -165,6 +167,8 @@ async def shutdown_event():
     """Cleanup on shutdown"""
     try:
         await agent_coordinator.stop_monitoring()
+        if background_notifications:
+            await asyncio.wait(background_notifications, timeout=10)
         logger.info("Multi-agent orchestrator shutdown complete")
     except Exception as e:
         logger.error(f"Error during shutdown: {e}")
@@ -318,6 +322,7 @@ async def get_agents_health():
                     "total_tasks": metric.total_tasks,
                     "success_rate": (metric.successful_tasks / metric.total_tasks * 100) if metric.total_tasks > 0 else 0,
                     "avg_processing_time": metric.avg_processing_time,
+                    "latency_seconds": agent_coordinator.get_latency_summary(agent_type),
                     "consecutive_failures": metric.consecutive_failures,
                     "last_success": metric.last_success.isoformat() if metric.last_success else None,
                     "last_failure": metric.last_failure.isoformat() if metric.last_failure else None,
@@ -541,41 +546,108 @@ async def process_submission(submission: SubmissionRequest, background_tasks: Ba
         logger.error(f"Error processing submission: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to process submission: {str(e)}")
 
+# Notifications are sent off the workflow's critical path; references are kept until they finish
+background_notifications: Set[asyncio.Task] = set()
+
+def send_in_background(coroutine: Awaitable[Any]) -> asyncio.Task:
+    """Schedule a notification without waiting for it"""
+    task = asyncio.ensure_future(coroutine)
+    background_notifications.add(task)
+    task.add_done_callback(background_notifications.discard)
+    return task
+
+def update_workflow_step(submission: Dict[str, Any], step_id: str, **fields):
+    """Update a step recorded in the submission's workflow_steps"""
+    for workflow_step in submission["workflow_steps"]:
+        if workflow_step["step_id"] == step_id:
+            workflow_step.update(fields)
+            break
+
+async def run_timed_step(submission_id: str, step_id: str, step_function: Callable[[str], Awaitable[Any]]):
+    """Run one workflow step and record its wall-clock time on the step entry"""
+    started_at = datetime.now().isoformat()
+    start_time = time.time()
+    try:
+        await step_function(submission_id)
+    finally:
+        duration = time.time() - start_time
+        update_workflow_step(submissions_db[submission_id], step_id, started_at=started_at, duration=duration)
+        logger.info(f"Step {step_id} for submission {submission_id} took {duration:.2f}s")
+
+async def run_workflow_graph(submission_id: str, graph: Dict[str, Tuple[Callable[[str], Awaitable[Any]], List[str]]]):
+    """Start every step as soon as the steps it depends on have finished"""
+    tasks: Dict[str, asyncio.Task] = {}
+
+    async def run_step(step_id: str, step_function: Callable[[str], Awaitable[Any]], dependencies: List[str]):
+        # Dependencies that are not part of this run (e.g. no voice file) are skipped
+        waiting_for = [tasks[dependency] for dependency in dependencies if dependency in tasks]
+        if waiting_for:
+            await asyncio.gather(*waiting_for)
+        await run_timed_step(submission_id, step_id, step_function)
+
+    for step_id, (step_function, dependencies) in graph.items():
+        tasks[step_id] = asyncio.create_task(run_step(step_id, step_function, dependencies))
+    try:
+        await asyncio.gather(*tasks.values())
+    except BaseException:
+        for task in tasks.values():
+            task.cancel()
+        raise
+
+def merge_extracted_text(submission: Dict[str, Any]):
+    """Append transcript and document text to the submission text in a fixed order"""
+    for key in ("voice_transcript", "document_text"):
+        text = submission.pop(key, None)
+        if text is not None:
+            submission["text_content"] = (submission["text_content"] or "") + "\n" + text
+
 async def process_submission_workflow(submission_id: str):
-    """Process submission through AI workflow"""
+    """Process submission through AI workflow
+    
+    ASR and Document AI run concurrently, NLP waits for both, then the
+    prototype and results page follow. The final notification is sent in
+    the background once the results page exists.
+    """
     try:
         submission = submissions_db[submission_id]
         submission["status"] = SubmissionStatus.PROCESSING
         submission["updated_at"] = datetime.now().isoformat()
         
         logger.info(f"Starting workflow for submission {submission_id}")
+        start_time = time.time()
         
-        # Step 1: Process voice files (if any)
-        if submission["voice_file_url"]:
-            await process_voice_content(submission_id)
+        graph: Dict[str, Tuple[Callable[[str], Awaitable[Any]], List[str]]] = {}
         
-        # Step 2: Process document files (if any)
+        # Voice and document files do not depend on each other
+        if submission["voice_file_url"]:
+            graph["asr_processing"] = (process_voice_content, [])
         if submission["file_urls"]:
-            await process_document_files(submission_id)
+            graph["document_processing"] = (process_document_files, [])
         
-        # Step 3: Analyze text content with NLP
+        # NLP needs the transcript and the extracted document text
         if submission["text_content"] or submission["voice_file_url"] or submission["file_urls"]:
-            await process_nlp_analysis(submission_id)
+            async def analyze_merged_text(submission_id: str):
+                merge_extracted_text(submissions_db[submission_id])
+                await process_nlp_analysis(submission_id)
+            graph["nlp_analysis"] = (analyze_merged_text, ["asr_processing", "document_processing"])
         
-        # Step 4: Generate prototype (if applicable)
-        await generate_prototype(submission_id)
+        graph["prototype_generation"] = (generate_prototype, ["nlp_analysis", "asr_processing", "document_processing"])
+        graph["results_page_creation"] = (create_results_page, ["prototype_generation"])
         
-        # Step 5: Create results page
-        await create_results_page(submission_id)
+        await run_workflow_graph(submission_id, graph)
+        merge_extracted_text(submission)
         
-        # Step 6: Send notification to user
-        await send_notification(submission_id)
+        submission["workflow_timing"] = {
+            "wall_time": time.time() - start_time,
+            "sum_of_step_times": sum(step.get("duration") or 0 for step in submission["workflow_steps"])
+        }
         
-        # Step 7: Mark as completed
+        # Mark as completed; the user notification goes out in the background
         submission["status"] = SubmissionStatus.COMPLETED
         submission["updated_at"] = datetime.now().isoformat()
+        send_in_background(run_timed_step(submission_id, "notification", send_notification))
         
-        logger.info(f"Workflow completed for submission {submission_id}")
+        logger.info(f"Workflow completed for submission {submission_id} in {submission['workflow_timing']['wall_time']:.2f}s")
         
     except Exception as e:
         logger.error(f"Error in workflow for submission {submission_id}: {e}")
@@ -613,18 +685,18 @@ async def process_voice_content(submission_id: str):
                         submission["workflow_steps"][i]["processing_time"] = result.get("processing_time", 0)
                         break
                 
-                # Add transcribed text to submission
-                submission["text_content"] = (submission["text_content"] or "") + "\n" + result.get("transcript", "")
+                # Transcribed text is merged into the submission text before NLP
+                submission["voice_transcript"] = result.get("transcript", "")
                 
                 # Send individual agent notification
-                await send_agent_notification(
+                send_in_background(send_agent_notification(
                     submission_id=submission_id,
                     agent_name="ASR Service",
                     service_name="asr-service",
                     input_data={"voice_file_url": submission["voice_file_url"]},
                     output_data=result,
                     processing_time=result.get("processing_time", 0)
-                )
+                ))
             else:
                 # Update the step in the workflow_steps list
                 for i, workflow_step in enumerate(submission["workflow_steps"]):
@@ -672,26 +744,23 @@ async def process_document_files(submission_id: str):
                         submission["workflow_steps"][i]["processing_time"] = result.get("processing_time", 0)
                         break
                 
-                # Add extracted text to submission
-                extracted_text = result.get("extracted_text", "")
-                submission["text_content"] = (submission["text_content"] or "") + "\n" + extracted_text
+                # Extracted text is merged into the submission text before NLP
+                submission["document_text"] = result.get("extracted_text", "")
                 
                 # Send individual agent notification
-                await send_agent_notification(
+                send_in_background(send_agent_notification(
                     submission_id=submission_id,
                     agent_name="Document AI",
                     service_name="document-ai",
                     input_data={"file_urls": submission["file_urls"]},
                     output_data=result,
                     processing_time=result.get("processing_time", 0)
-                )
+                ))
             else:
-                step.status = "failed"
-                step.error_message = f"Document AI service error: {response.status_code}"
+                update_workflow_step(submission, step.step_id, status="failed", error_message=f"Document AI service error: {response.status_code}")
                 
     except Exception as e:
-        step.status = "failed"
-        step.error_message = str(e)
+        update_workflow_step(submission, step.step_id, status="failed", error_message=str(e))
         logger.error(f"Document processing error for {submission_id}: {e}")
 
 async def process_nlp_analysis(submission_id: str):
@@ -731,21 +800,19 @@ async def process_nlp_analysis(submission_id: str):
                 submission["results"]["nlp_analysis"] = result
                 
                 # Send individual agent notification
-                await send_agent_notification(
+                send_in_background(send_agent_notification(
                     submission_id=submission_id,
                     agent_name="NLP Analysis",
                     service_name="nlp-service",
                     input_data={"text_content": submission["text_content"], "requirements": submission["requirements"]},
                     output_data=result,
                     processing_time=result.get("processing_time", 0)
-                )
+                ))
             else:
-                step.status = "failed"
-                step.error_message = f"NLP service error: {response.status_code}"
+                update_workflow_step(submission, step.step_id, status="failed", error_message=f"NLP service error: {response.status_code}")
                 
     except Exception as e:
-        step.status = "failed"
-        step.error_message = str(e)
+        update_workflow_step(submission, step.step_id, status="failed", error_message=str(e))
         logger.error(f"NLP processing error for {submission_id}: {e}")
 
 async def create_results_page(submission_id: str):
@@ -802,14 +869,14 @@ async def create_results_page(submission_id: str):
                 break
         
         # Send individual agent notification
-        await send_agent_notification(
+        send_in_background(send_agent_notification(
             submission_id=submission_id,
             agent_name="Results Page Creator",
             service_name="results-storage",
             input_data={"prototype_id": submission.get("prototype_id", f"proto_{submission_id}")},
             output_data={"results_page_url": submission["results_page_url"]},
             processing_time=0.1
-        )
+        ))
         
     except Exception as e:
         # Update the step in the workflow_steps list
@@ -878,7 +945,7 @@ async def generate_prototype(submission_id: str):
                     submission["prototype_id"] = result.get("prototype_id", f"proto_{int(time.time())}")
                 
                 # Send individual agent notification
-                await send_agent_notification(
+                send_in_background(send_agent_notification(
                     submission_id=submission_id,
                     agent_name="Prototype Generator",
                     service_name="prototype-generator",
@@ -888,14 +955,12 @@ async def generate_prototype(submission_id: str):
                     },
                     output_data=result,
                     processing_time=result.get("processing_time", 0)
-                )
+                ))
             else:
-                step.status = "failed"
-                step.error_message = f"Prototype generator error: {response.status_code}"
+                update_workflow_step(submission, step.step_id, status="failed", error_message=f"Prototype generator error: {response.status_code}")
                 
     except Exception as e:
-        step.status = "failed"
-        step.error_message = str(e)
+        update_workflow_step(submission, step.step_id, status="failed", error_message=str(e))
         logger.error(f"Prototype generation error for {submission_id}: {e}")
 
 async def send_agent_notification(submission_id: str, agent_name: str, service_name: str, input_data: dict, output_data: dict, processing_time: float = 0, status: str = "completed"):
@@ -1112,14 +1177,13 @@ async def send_notification(submission_id: str):
             
             if response.status_code == 200:
                 result = response.json()
-                step.status = "completed"
-                step.output_data = result
-                step.processing_time = 0  # Notification is usually instant
+                # Notification is usually instant
+                update_workflow_step(submission, step.step_id, status="completed", output_data=result, processing_time=0)
                 
                 logger.info(f"Notification sent successfully for submission {submission_id}")
                 
                 # Send individual agent notification for notification service
-                await send_agent_notification(
+                send_in_background(send_agent_notification(
                     submission_id=submission_id,
                     agent_name="Notification Service",
                     service_name="notification-service",
@@ -1130,15 +1194,13 @@ async def send_notification(submission_id: str):
                     },
                     output_data=result,
                     processing_time=0
-                )
+                ))
             else:
-                step.status = "failed"
-                step.error_message = f"Notification service error: {response.status_code}"
+                update_workflow_step(submission, step.step_id, status="failed", error_message=f"Notification service error: {response.status_code}")
                 logger.error(f"Notification failed for submission {submission_id}: {response.status_code}")
                 
     except Exception as e:
-        step.status = "failed"
-        step.error_message = str(e)
+        update_workflow_step(submission, step.step_id, status="failed", error_message=str(e))
         logger.error(f"Notification error for submission {submission_id}: {e}")
 
 @app.get("/api/status/{submission_id}", response_model=SubmissionStatusResponse)
@@ -1194,6 +1256,7 @@ async def get_submission_results(submission_id: str):
         "status": submission["status"],
         "results": submission["results"],
         "workflow_steps": submission["workflow_steps"],
+        "workflow_timing": submission.get("workflow_timing"),
         "prototype_id": submission.get("prototype_id"),
         "results_page_url": submission.get("results_page_url"),
         "created_at": submission["created_at"],
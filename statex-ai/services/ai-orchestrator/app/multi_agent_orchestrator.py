@@ -18,6 +18,7 @@ from .workflow_engine import (
     WorkflowState, TaskStatus, WorkflowStatus, workflow_engine
 )
 from .workflow_persistence import workflow_persistence
+from .agent_coordination import agent_coordinator
 from .workflow_recovery import workflow_recovery_manager, CheckpointType
 from .error_handling import (
     ErrorContext, ErrorRecoveryManager, error_recovery_manager,
@@ -337,6 +338,12 @@ class MultiAgentOrchestrator:
         
         for agent in agents:
             self.workflow_engine.register_agent(agent)
+        
+        # Task timeouts follow the recent latency of each kind of task
+        self.workflow_engine.set_task_monitor(
+            agent_coordinator.get_task_timeout,
+            agent_coordinator.record_task_latency
+        )
     
     def _register_workflows(self):
         """Register workflow definitions"""
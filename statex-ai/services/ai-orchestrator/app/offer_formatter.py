@@ -16,6 +16,7 @@ from pydantic import BaseModel
 from enum import Enum
 
 from .business_analysis_aggregator import BusinessAnalysisResult, ProjectComplexity, TechnologyRecommendation
+from .keyword_scanner import KeywordScanner
 
 logger = logging.getLogger(__name__)
 
@@ -84,6 +85,7 @@ class OfferFormatter:
             OfferTemplate.AI_ML_SOLUTION: ["ai", "ml", "machine learning", "nlp", "artificial intelligence"],
             OfferTemplate.ENTERPRISE_SYSTEM: ["enterprise", "large-scale", "distributed", "microservices"]
         }
+        self.template_scanner = KeywordScanner({"templates": self.template_patterns})
         
         self.base_deliverables = {
             "technical": {
@@ -161,10 +163,11 @@ class OfferFormatter:
             tech_text = " ".join([tech.technology.lower() for tech in analysis.technology_stack])
             all_text += f" {tech_text}"
             
-            # Score each template
+            # Score each template from one set of keyword hits on the text
+            hits = self.template_scanner.scan(all_text)
             template_scores = {}
             for template, keywords in self.template_patterns.items():
-                score = sum(1 for keyword in keywords if keyword in all_text)
+                score = sum(1 for keyword in keywords if hits.contains(keyword))
                 template_scores[template] = score
             
             # Find the template with highest score
@@ -118,12 +118,19 @@ class WorkflowEngine:
         self.running_tasks: Dict[str, asyncio.Task] = {}
         self.workflow_definitions: Dict[str, Callable] = {}
         self._shutdown = False
+        self.timeout_policy: Optional[Callable[[AgentTask], float]] = None
+        self.latency_observer: Optional[Callable[[AgentTask, float], None]] = None
         
     def register_agent(self, agent: AgentInterface):
         """Register an AI agent with the workflow engine"""
         self.agents[agent.agent_type] = agent
         logger.info(f"Registered agent: {agent.agent_name} ({agent.agent_type})")
     
+    def set_task_monitor(self, timeout_policy: Callable[[AgentTask], float], latency_observer: Callable[[AgentTask, float], None]):
+        """Use adaptive timeouts and report successful task durations (e.g. to the agent coordinator)"""
+        self.timeout_policy = timeout_policy
+        self.latency_observer = latency_observer
+    
     def register_workflow(self, workflow_type: str, workflow_func: Callable):
         """Register a workflow definition"""
         self.workflow_definitions[workflow_type] = workflow_func
@@ -270,6 +277,7 @@ class WorkflowEngine:
             return result
         
         # Execute task with retry logic
+        timeout = self.timeout_policy(task) if self.timeout_policy else task.timeout
         for attempt in range(task.max_retries + 1):
             try:
                 task.status = TaskStatus.RUNNING
@@ -281,10 +289,14 @@ class WorkflowEngine:
                 # Execute with timeout
                 result = await asyncio.wait_for(
                     agent.execute_task(task),
-                    timeout=task.timeout
+                    timeout=timeout
                 )
                 
                 result.processing_time = time.time() - start_time
+                # Agents return FAILED results quickly while their service is down; keep
+                # those out of the latency that sets timeouts
+                if self.latency_observer and result.status == TaskStatus.COMPLETED:
+                    self.latency_observer(task, result.processing_time)
                 result.status = TaskStatus.COMPLETED
                 task.status = TaskStatus.COMPLETED
                 task.completed_at = datetime.now()
@@ -293,8 +305,10 @@ class WorkflowEngine:
                 return result
                 
             except asyncio.TimeoutError:
-                error_msg = f"Task {task.task_id} timed out after {task.timeout}s"
+                error_msg = f"Task {task.task_id} timed out after {timeout:.1f}s"
                 logger.warning(f"{error_msg} (attempt {attempt + 1}/{task.max_retries + 1})")
+                if self.latency_observer:
+                    self.latency_observer(task, timeout)
                 
                 if attempt == task.max_retries:
                     result = AgentResult(
@@ -303,7 +317,7 @@ class WorkflowEngine:
                         agent_name=task.agent_name,
                         status=TaskStatus.TIMEOUT,
                         error_message=error_msg,
-                        processing_time=task.timeout
+                        processing_time=timeout
                     )
                     task.status = TaskStatus.TIMEOUT
                     workflow_state.agent_results[task.task_id] = result
@@ -27,6 +27,7 @@ class WorkflowPersistence:
         self.state_key_prefix = f"{self.key_prefix}state:"
         self.index_key = f"{self.key_prefix}index"
         self.cleanup_key = f"{self.key_prefix}cleanup"
+        self.checkpoint_key_prefix = f"{self.key_prefix}checkpoints:"
         
     async def connect(self):
         """Connect to Redis"""
@@ -161,8 +162,12 @@ class WorkflowPersistence:
             key = f"{self.state_key_prefix}{workflow_id}"
             deleted = self.redis_client.delete(key)
             
-            # Remove from index
+            # Remove from index and drop spilled checkpoints
             self.redis_client.srem(self.index_key, workflow_id)
+            self.redis_client.delete(
+                f"{self.checkpoint_key_prefix}{workflow_id}",
+                f"{self.checkpoint_key_prefix}{workflow_id}:order"
+            )
             
             logger.debug(f"Deleted workflow state {workflow_id}")
             return deleted > 0
@@ -171,6 +176,46 @@ class WorkflowPersistence:
             logger.error(f"Failed to delete workflow state {workflow_id}: {e}")
             return False
     
+    async def save_checkpoint(self, workflow_id: str, checkpoint_id: str, checkpoint_json: str) -> bool:
+        """Store a serialized checkpoint that no longer fits in memory"""
+        if not self.redis_client:
+            return False
+        
+        try:
+            key = f"{self.checkpoint_key_prefix}{workflow_id}"
+            pipe = self.redis_client.pipeline()
+            pipe.hset(key, checkpoint_id, checkpoint_json)
+            pipe.rpush(f"{key}:order", checkpoint_id)
+            pipe.expire(key, timedelta(days=7))
+            pipe.expire(f"{key}:order", timedelta(days=7))
+            pipe.execute()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save checkpoint {checkpoint_id}: {e}")
+            return False
+    
+    async def load_checkpoint(self, workflow_id: str, checkpoint_id: str) -> Optional[str]:
+        """Load a serialized checkpoint"""
+        if not self.redis_client:
+            return None
+        
+        try:
+            return self.redis_client.hget(f"{self.checkpoint_key_prefix}{workflow_id}", checkpoint_id)
+        except Exception as e:
+            logger.error(f"Failed to load checkpoint {checkpoint_id}: {e}")
+            return None
+    
+    async def list_checkpoint_ids(self, workflow_id: str) -> List[str]:
+        """Stored checkpoint IDs for a workflow, oldest first"""
+        if not self.redis_client:
+            return []
+        
+        try:
+            return self.redis_client.lrange(f"{self.checkpoint_key_prefix}{workflow_id}:order", 0, -1)
+        except Exception as e:
+            logger.error(f"Failed to list checkpoints for {workflow_id}: {e}")
+            return []
+    
     async def list_workflow_ids(self) -> List[str]:
         """List all workflow IDs in Redis"""
         if not self.redis_client:
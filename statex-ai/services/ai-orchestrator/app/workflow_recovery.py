@@ -6,9 +6,12 @@ checkpoint management, and workflow resumption after interruptions.
 """
 
 import asyncio
+import json
 import logging
+import os
+from collections import OrderedDict, deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from typing import Deque, Dict, List, Optional, Any
 from enum import Enum
 
 from .workflow_engine import WorkflowState, AgentResult, TaskStatus, WorkflowStatus
@@ -32,6 +35,112 @@ class CheckpointType(Enum):
     ERROR_RECOVERY = "error_recovery"
     MANUAL_CHECKPOINT = "manual_checkpoint"
 
+class WorkflowSnapshot:
+    """Immutable structural snapshot of a WorkflowState
+    
+    Task lists are frozen as tuples and each agent result and the metadata are
+    kept as serialized JSON. Parts that did not change since the previous
+    snapshot of the same workflow reuse its objects, so a checkpoint only costs
+    memory for what actually changed.
+    """
+    
+    __slots__ = (
+        "workflow_id", "submission_id", "workflow_type", "status", "current_step",
+        "completed_steps", "pending_tasks", "running_tasks", "completed_tasks", "failed_tasks",
+        "agent_results", "start_time", "end_time", "estimated_completion", "progress", "metadata"
+    )
+    
+    LIST_FIELDS = ("completed_steps", "pending_tasks", "running_tasks", "completed_tasks", "failed_tasks")
+    
+    @classmethod
+    def capture(cls, workflow_state: WorkflowState, previous: Optional["WorkflowSnapshot"] = None) -> "WorkflowSnapshot":
+        snapshot = cls()
+        snapshot.workflow_id = workflow_state.workflow_id
+        snapshot.submission_id = workflow_state.submission_id
+        snapshot.workflow_type = workflow_state.workflow_type
+        snapshot.status = workflow_state.status
+        snapshot.current_step = workflow_state.current_step
+        snapshot.start_time = workflow_state.start_time
+        snapshot.end_time = workflow_state.end_time
+        snapshot.estimated_completion = workflow_state.estimated_completion
+        snapshot.progress = workflow_state.progress
+        
+        for name in cls.LIST_FIELDS:
+            frozen = tuple(getattr(workflow_state, name))
+            if previous is not None and getattr(previous, name) == frozen:
+                frozen = getattr(previous, name)
+            setattr(snapshot, name, frozen)
+        
+        previous_results = previous.agent_results if previous is not None else {}
+        agent_results = {}
+        for task_id, result in workflow_state.agent_results.items():
+            serialized = result.model_dump_json()
+            shared = previous_results.get(task_id)
+            agent_results[task_id] = shared if shared == serialized else serialized
+        snapshot.agent_results = agent_results
+        
+        metadata = json.dumps(workflow_state.metadata, sort_keys=True, default=str)
+        snapshot.metadata = previous.metadata if previous is not None and previous.metadata == metadata else metadata
+        return snapshot
+    
+    def restore(self) -> WorkflowState:
+        """Build a new, independent WorkflowState from the snapshot"""
+        return WorkflowState(
+            workflow_id=self.workflow_id,
+            submission_id=self.submission_id,
+            workflow_type=self.workflow_type,
+            status=self.status,
+            current_step=self.current_step,
+            completed_steps=list(self.completed_steps),
+            pending_tasks=list(self.pending_tasks),
+            running_tasks=list(self.running_tasks),
+            completed_tasks=list(self.completed_tasks),
+            failed_tasks=list(self.failed_tasks),
+            agent_results={
+                task_id: AgentResult.model_validate_json(serialized)
+                for task_id, serialized in self.agent_results.items()
+            },
+            start_time=self.start_time,
+            end_time=self.end_time,
+            estimated_completion=self.estimated_completion,
+            progress=self.progress,
+            metadata=json.loads(self.metadata)
+        )
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "workflow_id": self.workflow_id,
+            "submission_id": self.submission_id,
+            "workflow_type": self.workflow_type,
+            "status": self.status.value,
+            "current_step": self.current_step,
+            **{name: list(getattr(self, name)) for name in self.LIST_FIELDS},
+            "agent_results": self.agent_results,
+            "start_time": self.start_time.isoformat(),
+            "end_time": self.end_time.isoformat() if self.end_time else None,
+            "estimated_completion": self.estimated_completion.isoformat() if self.estimated_completion else None,
+            "progress": self.progress,
+            "metadata": self.metadata
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WorkflowSnapshot":
+        snapshot = cls()
+        snapshot.workflow_id = data["workflow_id"]
+        snapshot.submission_id = data["submission_id"]
+        snapshot.workflow_type = data["workflow_type"]
+        snapshot.status = WorkflowStatus(data["status"])
+        snapshot.current_step = data["current_step"]
+        for name in cls.LIST_FIELDS:
+            setattr(snapshot, name, tuple(data[name]))
+        snapshot.agent_results = data["agent_results"]
+        snapshot.start_time = datetime.fromisoformat(data["start_time"])
+        snapshot.end_time = datetime.fromisoformat(data["end_time"]) if data["end_time"] else None
+        snapshot.estimated_completion = datetime.fromisoformat(data["estimated_completion"]) if data["estimated_completion"] else None
+        snapshot.progress = data["progress"]
+        snapshot.metadata = data["metadata"]
+        return snapshot
+
 class WorkflowCheckpoint:
     """Represents a workflow checkpoint for recovery"""
     
@@ -41,22 +150,155 @@ class WorkflowCheckpoint:
         checkpoint_id: str,
         checkpoint_type: CheckpointType,
         timestamp: datetime,
-        workflow_state: WorkflowState,
+        snapshot: WorkflowSnapshot,
         metadata: Dict[str, Any] = None
     ):
         self.workflow_id = workflow_id
         self.checkpoint_id = checkpoint_id
         self.checkpoint_type = checkpoint_type
         self.timestamp = timestamp
-        self.workflow_state = workflow_state
+        self.snapshot = snapshot
         self.metadata = metadata or {}
+    
+    @property
+    def workflow_state(self) -> WorkflowState:
+        """Workflow state as it was when the checkpoint was taken"""
+        return self.snapshot.restore()
+    
+    @property
+    def is_success(self) -> bool:
+        return (
+            self.checkpoint_type != CheckpointType.ERROR_RECOVERY
+            and self.snapshot.status != WorkflowStatus.FAILED
+        )
+    
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "checkpoint_id": self.checkpoint_id,
+            "checkpoint_type": self.checkpoint_type.value,
+            "timestamp": self.timestamp.isoformat(),
+            "status": self.snapshot.status.value,
+            "completed_tasks": len(self.snapshot.completed_tasks),
+            "failed_tasks": len(self.snapshot.failed_tasks)
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "workflow_id": self.workflow_id,
+            "checkpoint_id": self.checkpoint_id,
+            "checkpoint_type": self.checkpoint_type.value,
+            "timestamp": self.timestamp.isoformat(),
+            "snapshot": self.snapshot.to_dict(),
+            "metadata": self.metadata
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WorkflowCheckpoint":
+        return cls(
+            workflow_id=data["workflow_id"],
+            checkpoint_id=data["checkpoint_id"],
+            checkpoint_type=CheckpointType(data["checkpoint_type"]),
+            timestamp=datetime.fromisoformat(data["timestamp"]),
+            snapshot=WorkflowSnapshot.from_dict(data["snapshot"]),
+            metadata=data.get("metadata", {})
+        )
+
+class CheckpointStore:
+    """Keeps the last few checkpoints of recent workflows in memory and spills older ones to Redis"""
+    
+    def __init__(self, persistence, keep_last: int = 5, max_workflows: int = 500):
+        self.persistence = persistence
+        self.keep_last = keep_last
+        self.max_workflows = max_workflows
+        self.checkpoints: "OrderedDict[str, Deque[WorkflowCheckpoint]]" = OrderedDict()
+        self.spilled = 0
+    
+    def __contains__(self, workflow_id: str) -> bool:
+        return workflow_id in self.checkpoints
+    
+    def __len__(self) -> int:
+        return len(self.checkpoints)
+    
+    def latest_snapshot(self, workflow_id: str) -> Optional[WorkflowSnapshot]:
+        checkpoints = self.checkpoints.get(workflow_id)
+        return checkpoints[-1].snapshot if checkpoints else None
+    
+    async def add(self, checkpoint: WorkflowCheckpoint):
+        workflow_id = checkpoint.workflow_id
+        checkpoints = self.checkpoints.get(workflow_id)
+        if checkpoints is None:
+            checkpoints = self.checkpoints[workflow_id] = deque()
+        self.checkpoints.move_to_end(workflow_id)
+        checkpoints.append(checkpoint)
+        
+        spill: List[WorkflowCheckpoint] = []
+        while len(checkpoints) > self.keep_last:
+            spill.append(checkpoints.popleft())
+        while len(self.checkpoints) > self.max_workflows:
+            _, evicted = self.checkpoints.popitem(last=False)
+            spill.extend(evicted)
+        for old_checkpoint in spill:
+            await self._spill(old_checkpoint)
+    
+    async def _spill(self, checkpoint: WorkflowCheckpoint):
+        saved = await self.persistence.save_checkpoint(
+            checkpoint.workflow_id, checkpoint.checkpoint_id, json.dumps(checkpoint.to_dict())
+        )
+        if saved:
+            self.spilled += 1
+        else:
+            logger.debug(f"Dropped checkpoint {checkpoint.checkpoint_id}: persistence unavailable")
+    
+    async def get(self, workflow_id: str, checkpoint_id: str) -> Optional[WorkflowCheckpoint]:
+        """A checkpoint from memory, or from persistence if it was spilled"""
+        for checkpoint in self.checkpoints.get(workflow_id, ()):
+            if checkpoint.checkpoint_id == checkpoint_id:
+                return checkpoint
+        data = await self.persistence.load_checkpoint(workflow_id, checkpoint_id)
+        return WorkflowCheckpoint.from_dict(json.loads(data)) if data else None
+    
+    async def latest(self, workflow_id: str, successful_only: bool = False) -> Optional[WorkflowCheckpoint]:
+        """Most recent checkpoint, looking at spilled ones only when none in memory qualifies"""
+        for checkpoint in reversed(self.checkpoints.get(workflow_id, ())):
+            if not successful_only or checkpoint.is_success:
+                return checkpoint
+        for checkpoint_id in reversed(await self.persistence.list_checkpoint_ids(workflow_id)):
+            checkpoint = await self.get(workflow_id, checkpoint_id)
+            if checkpoint and (not successful_only or checkpoint.is_success):
+                return checkpoint
+        return None
+    
+    def in_memory(self, workflow_id: str) -> List[WorkflowCheckpoint]:
+        return list(self.checkpoints.get(workflow_id, ()))
+    
+    async def list_checkpoints(self, workflow_id: str) -> List[str]:
+        """Checkpoint IDs, oldest first: spilled ones followed by those in memory"""
+        in_memory = [checkpoint.checkpoint_id for checkpoint in self.checkpoints.get(workflow_id, ())]
+        spilled = [
+            checkpoint_id for checkpoint_id in await self.persistence.list_checkpoint_ids(workflow_id)
+            if checkpoint_id not in in_memory
+        ]
+        return spilled + in_memory
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "workflows": len(self.checkpoints),
+            "checkpoints_in_memory": sum(len(checkpoints) for checkpoints in self.checkpoints.values()),
+            "checkpoints_spilled": self.spilled,
+            "keep_last": self.keep_last,
+            "max_workflows": self.max_workflows
+        }
 
 class WorkflowRecoveryManager:
     """Manages workflow recovery and resumption"""
     
     def __init__(self):
         self.persistence = workflow_persistence
-        self.checkpoints: Dict[str, List[WorkflowCheckpoint]] = {}
+        self.checkpoints = CheckpointStore(
+            workflow_persistence,
+            keep_last=int(os.getenv("WORKFLOW_CHECKPOINTS_KEEP", "5")),
+            max_workflows=int(os.getenv("WORKFLOW_CHECKPOINTS_MAX_WORKFLOWS", "500"))
+        )
         self.recovery_strategies = {
             WorkflowStatus.FAILED: RecoveryStrategy.RESUME_FROM_LAST_SUCCESS,
             WorkflowStatus.RUNNING: RecoveryStrategy.RESUME_FROM_CHECKPOINT,
@@ -73,22 +315,23 @@ class WorkflowRecoveryManager:
     ) -> str:
         """Create a checkpoint for workflow recovery"""
         try:
-            checkpoint_id = f"{workflow_state.workflow_id}_{checkpoint_type.value}_{int(datetime.now().timestamp())}"
+            checkpoint_id = f"{workflow_state.workflow_id}_{checkpoint_type.value}_{int(datetime.now().timestamp() * 1000)}"
             
+            # Snapshot now, sharing unchanged parts with the previous checkpoint
+            snapshot = WorkflowSnapshot.capture(
+                workflow_state, self.checkpoints.latest_snapshot(workflow_state.workflow_id)
+            )
             checkpoint = WorkflowCheckpoint(
                 workflow_id=workflow_state.workflow_id,
                 checkpoint_id=checkpoint_id,
                 checkpoint_type=checkpoint_type,
                 timestamp=datetime.now(),
-                workflow_state=workflow_state,
+                snapshot=snapshot,
                 metadata=metadata or {}
             )
             
-            # Store checkpoint
-            if workflow_state.workflow_id not in self.checkpoints:
-                self.checkpoints[workflow_state.workflow_id] = []
-            
-            self.checkpoints[workflow_state.workflow_id].append(checkpoint)
+            # Store checkpoint; older ones are spilled to persistence
+            await self.checkpoints.add(checkpoint)
             
             logger.info(f"Created checkpoint {checkpoint_id} for workflow {workflow_state.workflow_id}")
             return checkpoint_id
@@ -124,6 +367,9 @@ class WorkflowRecoveryManager:
                 return await self._restart_workflow_from_beginning(current_state)
             elif strategy == RecoveryStrategy.RESUME_FROM_LAST_SUCCESS:
                 return await self._resume_from_last_success(current_state)
+            elif strategy == RecoveryStrategy.RESUME_FROM_CHECKPOINT:
+                checkpoint = await self.checkpoints.latest(workflow_id, successful_only=True)
+                return await self._resume_from_last_success(current_state, checkpoint)
             else:
                 logger.error(f"Recovery strategy {strategy} not implemented")
                 return None
@@ -132,6 +378,26 @@ class WorkflowRecoveryManager:
             logger.error(f"Failed to recover workflow {workflow_id}: {e}")
             return None
     
+    async def resume_workflow(
+        self,
+        workflow_id: str,
+        from_checkpoint: Optional[str] = None
+    ) -> Optional[WorkflowState]:
+        """Resume a workflow from a given checkpoint, or from its last successful one"""
+        if not from_checkpoint:
+            return await self.recover_workflow(workflow_id, RecoveryStrategy.RESUME_FROM_LAST_SUCCESS)
+        
+        try:
+            checkpoint = await self.checkpoints.get(workflow_id, from_checkpoint)
+            if not checkpoint:
+                logger.error(f"Cannot resume workflow {workflow_id}: checkpoint {from_checkpoint} not found")
+                return None
+            # The snapshot holds the full state, so the current one need not be loaded
+            return await self._resume_from_last_success(None, checkpoint)
+        except Exception as e:
+            logger.error(f"Failed to resume workflow {workflow_id} from {from_checkpoint}: {e}")
+            return None
+    
     async def auto_recover_interrupted_workflows(self) -> List[str]:
         """Automatically recover all interrupted workflows"""
         recovered_workflows = []
@@ -172,7 +438,8 @@ class WorkflowRecoveryManager:
                 return {"error": "Workflow not found"}
             
             # Get available checkpoints
-            checkpoints = self.checkpoints.get(workflow_id, [])
+            checkpoint_ids = await self.checkpoints.list_checkpoints(workflow_id)
+            recent_checkpoints = self.checkpoints.in_memory(workflow_id)
             
             # Analyze recovery options
             recovery_options = []
@@ -193,8 +460,10 @@ class WorkflowRecoveryManager:
                 "workflow_id": workflow_id,
                 "current_status": workflow_state.status.value,
                 "recovery_options": [option.value for option in recovery_options],
-                "available_checkpoints": len(checkpoints),
-                "last_checkpoint": checkpoints[-1].timestamp.isoformat() if checkpoints else None,
+                "available_checkpoints": len(checkpoint_ids),
+                "checkpoint_ids": checkpoint_ids,
+                "recent_checkpoints": [checkpoint.summary() for checkpoint in recent_checkpoints],
+                "last_checkpoint": recent_checkpoints[-1].timestamp.isoformat() if recent_checkpoints else None,
                 "workflow_age_hours": (datetime.now() - workflow_state.start_time).total_seconds() / 3600,
                 "can_auto_recover": True
             }
@@ -221,14 +490,24 @@ class WorkflowRecoveryManager:
         
         return workflow_state
     
-    async def _resume_from_last_success(self, workflow_state: WorkflowState) -> WorkflowState:
-        """Resume workflow from the last successful task"""
+    async def _resume_from_last_success(
+        self,
+        workflow_state: Optional[WorkflowState],
+        checkpoint: Optional[WorkflowCheckpoint] = None
+    ) -> WorkflowState:
+        """Resume workflow from the last successful task, or from an earlier checkpoint"""
+        if checkpoint is not None:
+            # Rebuild from the snapshot: tasks finished after it are dropped and run again
+            workflow_state = checkpoint.snapshot.restore()
+            workflow_state.current_step = f"resumed_from_checkpoint:{checkpoint.checkpoint_id}"
+        else:
+            workflow_state.current_step = "resumed_from_last_success"
+        
         # Reset running tasks
         workflow_state.running_tasks = []
         
         # Update status
         workflow_state.status = WorkflowStatus.RUNNING
-        workflow_state.current_step = "resumed_from_last_success"
         
         await self.persistence.save_workflow_state(workflow_state)
         return workflow_state
@@ -0,0 +1,99 @@
+"""
+Decode-once audio pipeline for the ASR service
+
+An uploaded file is decoded exactly once, straight to the 16 kHz mono float32
+buffer Whisper expects. Quality features are computed from that buffer and the
+same array is handed to Whisper, so no converted WAV is written and nothing is
+decoded twice. Decoding and feature extraction are CPU bound and run off the
+event loop.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import librosa
+    import numpy as np
+    import soundfile as sf
+    AUDIO_PROCESSING_AVAILABLE = True
+except ImportError:
+    AUDIO_PROCESSING_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Whisper models are trained on 16 kHz mono audio
+WHISPER_SAMPLE_RATE = 16000
+SILENCE_THRESHOLD = 0.01
+
+
+class DecodedAudio:
+    """A decoded 16 kHz mono float32 buffer and what is known about its source"""
+
+    def __init__(self, samples: "np.ndarray", source_sample_rate: Optional[int],
+                 source_channels: Optional[int], decode_seconds: float):
+        self.samples = samples
+        self.sample_rate = WHISPER_SAMPLE_RATE
+        self.source_sample_rate = source_sample_rate
+        self.source_channels = source_channels
+        self.decode_seconds = decode_seconds
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+
+def decode_audio(file_path: str) -> DecodedAudio:
+    """Decode and resample a file to 16 kHz mono float32 in a single pass"""
+    start_time = time.perf_counter()
+
+    # Header only; formats soundfile cannot parse (e.g. m4a) are decoded by audioread
+    source_sample_rate, source_channels = None, None
+    try:
+        info = sf.info(file_path)
+        source_sample_rate, source_channels = info.samplerate, info.channels
+    except Exception:
+        pass
+
+    samples, _ = librosa.load(file_path, sr=WHISPER_SAMPLE_RATE, mono=True, dtype=np.float32)
+    return DecodedAudio(samples, source_sample_rate, source_channels, time.perf_counter() - start_time)
+
+
+def compute_quality_features(audio: DecodedAudio) -> Dict[str, Any]:
+    """Quality metrics computed from the decoded buffer"""
+    y, sr = audio.samples, audio.sample_rate
+
+    rms_energy = librosa.feature.rms(y=y)[0]
+    spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
+    zero_crossing_rate = librosa.feature.zero_crossing_rate(y)[0]
+
+    avg_rms = float(np.mean(rms_energy)) if rms_energy.size else 0.0
+    avg_spectral_centroid = float(np.mean(spectral_centroid)) if spectral_centroid.size else 0.0
+    avg_zcr = float(np.mean(zero_crossing_rate)) if zero_crossing_rate.size else 0.0
+    silence_ratio = float(np.mean(rms_energy < SILENCE_THRESHOLD)) if rms_energy.size else 1.0
+
+    return {
+        "duration": audio.duration,
+        "sample_rate": audio.source_sample_rate or sr,
+        "channels": audio.source_channels or 1,
+        "quality_score": min(1.0, avg_rms * 10),  # Normalize RMS to 0-1
+        "silence_ratio": silence_ratio,
+        "avg_rms_energy": avg_rms,
+        "avg_spectral_centroid": avg_spectral_centroid,
+        "avg_zero_crossing_rate": avg_zcr,
+        "estimated_snr": float(20 * np.log10((avg_rms + 1e-8) / (avg_zcr + 1e-8))),  # Rough SNR estimate
+        "analysis_available": True
+    }
+
+
+def decode_and_analyze(file_path: str) -> Tuple[DecodedAudio, Dict[str, Any]]:
+    """Decode once and compute quality features from the same buffer"""
+    audio = decode_audio(file_path)
+    return audio, compute_quality_features(audio)
+
+
+async def load_audio(file_path: str) -> Tuple[DecodedAudio, Dict[str, Any]]:
+    """Decode and analyze off the event loop"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, decode_and_analyze, file_path)
@@ -0,0 +1,333 @@
+"""
+Whisper Inference Pool for the ASR service
+
+Runs Whisper in a pool of worker processes, each holding its own copy of the
+model, so concurrent transcriptions use separate cores instead of contending
+for one model and the GIL in the API process. Jobs wait in a bounded queue:
+when it is full, new jobs are rejected with InferencePoolFullError so the API
+can answer 503 instead of piling up work. Optionally, clips shorter than one
+Whisper window (30 s) are decoded together as a single batched forward pass.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+POOL_QUEUE_DEPTH = Gauge('asr_pool_queue_depth', 'Transcription jobs waiting for a worker')
+POOL_BUSY_WORKERS = Gauge('asr_pool_busy_workers', 'Whisper worker processes running a job')
+POOL_REJECTED = Counter('asr_pool_rejected_total', 'Transcription jobs rejected because the queue was full')
+POOL_QUEUE_WAIT = Histogram('asr_pool_queue_wait_seconds', 'Time a job waited for a worker')
+POOL_BATCH_SIZE = Histogram('asr_pool_batch_size', 'Clips per worker call', buckets=(1, 2, 4, 8, 16))
+POOL_AUDIO_SECONDS = Counter('asr_pool_audio_seconds_total', 'Seconds of audio transcribed by the pool')
+POOL_THROUGHPUT = Gauge('asr_pool_audio_seconds_per_wall_second', 'Audio seconds transcribed per wall-clock second (recent window)')
+
+SAMPLE_RATE = 16000
+WHISPER_WINDOW_SECONDS = 30.0
+
+
+class InferencePoolFullError(Exception):
+    """The transcription queue is full; retry later"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+# Worker process side -------------------------------------------------------
+
+_worker_model = None
+
+
+def _init_worker(model_name: str, threads: int):
+    """Load one Whisper model per worker process"""
+    global _worker_model
+    import torch
+    import whisper
+
+    if threads:
+        torch.set_num_threads(threads)
+    _worker_model = whisper.load_model(model_name)
+
+
+def _worker_ready() -> int:
+    return os.getpid()
+
+
+def _transcribe_one(audio: Any, language: Optional[str]) -> Dict[str, Any]:
+    result = _worker_model.transcribe(audio, language=language, verbose=False, word_timestamps=True)
+    return {"text": result["text"], "language": result.get("language"), "segments": result.get("segments", [])}
+
+
+def _decode_batch(items: List[Tuple[Any, Optional[str]]]) -> List[Dict[str, Any]]:
+    """Decode clips of at most one window in a single forward pass per language"""
+    import torch
+    import whisper
+
+    model = _worker_model
+    results: List[Optional[Dict[str, Any]]] = [None] * len(items)
+    by_language: Dict[Optional[str], List[int]] = {}
+    for index, (_, language) in enumerate(items):
+        by_language.setdefault(language, []).append(index)
+
+    for language, indexes in by_language.items():
+        mels = torch.stack([
+            whisper.log_mel_spectrogram(whisper.pad_or_trim(torch.from_numpy(items[i][0])), n_mels=model.dims.n_mels)
+            for i in indexes
+        ]).to(model.device)
+        options = whisper.DecodingOptions(language=language, without_timestamps=True, fp16=model.device.type == "cuda")
+        for index, decoded in zip(indexes, whisper.decode(model, mels, options)):
+            duration = len(items[index][0]) / SAMPLE_RATE
+            results[index] = {
+                "text": decoded.text,
+                "language": decoded.language,
+                "segments": [{
+                    "start": 0.0,
+                    "end": duration,
+                    "text": decoded.text,
+                    "avg_logprob": decoded.avg_logprob,
+                    "no_speech_prob": decoded.no_speech_prob,
+                    "words": []
+                }]
+            }
+    return results
+
+
+def _run_jobs(items: List[Tuple[Any, Optional[str]]], batched: bool) -> List[Dict[str, Any]]:
+    if batched and len(items) > 1:
+        return _decode_batch(items)
+    return [_transcribe_one(audio, language) for audio, language in items]
+
+
+# API process side ----------------------------------------------------------
+
+class _Job:
+    __slots__ = ("audio", "language", "duration", "future", "enqueued_at")
+
+    def __init__(self, audio: Any, language: Optional[str], duration: float, future: asyncio.Future):
+        self.audio = audio
+        self.language = language
+        self.duration = duration
+        self.future = future
+        self.enqueued_at = time.monotonic()
+
+
+class WhisperInferencePool:
+    """Process pool of Whisper models fed from a bounded job queue"""
+
+    def __init__(
+        self,
+        model_name: str = "base",
+        workers: int = 2,
+        threads_per_worker: int = 0,
+        max_queue: int = 32,
+        batching: bool = False,
+        batch_max_seconds: float = WHISPER_WINDOW_SECONDS,
+        batch_size: int = 8,
+        batch_window: float = 0.1,
+        throughput_window: float = 60.0,
+    ):
+        self.model_name = model_name
+        self.workers = max(1, workers)
+        self.threads_per_worker = threads_per_worker or max(1, (os.cpu_count() or 1) // self.workers)
+        self.max_queue = max_queue
+        self.batching = batching
+        self.batch_max_seconds = min(batch_max_seconds, WHISPER_WINDOW_SECONDS)
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.throughput_window = throughput_window
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.queue: Optional[asyncio.Queue] = None
+        self.deferred: Deque[_Job] = deque()
+        self.dispatchers: List[asyncio.Task] = []
+        self.busy = 0
+        self.completed: Deque[Tuple[float, float]] = deque()
+        self.started_at = 0.0
+        self.avg_job_seconds = 10.0
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            # torch does not survive fork reliably
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.model_name, self.threads_per_worker)
+        )
+
+    async def start(self) -> bool:
+        """Spawn the workers and wait until each has loaded its model"""
+        self.executor = self._new_executor()
+        loop = asyncio.get_running_loop()
+        try:
+            pids = await asyncio.gather(*[
+                loop.run_in_executor(self.executor, _worker_ready) for _ in range(self.workers)
+            ])
+        except Exception as e:
+            logger.warning(f"❌ Whisper worker pool failed to start: {e}")
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+            return False
+
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.started_at = time.monotonic()
+        self.dispatchers = [asyncio.create_task(self._dispatch_loop()) for _ in range(self.workers)]
+        logger.info(f"✅ Whisper pool started: {len(set(pids))} worker processes, "
+                    f"{self.threads_per_worker} threads each, model {self.model_name}")
+        return True
+
+    async def stop(self):
+        for task in self.dispatchers:
+            task.cancel()
+        await asyncio.gather(*self.dispatchers, return_exceptions=True)
+        self.dispatchers = []
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    @property
+    def available(self) -> bool:
+        return self.executor is not None
+
+    async def transcribe(self, audio: Any, language: Optional[str] = None, duration: float = 0.0) -> Dict[str, Any]:
+        """Queue a clip (16 kHz float32 array or file path) and wait for its transcript"""
+        if not self.available:
+            raise Exception("Whisper inference pool not available")
+
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait(_Job(audio, language, duration, future))
+        except asyncio.QueueFull:
+            POOL_REJECTED.inc()
+            retry_after = self.avg_job_seconds * self.max_queue / self.workers
+            raise InferencePoolFullError(f"Transcription queue is full ({self.max_queue} jobs)", retry_after)
+        POOL_QUEUE_DEPTH.set(self.queued)
+        return await future
+
+    @property
+    def queued(self) -> int:
+        return (self.queue.qsize() if self.queue else 0) + len(self.deferred)
+
+    def _batchable(self, job: _Job) -> bool:
+        return self.batching and not isinstance(job.audio, str) and 0 < job.duration <= self.batch_max_seconds
+
+    async def _next_job(self) -> _Job:
+        if self.deferred:
+            return self.deferred.popleft()
+        return await self.queue.get()
+
+    async def _collect_batch(self, first: _Job) -> List[_Job]:
+        """Gather more short clips for a brief window; long ones are deferred to the next turn"""
+        batch = [first]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                job = await asyncio.wait_for(self.queue.get(), timeout=remaining)
+            except asyncio.TimeoutError:
+                break
+            if self._batchable(job):
+                batch.append(job)
+            else:
+                self.deferred.append(job)
+        return batch
+
+    async def _dispatch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self._next_job()
+            if job.future.done():
+                continue
+            batch = await self._collect_batch(job) if self._batchable(job) else [job]
+            batch = [job for job in batch if not job.future.done()]
+            if not batch:
+                continue
+
+            POOL_QUEUE_DEPTH.set(self.queued)
+            for job in batch:
+                POOL_QUEUE_WAIT.observe(time.monotonic() - job.enqueued_at)
+            POOL_BATCH_SIZE.observe(len(batch))
+
+            self.busy += 1
+            POOL_BUSY_WORKERS.set(self.busy)
+            start_time = time.monotonic()
+            executor = self.executor
+            try:
+                results = await loop.run_in_executor(
+                    executor,
+                    _run_jobs,
+                    [(job.audio, job.language) for job in batch],
+                    len(batch) > 1
+                )
+                for job, result in zip(batch, results):
+                    if not job.future.done():
+                        job.future.set_result(result)
+                self._record_completion(batch, time.monotonic() - start_time)
+            except asyncio.CancelledError:
+                for job in batch:
+                    if not job.future.done():
+                        job.future.cancel()
+                raise
+            except BrokenProcessPool as e:
+                self._fail(batch, e)
+                # Every in-flight call on the broken pool fails; restart it once
+                if self.executor is executor:
+                    logger.error(f"❌ Whisper worker died, restarting pool: {e}")
+                    self._restart_executor()
+            except Exception as e:
+                self._fail(batch, e)
+            finally:
+                self.busy -= 1
+                POOL_BUSY_WORKERS.set(self.busy)
+
+    def _fail(self, batch: List[_Job], error: Exception):
+        for job in batch:
+            if not job.future.done():
+                job.future.set_exception(error)
+
+    def _restart_executor(self):
+        broken = self.executor
+        self.executor = self._new_executor()
+        if broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+
+    def _record_completion(self, batch: List[_Job], elapsed: float):
+        now = time.monotonic()
+        audio_seconds = sum(job.duration for job in batch)
+        POOL_AUDIO_SECONDS.inc(audio_seconds)
+        self.avg_job_seconds = 0.8 * self.avg_job_seconds + 0.2 * (elapsed / len(batch))
+        self.completed.append((now, audio_seconds))
+        while self.completed and self.completed[0][0] < now - self.throughput_window:
+            self.completed.popleft()
+        POOL_THROUGHPUT.set(self.throughput())
+
+    def throughput(self) -> float:
+        """Audio seconds transcribed per wall-clock second over the recent window"""
+        window = min(self.throughput_window, max(time.monotonic() - self.started_at, 1e-6))
+        cutoff = time.monotonic() - window
+        return sum(seconds for at, seconds in self.completed if at >= cutoff) / window
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "model": self.model_name,
+            "workers": self.workers,
+            "threads_per_worker": self.threads_per_worker,
+            "busy_workers": self.busy,
+            "queued": self.queued,
+            "max_queue": self.max_queue,
+            "batching": self.batching,
+            "avg_job_seconds": round(self.avg_job_seconds, 3),
+            "audio_seconds_per_wall_second": round(self.throughput(), 3)
+        }
@@ -0,0 +1,195 @@
+"""
+Long-form transcription for the ASR service
+
+Long recordings are split at pauses found by an energy-based voice activity
+detector, the chunks are transcribed in parallel on the Whisper inference
+pool, and the chunk transcripts are stitched back together with timestamps
+shifted to the position of each chunk in the recording. Chunk results are
+emitted as they complete so callers can stream partial transcripts.
+"""
+
+import asyncio
+import logging
+from collections import Counter as TallyCounter
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .inference_pool import InferencePoolFullError, WhisperInferencePool
+
+try:
+    import librosa
+    import numpy as np
+    VAD_AVAILABLE = True
+except ImportError:
+    VAD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_LENGTH = 400  # 25 ms
+HOP_LENGTH = 160  # 10 ms
+
+
+class AudioChunk:
+    """A span of the recording, in samples"""
+
+    def __init__(self, index: int, start_sample: int, end_sample: int):
+        self.index = index
+        self.start_sample = start_sample
+        self.end_sample = end_sample
+
+    @property
+    def start(self) -> float:
+        return self.start_sample / SAMPLE_RATE
+
+    @property
+    def end(self) -> float:
+        return self.end_sample / SAMPLE_RATE
+
+
+def detect_speech(samples: "np.ndarray", top_db: float = 35.0) -> "np.ndarray":
+    """Per 10 ms frame: whether it is within top_db of the loudest frame"""
+    rms = librosa.feature.rms(y=samples, frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH)[0]
+    return librosa.amplitude_to_db(rms, ref=np.max) > -top_db
+
+
+def plan_chunks(samples: "np.ndarray", target_seconds: float = 30.0, max_seconds: float = 60.0,
+                min_silence: float = 0.3, top_db: float = 35.0) -> List[AudioChunk]:
+    """Split at the pause closest to target_seconds; hard-split at the quietest frame past max_seconds.
+
+    Chunks without any speech are dropped, which also keeps Whisper from
+    hallucinating text on long silences.
+    """
+    speech = detect_speech(samples, top_db)
+    frames = len(speech)
+    frames_per_second = SAMPLE_RATE / HOP_LENGTH
+
+    # Midpoints of silent runs long enough to be a pause
+    padded = np.concatenate(([1], speech.astype(np.int8), [1]))
+    edges = np.diff(padded)
+    silence_starts, silence_ends = np.where(edges == -1)[0], np.where(edges == 1)[0]
+    long_enough = (silence_ends - silence_starts) >= min_silence * frames_per_second
+    cuts = ((silence_starts[long_enough] + silence_ends[long_enough]) // 2).tolist()
+
+    target, maximum = int(target_seconds * frames_per_second), int(max_seconds * frames_per_second)
+    boundaries, start, cut_index = [0], 0, 0
+    while frames - start > maximum:
+        while cut_index < len(cuts) and cuts[cut_index] <= start + target // 2:
+            cut_index += 1
+        candidates = []
+        while cut_index + len(candidates) < len(cuts) and cuts[cut_index + len(candidates)] <= start + maximum:
+            candidates.append(cuts[cut_index + len(candidates)])
+
+        if candidates:
+            cut = min(candidates, key=lambda frame: abs(frame - (start + target)))
+        else:
+            # No pause in range: cut at the quietest frame of the overflow zone
+            rms = librosa.feature.rms(
+                y=samples[(start + target) * HOP_LENGTH:(start + maximum) * HOP_LENGTH + FRAME_LENGTH],
+                frame_length=FRAME_LENGTH, hop_length=HOP_LENGTH, center=False
+            )[0]
+            cut = start + target + int(np.argmin(rms)) if rms.size else start + maximum
+        boundaries.append(cut)
+        start = cut
+    boundaries.append(frames)
+
+    chunks = []
+    for first, last in zip(boundaries, boundaries[1:]):
+        if last > first and speech[first:last].any():
+            end_sample = min(last * HOP_LENGTH, len(samples))
+            chunks.append(AudioChunk(len(chunks), first * HOP_LENGTH, end_sample))
+    return chunks
+
+
+def shift_result(result: Dict[str, Any], offset: float) -> List[Dict[str, Any]]:
+    """Chunk segments with timestamps relative to the whole recording"""
+    segments = []
+    for segment in result.get("segments", []):
+        shifted = dict(segment)
+        shifted["start"] = segment.get("start", 0) + offset
+        shifted["end"] = segment.get("end", 0) + offset
+        shifted["words"] = [
+            {**word, "start": word.get("start", 0) + offset, "end": word.get("end", 0) + offset}
+            for word in segment.get("words", []) or []
+        ]
+        segments.append(shifted)
+    return segments
+
+
+class LongFormTranscriber:
+    """Transcribes long recordings as parallel VAD-delimited chunks"""
+
+    def __init__(self, pool: WhisperInferencePool, target_seconds: float = 30.0,
+                 max_seconds: float = 60.0, parallelism: int = 0, max_retry_wait: float = 5.0):
+        self.pool = pool
+        self.target_seconds = target_seconds
+        self.max_seconds = max_seconds
+        # Enough in flight to keep every worker busy without filling the shared queue
+        self.parallelism = parallelism or min(pool.workers * 2, max(1, pool.max_queue // 2))
+        self.max_retry_wait = max_retry_wait
+
+    async def _transcribe_chunk(self, samples: "np.ndarray", chunk: AudioChunk, language: Optional[str],
+                                semaphore: asyncio.Semaphore):
+        async with semaphore:
+            while True:
+                try:
+                    result = await self.pool.transcribe(
+                        samples[chunk.start_sample:chunk.end_sample],
+                        language=language,
+                        duration=chunk.end - chunk.start
+                    )
+                    return chunk, result
+                except InferencePoolFullError as e:
+                    # Other requests filled the queue; wait for room rather than failing the recording
+                    await asyncio.sleep(min(e.retry_after, self.max_retry_wait))
+
+    async def stream(self, samples: "np.ndarray", language: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Yield a plan event, one event per chunk as it completes, then the stitched result"""
+        loop = asyncio.get_running_loop()
+        chunks = await loop.run_in_executor(None, plan_chunks, samples, self.target_seconds, self.max_seconds)
+        yield {
+            "event": "plan",
+            "duration": len(samples) / SAMPLE_RATE,
+            "chunks": [{"index": c.index, "start": c.start, "end": c.end} for c in chunks]
+        }
+
+        semaphore = asyncio.Semaphore(self.parallelism)
+        tasks = [asyncio.create_task(self._transcribe_chunk(samples, chunk, language, semaphore)) for chunk in chunks]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(chunks)
+        try:
+            for completed in asyncio.as_completed(tasks):
+                chunk, result = await completed
+                segments = shift_result(result, chunk.start)
+                results[chunk.index] = {"text": result.get("text", "").strip(), "language": result.get("language"),
+                                        "segments": segments}
+                yield {
+                    "event": "chunk",
+                    "index": chunk.index,
+                    "start": chunk.start,
+                    "end": chunk.end,
+                    "text": results[chunk.index]["text"],
+                    "segments": segments,
+                    "completed_chunks": sum(1 for r in results if r is not None),
+                    "total_chunks": len(chunks)
+                }
+        finally:
+            # Client went away or a chunk failed: drop the queued remainder
+            for task in tasks:
+                task.cancel()
+
+        languages = TallyCounter(r["language"] for r in results if r and r["language"])
+        yield {
+            "event": "completed",
+            "result": {
+                "text": " ".join(r["text"] for r in results if r and r["text"]),
+                "language": languages.most_common(1)[0][0] if languages else language,
+                "segments": [segment for r in results if r for segment in r["segments"]],
+                "chunks": len(chunks)
+            }
+        }
+
+    async def transcribe(self, samples: "np.ndarray", language: Optional[str] = None) -> Dict[str, Any]:
+        """Transcribe without streaming; returns the stitched result"""
+        async for event in self.stream(samples, language):
+            if event["event"] == "completed":
+                return event["result"]
+        raise RuntimeError("Long-form transcription ended without a result")
@@ -7,11 +7,13 @@ Supports free speech-to-text services with audio format validation and confidenc
 """
 
 from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 from typing import Dict, Any, Optional, List
 import uvicorn
 import os
+import json
 import time
 import logging
 import tempfile
@@ -22,12 +24,16 @@ from datetime import datetime
 from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
 from enum import Enum
 
+from .audio_pipeline import load_audio
+from .inference_pool import InferencePoolFullError, WhisperInferencePool
+from .long_form import LongFormTranscriber
+from .transcript_store import TranscriptStore, hash_file
+
 # Try to import audio processing libraries
 try:
     import whisper
     import torch
     import librosa
-    import soundfile as sf
     import numpy as np
     WHISPER_AVAILABLE = True
     AUDIO_PROCESSING_AVAILABLE = True
@@ -74,6 +80,26 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 FREE_AI_SERVICE_URL = os.getenv("FREE_AI_SERVICE_URL", "http://free-ai-service:8000")
 ASR_MODE = os.getenv("ASR_MODE", "free")  # free, paid, hybrid
 
+# Whisper inference pool configuration
+WHISPER_MODEL = os.getenv("WHISPER_MODEL", "base")
+ASR_WORKERS = int(os.getenv("ASR_WORKERS", "2"))
+ASR_WORKER_THREADS = int(os.getenv("ASR_WORKER_THREADS", "0"))  # 0 = cores / workers
+ASR_MAX_QUEUE = int(os.getenv("ASR_MAX_QUEUE", "32"))
+ASR_BATCHING = os.getenv("ASR_BATCHING", "false").lower() == "true"
+ASR_BATCH_SIZE = int(os.getenv("ASR_BATCH_SIZE", "8"))
+ASR_BATCH_WINDOW_MS = float(os.getenv("ASR_BATCH_WINDOW_MS", "100"))
+
+# Long-form transcription configuration
+ASR_MAX_DURATION = int(os.getenv("ASR_MAX_DURATION", str(60 * 60)))
+ASR_LONG_FORM_THRESHOLD = float(os.getenv("ASR_LONG_FORM_THRESHOLD", "120"))
+ASR_CHUNK_SECONDS = float(os.getenv("ASR_CHUNK_SECONDS", "30"))
+ASR_MAX_CHUNK_SECONDS = float(os.getenv("ASR_MAX_CHUNK_SECONDS", "60"))
+
+# Transcript store configuration
+ASR_TRANSCRIPT_STORE_DIR = os.getenv("ASR_TRANSCRIPT_STORE_DIR", os.path.join(tempfile.gettempdir(), "asr-transcripts"))
+ASR_TRANSCRIPT_TTL = float(os.getenv("ASR_TRANSCRIPT_TTL", str(7 * 24 * 3600)))
+ASR_TRANSCRIPT_STORE_MAX_MB = int(os.getenv("ASR_TRANSCRIPT_STORE_MAX_MB", "256"))
+
 class ASRProvider(str, Enum):
     LOCAL_WHISPER = "local_whisper"
     OPENAI_WHISPER = "openai_whisper"
@@ -97,7 +123,7 @@ class AudioValidator:
     }
     
     MAX_FILE_SIZE = 25 * 1024 * 1024  # 25MB
-    MAX_DURATION = 25 * 60  # 25 minutes in seconds
+    MAX_DURATION = ASR_MAX_DURATION  # Long recordings are transcribed in chunks
     MIN_DURATION = 0.5  # 0.5 seconds minimum
     
     @classmethod
@@ -135,17 +161,15 @@ class AudioValidator:
     
     @classmethod
     async def analyze_audio_properties(cls, file_path: str) -> Dict[str, Any]:
-        """Analyze audio file properties using librosa"""
+        """Analyze audio file properties from a single 16 kHz decode"""
         
         if not AUDIO_PROCESSING_AVAILABLE:
             return cls._mock_audio_properties()
         
         try:
-            # Load audio file
-            y, sr = librosa.load(file_path, sr=None)
-            
-            # Calculate basic properties
-            duration = librosa.get_duration(y=y, sr=sr)
+            # Decode once to 16 kHz off the event loop and analyze that buffer
+            _, properties = await load_audio(file_path)
+            duration = properties["duration"]
             
             # Check duration limits
             if duration < cls.MIN_DURATION:
@@ -160,36 +184,10 @@ class AudioValidator:
                     detail=f"Audio duration {duration:.2f}s exceeds maximum {cls.MAX_DURATION}s"
                 )
             
-            # Calculate audio quality metrics
-            rms_energy = librosa.feature.rms(y=y)[0]
-            spectral_centroid = librosa.feature.spectral_centroid(y=y, sr=sr)[0]
-            zero_crossing_rate = librosa.feature.zero_crossing_rate(y)[0]
-            
-            # Estimate signal quality
-            avg_rms = np.mean(rms_energy)
-            avg_spectral_centroid = np.mean(spectral_centroid)
-            avg_zcr = np.mean(zero_crossing_rate)
-            
-            # Simple quality assessment
-            quality_score = min(1.0, avg_rms * 10)  # Normalize RMS to 0-1
-            
-            # Detect silence/noise
-            silence_threshold = 0.01
-            silence_ratio = np.sum(rms_energy < silence_threshold) / len(rms_energy)
-            
-            return {
-                "duration": duration,
-                "sample_rate": sr,
-                "channels": 1 if len(y.shape) == 1 else y.shape[0],
-                "quality_score": float(quality_score),
-                "silence_ratio": float(silence_ratio),
-                "avg_rms_energy": float(avg_rms),
-                "avg_spectral_centroid": float(avg_spectral_centroid),
-                "avg_zero_crossing_rate": float(avg_zcr),
-                "estimated_snr": float(20 * np.log10(avg_rms / (avg_zcr + 1e-8))),  # Rough SNR estimate
-                "analysis_available": True
-            }
+            return properties
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Audio analysis failed: {e}")
             return cls._mock_audio_properties()
@@ -209,43 +207,31 @@ class AudioValidator:
             "estimated_snr": 15.0,
             "analysis_available": False
         }
-    
-    @classmethod
-    async def convert_audio_format(cls, input_path: str, output_path: str, target_format: str = "wav") -> str:
-        """Convert audio to target format for better compatibility"""
-        
-        if not AUDIO_PROCESSING_AVAILABLE:
-            return input_path  # Return original if conversion not available
-        
-        try:
-            # Load audio
-            y, sr = librosa.load(input_path, sr=16000)  # Standardize to 16kHz for Whisper
-            
-            # Save in target format
-            sf.write(output_path, y, sr, format=target_format.upper())
-            
-            logger.info(f"Audio converted from {input_path} to {output_path} ({target_format})")
-            return output_path
-            
-        except Exception as e:
-            logger.error(f"Audio conversion failed: {e}")
-            return input_path  # Return original on failure
 
 class WhisperASRService:
     def __init__(self):
-        self.local_model = None
+        self.inference_pool = None
+        self.long_form = None
         self.openai_client = None
         self.provider_status = {}
         
-        # Initialize local Whisper model
+        # Local Whisper runs in worker processes, started with the app
         if WHISPER_AVAILABLE and ASR_MODE in ["free", "hybrid"]:
-            try:
-                self.local_model = whisper.load_model("base")
-                self.provider_status["local_whisper"] = "available"
-                logger.info("✅ Local Whisper model loaded successfully")
-            except Exception as e:
-                logger.warning(f"❌ Failed to load local Whisper model: {e}")
-                self.provider_status["local_whisper"] = "unavailable"
+            self.inference_pool = WhisperInferencePool(
+                model_name=WHISPER_MODEL,
+                workers=ASR_WORKERS,
+                threads_per_worker=ASR_WORKER_THREADS,
+                max_queue=ASR_MAX_QUEUE,
+                batching=ASR_BATCHING,
+                batch_size=ASR_BATCH_SIZE,
+                batch_window=ASR_BATCH_WINDOW_MS / 1000
+            )
+            self.long_form = LongFormTranscriber(
+                self.inference_pool,
+                target_seconds=ASR_CHUNK_SECONDS,
+                max_seconds=ASR_MAX_CHUNK_SECONDS
+            )
+            self.provider_status["local_whisper"] = "starting"
         else:
             self.provider_status["local_whisper"] = "unavailable"
         
@@ -264,97 +250,108 @@ class WhisperASRService:
         # Mock is always available
         self.provider_status["mock"] = "available"
     
+    async def start(self):
+        """Start the local Whisper worker pool"""
+        if self.inference_pool:
+            started = await self.inference_pool.start()
+            self.provider_status["local_whisper"] = "available" if started else "unavailable"
+    
+    async def stop(self):
+        if self.inference_pool:
+            await self.inference_pool.stop()
+    
     async def transcribe_with_local_whisper(self, audio_file_path: str, language: str = None) -> Dict[str, Any]:
         """Transcribe audio using local Whisper model with enhanced confidence scoring"""
-        if not self.local_model:
+        if not self.inference_pool or not self.inference_pool.available:
             raise Exception("Local Whisper model not available")
         
         logger.info("🎤 Transcribing with local Whisper model...")
         
         try:
-            # Analyze audio properties first
-            audio_props = await AudioValidator.analyze_audio_properties(audio_file_path)
-            
-            # Convert audio if needed for better compatibility
-            converted_path = audio_file_path
+            # Decode once; quality features and Whisper both use the 16 kHz buffer
             if AUDIO_PROCESSING_AVAILABLE:
-                converted_path = audio_file_path.replace(os.path.splitext(audio_file_path)[1], '_converted.wav')
-                converted_path = await AudioValidator.convert_audio_format(audio_file_path, converted_path, "wav")
+                audio, audio_props = await load_audio(audio_file_path)
+                whisper_input = audio.samples
+            else:
+                audio, audio_props = None, AudioValidator._mock_audio_properties()
+                whisper_input = audio_file_path
             
-            # Run Whisper in a thread to avoid blocking
-            loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(
-                None, 
-                lambda: self.local_model.transcribe(
-                    converted_path, 
+            if audio is not None and audio.duration > ASR_LONG_FORM_THRESHOLD:
+                # Long recordings are split at pauses and transcribed in parallel
+                result = await self.long_form.transcribe(audio.samples, language)
+            else:
+                # Queue for a Whisper worker process
+                result = await self.inference_pool.transcribe(
+                    whisper_input,
                     language=language,
-                    verbose=False,
-                    word_timestamps=True
+                    duration=audio.duration if audio else 0.0
                 )
-            )
             
-            # Extract segments with enhanced information
-            segments = []
-            total_confidence = 0
-            segment_count = 0
+            return self.build_local_result(result, audio, audio_props, language)
+        except InferencePoolFullError:
+            raise
+        except Exception as e:
+            logger.error(f"Local Whisper transcription failed: {e}")
+            raise e
+    
+    def build_local_result(self, result: Dict[str, Any], audio: Any, audio_props: Dict[str, Any],
+                           language: str = None) -> Dict[str, Any]:
+        """Score Whisper segments and assemble the local transcription result"""
+        # Extract segments with enhanced information
+        segments = []
+        total_confidence = 0
+        segment_count = 0
+        
+        for segment in result.get("segments", []):
+            # Calculate segment confidence based on audio quality and length
+            segment_duration = segment.get("end", 0) - segment.get("start", 0)
+            segment_text = segment.get("text", "").strip()
             
-            for segment in result.get("segments", []):
-                # Calculate segment confidence based on audio quality and length
-                segment_duration = segment.get("end", 0) - segment.get("start", 0)
-                segment_text = segment.get("text", "").strip()
-                
-                # Estimate confidence based on various factors
-                base_confidence = 0.85  # Base Whisper confidence
-                
-                # Adjust based on audio quality
-                quality_factor = audio_props.get("quality_score", 0.8)
-                snr_factor = min(1.0, max(0.3, audio_props.get("estimated_snr", 15) / 20))
-                
-                # Adjust based on segment characteristics
-                length_factor = min(1.0, max(0.5, len(segment_text) / 50))  # Longer text usually more reliable
-                duration_factor = min(1.0, max(0.5, segment_duration / 5))  # Reasonable duration
-                
-                segment_confidence = base_confidence * quality_factor * snr_factor * length_factor * duration_factor
-                segment_confidence = max(0.3, min(0.95, segment_confidence))  # Clamp between 0.3 and 0.95
-                
-                segments.append({
-                    "start": segment.get("start", 0),
-                    "end": segment.get("end", 0),
-                    "text": segment_text,
-                    "confidence": round(segment_confidence, 3),
-                    "words": segment.get("words", [])
-                })
-                
-                total_confidence += segment_confidence
-                segment_count += 1
+            # Estimate confidence based on various factors
+            base_confidence = 0.85  # Base Whisper confidence
             
-            # Calculate overall confidence
-            overall_confidence = total_confidence / segment_count if segment_count > 0 else 0.85
+            # Adjust based on audio quality
+            quality_factor = audio_props.get("quality_score", 0.8)
+            snr_factor = min(1.0, max(0.3, audio_props.get("estimated_snr", 15) / 20))
             
-            # Clean up converted file if created
-            if converted_path != audio_file_path and os.path.exists(converted_path):
-                try:
-                    os.unlink(converted_path)
-                except:
-                    pass
+            # Adjust based on segment characteristics
+            length_factor = min(1.0, max(0.5, len(segment_text) / 50))  # Longer text usually more reliable
+            duration_factor = min(1.0, max(0.5, segment_duration / 5))  # Reasonable duration
             
-            return {
-                "transcript": result["text"].strip(),
-                "language": result.get("language", language or "en"),
-                "confidence": round(overall_confidence, 3),
-                "segments": segments,
-                "provider": "local_whisper",
-                "model": "whisper-base",
-                "audio_properties": audio_props,
-                "processing_info": {
-                    "audio_converted": converted_path != audio_file_path,
-                    "segments_count": len(segments),
-                    "total_duration": audio_props.get("duration", 0)
-                }
+            segment_confidence = base_confidence * quality_factor * snr_factor * length_factor * duration_factor
+            segment_confidence = max(0.3, min(0.95, segment_confidence))  # Clamp between 0.3 and 0.95
+            
+            segments.append({
+                "start": segment.get("start", 0),
+                "end": segment.get("end", 0),
+                "text": segment_text,
+                "confidence": round(segment_confidence, 3),
+                "words": segment.get("words", [])
+            })
+            
+            total_confidence += segment_confidence
+            segment_count += 1
+        
+        # Calculate overall confidence
+        overall_confidence = total_confidence / segment_count if segment_count > 0 else 0.85
+        
+        return {
+            "transcript": result["text"].strip(),
+            "language": result.get("language", language or "en"),
+            "confidence": round(overall_confidence, 3),
+            "segments": segments,
+            "provider": "local_whisper",
+            "model": f"whisper-{WHISPER_MODEL}",
+            "audio_properties": audio_props,
+            "processing_info": {
+                "audio_converted": audio is not None,
+                "decode_seconds": round(audio.decode_seconds, 3) if audio else 0.0,
+                "segments_count": len(segments),
+                "total_duration": audio_props.get("duration", 0),
+                "long_form": "chunks" in result,
+                "chunks": result.get("chunks", 1)
             }
-        except Exception as e:
-            logger.error(f"Local Whisper transcription failed: {e}")
-            raise e
+        }
     
     async def transcribe_with_openai_whisper(self, audio_file_path: str, language: str = None) -> Dict[str, Any]:
         """Transcribe audio using OpenAI Whisper API"""
@@ -458,6 +455,9 @@ class WhisperASRService:
                     else:  # mock
                         return self.transcribe_with_mock(audio_file_path, language)
                         
+                except InferencePoolFullError:
+                    # Backpressure is reported to the caller, not papered over
+                    raise
                 except Exception as e:
                     logger.warning(f"⚠️ Provider {provider} failed: {e}")
                     continue
@@ -468,6 +468,29 @@ class WhisperASRService:
 
 # Initialize ASR service
 asr_service = WhisperASRService()
+transcript_store = TranscriptStore(
+    ASR_TRANSCRIPT_STORE_DIR,
+    ttl_seconds=ASR_TRANSCRIPT_TTL,
+    max_bytes=ASR_TRANSCRIPT_STORE_MAX_MB * 1024 * 1024
+)
+
+@app.on_event("startup")
+async def startup_event():
+    """Start the Whisper worker pool and load the transcript store"""
+    await transcript_store.load()
+    await asr_service.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the Whisper worker pool"""
+    await asr_service.stop()
+
+def _queue_full_response(error: InferencePoolFullError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(max(1, int(error.retry_after)))}
+    )
 
 # Prometheus metrics
 ASR_REQUEST_COUNT = Counter('asr_requests_total', 'Total ASR requests', ['provider', 'status'])
@@ -496,6 +519,7 @@ class TranscriptionResponse(BaseModel):
     word_count: int
     duration: float
     created_at: str
+    cached: bool = False
 
 class VoiceAnalysisResponse(BaseModel):
     analysis_id: str
@@ -529,14 +553,13 @@ async def transcribe_audio(request: TranscriptionRequest):
     ASR_ACTIVE_REQUESTS.inc()
     
     try:
-        transcription_id = f"asr_{int(time.time())}"
-        
         # Perform enhanced transcription
         transcript_result = await perform_transcription(
             request.voice_file_url,
             request.language,
             request.model
         )
+        transcription_id = transcript_result.get("transcription_id", f"asr_{int(time.time())}")
         
         processing_time = time.time() - start_time
         
@@ -557,9 +580,14 @@ async def transcribe_audio(request: TranscriptionRequest):
             processing_time=processing_time,
             word_count=transcript_result["word_count"],
             duration=transcript_result["duration"],
-            created_at=datetime.now().isoformat()
+            created_at=datetime.now().isoformat(),
+            cached=transcript_result.get("cached", False)
         )
         
+    except InferencePoolFullError as e:
+        ASR_REQUEST_COUNT.labels(provider="local_whisper", status="rejected").inc()
+        ASR_ACTIVE_REQUESTS.dec()
+        raise _queue_full_response(e)
     except Exception as e:
         logger.error(f"Error transcribing audio: {e}")
         processing_time = time.time() - start_time
@@ -572,6 +600,65 @@ async def transcribe_audio(request: TranscriptionRequest):
         
         raise HTTPException(status_code=500, detail=f"Failed to transcribe audio: {str(e)}")
 
+@app.post("/api/transcribe/stream")
+async def transcribe_audio_stream(request: TranscriptionRequest):
+    """Transcribe a long recording in parallel chunks, streaming partial transcripts as NDJSON"""
+    if not asr_service.long_form or not asr_service.inference_pool.available:
+        raise HTTPException(status_code=503, detail="Local Whisper is not available for long-form transcription")
+    
+    downloaded_path = None
+    try:
+        if request.voice_file_url.startswith(('http://', 'https://')):
+            audio_file_path = downloaded_path = await download_audio_file(request.voice_file_url)
+        else:
+            audio_file_path = request.voice_file_url
+        audio, audio_props = await load_audio(audio_file_path)
+    except Exception as e:
+        logger.error(f"Error loading audio for streaming transcription: {e}")
+        raise HTTPException(status_code=400, detail=f"Failed to load audio: {str(e)}")
+    finally:
+        # The decoded samples are in memory, so the download is not needed while streaming
+        if downloaded_path:
+            try:
+                os.unlink(downloaded_path)
+            except OSError:
+                pass
+    
+    if audio.duration > AudioValidator.MAX_DURATION:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Audio duration {audio.duration:.2f}s exceeds maximum {AudioValidator.MAX_DURATION}s"
+        )
+    
+    async def event_stream():
+        start_time = time.time()
+        ASR_ACTIVE_REQUESTS.inc()
+        try:
+            async for event in asr_service.long_form.stream(audio.samples, request.language):
+                if event["event"] == "completed":
+                    result = asr_service.build_local_result(event["result"], audio, audio_props, request.language)
+                    processing_time = time.time() - start_time
+                    event = {
+                        "event": "completed",
+                        "transcription_id": f"asr_{int(start_time)}",
+                        "word_count": len(result["transcript"].split()),
+                        "duration": audio.duration,
+                        "processing_time": processing_time,
+                        **result
+                    }
+                    ASR_REQUEST_COUNT.labels(provider="local_whisper", status="success").inc()
+                    ASR_REQUEST_DURATION.labels(provider="local_whisper").observe(processing_time)
+                    ASR_AUDIO_DURATION.labels(provider="local_whisper").inc(audio.duration)
+                yield json.dumps(event, default=str) + "\n"
+        except Exception as e:
+            logger.error(f"Streaming transcription failed: {e}")
+            ASR_REQUEST_COUNT.labels(provider="local_whisper", status="failed").inc()
+            yield json.dumps({"event": "error", "detail": str(e)}) + "\n"
+        finally:
+            ASR_ACTIVE_REQUESTS.dec()
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson", headers={"Cache-Control": "no-cache"})
+
 @app.post("/api/transcribe-with-analysis")
 async def transcribe_with_voice_analysis(request: TranscriptionRequest):
     """Enhanced transcription with voice quality analysis and recommendations"""
@@ -579,14 +666,13 @@ async def transcribe_with_voice_analysis(request: TranscriptionRequest):
     ASR_ACTIVE_REQUESTS.inc()
     
     try:
-        transcription_id = f"asr_analysis_{int(time.time())}"
-        
         # Perform transcription
         transcript_result = await perform_transcription(
             request.voice_file_url,
             request.language,
             request.model
         )
+        transcription_id = transcript_result.get("transcription_id", f"asr_analysis_{int(time.time())}")
         
         # Perform voice analysis
         voice_analysis = await perform_voice_analysis(
@@ -621,6 +707,10 @@ async def transcribe_with_voice_analysis(request: TranscriptionRequest):
             "created_at": datetime.now().isoformat()
         }
         
+    except InferencePoolFullError as e:
+        ASR_REQUEST_COUNT.labels(provider="local_whisper", status="rejected").inc()
+        ASR_ACTIVE_REQUESTS.dec()
+        raise _queue_full_response(e)
     except Exception as e:
         logger.error(f"Error in transcription with analysis: {e}")
         ASR_ACTIVE_REQUESTS.dec()
@@ -656,45 +746,73 @@ def _generate_transcription_recommendations(transcript_result: Dict, voice_analy
     return recommendations
 
 async def perform_transcription(voice_file_url: str, language: str, model: str) -> Dict[str, Any]:
-    """Perform audio transcription using available Whisper services"""
+    """Perform audio transcription, reusing stored transcripts of the same audio"""
     
+    downloaded_path = None
     try:
         # Download audio file if it's a URL
         if voice_file_url.startswith(('http://', 'https://')):
-            audio_file_path = await download_audio_file(voice_file_url)
+            audio_file_path = downloaded_path = await download_audio_file(voice_file_url)
         else:
             audio_file_path = voice_file_url
         
-        # Transcribe using fallback logic
-        result = await asr_service.transcribe_with_fallback(audio_file_path, language)
-        
-        # Calculate additional metrics
-        transcript = result["transcript"]
-        word_count = len(transcript.split())
-        
-        # Estimate duration from segments or use default
-        duration = 0
-        if result.get("segments"):
-            last_segment = result["segments"][-1]
-            duration = last_segment.get("end", 45.2)
-        else:
-            duration = 45.2  # Default duration
+        # Same bytes, language and model give the same transcript
+        loop = asyncio.get_running_loop()
+        audio_sha256 = await loop.run_in_executor(None, hash_file, audio_file_path)
+        key = transcript_store.make_key(audio_sha256, language, f"{model}|{WHISPER_MODEL}")
         
+        result, store_status = await transcript_store.get_or_transcribe(
+            key,
+            lambda: transcribe_audio_file(audio_file_path, language),
+            # Mock fallbacks are not worth remembering
+            cacheable=lambda result: result["provider"] != "mock"
+        )
         return {
-            "transcript": transcript,
-            "confidence": result["confidence"],
-            "language": result["language"],
-            "word_count": word_count,
-            "duration": duration,
-            "segments": result["segments"],
-            "provider": result["provider"],
-            "model_used": result["model"]
+            **result,
+            "transcription_id": transcript_store.transcription_id(key),
+            "cached": store_status != "miss"
         }
         
+    except InferencePoolFullError:
+        raise
     except Exception as e:
         logger.error(f"Transcription failed: {e}")
         # Fallback to mock if everything fails
         return asr_service.transcribe_with_mock("", language)
+    finally:
+        if downloaded_path:
+            try:
+                os.unlink(downloaded_path)
+            except OSError:
+                pass
+
+async def transcribe_audio_file(audio_file_path: str, language: str) -> Dict[str, Any]:
+    """Transcribe a local audio file with provider fallback"""
+    # Transcribe using fallback logic
+    result = await asr_service.transcribe_with_fallback(audio_file_path, language)
+    
+    # Calculate additional metrics
+    transcript = result["transcript"]
+    word_count = len(transcript.split())
+    
+    # Estimate duration from segments or use default
+    duration = 0
+    if result.get("segments"):
+        last_segment = result["segments"][-1]
+        duration = last_segment.get("end", 45.2)
+    else:
+        duration = 45.2  # Default duration
+    
+    return {
+        "transcript": transcript,
+        "confidence": result["confidence"],
+        "language": result["language"],
+        "word_count": word_count,
+        "duration": duration,
+        "segments": result["segments"],
+        "provider": result["provider"],
+        "model_used": result["model"]
+    }
 
 async def download_audio_file(url: str) -> str:
     """Download audio file from URL to temporary location"""
@@ -933,6 +1051,13 @@ async def get_providers():
         ]
     }
 
+@app.get("/api/inference-pool")
+async def get_inference_pool_status():
+    """Get Whisper worker pool load and throughput"""
+    if not asr_service.inference_pool:
+        return {"available": False}
+    return asr_service.inference_pool.get_status()
+
 @app.get("/api/supported-formats")
 async def get_supported_formats():
     """Get list of supported audio formats"""
@@ -964,7 +1089,7 @@ async def get_supported_formats():
             }
         ],
         "recommended_format": "WAV",
-        "max_duration": "25 minutes",
+        "max_duration": f"{AudioValidator.MAX_DURATION // 60} minutes",
         "supported_languages": [
             "en", "es", "fr", "de", "it", "pt", "ru", "ja", "ko", "zh"
         ]
@@ -973,13 +1098,18 @@ async def get_supported_formats():
 @app.get("/api/transcription-status/{transcription_id}")
 async def get_transcription_status(transcription_id: str):
     """Get the status of a transcription job"""
-    # Simulate status check
+    status = transcript_store.status(transcription_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail=f"Transcription {transcription_id} not found")
+    
+    created_at = status.get("created_at")
     return {
         "transcription_id": transcription_id,
-        "status": "completed",
-        "progress": 100,
+        "status": status["status"],
+        "progress": status["progress"],
         "estimated_completion": None,
-        "created_at": datetime.now().isoformat(),
+        "created_at": datetime.fromtimestamp(created_at).isoformat() if created_at else None,
+        "expires_at": datetime.fromtimestamp(status["expires_at"]).isoformat() if "expires_at" in status else None,
         "updated_at": datetime.now().isoformat()
     }
 
@@ -987,14 +1117,23 @@ async def get_transcription_status(transcription_id: str):
 async def delete_transcription(transcription_id: str):
     """Delete a transcription and its associated files"""
     try:
-        # Simulate deletion
+        key = transcript_store.resolve(transcription_id)
+        if key is None or not await transcript_store.delete(key):
+            raise HTTPException(status_code=404, detail=f"Transcription {transcription_id} not found")
         return {
             "status": "success",
             "message": f"Transcription {transcription_id} deleted successfully"
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error deleting transcription: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to delete transcription: {str(e)}")
 
+@app.get("/api/transcript-store/stats")
+async def get_transcript_store_stats():
+    """Get transcript store size and hit statistics"""
+    return transcript_store.get_stats()
+
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8000)
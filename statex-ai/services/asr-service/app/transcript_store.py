@@ -0,0 +1,280 @@
+"""
+Transcript Store for the ASR service
+
+Persists transcription results on disk, keyed by the SHA-256 of the audio
+bytes together with the language and model, so a retried submission or the
+same recording processed by both the legacy and the multi-agent workflow is
+transcribed once. Entries expire after a TTL and the least recently used ones
+are evicted when the store exceeds its size or entry budget. Concurrent
+requests for the same key wait for the first one instead of running Whisper
+twice. The store also backs the transcription status and delete endpoints.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+TRANSCRIPT_LOOKUPS = Counter('asr_transcript_store_lookups_total', 'Transcript store lookups', ['result'])
+TRANSCRIPT_ENTRIES = Gauge('asr_transcript_store_entries', 'Transcripts held in the store')
+TRANSCRIPT_BYTES = Gauge('asr_transcript_store_bytes', 'Disk space used by stored transcripts')
+
+
+def hash_file(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 of a file's bytes"""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class StoredTranscript:
+    """Index entry for a transcript on disk"""
+
+    __slots__ = ("key", "path", "size", "created_at", "expires_at")
+
+    def __init__(self, key: str, path: str, size: int, created_at: float, expires_at: float):
+        self.key = key
+        self.path = path
+        self.size = size
+        self.created_at = created_at
+        self.expires_at = expires_at
+
+
+class TranscriptStore:
+    """Disk-backed transcript store with TTL, LRU size eviction and request coalescing"""
+
+    def __init__(self, store_dir: str, ttl_seconds: float = 7 * 24 * 3600,
+                 max_bytes: int = 256 * 1024 * 1024, max_entries: int = 10000):
+        self.store_dir = store_dir
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.index: "OrderedDict[str, StoredTranscript]" = OrderedDict()
+        self.ids: Dict[str, str] = {}
+        self.total_bytes = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "coalesced": 0, "misses": 0}
+
+    @staticmethod
+    def make_key(audio_sha256: str, language: Optional[str], model: str) -> str:
+        return hashlib.sha256(f"{audio_sha256}|{language or 'auto'}|{model}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def transcription_id(key: str) -> str:
+        return f"asr_{key[:24]}"
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.store_dir, key[:2], f"{key}.json")
+
+    async def load(self):
+        """Rebuild the index from disk, least recently used first"""
+        loop = asyncio.get_running_loop()
+        entries = await loop.run_in_executor(None, self._scan)
+        for entry in entries:
+            self._add(entry)
+        self._enforce_limits()
+        logger.info(f"✅ Transcript store loaded: {len(self.index)} transcripts, {self.total_bytes / 1e6:.1f} MB")
+
+    def _scan(self) -> list:
+        os.makedirs(self.store_dir, exist_ok=True)
+        entries, now = [], time.time()
+        for root, _, files in os.walk(self.store_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                    # mtime is the creation time, atime the last access (set explicitly on reads)
+                    created_at = stat.st_mtime
+                    expires_at = created_at + self.ttl_seconds
+                    if expires_at <= now:
+                        os.unlink(path)
+                        continue
+                    entries.append((stat.st_atime, StoredTranscript(name[:-5], path, stat.st_size, created_at, expires_at)))
+                except OSError:
+                    continue
+        return [entry for _, entry in sorted(entries, key=lambda item: item[0])]
+
+    async def get_or_transcribe(
+        self,
+        key: str,
+        transcribe: Callable[[], Awaitable[Dict[str, Any]]],
+        cacheable: Callable[[Dict[str, Any]], bool] = lambda result: True,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Return (result, status) where status is hit, coalesced or miss"""
+        result = await self.get(key)
+        if result is not None:
+            self._record("hit")
+            return result, "hit"
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                result = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The first request was cancelled; transcribe on our own
+                return await self.get_or_transcribe(key, transcribe, cacheable)
+            self._record("coalesced")
+            return result, "coalesced"
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await transcribe()
+            if cacheable(result):
+                await self.put(key, result)
+            future.set_result(result)
+            self._record("miss")
+            return result, "miss"
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.index.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            await self.delete(key)
+            return None
+
+        loop = asyncio.get_running_loop()
+        try:
+            document = await loop.run_in_executor(None, self._read, entry.path)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Dropping unreadable transcript {key[:12]}: {e}")
+            self._remove(key)
+            return None
+        self.index.move_to_end(key)
+        return document["result"]
+
+    @staticmethod
+    def _read(path: str) -> Dict[str, Any]:
+        with open(path, "r", encoding="utf-8") as f:
+            document = json.load(f)
+        os.utime(path, (time.time(), os.stat(path).st_mtime))
+        return document
+
+    async def put(self, key: str, result: Dict[str, Any]):
+        now = time.time()
+        document = {"key": key, "created_at": now, "expires_at": now + self.ttl_seconds, "result": result}
+        path = self._path(key)
+        loop = asyncio.get_running_loop()
+        try:
+            size = await loop.run_in_executor(None, self._write, path, json.dumps(document, default=str))
+        except OSError as e:
+            logger.warning(f"⚠️ Could not store transcript {key[:12]}: {e}")
+            return
+        if key in self.index:
+            self._remove(key, unlink=False)
+        self._add(StoredTranscript(key, path, size, now, now + self.ttl_seconds))
+        self._enforce_limits()
+
+    @staticmethod
+    def _write(path: str, data: str) -> int:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return os.path.getsize(path)
+
+    async def delete(self, key: str) -> bool:
+        if key not in self.index:
+            return False
+        path = self.index[key].path
+        self._remove(key, unlink=False)
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._unlink, path)
+        return True
+
+    def resolve(self, transcription_id: str) -> Optional[str]:
+        """Key for a transcription ID, stored or in flight"""
+        key = self.ids.get(transcription_id)
+        if key is not None:
+            return key
+        for key in self._inflight:
+            if self.transcription_id(key) == transcription_id:
+                return key
+        return None
+
+    def status(self, transcription_id: str) -> Optional[Dict[str, Any]]:
+        key = self.resolve(transcription_id)
+        if key is None:
+            return None
+        if key in self._inflight:
+            return {"status": "processing", "progress": None}
+        entry = self.index.get(key)
+        if entry is None or entry.expires_at <= time.time():
+            return None
+        return {"status": "completed", "progress": 100, "created_at": entry.created_at, "expires_at": entry.expires_at}
+
+    def _add(self, entry: StoredTranscript):
+        self.index[entry.key] = entry
+        self.ids[self.transcription_id(entry.key)] = entry.key
+        self.total_bytes += entry.size
+        self._update_gauges()
+
+    def _remove(self, key: str, unlink: bool = True):
+        entry = self.index.pop(key, None)
+        if entry is None:
+            return
+        self.ids.pop(self.transcription_id(key), None)
+        self.total_bytes -= entry.size
+        if unlink:
+            self._unlink(entry.path)
+        self._update_gauges()
+
+    @staticmethod
+    def _unlink(path: str):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+    def _enforce_limits(self):
+        """Drop expired entries, then least recently used ones until within budget"""
+        now = time.time()
+        for key in [key for key, entry in self.index.items() if entry.expires_at <= now]:
+            self._remove(key)
+        while self.index and (self.total_bytes > self.max_bytes or len(self.index) > self.max_entries):
+            self._remove(next(iter(self.index)))
+
+    def _record(self, result: str):
+        TRANSCRIPT_LOOKUPS.labels(result=result).inc()
+        self.stats[{"hit": "hits", "coalesced": "coalesced", "miss": "misses"}[result]] += 1
+
+    def _update_gauges(self):
+        TRANSCRIPT_ENTRIES.set(len(self.index))
+        TRANSCRIPT_BYTES.set(self.total_bytes)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self.index),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "in_flight": len(self._inflight),
+            **self.stats
+        }
@@ -0,0 +1,127 @@
+"""
+Worker-process parsers for the Document AI service
+
+DOCX parsing and image OCR are CPU bound and block the event loop when run
+inline, which serialises a multi-attachment submission behind one core. These
+functions run in the shared document worker pool (the same processes that
+extract PDF pages), take a file path and return plain, picklable results, so
+the API process only downloads files and merges results while other files are
+still being parsed.
+"""
+
+import logging
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+def parse_docx(file_path: str) -> Dict[str, Any]:
+    """Paragraphs, tables and metadata via python-docx, with unstructured as a fallback"""
+    import docx
+    from unstructured.partition.docx import partition_docx
+
+    result = {
+        "extracted_text": "",
+        "paragraphs": [],
+        "tables": [],
+        "images": [],
+        "metadata": {}
+    }
+
+    try:
+        doc = docx.Document(file_path)
+
+        core_props = doc.core_properties
+        result["metadata"] = {
+            "title": core_props.title or "",
+            "author": core_props.author or "",
+            "subject": core_props.subject or "",
+            "created": str(core_props.created) if core_props.created else "",
+            "modified": str(core_props.modified) if core_props.modified else ""
+        }
+
+        text_parts = []
+        for para in doc.paragraphs:
+            if para.text.strip():
+                result["paragraphs"].append(para.text)
+                text_parts.append(para.text + "\n")
+
+        for table in doc.tables:
+            table_text = "".join(" | ".join(cell.text for cell in row.cells) + "\n" for row in table.rows)
+            result["tables"].append({
+                "content": table_text,
+                "rows": len(table.rows),
+                "columns": len(table.columns) if table.rows else 0
+            })
+            text_parts.append(table_text + "\n")
+
+        result["extracted_text"] = "".join(text_parts)
+
+    except Exception as e:
+        logger.warning(f"python-docx processing failed: {e}")
+
+    try:
+        unstructured_text = "".join(
+            element.text + "\n" for element in partition_docx(file_path) if hasattr(element, 'text')
+        )
+        if len(unstructured_text) > len(result["extracted_text"]):
+            result["extracted_text"] = unstructured_text
+    except Exception as e:
+        logger.warning(f"Unstructured DOCX processing failed: {e}")
+
+    return result
+
+
+def parse_image(file_path: str, language: str, tesseract_cmd: str, timeout: float = 0) -> Dict[str, Any]:
+    """Image information and Tesseract OCR with a per-word confidence average; timeout 0 means none"""
+    import pytesseract
+    from PIL import Image
+
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    result = {
+        "extracted_text": "",
+        "image_info": {},
+        "ocr_confidence": 0,
+        "metadata": {}
+    }
+
+    try:
+        with Image.open(file_path) as img:
+            result["image_info"] = {
+                "format": img.format,
+                "mode": img.mode,
+                "size": img.size,
+                "width": img.width,
+                "height": img.height
+            }
+            if hasattr(img, '_getexif') and img._getexif():
+                # EXIF values may be rationals or bytes; keep them picklable and JSON friendly
+                result["metadata"]["exif"] = {str(key): str(value) for key, value in img._getexif().items()}
+    except Exception as e:
+        logger.warning(f"Image info extraction failed: {e}")
+
+    try:
+        ocr_result = pytesseract.image_to_data(file_path, lang=language, output_type=pytesseract.Output.DICT,
+                                               timeout=timeout)
+
+        text_parts = []
+        confidences = []
+        for i, text in enumerate(ocr_result['text']):
+            if text.strip():
+                text_parts.append(text)
+                conf = int(float(ocr_result['conf'][i]))
+                if conf > 0:
+                    confidences.append(conf)
+
+        result["extracted_text"] = " ".join(text_parts)
+        result["ocr_confidence"] = sum(confidences) / len(confidences) if confidences else 0
+
+    except Exception as e:
+        logger.warning(f"OCR processing failed: {e}")
+        try:
+            result["extracted_text"] = pytesseract.image_to_string(file_path, lang=language, timeout=timeout)
+            result["ocr_confidence"] = 75  # Default confidence
+        except Exception as e2:
+            logger.error(f"Fallback OCR also failed: {e2}")
+
+    return result
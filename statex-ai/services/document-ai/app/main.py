@@ -8,6 +8,7 @@ and content processing with multiple format support and Free AI integration.
 
 from fastapi import FastAPI, HTTPException, UploadFile, File
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from typing import Dict, Any, Optional, List
 import uvicorn
@@ -18,9 +19,15 @@ import tempfile
 import asyncio
 import aiohttp
 import mimetypes
+import json
 from datetime import datetime
 from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
 
+from .document_parsing import parse_docx, parse_image
+from .ocr_pipeline import OcrPipeline
+from .pdf_extraction import PdfExtractor, assemble_text
+from .summarization import ChunkSummarizer
+
 # Try to import document processing libraries
 try:
     import PyPDF2
@@ -46,6 +53,26 @@ logger = logging.getLogger(__name__)
 # Configuration
 FREE_AI_SERVICE_URL = os.getenv("FREE_AI_SERVICE_URL", "http://free-ai-service:8016")
 TESSERACT_CMD = os.getenv("TESSERACT_CMD", "/usr/bin/tesseract")
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", str(os.cpu_count() or 2)))
+PDF_PAGES_PER_TASK = int(os.getenv("PDF_PAGES_PER_TASK", "16"))
+PDF_LAYOUT_PASS = os.getenv("PDF_LAYOUT_PASS", "auto")  # auto, always, never
+PDF_MIN_CHARS_PER_PAGE = int(os.getenv("PDF_MIN_CHARS_PER_PAGE", "200"))
+DOCUMENT_DOWNLOAD_CONCURRENCY = int(os.getenv("DOCUMENT_DOWNLOAD_CONCURRENCY", "4"))
+DOCUMENT_FILE_CONCURRENCY = int(os.getenv("DOCUMENT_FILE_CONCURRENCY", "8"))
+DOCUMENT_DOWNLOAD_TIMEOUT = float(os.getenv("DOCUMENT_DOWNLOAD_TIMEOUT", "120"))
+# A chunk plus its instructions must fit the Free AI service's HUGGINGFACE_MAX_PROMPT_CHARS
+SUMMARY_MAX_CHUNK_TOKENS = int(os.getenv("SUMMARY_MAX_CHUNK_TOKENS", "800"))
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "2048"))
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", str(os.cpu_count() or 2)))
+OCR_MIN_DPI = int(os.getenv("OCR_MIN_DPI", "150"))
+OCR_MAX_DPI = int(os.getenv("OCR_MAX_DPI", "300"))
+OCR_MAX_PIXELS = int(os.getenv("OCR_MAX_PIXELS", "9000000"))
+OCR_PAGE_TIMEOUT = float(os.getenv("OCR_PAGE_TIMEOUT", "60"))
+OCR_MEMORY_LIMIT_MB = int(os.getenv("OCR_MEMORY_LIMIT_MB", "1024"))
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", "/tmp/document-ai-ocr-cache")
+OCR_CACHE_MAX_ENTRIES = int(os.getenv("OCR_CACHE_MAX_ENTRIES", "20000"))
+OCR_CACHE_PRUNE_INTERVAL = float(os.getenv("OCR_CACHE_PRUNE_INTERVAL", "300"))
 
 # Set Tesseract path if available
 if DOCUMENT_PROCESSING_AVAILABLE:
@@ -69,6 +96,8 @@ DOC_REQUEST_DURATION = Histogram('document_request_duration_seconds', 'Document
 DOC_ACTIVE_REQUESTS = Gauge('document_active_requests', 'Active document requests')
 DOC_AGENT_STATUS = Gauge('document_agent_status', 'Document agent status', ['agent_name'])
 DOC_PAGES_PROCESSED = Counter('document_pages_processed_total', 'Total pages processed', ['format'])
+DOC_DOWNLOADS_IN_FLIGHT = Gauge('document_downloads_in_flight', 'Document downloads in progress')
+DOC_FILE_DURATION = Histogram('document_file_duration_seconds', 'Per-file download and parse time', ['stage'])
 
 # CORS middleware
 app.add_middleware(
@@ -85,9 +114,14 @@ class DocumentAnalysisRequest(BaseModel):
     extract_text: bool = True
     extract_metadata: bool = True
     extract_images: bool = False
+    extract_tables: bool = False  # Tables need the unstructured layout pass, as do images
     use_ocr: bool = True
     language: str = "eng"  # OCR language
 
+class PdfExtractionRequest(BaseModel):
+    file_url: str
+    extract_layout: bool = False  # Run the unstructured pass for tables and images
+
 class DocumentAnalysisResponse(BaseModel):
     analysis_id: str
     status: str
@@ -167,8 +201,9 @@ class EnhancedDocumentProcessor:
     def __init__(self):
         self.free_ai_url = FREE_AI_SERVICE_URL
     
-    async def process_pdf(self, file_path: str, use_ocr: bool = True, language: str = "eng") -> Dict[str, Any]:
-        """Process PDF document with text extraction and OCR"""
+    async def process_pdf(self, file_path: str, use_ocr: bool = True, language: str = "eng",
+                          extract_layout: bool = False) -> Dict[str, Any]:
+        """Process PDF document with page-parallel text extraction and OCR"""
         
         if not DOCUMENT_PROCESSING_AVAILABLE:
             return self._mock_pdf_processing(file_path)
@@ -183,79 +218,47 @@ class EnhancedDocumentProcessor:
                 "structure": {}
             }
             
-            # Try text extraction first
+            # Text layer, page ranges extracted in parallel worker processes
             try:
-                with open(file_path, 'rb') as file:
-                    pdf_reader = PyPDF2.PdfReader(file)
-                    
-                    # Extract metadata
-                    if pdf_reader.metadata:
-                        result["metadata"] = {
-                            "title": pdf_reader.metadata.get('/Title', ''),
-                            "author": pdf_reader.metadata.get('/Author', ''),
-                            "subject": pdf_reader.metadata.get('/Subject', ''),
-                            "creator": pdf_reader.metadata.get('/Creator', ''),
-                            "producer": pdf_reader.metadata.get('/Producer', ''),
-                            "creation_date": str(pdf_reader.metadata.get('/CreationDate', '')),
-                            "modification_date": str(pdf_reader.metadata.get('/ModDate', ''))
-                        }
-                    
-                    # Extract text from each page
-                    for page_num, page in enumerate(pdf_reader.pages):
-                        page_text = page.extract_text()
-                        result["pages"].append({
-                            "page_number": page_num + 1,
-                            "text": page_text,
-                            "method": "direct_extraction"
-                        })
-                        result["extracted_text"] += page_text + "\n\n"
-                    
-                    result["page_count"] = len(pdf_reader.pages)
-                    
+                header = await pdf_extractor.read_header(file_path)
+                result["metadata"] = header["metadata"]
+                result["page_count"] = header["page_count"]
+                result["pages"] = await pdf_extractor.extract_pages(file_path, header["page_count"])
+                result["extracted_text"] = assemble_text(result["pages"])
             except Exception as e:
                 logger.warning(f"Direct PDF text extraction failed: {e}")
             
-            # Use Unstructured for better parsing if available
-            try:
-                elements = partition_pdf(file_path)
-                
-                unstructured_text = ""
-                tables = []
-                images = []
-                
-                for element in elements:
-                    if hasattr(element, 'text'):
-                        unstructured_text += element.text + "\n"
+            # Unstructured layout pass only when the text layer is poor or layout is requested
+            layout_reason = pdf_extractor.layout_pass_reason(result["pages"], extract_layout)
+            result["layout_pass"] = layout_reason
+            if layout_reason:
+                try:
+                    layout = await pdf_extractor.run_layout_pass(file_path, layout_reason)
                     
-                    if hasattr(element, 'category'):
-                        if element.category == 'Table':
-                            tables.append({
-                                "content": element.text,
-                                "page": getattr(element, 'metadata', {}).get('page_number', 0)
-                            })
-                        elif element.category == 'Image':
-                            images.append({
-                                "description": "Image detected",
-                                "page": getattr(element, 'metadata', {}).get('page_number', 0)
-                            })
-                
-                # Use unstructured text if it's more comprehensive
-                if len(unstructured_text) > len(result["extracted_text"]):
-                    result["extracted_text"] = unstructured_text
-                
-                result["tables"] = tables
-                result["images"] = images
-                
-            except Exception as e:
-                logger.warning(f"Unstructured PDF processing failed: {e}")
+                    # Use unstructured text if it's more comprehensive
+                    if len(layout["text"]) > len(result["extracted_text"]):
+                        result["extracted_text"] = layout["text"]
+                    
+                    result["tables"] = layout["tables"]
+                    result["images"] = layout["images"]
+                    
+                except Exception as e:
+                    logger.warning(f"Unstructured PDF processing failed: {e}")
             
-            # OCR fallback for scanned PDFs
-            if use_ocr and (not result["extracted_text"].strip() or len(result["extracted_text"]) < 100):
+            # OCR only the pages without a usable text layer (scanned pages)
+            if use_ocr and ocr_pipeline.available and ocr_pipeline.pages_needing_ocr(result["pages"]):
                 try:
-                    ocr_text = await self._perform_ocr_on_pdf(file_path, language)
-                    if ocr_text:
+                    ocr_pages = await self._perform_ocr_on_pdf(file_path, language, result["pages"])
+                    by_number = {page["page_number"]: page for page in ocr_pages if page["text"].strip()}
+                    for page in result["pages"]:
+                        ocr_page = by_number.get(page["page_number"])
+                        if ocr_page:
+                            page.update(text=ocr_page["text"], method="ocr", dpi=ocr_page["dpi"])
+                    ocr_text = assemble_text(result["pages"])
+                    if by_number and len(ocr_text) > len(result["extracted_text"]):
                         result["extracted_text"] = ocr_text
                         result["ocr_used"] = True
+                        result["ocr_pages"] = len(by_number)
                 except Exception as e:
                     logger.warning(f"OCR processing failed: {e}")
             
@@ -266,142 +269,27 @@ class EnhancedDocumentProcessor:
             return self._mock_pdf_processing(file_path)
     
     async def process_docx(self, file_path: str) -> Dict[str, Any]:
-        """Process DOCX document"""
+        """Process DOCX document in the worker pool"""
         
         if not DOCUMENT_PROCESSING_AVAILABLE:
             return self._mock_docx_processing(file_path)
         
         try:
-            result = {
-                "extracted_text": "",
-                "paragraphs": [],
-                "tables": [],
-                "images": [],
-                "metadata": {}
-            }
-            
-            # Use python-docx for basic extraction
-            try:
-                doc = docx.Document(file_path)
-                
-                # Extract metadata
-                core_props = doc.core_properties
-                result["metadata"] = {
-                    "title": core_props.title or "",
-                    "author": core_props.author or "",
-                    "subject": core_props.subject or "",
-                    "created": str(core_props.created) if core_props.created else "",
-                    "modified": str(core_props.modified) if core_props.modified else ""
-                }
-                
-                # Extract paragraphs
-                for para in doc.paragraphs:
-                    if para.text.strip():
-                        result["paragraphs"].append(para.text)
-                        result["extracted_text"] += para.text + "\n"
-                
-                # Extract tables
-                for table in doc.tables:
-                    table_text = ""
-                    for row in table.rows:
-                        row_text = " | ".join([cell.text for cell in row.cells])
-                        table_text += row_text + "\n"
-                    
-                    result["tables"].append({
-                        "content": table_text,
-                        "rows": len(table.rows),
-                        "columns": len(table.columns) if table.rows else 0
-                    })
-                    result["extracted_text"] += table_text + "\n"
-                
-            except Exception as e:
-                logger.warning(f"python-docx processing failed: {e}")
-            
-            # Use Unstructured as fallback
-            try:
-                elements = partition_docx(file_path)
-                
-                unstructured_text = ""
-                for element in elements:
-                    if hasattr(element, 'text'):
-                        unstructured_text += element.text + "\n"
-                
-                if len(unstructured_text) > len(result["extracted_text"]):
-                    result["extracted_text"] = unstructured_text
-                    
-            except Exception as e:
-                logger.warning(f"Unstructured DOCX processing failed: {e}")
-            
-            return result
-            
+            return await pdf_extractor.run_in_pool(parse_docx, file_path)
         except Exception as e:
             logger.error(f"DOCX processing failed: {e}")
             return self._mock_docx_processing(file_path)
     
     async def process_image(self, file_path: str, language: str = "eng") -> Dict[str, Any]:
-        """Process image document with OCR"""
+        """Process image document with OCR in the worker pool"""
         
         if not DOCUMENT_PROCESSING_AVAILABLE:
             return self._mock_image_processing(file_path)
         
         try:
-            result = {
-                "extracted_text": "",
-                "image_info": {},
-                "ocr_confidence": 0,
-                "metadata": {}
-            }
-            
-            # Get image information
-            try:
-                with Image.open(file_path) as img:
-                    result["image_info"] = {
-                        "format": img.format,
-                        "mode": img.mode,
-                        "size": img.size,
-                        "width": img.width,
-                        "height": img.height
-                    }
-                    
-                    # Extract EXIF data if available
-                    if hasattr(img, '_getexif') and img._getexif():
-                        result["metadata"]["exif"] = dict(img._getexif())
-            except Exception as e:
-                logger.warning(f"Image info extraction failed: {e}")
-            
-            # Perform OCR
-            try:
-                ocr_result = pytesseract.image_to_data(
-                    file_path, 
-                    lang=language, 
-                    output_type=pytesseract.Output.DICT
-                )
-                
-                # Extract text and calculate confidence
-                text_parts = []
-                confidences = []
-                
-                for i, text in enumerate(ocr_result['text']):
-                    if text.strip():
-                        text_parts.append(text)
-                        conf = int(ocr_result['conf'][i])
-                        if conf > 0:
-                            confidences.append(conf)
-                
-                result["extracted_text"] = " ".join(text_parts)
-                result["ocr_confidence"] = sum(confidences) / len(confidences) if confidences else 0
-                
-            except Exception as e:
-                logger.warning(f"OCR processing failed: {e}")
-                # Fallback OCR
-                try:
-                    result["extracted_text"] = pytesseract.image_to_string(file_path, lang=language)
-                    result["ocr_confidence"] = 75  # Default confidence
-                except Exception as e2:
-                    logger.error(f"Fallback OCR also failed: {e2}")
-            
-            return result
-            
+            if ocr_pipeline.available:
+                return await ocr_pipeline.ocr_image(file_path, language)
+            return await pdf_extractor.run_in_pool(parse_image, file_path, language, TESSERACT_CMD)
         except Exception as e:
             logger.error(f"Image processing failed: {e}")
             return self._mock_image_processing(file_path)
@@ -452,35 +340,29 @@ class EnhancedDocumentProcessor:
                 "char_count": 42
             }
     
-    async def _perform_ocr_on_pdf(self, file_path: str, language: str) -> str:
-        """Perform OCR on PDF pages"""
+    async def _perform_ocr_on_pdf(self, file_path: str, language: str,
+                                  pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """OCR the PDF pages that have no usable text layer, in parallel"""
         
         try:
-            # This would require pdf2image library
-            # For now, return mock OCR result
-            return "OCR extracted text from PDF document. This is a placeholder for actual OCR implementation."
+            return await ocr_pipeline.ocr_pdf_pages(file_path, pages, language)
         except Exception as e:
             logger.error(f"PDF OCR failed: {e}")
-            return ""
+            return []
     
     async def analyze_with_ai(self, extracted_text: str) -> Dict[str, Any]:
-        """Analyze document content using Free AI Service"""
+        """Analyze document content using Free AI Service
+        
+        Text longer than one prompt is first reduced by map-reduce
+        summarization, so the analysis prompt stays bounded.
+        """
         
         try:
-            async with aiohttp.ClientSession() as session:
-                payload = {
-                    "text_content": extracted_text,
-                    "analysis_type": "business_analysis",
-                    "user_name": "Document AI"
-                }
-                
-                async with session.post(f"{self.free_ai_url}/analyze", json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result.get("analysis", {})
-                    else:
-                        logger.warning(f"AI analysis failed: {response.status}")
-                        return self._fallback_ai_analysis(extracted_text)
+            text_content, chunking = await chunk_summarizer.summarize(extracted_text)
+            analysis = await chunk_summarizer.request_analysis(text_content, "business_analysis")
+            if chunking["reduce_levels"]:
+                analysis["chunking"] = chunking
+            return analysis
         except Exception as e:
             logger.error(f"AI analysis request failed: {e}")
             return self._fallback_ai_analysis(extracted_text)
@@ -523,8 +405,48 @@ class EnhancedDocumentProcessor:
         }
 
 # Initialize enhanced processor
+pdf_extractor = PdfExtractor(
+    workers=PDF_WORKERS,
+    pages_per_task=PDF_PAGES_PER_TASK,
+    min_chars_per_page=PDF_MIN_CHARS_PER_PAGE,
+    layout_pass=PDF_LAYOUT_PASS
+)
+chunk_summarizer = ChunkSummarizer(
+    FREE_AI_SERVICE_URL,
+    max_chunk_tokens=SUMMARY_MAX_CHUNK_TOKENS,
+    concurrency=SUMMARY_CONCURRENCY,
+    cache_size=SUMMARY_CACHE_SIZE
+)
+ocr_pipeline = OcrPipeline(
+    workers=OCR_WORKERS,
+    min_dpi=OCR_MIN_DPI,
+    max_dpi=OCR_MAX_DPI,
+    max_pixels=OCR_MAX_PIXELS,
+    page_timeout=OCR_PAGE_TIMEOUT,
+    memory_limit_mb=OCR_MEMORY_LIMIT_MB,
+    cache_dir=OCR_CACHE_DIR,
+    cache_max_entries=OCR_CACHE_MAX_ENTRIES,
+    cache_prune_interval=OCR_CACHE_PRUNE_INTERVAL,
+    tesseract_cmd=TESSERACT_CMD
+)
 document_processor = EnhancedDocumentProcessor()
 
+@app.on_event("startup")
+async def startup_event():
+    """Start the PDF extraction and OCR worker pools"""
+    if DOCUMENT_PROCESSING_AVAILABLE:
+        pdf_extractor.start()
+        ocr_pipeline.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the worker pools and close the HTTP sessions"""
+    pdf_extractor.stop()
+    ocr_pipeline.stop()
+    await chunk_summarizer.close()
+    if download_session is not None and not download_session.closed:
+        await download_session.close()
+
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -534,7 +456,10 @@ async def health_check():
         "timestamp": datetime.now().isoformat(),
         "version": "2.0.0",
         "document_processing_available": DOCUMENT_PROCESSING_AVAILABLE,
-        "tesseract_available": os.path.exists(TESSERACT_CMD) if TESSERACT_CMD else False
+        "tesseract_available": os.path.exists(TESSERACT_CMD) if TESSERACT_CMD else False,
+        "pdf_extraction": pdf_extractor.get_status(),
+        "summarization": chunk_summarizer.get_stats(),
+        "ocr": ocr_pipeline.get_status()
     }
 
 @app.get("/metrics")
@@ -545,7 +470,13 @@ async def metrics():
 
 @app.post("/api/analyze-documents", response_model=DocumentAnalysisResponse)
 async def analyze_documents(request: DocumentAnalysisRequest):
-    """Enhanced document analysis with OCR and AI integration"""
+    """Enhanced document analysis with OCR and AI integration
+
+    PDFs with a good text layer skip the unstructured layout pass, so their
+    tables and images are only returned when extract_tables or
+    extract_images is set. Scanned or poorly extracted PDFs get the pass
+    anyway, unless PDF_LAYOUT_PASS is "never".
+    """
     start_time = time.time()
     DOC_ACTIVE_REQUESTS.inc()
     
@@ -559,6 +490,7 @@ async def analyze_documents(request: DocumentAnalysisRequest):
             request.extract_text,
             request.extract_metadata,
             request.extract_images,
+            request.extract_tables,
             request.use_ocr,
             request.language
         )
@@ -612,6 +544,7 @@ async def perform_enhanced_document_analysis(
     extract_text: bool, 
     extract_metadata: bool, 
     extract_images: bool,
+    extract_tables: bool,
     use_ocr: bool,
     language: str
 ) -> Dict[str, Any]:
@@ -636,16 +569,27 @@ async def perform_enhanced_document_analysis(
     
     total_pages = 0
     
-    for i, file_url in enumerate(file_urls):
-        doc_result = await analyze_single_document_enhanced(
-            file_url, 
-            analysis_type, 
-            extract_text, 
-            extract_metadata, 
-            extract_images,
-            use_ocr,
-            language
-        )
+    # Files are analysed concurrently: downloads are bounded by the download
+    # semaphore and parsing runs in the worker pool, so one file can download
+    # while others parse. Results are merged below in the order of file_urls.
+    file_semaphore = asyncio.Semaphore(DOCUMENT_FILE_CONCURRENCY)
+    
+    async def analyze_file(file_url: str) -> Dict[str, Any]:
+        async with file_semaphore:
+            return await analyze_single_document_enhanced(
+                file_url, 
+                analysis_type, 
+                extract_text, 
+                extract_metadata, 
+                extract_images,
+                extract_tables,
+                use_ocr,
+                language
+            )
+    
+    doc_results = await asyncio.gather(*(analyze_file(file_url) for file_url in file_urls))
+    
+    for i, doc_result in enumerate(doc_results):
         results["documents"].append(doc_result)
         
         # Combine extracted text
@@ -694,6 +638,7 @@ async def analyze_single_document_enhanced(
     extract_text: bool, 
     extract_metadata: bool, 
     extract_images: bool,
+    extract_tables: bool,
     use_ocr: bool,
     language: str
 ) -> Dict[str, Any]:
@@ -702,9 +647,12 @@ async def analyze_single_document_enhanced(
     try:
         # Download file if it's a URL
         if file_url.startswith(('http://', 'https://')):
+            download_start = time.time()
             file_path = await download_document_file(file_url)
+            DOC_FILE_DURATION.labels(stage="download").observe(time.time() - download_start)
         else:
             file_path = file_url
+        parse_start = time.time()
         
         # Determine file type
         file_type = DocumentValidator.get_document_type(
@@ -728,7 +676,8 @@ async def analyze_single_document_enhanced(
         
         # Process based on file type
         if file_type == 'pdf':
-            pdf_result = await document_processor.process_pdf(file_path, use_ocr, language)
+            pdf_result = await document_processor.process_pdf(file_path, use_ocr, language,
+                                                              extract_images or extract_tables)
             doc_result.update(pdf_result)
             DOC_PAGES_PROCESSED.labels(format="pdf").inc(pdf_result.get("page_count", 1))
             
@@ -751,6 +700,7 @@ async def analyze_single_document_enhanced(
             # Fallback for unknown types
             doc_result["extracted_text"] = "Unknown file type - content extraction not supported"
             doc_result["confidence"] = 0.3
+        DOC_FILE_DURATION.labels(stage="parse").observe(time.time() - parse_start)
         
         # Clean up temporary file if downloaded
         if file_url.startswith(('http://', 'https://')) and os.path.exists(file_path):
@@ -777,29 +727,46 @@ async def analyze_single_document_enhanced(
             "error": str(e)
         }
 
+# Shared download session; concurrent downloads are bounded by the semaphore
+download_session: Optional[aiohttp.ClientSession] = None
+download_semaphore = asyncio.Semaphore(DOCUMENT_DOWNLOAD_CONCURRENCY)
+
+def get_download_session() -> aiohttp.ClientSession:
+    global download_session
+    if download_session is None or download_session.closed:
+        download_session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=DOCUMENT_DOWNLOAD_TIMEOUT),
+            connector=aiohttp.TCPConnector(limit=DOCUMENT_DOWNLOAD_CONCURRENCY)
+        )
+    return download_session
+
 async def download_document_file(url: str) -> str:
     """Download document file from URL to temporary location"""
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    # Determine file extension from content type or URL
-                    content_type = response.headers.get('content-type', '')
-                    extension = DocumentValidator.SUPPORTED_FORMATS.get(content_type, '.bin')
-                    
-                    if extension == '.bin':
-                        # Try to get extension from URL
-                        url_path = url.split('?')[0]  # Remove query parameters
-                        if '.' in url_path:
-                            extension = '.' + url_path.split('.')[-1]
-                    
-                    # Create temporary file
-                    with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as tmp_file:
-                        async for chunk in response.content.iter_chunked(8192):
-                            tmp_file.write(chunk)
-                        return tmp_file.name
-                else:
-                    raise Exception(f"Failed to download document: HTTP {response.status}")
+        async with download_semaphore:
+            DOC_DOWNLOADS_IN_FLIGHT.inc()
+            try:
+                async with get_download_session().get(url) as response:
+                    if response.status == 200:
+                        # Determine file extension from content type or URL
+                        content_type = response.headers.get('content-type', '')
+                        extension = DocumentValidator.SUPPORTED_FORMATS.get(content_type, '.bin')
+                        
+                        if extension == '.bin':
+                            # Try to get extension from URL
+                            url_path = url.split('?')[0]  # Remove query parameters
+                            if '.' in url_path:
+                                extension = '.' + url_path.split('.')[-1]
+                        
+                        # Create temporary file
+                        with tempfile.NamedTemporaryFile(delete=False, suffix=extension) as tmp_file:
+                            async for chunk in response.content.iter_chunked(65536):
+                                tmp_file.write(chunk)
+                            return tmp_file.name
+                    else:
+                        raise Exception(f"Failed to download document: HTTP {response.status}")
+            finally:
+                DOC_DOWNLOADS_IN_FLIGHT.dec()
     except Exception as e:
         logger.error(f"Failed to download document file: {e}")
         raise e
@@ -817,6 +784,71 @@ def generate_document_summary(text: str) -> str:
     business systems.
     """
 
+@app.post("/api/extract-pdf/stream")
+async def extract_pdf_stream(request: PdfExtractionRequest):
+    """Extract PDF pages in parallel, streaming page text as NDJSON while workers finish"""
+    if not DOCUMENT_PROCESSING_AVAILABLE:
+        raise HTTPException(status_code=503, detail="Document processing libraries not available")
+    
+    downloaded = request.file_url.startswith(('http://', 'https://'))
+    try:
+        file_path = await download_document_file(request.file_url) if downloaded else request.file_url
+        header = await pdf_extractor.read_header(file_path)
+    except Exception as e:
+        logger.error(f"Error opening PDF for streaming extraction: {e}")
+        raise HTTPException(status_code=400, detail=f"Failed to open PDF: {str(e)}")
+    
+    async def event_stream():
+        start_time = time.time()
+        DOC_ACTIVE_REQUESTS.inc()
+        pages: List[Optional[Dict[str, Any]]] = [None] * header["page_count"]
+        try:
+            yield json.dumps({"event": "header", **header}, default=str) + "\n"
+            async for page_range in pdf_extractor.stream_pages(file_path, header["page_count"]):
+                for page in page_range:
+                    pages[page["page_number"] - 1] = page
+                yield json.dumps({
+                    "event": "pages",
+                    "pages": page_range,
+                    "completed_pages": sum(1 for page in pages if page is not None),
+                    "total_pages": header["page_count"]
+                }) + "\n"
+            
+            extracted = [page for page in pages if page is not None]
+            completed = {
+                "event": "completed",
+                "page_count": header["page_count"],
+                "extracted_text": assemble_text(extracted),
+                "tables": [],
+                "images": []
+            }
+            layout_reason = pdf_extractor.layout_pass_reason(extracted, request.extract_layout)
+            if layout_reason:
+                layout = await pdf_extractor.run_layout_pass(file_path, layout_reason)
+                completed.update(tables=layout["tables"], images=layout["images"])
+                if len(layout["text"]) > len(completed["extracted_text"]):
+                    completed["extracted_text"] = layout["text"]
+            completed["layout_pass"] = layout_reason
+            completed["processing_time"] = time.time() - start_time
+            
+            DOC_PAGES_PROCESSED.labels(format="pdf").inc(len(extracted))
+            DOC_REQUEST_COUNT.labels(operation="extract_stream", format="pdf", status="success").inc()
+            DOC_REQUEST_DURATION.labels(operation="extract_stream", format="pdf").observe(completed["processing_time"])
+            yield json.dumps(completed, default=str) + "\n"
+        except Exception as e:
+            logger.error(f"Streaming PDF extraction failed: {e}")
+            DOC_REQUEST_COUNT.labels(operation="extract_stream", format="pdf", status="failed").inc()
+            yield json.dumps({"event": "error", "detail": str(e)}) + "\n"
+        finally:
+            DOC_ACTIVE_REQUESTS.dec()
+            if downloaded and os.path.exists(file_path):
+                try:
+                    os.unlink(file_path)
+                except OSError:
+                    pass
+    
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson", headers={"Cache-Control": "no-cache"})
+
 @app.post("/api/upload-document")
 async def upload_document(file: UploadFile = File(...)):
     """Enhanced document upload with validation and analysis"""
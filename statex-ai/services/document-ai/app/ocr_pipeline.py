@@ -0,0 +1,288 @@
+"""
+Page-parallel OCR for scanned PDFs and images
+
+Pages of a PDF that have no usable text layer are rasterized with poppler
+(pdf2image) and recognised with Tesseract in a dedicated pool of worker
+processes, one page per task, so a scanned document uses every core while
+pages that already carry text are skipped. The DPI is chosen per page from
+its size so every raster stays within a pixel budget. OCR output is cached on
+disk by the hash of the rendered page image, which the workers check
+directly, so re-submitting the same scan does not run Tesseract again.
+
+One bad scan cannot stall the service: poppler and Tesseract run with a
+per-page timeout, each worker (and the subprocesses it starts) is limited to
+a fixed address space, and a crashed pool is replaced.
+"""
+
+import asyncio
+import hashlib
+import logging
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from prometheus_client import Counter, Histogram
+
+from .document_parsing import parse_image
+
+try:
+    import pdf2image  # noqa: F401
+    import pytesseract  # noqa: F401
+    OCR_AVAILABLE = True
+except ImportError:
+    OCR_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+OCR_PAGES = Counter('document_ocr_pages_total', 'PDF pages considered for OCR', ['result'])
+OCR_PAGE_SECONDS = Histogram('document_ocr_page_seconds', 'Rasterization and OCR time per page')
+
+
+# Worker process side -------------------------------------------------------
+
+def _init_ocr_worker(memory_limit_mb: int, tesseract_cmd: str):
+    """Cap the worker's address space (inherited by poppler and Tesseract) and pin Tesseract to one thread"""
+    # Parallelism comes from the pool; OpenMP threads per page would oversubscribe the cores
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    if memory_limit_mb:
+        try:
+            import resource
+            limit = memory_limit_mb * 1024 * 1024
+            resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+        except (ImportError, ValueError, OSError) as e:
+            logger.warning(f"⚠️ Could not limit OCR worker memory: {e}")
+
+    import pytesseract
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+
+
+def _ocr_pdf_page(file_path: str, page_number: int, dpi: int, language: str, timeout: float,
+                  cache_dir: str) -> Dict[str, Any]:
+    """Rasterize one page and OCR it, unless the same page image was recognised before"""
+    import pytesseract
+    from pdf2image import convert_from_path
+
+    start_time = time.perf_counter()
+    images = convert_from_path(
+        file_path, dpi=dpi, first_page=page_number, last_page=page_number,
+        grayscale=True, timeout=max(1, int(timeout))
+    )
+    if not images:
+        return {"page_number": page_number, "text": "", "dpi": dpi, "cached": False, "seconds": 0.0}
+    image = images[0]
+
+    digest = hashlib.sha256(f"{language}|{image.size}|".encode("utf-8") + image.tobytes()).hexdigest()
+    cache_path = os.path.join(cache_dir, digest[:2], f"{digest}.txt") if cache_dir else None
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path, "r", encoding="utf-8") as f:
+            text = f.read()
+        return {"page_number": page_number, "text": text, "dpi": dpi, "cached": True,
+                "seconds": time.perf_counter() - start_time}
+
+    text = pytesseract.image_to_string(image, lang=language, timeout=timeout)
+    if cache_path:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, cache_path)
+    return {"page_number": page_number, "text": text, "dpi": dpi, "cached": False,
+            "seconds": time.perf_counter() - start_time}
+
+
+# API process side ----------------------------------------------------------
+
+class OcrPipeline:
+    """OCR worker pool with adaptive DPI, page skipping, an image-hash cache and per-page limits"""
+
+    def __init__(self, workers: int = 2, min_dpi: int = 150, max_dpi: int = 300,
+                 max_pixels: int = 9_000_000, page_timeout: float = 60.0, memory_limit_mb: int = 1024,
+                 min_text_chars: int = 20, cache_dir: str = "", cache_max_entries: int = 20000,
+                 cache_prune_interval: float = 300.0, tesseract_cmd: str = "tesseract"):
+        self.workers = max(1, workers)
+        self.min_dpi = min_dpi
+        self.max_dpi = max_dpi
+        self.max_pixels = max_pixels
+        self.page_timeout = page_timeout
+        self.memory_limit_mb = memory_limit_mb
+        self.min_text_chars = min_text_chars
+        self.cache_dir = cache_dir
+        self.cache_max_entries = cache_max_entries
+        self.cache_prune_interval = cache_prune_interval
+        self.tesseract_cmd = tesseract_cmd
+        self.executor: Optional[ProcessPoolExecutor] = None
+        # One task per worker at a time, so the timeout measures work rather than time spent queued
+        self._slots = asyncio.Semaphore(self.workers)
+        self._prune_task: Optional[asyncio.Future] = None
+        self._last_prune = 0.0
+        self._written_since_prune = 0
+        self.stats = {"pages_ocr": 0, "pages_cached": 0, "pages_skipped": 0, "pages_timed_out": 0, "pages_failed": 0}
+
+    @property
+    def available(self) -> bool:
+        return OCR_AVAILABLE
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_ocr_worker,
+            initargs=(self.memory_limit_mb, self.tesseract_cmd)
+        )
+
+    def start(self):
+        if self.executor is None and self.available:
+            if self.cache_dir:
+                os.makedirs(self.cache_dir, exist_ok=True)
+            self.executor = self._new_executor()
+            logger.info(f"✅ OCR pool started with {self.workers} worker processes, "
+                        f"{self.memory_limit_mb} MB and {self.page_timeout:.0f}s per page")
+
+    def stop(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        # Only the first caller that sees the broken pool replaces it
+        if self.executor is broken:
+            logger.error("❌ OCR worker died, restarting pool")
+            self.executor = self._new_executor()
+            broken.shutdown(wait=False, cancel_futures=True)
+
+    def choose_dpi(self, width_pt: Optional[float], height_pt: Optional[float]) -> int:
+        """Highest DPI in [min_dpi, max_dpi] that keeps the page raster within max_pixels"""
+        if not width_pt or not height_pt:
+            return self.min_dpi
+        area_square_inches = (float(width_pt) / 72) * (float(height_pt) / 72)
+        dpi = int(math.sqrt(self.max_pixels / area_square_inches))
+        return max(self.min_dpi, min(self.max_dpi, dpi))
+
+    def pages_needing_ocr(self, pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Pages whose text layer is missing or too short to be real text"""
+        return [page for page in pages if len((page.get("text") or "").strip()) < self.min_text_chars]
+
+    async def _run_page(self, file_path: str, page: Dict[str, Any], language: str) -> Dict[str, Any]:
+        page_number = page["page_number"]
+        dpi = self.choose_dpi(page.get("width"), page.get("height"))
+        loop = asyncio.get_running_loop()
+        try:
+            async with self._slots:
+                executor = self.executor
+                # poppler and Tesseract each get page_timeout; this bounds the page as a whole
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(executor, _ocr_pdf_page, file_path, page_number, dpi, language,
+                                         self.page_timeout, self.cache_dir),
+                    timeout=self.page_timeout * 2 + 5
+                )
+        except asyncio.TimeoutError:
+            OCR_PAGES.labels(result="timeout").inc()
+            self.stats["pages_timed_out"] += 1
+            logger.warning(f"⚠️ OCR timed out on page {page_number} of {file_path}")
+            return {"page_number": page_number, "text": "", "dpi": dpi, "error": "timeout"}
+        except BrokenProcessPool as e:
+            self._restart(executor)
+            OCR_PAGES.labels(result="failed").inc()
+            self.stats["pages_failed"] += 1
+            return {"page_number": page_number, "text": "", "dpi": dpi, "error": f"worker died: {e}"}
+        except Exception as e:
+            # Includes MemoryError from the address-space cap and Tesseract/poppler timeouts
+            OCR_PAGES.labels(result="failed").inc()
+            self.stats["pages_failed"] += 1
+            logger.warning(f"⚠️ OCR failed on page {page_number} of {file_path}: {e}")
+            return {"page_number": page_number, "text": "", "dpi": dpi, "error": str(e)}
+
+        OCR_PAGE_SECONDS.observe(result["seconds"])
+        if result["cached"]:
+            OCR_PAGES.labels(result="cached").inc()
+            self.stats["pages_cached"] += 1
+        else:
+            OCR_PAGES.labels(result="ocr").inc()
+            self.stats["pages_ocr"] += 1
+        return result
+
+    async def ocr_pdf_pages(self, file_path: str, pages: List[Dict[str, Any]], language: str = "eng") -> List[Dict[str, Any]]:
+        """OCR the pages without a usable text layer in parallel; results come back in page order"""
+        self.start()
+        targets = self.pages_needing_ocr(pages)
+        skipped = len(pages) - len(targets)
+        OCR_PAGES.labels(result="skipped").inc(skipped)
+        self.stats["pages_skipped"] += skipped
+        results = await asyncio.gather(*(self._run_page(file_path, page, language) for page in targets))
+        self._written_since_prune += sum(1 for result in results if result.get("cached") is False)
+        self._schedule_prune()
+        return list(results)
+
+    async def ocr_image(self, file_path: str, language: str = "eng") -> Dict[str, Any]:
+        """Image OCR on the memory-capped pool, bounded by the page timeout"""
+        self.start()
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            executor = self.executor
+            try:
+                return await asyncio.wait_for(
+                    loop.run_in_executor(executor, parse_image, file_path, language, self.tesseract_cmd,
+                                         self.page_timeout),
+                    timeout=self.page_timeout * 2 + 5
+                )
+            except BrokenProcessPool:
+                self._restart(executor)
+                raise
+
+    def _schedule_prune(self):
+        """Prune in a thread at most once per cache_prune_interval, and only after new pages were cached"""
+        if not self.cache_dir or not self._written_since_prune:
+            return
+        if self._prune_task is not None and not self._prune_task.done():
+            return
+        now = time.monotonic()
+        if now - self._last_prune < self.cache_prune_interval:
+            return
+        self._last_prune = now
+        self._written_since_prune = 0
+        self._prune_task = asyncio.get_running_loop().run_in_executor(None, self.prune_cache)
+        self._prune_task.add_done_callback(self._prune_done)
+
+    @staticmethod
+    def _prune_done(task: asyncio.Future):
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"⚠️ OCR cache pruning failed: {task.exception()}")
+
+    def prune_cache(self):
+        """Drop the oldest cached pages once the cache holds more than cache_max_entries"""
+        if not self.cache_dir:
+            return
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".txt"):
+                    path = os.path.join(root, name)
+                    try:
+                        entries.append((os.stat(path).st_mtime, path))
+                    except OSError:
+                        continue
+        if len(entries) <= self.cache_max_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.cache_max_entries]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "running": self.executor is not None,
+            "workers": self.workers,
+            "dpi_range": [self.min_dpi, self.max_dpi],
+            "max_pixels": self.max_pixels,
+            "page_timeout": self.page_timeout,
+            "memory_limit_mb": self.memory_limit_mb,
+            "cache_dir": self.cache_dir,
+            "cache_prune_interval": self.cache_prune_interval,
+            **self.stats
+        }
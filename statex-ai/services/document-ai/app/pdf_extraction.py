@@ -0,0 +1,198 @@
+"""
+Page-parallel PDF extraction for the Document AI service
+
+Pages are split into contiguous ranges and extracted with PyPDF2 in a pool of
+worker processes, so a multi-hundred-page PDF uses every core instead of one
+event-loop thread. Each worker opens the file once per range. Page results are
+yielded as ranges complete, so callers can stream them, and the document text is
+assembled once with a join. The unstructured layout pass is a second full parse
+of the file and only runs when the text layer looks poor (scanned or mostly
+empty pages) or when tables and images are explicitly requested.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from prometheus_client import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+PDF_PAGE_EXTRACTION_SECONDS = Histogram('document_pdf_extraction_seconds', 'PDF text layer extraction time', ['stage'])
+PDF_LAYOUT_PASSES = Counter('document_pdf_layout_passes_total', 'Unstructured layout passes over PDFs', ['reason'])
+
+
+# Worker process side -------------------------------------------------------
+
+def _read_header(file_path: str) -> Dict[str, Any]:
+    """Page count and document metadata"""
+    import PyPDF2
+
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        metadata = {}
+        if pdf_reader.metadata:
+            metadata = {
+                "title": pdf_reader.metadata.get('/Title', ''),
+                "author": pdf_reader.metadata.get('/Author', ''),
+                "subject": pdf_reader.metadata.get('/Subject', ''),
+                "creator": pdf_reader.metadata.get('/Creator', ''),
+                "producer": pdf_reader.metadata.get('/Producer', ''),
+                "creation_date": str(pdf_reader.metadata.get('/CreationDate', '')),
+                "modification_date": str(pdf_reader.metadata.get('/ModDate', ''))
+            }
+        return {"page_count": len(pdf_reader.pages), "metadata": metadata}
+
+
+def _extract_page_range(file_path: str, start: int, end: int) -> List[Dict[str, Any]]:
+    """Extract pages [start, end) with a single reader"""
+    import PyPDF2
+
+    pages = []
+    with open(file_path, 'rb') as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page_index in range(start, end):
+            width = height = None
+            try:
+                page = pdf_reader.pages[page_index]
+                # Page size in points; the OCR stage picks its DPI from it
+                width, height = float(page.mediabox.width), float(page.mediabox.height)
+                page_text = page.extract_text() or ""
+                method = "direct_extraction"
+            except Exception as e:
+                page_text, method = "", f"failed: {e}"
+            pages.append({"page_number": page_index + 1, "text": page_text, "method": method,
+                          "width": width, "height": height})
+    return pages
+
+
+def _partition_layout(file_path: str) -> Dict[str, Any]:
+    """Unstructured layout pass reduced to plain, picklable data"""
+    from unstructured.partition.pdf import partition_pdf
+
+    text_parts, tables, images = [], [], []
+    for element in partition_pdf(file_path):
+        text = getattr(element, 'text', None)
+        if text is not None:
+            text_parts.append(text)
+        metadata = getattr(element, 'metadata', None)
+        page = getattr(metadata, 'page_number', None) or 0
+        category = getattr(element, 'category', None)
+        if category == 'Table':
+            tables.append({"content": text, "page": page})
+        elif category == 'Image':
+            images.append({"description": "Image detected", "page": page})
+    return {"text": "\n".join(text_parts), "tables": tables, "images": images}
+
+
+# API process side ----------------------------------------------------------
+
+def assemble_text(pages: List[Dict[str, Any]]) -> str:
+    """Document text from ordered pages in one pass"""
+    return "".join(f"{page['text']}\n\n" for page in pages)
+
+
+class PdfExtractor:
+    """Fans PDF pages out to a process pool and decides whether a layout pass is needed"""
+
+    def __init__(self, workers: int = 4, pages_per_task: int = 16, min_chars_per_page: int = 200,
+                 max_empty_page_ratio: float = 0.2, layout_pass: str = "auto"):
+        self.workers = max(1, workers)
+        self.pages_per_task = max(1, pages_per_task)
+        self.min_chars_per_page = min_chars_per_page
+        self.max_empty_page_ratio = max_empty_page_ratio
+        self.layout_pass = layout_pass  # auto, always or never
+        self.executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.workers)
+            logger.info(f"✅ PDF extraction pool started with {self.workers} worker processes")
+
+    def stop(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def plan_ranges(self, page_count: int) -> List[Tuple[int, int]]:
+        """Contiguous page ranges: at least two per worker for balance, at most pages_per_task long"""
+        if page_count <= 0:
+            return []
+        size = max(1, min(self.pages_per_task, math.ceil(page_count / (self.workers * 2))))
+        return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+    async def read_header(self, file_path: str) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, _read_header, file_path)
+
+    async def stream_pages(self, file_path: str, page_count: int) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield each page range as soon as its worker finishes; ranges may arrive out of order"""
+        self.start()
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(self.executor, _extract_page_range, file_path, start, end)
+            for start, end in self.plan_ranges(page_count)
+        ]
+        try:
+            for completed in asyncio.as_completed(futures):
+                yield await completed
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def extract_pages(self, file_path: str, page_count: int) -> List[Dict[str, Any]]:
+        """All pages, in page order"""
+        start_time = time.perf_counter()
+        pages: List[Optional[Dict[str, Any]]] = [None] * page_count
+        async for page_range in self.stream_pages(file_path, page_count):
+            for page in page_range:
+                pages[page["page_number"] - 1] = page
+        PDF_PAGE_EXTRACTION_SECONDS.labels(stage="text_layer").observe(time.perf_counter() - start_time)
+        return [page for page in pages if page is not None]
+
+    def layout_pass_reason(self, pages: List[Dict[str, Any]], want_layout: bool = False) -> Optional[str]:
+        """Why the unstructured pass should run, or None when the text layer is good enough"""
+        if self.layout_pass == "never":
+            return None
+        if self.layout_pass == "always":
+            return "always"
+        if want_layout:
+            return "requested"
+        if not pages:
+            return "no_pages"
+        empty_pages = sum(1 for page in pages if len(page["text"].strip()) < 20)
+        if empty_pages / len(pages) > self.max_empty_page_ratio:
+            return "empty_pages"
+        if sum(len(page["text"]) for page in pages) / len(pages) < self.min_chars_per_page:
+            return "sparse_text"
+        return None
+
+    async def run_layout_pass(self, file_path: str, reason: str) -> Dict[str, Any]:
+        self.start()
+        PDF_LAYOUT_PASSES.labels(reason=reason).inc()
+        start_time = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self.executor, _partition_layout, file_path)
+        finally:
+            PDF_PAGE_EXTRACTION_SECONDS.labels(stage="layout").observe(time.perf_counter() - start_time)
+
+    async def run_in_pool(self, func: Callable[..., Any], *args) -> Any:
+        """Run another CPU-bound parser on the same worker processes"""
+        self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func, *args)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": self.executor is not None,
+            "pages_per_task": self.pages_per_task,
+            "layout_pass": self.layout_pass,
+            "min_chars_per_page": self.min_chars_per_page,
+            "max_empty_page_ratio": self.max_empty_page_ratio
+        }
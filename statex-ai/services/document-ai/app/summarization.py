@@ -0,0 +1,209 @@
+"""
+Map-reduce summarization for long documents
+
+Sending the whole extracted text of a submission to the Free AI service in
+one request either gets truncated (Hugging Face keeps one model context,
+HUGGINGFACE_MAX_PROMPT_CHARS in the Free AI service) or produces an
+unbounded Ollama prompt. Instead, long text is split into token-bounded
+chunks that are summarized concurrently (map), and the chunk summaries are
+merged level by level until they fit one prompt (reduce). The final, bounded text is then analysed as before.
+
+Chunk boundaries are content defined: besides the size limit, a chunk ends
+after a paragraph whose hash marks a boundary, so an edit only changes the
+chunk it falls in (and at most the next one) instead of shifting every later
+chunk. Chunk and intermediate summaries are cached by content hash, so
+re-analysing a slightly edited document only summarizes the changed chunks.
+"""
+
+import asyncio
+import hashlib
+import logging
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import aiohttp
+from prometheus_client import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+SUMMARY_CHUNKS = Counter('document_summary_chunks_total', 'Chunks summarized in map-reduce summarization', ['result'])
+SUMMARY_DURATION = Histogram('document_summary_duration_seconds', 'Map-reduce summarization time', ['stage'])
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+# Text-completion providers wrap their output as "AI Analysis for <user>: <text>..."
+_ANALYSIS_WRAPPER = re.compile(r'^AI Analysis for [^:]*:\s*')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English text)"""
+    return (len(text) + 3) // 4
+
+
+def _split_oversized(paragraph: str, max_tokens: int) -> List[str]:
+    """Split a paragraph longer than max_tokens at sentence ends, or hard-split as a last resort"""
+    pieces, current = [], ""
+    for sentence in _SENTENCE_END.split(paragraph):
+        while estimate_tokens(sentence) > max_tokens:
+            head, sentence = sentence[:max_tokens * 4], sentence[max_tokens * 4:]
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(head)
+        if current and estimate_tokens(current) + estimate_tokens(sentence) + 1 > max_tokens:
+            pieces.append(current)
+            current = ""
+        current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_into_chunks(text: str, max_tokens: int = 800, boundary_every: int = 4) -> List[str]:
+    """Chunks of at most max_tokens, cut at paragraph boundaries.
+
+    A chunk is closed early, once it is at least half full, after a paragraph
+    whose hash is divisible by boundary_every, so boundaries resynchronise
+    right after an edited paragraph.
+    """
+    paragraphs = []
+    for paragraph in re.split(r'\n\s*\n', text):
+        paragraph = paragraph.strip()
+        if paragraph:
+            paragraphs.extend(_split_oversized(paragraph, max_tokens))
+
+    chunks, current, current_tokens = [], [], 0
+    for paragraph in paragraphs:
+        tokens = estimate_tokens(paragraph)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(paragraph)
+        current_tokens += tokens
+        content_boundary = int(hashlib.md5(paragraph.encode("utf-8")).hexdigest()[:8], 16) % boundary_every == 0
+        if content_boundary and current_tokens >= max_tokens // 2:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+def clean_summary(summary: str) -> str:
+    """Summary text without the analysis wrapper, so it does not pile up in the reduce step"""
+    summary = _ANALYSIS_WRAPPER.sub("", (summary or "").strip())
+    if summary.endswith("...") and not summary.endswith("...."):
+        summary = summary[:-3].rstrip()
+    return summary
+
+
+def extractive_summary(text: str, max_sentences: int = 3) -> str:
+    """First sentences of a chunk; used when the AI service cannot summarize it"""
+    return " ".join(_SENTENCE_END.split(text.strip())[:max_sentences])
+
+
+class ChunkSummarizer:
+    """Map-reduce summarization through the Free AI service with a per-chunk summary cache"""
+
+    def __init__(self, free_ai_url: str, max_chunk_tokens: int = 800, concurrency: int = 4,
+                 cache_size: int = 2048, timeout: float = 120.0):
+        self.free_ai_url = free_ai_url
+        self.max_chunk_tokens = max_chunk_tokens
+        self.concurrency = max(1, concurrency)
+        self.cache_size = cache_size
+        self.timeout = timeout
+        self.cache: "OrderedDict[str, str]" = OrderedDict()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self.stats = {"chunks": 0, "cache_hits": 0, "fallbacks": 0}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.concurrency)
+            )
+        return self._session
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def fits_one_prompt(self, text: str) -> bool:
+        return estimate_tokens(text) <= self.max_chunk_tokens
+
+    async def request_analysis(self, text_content: str, analysis_type: str) -> Dict[str, Any]:
+        """One /analyze call on the shared session; raises on transport or service errors"""
+        payload = {"text_content": text_content, "analysis_type": analysis_type, "user_name": "Document AI"}
+        async with self._semaphore:
+            async with self._get_session().post(f"{self.free_ai_url}/analyze", json=payload) as response:
+                if response.status != 200:
+                    raise Exception(f"Free AI service error: {response.status}")
+                result = await response.json()
+        if not result.get("success", True):
+            raise Exception(result.get("error") or "Free AI analysis failed")
+        return result.get("analysis", {})
+
+    async def _summarize_chunk(self, chunk: str) -> Tuple[str, bool]:
+        """(summary, cache hit) for one chunk"""
+        key = hashlib.sha256(chunk.encode("utf-8")).hexdigest()
+        cached = self.cache.get(key)
+        if cached is not None:
+            self.cache.move_to_end(key)
+            self.stats["cache_hits"] += 1
+            SUMMARY_CHUNKS.labels(result="cached").inc()
+            return cached, True
+
+        self.stats["chunks"] += 1
+        try:
+            analysis = await self.request_analysis(
+                f"Summarize this section of a longer document in a few sentences:\n\n{chunk}",
+                "content_generation"
+            )
+            summary = clean_summary(analysis.get("summary"))
+            if not summary:
+                raise Exception("empty summary")
+        except Exception as e:
+            # Not cached, so the chunk is retried on the next analysis
+            logger.warning(f"⚠️ Chunk summarization failed, using extractive summary: {e}")
+            self.stats["fallbacks"] += 1
+            SUMMARY_CHUNKS.labels(result="fallback").inc()
+            return extractive_summary(chunk), False
+
+        SUMMARY_CHUNKS.labels(result="summarized").inc()
+        self.cache[key] = summary
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return summary, False
+
+    async def summarize(self, text: str) -> Tuple[str, Dict[str, Any]]:
+        """Reduce text to at most one prompt's worth; returns (reduced text, chunking info)"""
+        info = {"chunks": 0, "cached_chunks": 0, "reduce_levels": 0}
+        level_text = text
+        while not self.fits_one_prompt(level_text):
+            loop_start = asyncio.get_running_loop().time()
+            chunks = split_into_chunks(level_text, self.max_chunk_tokens)
+            results = await asyncio.gather(*(self._summarize_chunk(chunk) for chunk in chunks))
+            SUMMARY_DURATION.labels(stage="map" if info["reduce_levels"] == 0 else "reduce").observe(
+                asyncio.get_running_loop().time() - loop_start
+            )
+
+            info["chunks"] += len(chunks)
+            info["cached_chunks"] += sum(1 for _, hit in results if hit)
+            info["reduce_levels"] += 1
+            next_text = "\n\n".join(summary for summary, _ in results)
+            if estimate_tokens(next_text) >= estimate_tokens(level_text):
+                # Summaries did not shrink the text (e.g. every chunk fell back); stop at a bounded prefix
+                next_text = next_text[:self.max_chunk_tokens * 4]
+            level_text = next_text
+        return level_text, info
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_chunk_tokens": self.max_chunk_tokens,
+            "concurrency": self.concurrency,
+            "cached_summaries": len(self.cache),
+            **self.stats
+        }
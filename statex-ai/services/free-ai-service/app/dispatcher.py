@@ -0,0 +1,252 @@
+"""
+Provider Dispatcher for the Free AI Service
+
+Bounds the number of in-flight generations per (provider, model) so a burst of
+submissions queues up instead of thrashing a single local Ollama instance.
+Waiting requests are served by priority (interactive before background) and
+then in arrival order. Every request carries a deadline: time spent queued is
+subtracted from the provider timeout, and requests whose budget runs out while
+queued fail fast without reaching the provider.
+
+Compatible Hugging Face requests can be micro-batched: requests for the same
+model arriving within a short window are sent as one call with a list of
+`inputs`.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from prometheus_client import Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+DISPATCH_QUEUE_DEPTH = Gauge('ai_dispatch_queue_depth', 'Requests waiting for a provider slot', ['provider', 'model'])
+DISPATCH_IN_FLIGHT = Gauge('ai_dispatch_in_flight', 'Generations running against a provider', ['provider', 'model'])
+DISPATCH_QUEUE_WAIT = Histogram('ai_dispatch_queue_wait_seconds', 'Time spent waiting for a provider slot', ['provider', 'priority'])
+DISPATCH_BATCH_SIZE = Histogram('ai_dispatch_batch_size', 'Inputs per micro-batched provider call', ['provider'],
+                                buckets=(1, 2, 4, 8, 16, 32))
+
+
+class RequestPriority(IntEnum):
+    """Lower value is served first"""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class QueueTimeoutError(TimeoutError):
+    """The request's deadline expired before a provider slot became free"""
+
+
+class ModelLane:
+    """Priority-ordered semaphore guarding the in-flight generations of one model"""
+
+    def __init__(self, provider: str, model: str, concurrency: int):
+        self.provider = provider
+        self.model = model
+        self.concurrency = max(1, concurrency)
+        self.active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def acquire(self, priority: RequestPriority, deadline: float):
+        """Wait for a slot; raises QueueTimeoutError if the deadline passes first"""
+        if self.active < self.concurrency and not self.queued:
+            self.active += 1
+            self._update_gauges()
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._sequence), future))
+        self._update_gauges()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=max(deadline - time.monotonic(), 0))
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we gave up; pass it on
+                self.release()
+            future.cancel()
+            raise QueueTimeoutError(f"Deadline expired while queued for {self.provider}/{self.model}")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            future.cancel()
+            raise
+        finally:
+            self._update_gauges()
+
+    def release(self):
+        """Hand the slot to the highest-priority waiter, or free it"""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                self._update_gauges()
+                return
+        self.active -= 1
+        self._update_gauges()
+
+    def _update_gauges(self):
+        DISPATCH_QUEUE_DEPTH.labels(provider=self.provider, model=self.model).set(self.queued)
+        DISPATCH_IN_FLIGHT.labels(provider=self.provider, model=self.model).set(self.active)
+
+
+class _PendingInput:
+    __slots__ = ("value", "priority", "deadline", "future")
+
+    def __init__(self, value: Any, priority: RequestPriority, deadline: float, future: asyncio.Future):
+        self.value = value
+        self.priority = priority
+        self.deadline = deadline
+        self.future = future
+
+
+class MicroBatcher:
+    """Collects compatible inputs for a short window and sends them as one call"""
+
+    def __init__(self, dispatcher: "ProviderDispatcher", provider: str, model: str,
+                 batch_call: Callable[[List[Any], float], Awaitable[List[Any]]],
+                 max_batch_size: int, batch_window: float):
+        self.dispatcher = dispatcher
+        self.provider = provider
+        self.model = model
+        self.batch_call = batch_call
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self._pending: List[_PendingInput] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        # Strong references to running batches; the event loop only keeps weak ones
+        self._batch_tasks: Set[asyncio.Task] = set()
+
+    async def submit(self, value: Any, priority: RequestPriority, deadline: float) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(_PendingInput(value, priority, deadline, future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+
+        return await future
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._run_batch(batch))
+            self._batch_tasks.add(task)
+            task.add_done_callback(self._batch_tasks.discard)
+
+    async def _run_batch(self, batch: List[_PendingInput]):
+        batch = [item for item in batch if not item.future.done()]
+        if not batch:
+            return
+        # The batch runs at its most urgent member's priority and deadline
+        priority = min(item.priority for item in batch)
+        deadline = min(item.deadline for item in batch)
+        DISPATCH_BATCH_SIZE.labels(provider=self.provider).observe(len(batch))
+        try:
+            results = await self.dispatcher.run(
+                self.provider,
+                self.model,
+                lambda timeout: self.batch_call([item.value for item in batch], timeout),
+                priority=priority,
+                deadline=deadline
+            )
+            if len(results) != len(batch):
+                raise ValueError(f"Batched call returned {len(results)} results for {len(batch)} inputs")
+            for item, result in zip(batch, results):
+                if not item.future.done():
+                    item.future.set_result(result)
+        except Exception as e:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+
+
+class ProviderDispatcher:
+    """Bounded-concurrency, priority-aware dispatcher for LLM provider calls"""
+
+    def __init__(
+        self,
+        concurrency: Optional[Dict[str, int]] = None,
+        default_concurrency: int = 2,
+        min_call_budget: float = 1.0,
+        max_batch_size: int = 8,
+        batch_window: float = 0.05,
+    ):
+        self.concurrency = concurrency or {}
+        self.default_concurrency = default_concurrency
+        self.min_call_budget = min_call_budget
+        self.max_batch_size = max_batch_size
+        self.batch_window = batch_window
+        self.lanes: Dict[Tuple[str, str], ModelLane] = {}
+        self.batchers: Dict[Tuple[str, str], MicroBatcher] = {}
+
+    def lane(self, provider: str, model: str) -> ModelLane:
+        key = (provider, model)
+        if key not in self.lanes:
+            self.lanes[key] = ModelLane(provider, model, self.concurrency.get(provider, self.default_concurrency))
+        return self.lanes[key]
+
+    @asynccontextmanager
+    async def slot(self, provider: str, model: str,
+                   priority: RequestPriority = RequestPriority.INTERACTIVE,
+                   deadline: Optional[float] = None):
+        """Hold a provider slot for the duration of the block (e.g. a stream).
+
+        Yields the remaining time budget in seconds.
+        """
+        deadline = deadline if deadline is not None else time.monotonic() + 60.0
+        lane = self.lane(provider, model)
+        queued_at = time.monotonic()
+        await lane.acquire(priority, deadline)
+        try:
+            DISPATCH_QUEUE_WAIT.labels(provider=provider, priority=priority.name.lower()).observe(time.monotonic() - queued_at)
+            remaining = deadline - time.monotonic()
+            if remaining < self.min_call_budget:
+                raise QueueTimeoutError(f"Only {remaining:.1f}s left for {provider}/{model} after queueing")
+            yield remaining
+        finally:
+            lane.release()
+
+    async def run(self, provider: str, model: str, call: Callable[[float], Awaitable[Any]],
+                  priority: RequestPriority = RequestPriority.INTERACTIVE,
+                  deadline: Optional[float] = None) -> Any:
+        """Run call(timeout) once a slot is free; timeout is what is left of the deadline"""
+        async with self.slot(provider, model, priority, deadline) as remaining:
+            return await asyncio.wait_for(call(remaining), timeout=remaining)
+
+    async def run_batched(self, provider: str, model: str, value: Any,
+                          batch_call: Callable[[List[Any], float], Awaitable[List[Any]]],
+                          priority: RequestPriority = RequestPriority.INTERACTIVE,
+                          deadline: Optional[float] = None) -> Any:
+        """Submit one input to be sent together with other inputs for the same model"""
+        deadline = deadline if deadline is not None else time.monotonic() + 60.0
+        key = (provider, model)
+        if key not in self.batchers:
+            self.batchers[key] = MicroBatcher(self, provider, model, batch_call, self.max_batch_size, self.batch_window)
+        return await self.batchers[key].submit(value, priority, deadline)
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            f"{provider}/{model}": {
+                "concurrency": lane.concurrency,
+                "in_flight": lane.active,
+                "queued": lane.queued
+            }
+            for (provider, model), lane in self.lanes.items()
+        }
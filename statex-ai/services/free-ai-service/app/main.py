@@ -10,10 +10,11 @@ This service provides access to free AI models:
 Port: 8016
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Query
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator, Literal
 import asyncio
 import aiohttp
 import json
@@ -23,6 +24,12 @@ from datetime import datetime
 from enum import Enum
 from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
 
+from .response_cache import ResponseCache
+from .streaming import IncrementalJSONParser, encode_event
+from .dispatcher import ProviderDispatcher, RequestPriority
+from .provider_router import AdaptiveRouter, ProviderLoadingError
+from .model_residency import ModelResidencyManager
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -47,12 +54,64 @@ import os
 OLLAMA_URL = os.getenv("OLLAMA_URL", "http://ollama:11434")
 HUGGINGFACE_URL = "https://api-inference.huggingface.co/models"
 HUGGINGFACE_API_KEY = os.getenv("HUGGINGFACE_API_KEY", "")
+# gpt2 has a 1024-token context; ~3400 characters leaves room for the 150 generated tokens
+HUGGINGFACE_MAX_PROMPT_CHARS = int(os.getenv("HUGGINGFACE_MAX_PROMPT_CHARS", "3400"))
+
+# Dispatcher configuration
+OLLAMA_CONCURRENCY = int(os.getenv("OLLAMA_CONCURRENCY", "2"))
+HUGGINGFACE_CONCURRENCY = int(os.getenv("HUGGINGFACE_CONCURRENCY", "4"))
+REQUEST_DEADLINE = float(os.getenv("REQUEST_DEADLINE", "120"))
+HUGGINGFACE_BATCH_SIZE = int(os.getenv("HUGGINGFACE_BATCH_SIZE", "8"))
+HUGGINGFACE_BATCH_WINDOW_MS = float(os.getenv("HUGGINGFACE_BATCH_WINDOW_MS", "50"))
+
+# Model residency configuration
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_PRELOAD_MODELS = [m.strip() for m in os.getenv("OLLAMA_PRELOAD_MODELS", "").split(",") if m.strip()]
+OLLAMA_MAX_RESIDENT = int(os.getenv("OLLAMA_MAX_RESIDENT", "2"))
+OLLAMA_RESIDENCY_REFRESH = float(os.getenv("OLLAMA_RESIDENCY_REFRESH", "30"))
+
+# Routing configuration
+ROUTER_HEDGING = os.getenv("ROUTER_HEDGING", "false").lower() == "true"
+ROUTER_HEDGE_MIN_DELAY = float(os.getenv("ROUTER_HEDGE_MIN_DELAY", "2"))
+ROUTER_OPEN_SECONDS = float(os.getenv("ROUTER_OPEN_SECONDS", "15"))
+ROUTER_PROBE_INTERVAL = float(os.getenv("ROUTER_PROBE_INTERVAL", "15"))
+
+# Response cache configuration
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1000"))
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_NEAR_DUPLICATES = os.getenv("RESPONSE_CACHE_NEAR_DUPLICATES", "false").lower() == "true"
+RESPONSE_CACHE_SIMILARITY = float(os.getenv("RESPONSE_CACHE_SIMILARITY", "0.9"))
+RESPONSE_CACHE_REDIS_URL = os.getenv("RESPONSE_CACHE_REDIS_URL")
+RESPONSE_CACHE_DIR = os.getenv("RESPONSE_CACHE_DIR")
+
+provider_dispatcher = ProviderDispatcher(
+    concurrency={"ollama": OLLAMA_CONCURRENCY, "huggingface": HUGGINGFACE_CONCURRENCY},
+    max_batch_size=HUGGINGFACE_BATCH_SIZE,
+    batch_window=HUGGINGFACE_BATCH_WINDOW_MS / 1000
+)
+
+provider_router = AdaptiveRouter(
+    open_seconds=ROUTER_OPEN_SECONDS,
+    hedging=ROUTER_HEDGING,
+    hedge_min_delay=ROUTER_HEDGE_MIN_DELAY,
+    # Local Ollama is preferred until measurements say otherwise
+    prior_latencies={"ollama": 10.0, "huggingface": 15.0}
+)
+
+model_residency = ModelResidencyManager(
+    OLLAMA_URL,
+    keep_alive=OLLAMA_KEEP_ALIVE,
+    max_resident=OLLAMA_MAX_RESIDENT,
+    refresh_interval=OLLAMA_RESIDENCY_REFRESH
+)
 
 # Prometheus metrics
 REQUEST_COUNT = Counter('ai_requests_total', 'Total AI requests', ['provider', 'status'])
 REQUEST_DURATION = Histogram('ai_request_duration_seconds', 'AI request duration', ['provider'])
 ACTIVE_REQUESTS = Gauge('ai_active_requests', 'Active AI requests')
 AI_AGENT_STATUS = Gauge('ai_agent_status', 'AI agent status', ['agent_name'])
+STREAM_FIRST_TOKEN = Histogram('ai_stream_first_token_seconds', 'Time to first streamed token', ['provider'])
 
 class AIProvider(str, Enum):
     OLLAMA = "ollama"
@@ -71,6 +130,8 @@ class AIAnalysisRequest(BaseModel):
     user_name: str = "User"
     provider: Optional[AIProvider] = None  # Auto-detect if not specified
     model: Optional[str] = None  # Specific model to use
+    use_cache: bool = True  # Serve repeated or near-identical prompts from the response cache
+    priority: Literal["interactive", "background"] = "interactive"  # Background work yields to interactive requests
 
 class AIAnalysisResponse(BaseModel):
     success: bool
@@ -79,6 +140,7 @@ class AIAnalysisResponse(BaseModel):
     model_used: str
     processing_time: float
     confidence: float
+    cached: bool = False
     error: Optional[str] = None
 
 class AIModelInfo(BaseModel):
@@ -115,7 +177,26 @@ class FreeAIService:
         """Check which AI providers are available"""
         logger.info("🔍 Checking AI providers availability...")
         
-        # Check Ollama
+        await self._check_ollama()
+        await self._check_huggingface()
+        
+        # Mock AI is always available
+        self.provider_status["mock"] = "available"
+        self.available_models["mock"] = [
+            {"name": "mock-ai", "description": "Mock AI - Realistic simulation for testing"}
+        ]
+        logger.info("✅ Mock AI is available")
+    
+    async def probe_provider(self, provider: str) -> bool:
+        """Re-check a single provider, refreshing its status and models"""
+        if provider == "ollama":
+            await self._check_ollama()
+        elif provider == "huggingface":
+            await self._check_huggingface()
+        return self.provider_status.get(provider) == "available"
+    
+    async def _check_ollama(self):
+        """Check Ollama availability and its installed models"""
         try:
             async with aiohttp.ClientSession() as session:
                 async with session.get(f"{OLLAMA_URL}/api/tags", timeout=aiohttp.ClientTimeout(total=10)) as response:
@@ -164,8 +245,9 @@ class FreeAIService:
         except Exception as e:
             logger.warning(f"❌ Ollama not available: {e}")
             self.provider_status["ollama"] = "unavailable"
-        
-        # Check Hugging Face
+    
+    async def _check_huggingface(self):
+        """Check Hugging Face Inference API availability"""
         try:
             headers = {}
             if HUGGINGFACE_API_KEY:
@@ -197,13 +279,6 @@ class FreeAIService:
         except Exception as e:
             logger.warning(f"❌ Hugging Face API not available: {e}")
             self.provider_status["huggingface"] = "unavailable"
-        
-        # Mock AI is always available
-        self.provider_status["mock"] = "available"
-        self.available_models["mock"] = [
-            {"name": "mock-ai", "description": "Mock AI - Realistic simulation for testing"}
-        ]
-        logger.info("✅ Mock AI is available")
     
     def get_best_model(self, analysis_type: AnalysisType, provider: str = None) -> tuple[str, str]:
         """Get the best available model for the given analysis type and provider"""
@@ -242,64 +317,135 @@ class FreeAIService:
         # Ultimate fallback
         return "mock", "mock-ai"
     
-    async def analyze_with_fallback(self, request: AIAnalysisRequest) -> Dict[str, Any]:
-        """Analyze with automatic fallback between providers"""
+    def _pick_model(self, analysis_type: AnalysisType, provider: str) -> Optional[str]:
+        """Best model of a provider whose circuit admits traffic"""
+        preferred_models = self.model_preferences.get(analysis_type, {}).get(provider, [])
+        available_models = [m["name"] for m in self.available_models.get(provider, [])]
+        
+        candidates = [m for m in preferred_models if m in available_models or provider == "ollama"]
+        candidates += [m for m in available_models if m not in candidates]
+        if provider == "ollama":
+            # A loaded model of the same quality tier avoids a cold start
+            candidates = model_residency.order_by_residency(candidates)
+        for model in candidates:
+            if provider_router.allows(provider, model):
+                return model
+        return None
+    
+    def preload_candidates(self) -> List[str]:
+        """Ollama models to keep loaded: configured, or the top preference per analysis type"""
+        installed = [m["name"] for m in self.available_models.get("ollama", [])]
+        if OLLAMA_PRELOAD_MODELS:
+            return [m for m in OLLAMA_PRELOAD_MODELS if m in installed]
+        
+        models = []
+        for preferences in self.model_preferences.values():
+            for model in preferences.get("ollama", []):
+                if model in installed:
+                    if model not in models:
+                        models.append(model)
+                    break
+        return models
+    
+    def routing_candidates(self, request: AIAnalysisRequest) -> List[tuple[str, str]]:
+        """(provider, model) pairs to try in order; mock is the implicit last resort"""
+        if request.provider == AIProvider.MOCK:
+            return []
+        
+        providers = [p for p in ("ollama", "huggingface") if self.provider_status.get(p) == "available"]
+        ranked = provider_router.rank(providers)
         
-        # Determine provider and model
-        provider, model = self.get_best_model(request.analysis_type, request.provider)
+        # An explicitly requested provider goes first while its circuit is closed
+        if request.provider and request.provider.value in ranked:
+            ranked.remove(request.provider.value)
+            ranked.insert(0, request.provider.value)
+        
+        candidates = []
+        for provider in ranked:
+            model = self._pick_model(request.analysis_type, provider)
+            if model:
+                candidates.append((provider, model))
         
         # Override model if specified in request
-        if request.model:
-            model = request.model
+        if request.model and candidates:
+            candidates[0] = (candidates[0][0], request.model)
+        return candidates
+    
+    async def analyze_with_fallback(self, request: AIAnalysisRequest) -> Dict[str, Any]:
+        """Analyze with adaptive routing between providers"""
         
-        logger.info(f"🎯 Selected provider: {provider}, model: {model}")
+        # One budget for the whole request, including time spent queued
+        deadline = time.monotonic() + REQUEST_DEADLINE
+        
+        candidates = self.routing_candidates(request)
+        index = 0
+        while index < len(candidates) and time.monotonic() < deadline:
+            provider, model = candidates[index]
+            hedge = candidates[index + 1] if index + 1 < len(candidates) else None
+            hedge_delay = provider_router.hedge_delay(provider, model) if hedge else None
+            logger.info(f"🎯 Selected provider: {provider}, model: {model}")
+            
+            try:
+                if hedge_delay is None:
+                    return await self._attempt(provider, model, request, deadline)
+                return await self._attempt_hedged((provider, model), hedge, hedge_delay, request, deadline)
+            except Exception as e:
+                logger.warning(f"⚠️ Provider {provider} failed: {e}")
+                index += 2 if hedge_delay is not None else 1
         
-        # Try primary provider
+        # Ultimate fallback to mock
+        if candidates:
+            logger.info("🔄 Using mock AI as ultimate fallback")
+        return self.analyze_with_mock(request)
+    
+    async def _attempt(self, provider: str, model: str, request: AIAnalysisRequest, deadline: float) -> Dict[str, Any]:
+        """Run one provider call and feed its outcome to the router"""
+        attempt_request = request.model_copy(update={"model": model})
+        provider_router.begin(provider, model)
+        start_time = time.monotonic()
         try:
             if provider == "ollama":
-                request.model = model
-                return await self.analyze_with_ollama(request)
-            elif provider == "huggingface":
-                request.model = model
-                return await self.analyze_with_huggingface(request)
+                result = await self.analyze_with_ollama(attempt_request, deadline)
             else:
-                return self.analyze_with_mock(request)
+                result = await self.analyze_with_huggingface(attempt_request, deadline)
+        except asyncio.CancelledError:
+            provider_router.cancel(provider, model)
+            raise
         except Exception as e:
-            logger.warning(f"⚠️ Primary provider {provider} failed: {e}")
-            
-            # Try fallback providers
-            fallback_providers = ["ollama", "huggingface", "mock"]
-            fallback_providers = [p for p in fallback_providers if p != provider]
-            
-            for fallback_provider in fallback_providers:
-                if self.provider_status.get(fallback_provider) == "available":
-                    try:
-                        logger.info(f"🔄 Trying fallback provider: {fallback_provider}")
-                        fallback_provider_name, fallback_model = self.get_best_model(request.analysis_type, fallback_provider)
-                        
-                        if fallback_provider == "ollama":
-                            request.model = fallback_model
-                            return await self.analyze_with_ollama(request)
-                        elif fallback_provider == "huggingface":
-                            request.model = fallback_model
-                            return await self.analyze_with_huggingface(request)
-                        else:
-                            return self.analyze_with_mock(request)
-                    except Exception as fallback_error:
-                        logger.warning(f"⚠️ Fallback provider {fallback_provider} also failed: {fallback_error}")
-                        continue
-            
-            # Ultimate fallback to mock
-            logger.info("🔄 Using mock AI as ultimate fallback")
-            return self.analyze_with_mock(request)
+            provider_router.record_failure(provider, model, time.monotonic() - start_time, e)
+            raise
+        provider_router.record_success(provider, model, time.monotonic() - start_time)
+        return result
     
-    async def analyze_with_ollama(self, request: AIAnalysisRequest) -> Dict[str, Any]:
-        """Analyze using Ollama (Local LLM)"""
-        logger.info(f"🤖 Analyzing with Ollama: {request.model or 'llama2:7b'}")
+    async def _attempt_hedged(self, primary: tuple[str, str], secondary: tuple[str, str], delay: float,
+                              request: AIAnalysisRequest, deadline: float) -> Dict[str, Any]:
+        """Start the secondary provider if the primary has not answered after delay; first success wins"""
+        primary_task = asyncio.create_task(self._attempt(*primary, request, deadline))
+        done, _ = await asyncio.wait({primary_task}, timeout=delay)
+        if done and not primary_task.exception():
+            return primary_task.result()
         
-        model = request.model or "llama2:7b"
+        logger.info(f"🪁 Hedging {primary[0]} with {secondary[0]} after {delay:.1f}s")
+        secondary_task = asyncio.create_task(self._attempt(*secondary, request, deadline))
+        pending = {secondary_task} if done else {primary_task, secondary_task}
+        last_error: Optional[BaseException] = primary_task.exception() if done else None
         
-        # Create a comprehensive prompt based on analysis type
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = primary[0] if task is primary_task else secondary[0]
+                        provider_router.record_hedge(primary[0], secondary[0], winner)
+                        return task.result()
+                    last_error = task.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+        raise last_error
+    
+    def _build_ollama_prompt(self, request: AIAnalysisRequest) -> str:
+        """Create a comprehensive prompt based on analysis type"""
         if request.analysis_type == AnalysisType.BUSINESS_ANALYSIS:
             prompt = f"""Analyze this business request and provide a comprehensive business analysis:
 
@@ -344,126 +490,196 @@ Please provide a JSON response with:
 - summary: String summary
 """
         
+        return prompt
+    
+    def _parse_ollama_response(self, ai_response: str, request: AIAnalysisRequest, model: str) -> Dict[str, Any]:
+        """Parse the JSON object embedded in an Ollama completion"""
         try:
+            json_start = ai_response.find('{')
+            json_end = ai_response.rfind('}') + 1
+            if json_start != -1 and json_end != -1:
+                json_str = ai_response[json_start:json_end]
+                analysis = json.loads(json_str)
+            else:
+                analysis = self._parse_text_response(ai_response, request.user_name, request.analysis_type)
+        except:
+            analysis = self._parse_text_response(ai_response, request.user_name, request.analysis_type)
+        
+        analysis["ai_service"] = "Ollama"
+        analysis["model_used"] = model
+        return analysis
+    
+    async def analyze_with_ollama(self, request: AIAnalysisRequest, deadline: Optional[float] = None) -> Dict[str, Any]:
+        """Analyze using Ollama (Local LLM)"""
+        logger.info(f"🤖 Analyzing with Ollama: {request.model or 'llama2:7b'}")
+        
+        model = request.model or "llama2:7b"
+        payload = {
+            "model": model,
+            "prompt": self._build_ollama_prompt(request),
+            "stream": False,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            "options": {
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "num_predict": 1000
+            }
+        }
+        
+        async def generate(timeout: float) -> str:
             async with aiohttp.ClientSession() as session:
-                payload = {
-                    "model": model,
-                    "prompt": prompt,
-                    "stream": False,
-                    "options": {
-                        "temperature": 0.7,
-                        "top_p": 0.9,
-                        "num_predict": 1000
-                    }
-                }
-                
                 async with session.post(
                     f"{OLLAMA_URL}/api/generate",
                     json=payload,
-                    timeout=aiohttp.ClientTimeout(total=60)
+                    timeout=aiohttp.ClientTimeout(total=timeout)
                 ) as response:
                     if response.status == 200:
                         result = await response.json()
-                        ai_response = result.get("response", "")
-                        
-                        # Try to parse JSON response
-                        try:
-                            json_start = ai_response.find('{')
-                            json_end = ai_response.rfind('}') + 1
-                            if json_start != -1 and json_end != -1:
-                                json_str = ai_response[json_start:json_end]
-                                analysis = json.loads(json_str)
-                            else:
-                                analysis = self._parse_text_response(ai_response, request.user_name, request.analysis_type)
-                        except:
-                            analysis = self._parse_text_response(ai_response, request.user_name, request.analysis_type)
-                        
-                        analysis["ai_service"] = "Ollama"
-                        analysis["model_used"] = model
-                        return analysis
+                        model_residency.observe_generation(model, result.get("load_duration"))
+                        return result.get("response", "")
                     else:
                         error_text = await response.text()
                         raise Exception(f"Ollama API error: {response.status} - {error_text}")
+        
+        try:
+            ai_response = await provider_dispatcher.run(
+                "ollama",
+                model,
+                generate,
+                priority=RequestPriority[request.priority.upper()],
+                deadline=deadline or time.monotonic() + REQUEST_DEADLINE
+            )
+            return self._parse_ollama_response(ai_response, request, model)
         except Exception as e:
             logger.error(f"Ollama analysis failed: {e}")
             raise e
     
-    async def analyze_with_huggingface(self, request: AIAnalysisRequest) -> Dict[str, Any]:
+    async def stream_with_ollama(self, request: AIAnalysisRequest) -> AsyncIterator[str]:
+        """Stream completion tokens from Ollama as they are generated"""
+        logger.info(f"🤖 Streaming with Ollama: {request.model or 'llama2:7b'}")
+        
+        model = request.model or "llama2:7b"
+        payload = {
+            "model": model,
+            "prompt": self._build_ollama_prompt(request),
+            "stream": True,
+            "keep_alive": OLLAMA_KEEP_ALIVE,
+            "options": {
+                "temperature": 0.7,
+                "top_p": 0.9,
+                "num_predict": 1000
+            }
+        }
+        
+        async with provider_dispatcher.slot(
+            "ollama",
+            model,
+            priority=RequestPriority[request.priority.upper()],
+            deadline=time.monotonic() + REQUEST_DEADLINE
+        ):
+            async with aiohttp.ClientSession() as session:
+                async with session.post(
+                    f"{OLLAMA_URL}/api/generate",
+                    json=payload,
+                    # Bound the gap between tokens rather than the whole generation
+                    timeout=aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=60)
+                ) as response:
+                    if response.status != 200:
+                        error_text = await response.text()
+                        raise Exception(f"Ollama API error: {response.status} - {error_text}")
+                    
+                    # Ollama streams one JSON object per line
+                    async for line in response.content:
+                        if not line.strip():
+                            continue
+                        chunk = json.loads(line)
+                        if chunk.get("error"):
+                            raise Exception(f"Ollama stream error: {chunk['error']}")
+                        token = chunk.get("response", "")
+                        if token:
+                            yield token
+                        if chunk.get("done"):
+                            model_residency.observe_generation(model, chunk.get("load_duration"))
+                            break
+    
+    async def analyze_with_huggingface(self, request: AIAnalysisRequest, deadline: Optional[float] = None) -> Dict[str, Any]:
         """Analyze using Hugging Face API"""
         logger.info(f"🤖 Analyzing with Hugging Face: {request.model or 'gpt2'}")
         
         model = request.model or "gpt2"
         
         try:
-            headers = {"Content-Type": "application/json"}
-            if HUGGINGFACE_API_KEY:
-                headers["Authorization"] = f"Bearer {HUGGINGFACE_API_KEY}"
-            
             # Create a focused prompt for business analysis
-            prompt = f"Business Analysis Request from {request.user_name}: {request.text_content[:400]}"
+            prompt = f"Business Analysis Request from {request.user_name}: {request.text_content}"
+            prompt = prompt[:HUGGINGFACE_MAX_PROMPT_CHARS]
             
-            async with aiohttp.ClientSession() as session:
-                payload = {
-                    "inputs": prompt,
-                    "parameters": {
-                        "max_new_tokens": 150,
-                        "temperature": 0.7,
-                        "do_sample": True,
-                        "return_full_text": False
-                    }
-                }
-                
-                async with session.post(
-                    f"{HUGGINGFACE_URL}/{model}",
-                    json=payload,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=60)
-                ) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        
-                        # Handle different response formats
-                        ai_response = ""
-                        if isinstance(result, list) and len(result) > 0:
-                            if "generated_text" in result[0]:
-                                ai_response = result[0]["generated_text"]
-                            elif "text" in result[0]:
-                                ai_response = result[0]["text"]
-                        elif isinstance(result, dict):
-                            ai_response = result.get("generated_text", result.get("text", ""))
-                        
-                        analysis = self._parse_text_response(ai_response, request.user_name, request.analysis_type)
-                        analysis["ai_service"] = "Hugging Face"
-                        analysis["model_used"] = model
-                        return analysis
-                    elif response.status == 503:
-                        # Model is loading, wait and retry once
-                        logger.info("⏳ Model is loading, waiting 10 seconds...")
-                        await asyncio.sleep(10)
-                        
-                        async with session.post(
-                            f"{HUGGINGFACE_URL}/{model}",
-                            json=payload,
-                            headers=headers,
-                            timeout=aiohttp.ClientTimeout(total=60)
-                        ) as retry_response:
-                            if retry_response.status == 200:
-                                result = await retry_response.json()
-                                ai_response = result[0].get("generated_text", "") if isinstance(result, list) else ""
-                                analysis = self._parse_text_response(ai_response, request.user_name, request.analysis_type)
-                                analysis["ai_service"] = "Hugging Face"
-                                analysis["model_used"] = model
-                                return analysis
-                            else:
-                                error_text = await retry_response.text()
-                                raise Exception(f"Hugging Face API error after retry: {retry_response.status} - {error_text}")
-                    else:
-                        error_text = await response.text()
-                        raise Exception(f"Hugging Face API error: {response.status} - {error_text}")
+            # Compatible prompts for the same model are sent as one batched call
+            ai_response = await provider_dispatcher.run_batched(
+                "huggingface",
+                model,
+                prompt,
+                lambda prompts, timeout: self._generate_huggingface_batch(model, prompts, timeout),
+                priority=RequestPriority[request.priority.upper()],
+                deadline=deadline or time.monotonic() + REQUEST_DEADLINE
+            )
+            
+            analysis = self._parse_text_response(ai_response, request.user_name, request.analysis_type)
+            analysis["ai_service"] = "Hugging Face"
+            analysis["model_used"] = model
+            return analysis
         except Exception as e:
             logger.error(f"Hugging Face analysis failed: {e}")
             raise e
     
+    async def _generate_huggingface_batch(self, model: str, prompts: List[str], timeout: float) -> List[str]:
+        """Generate completions for several prompts in one Hugging Face call"""
+        headers = {"Content-Type": "application/json"}
+        if HUGGINGFACE_API_KEY:
+            headers["Authorization"] = f"Bearer {HUGGINGFACE_API_KEY}"
+        
+        payload = {
+            "inputs": prompts,
+            "parameters": {
+                "max_new_tokens": 150,
+                "temperature": 0.7,
+                "do_sample": True,
+                "return_full_text": False
+            }
+        }
+        async with aiohttp.ClientSession() as session:
+            async with session.post(
+                f"{HUGGINGFACE_URL}/{model}",
+                json=payload,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=timeout)
+            ) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    if not isinstance(result, list):
+                        result = [result]
+                    return [self._extract_generated_text(item) for item in result]
+                elif response.status == 503:
+                    # Model is loading; let the router open this model's circuit
+                    # for the estimated load time instead of waiting here
+                    retry_after = None
+                    try:
+                        retry_after = float((await response.json()).get("estimated_time"))
+                    except Exception:
+                        pass
+                    logger.info(f"⏳ Hugging Face model {model} is loading")
+                    raise ProviderLoadingError(f"Hugging Face model {model} is loading", retry_after or 20.0)
+                else:
+                    error_text = await response.text()
+                    raise Exception(f"Hugging Face API error: {response.status} - {error_text}")
+    
+    def _extract_generated_text(self, item: Any) -> str:
+        """Handle the different response formats of the Inference API"""
+        if isinstance(item, list):
+            item = item[0] if item else {}
+        if isinstance(item, dict):
+            return item.get("generated_text", item.get("text", ""))
+        return ""
+    
     def analyze_with_mock(self, request: AIAnalysisRequest) -> Dict[str, Any]:
         """Mock AI analysis for testing"""
         logger.info("🤖 Using mock AI analysis...")
@@ -638,11 +854,120 @@ Please provide a JSON response with:
 
 # Initialize service
 free_ai_service = FreeAIService()
+response_cache = ResponseCache(
+    max_entries=RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=RESPONSE_CACHE_TTL,
+    near_duplicates=RESPONSE_CACHE_NEAR_DUPLICATES,
+    similarity_threshold=RESPONSE_CACHE_SIMILARITY,
+    redis_url=RESPONSE_CACHE_REDIS_URL,
+    cache_dir=RESPONSE_CACHE_DIR
+)
+
+def cache_key_parts(request: AIAnalysisRequest) -> tuple[str, str, str, str]:
+    """(analysis_type, model, scope, prompt) of a request as received by the service"""
+    # Must be taken before analysis, since analyze_with_fallback rewrites request.model
+    provider_key = request.provider.value if request.provider else "auto"
+    model_key = f"{provider_key}/{request.model or 'auto'}"
+    # The user is part of the exact-match scope: a near-duplicate text from another
+    # customer must never be served someone else's analysis
+    return request.analysis_type.value, model_key, request.user_name, request.text_content
+
+def is_cacheable(request: AIAnalysisRequest, analysis: Dict[str, Any]) -> bool:
+    """Do not pin mock fallbacks caused by provider outages"""
+    return request.provider == AIProvider.MOCK or analysis.get("ai_service") != "Mock AI Service"
+
+async def analyze_cached(request: AIAnalysisRequest) -> tuple[Dict[str, Any], bool]:
+    """Analyze through the response cache, returning (analysis, served_from_cache)"""
+    if not RESPONSE_CACHE_ENABLED or not request.use_cache:
+        return await free_ai_service.analyze_with_fallback(request), False
+    
+    analysis, cache_status = await response_cache.get_or_compute(
+        *cache_key_parts(request),
+        lambda: free_ai_service.analyze_with_fallback(request),
+        lambda analysis: is_cacheable(request, analysis)
+    )
+    return analysis, cache_status != "miss"
+
+async def stream_analysis_events(request: AIAnalysisRequest) -> AsyncIterator[Dict[str, Any]]:
+    """Yield start, token, field and done events for a streamed analysis"""
+    start_time = time.time()
+    key_parts = cache_key_parts(request)
+    use_cache = RESPONSE_CACHE_ENABLED and request.use_cache
+    
+    cached = response_cache.lookup(*key_parts) if use_cache else None
+    candidates = free_ai_service.routing_candidates(request)
+    provider, model = candidates[0] if candidates else ("mock", "mock-ai")
+    
+    if cached is None and provider == "ollama":
+        request.model = model
+        parser = IncrementalJSONParser()
+        tokens: List[str] = []
+        provider_router.begin(provider, model)
+        # Whether the trial slot taken by begin() was released by a success or failure
+        settled = False
+        try:
+            async for token in free_ai_service.stream_with_ollama(request):
+                if not tokens:
+                    first_token_time = time.time() - start_time
+                    STREAM_FIRST_TOKEN.labels(provider="ollama").observe(first_token_time)
+                    yield {"event": "start", "provider": "ollama", "model": model, "time_to_first_token": first_token_time}
+                tokens.append(token)
+                yield {"event": "token", "token": token}
+                for field, value in parser.feed(token).items():
+                    yield {"event": "field", "field": field, "value": value}
+            
+            provider_router.record_success(provider, model, time.time() - start_time)
+            settled = True
+            analysis = free_ai_service._parse_ollama_response("".join(tokens), request, model)
+            if use_cache:
+                await response_cache.store(*key_parts, analysis, time.time() - start_time)
+            cached = (analysis, "miss")
+        except Exception as e:
+            if not settled:
+                provider_router.record_failure(provider, model, time.time() - start_time, e)
+                settled = True
+            logger.warning(f"⚠️ Ollama stream failed, falling back to buffered analysis: {e}")
+        finally:
+            # Cancellation or the consumer closing the stream early (GeneratorExit) must not
+            # leave a half-open circuit's trial slot taken
+            if not settled:
+                provider_router.cancel(provider, model)
+    
+    if cached is None:
+        cached = (await analyze_cached(request))[0], "miss"
+    
+    analysis, cache_status = cached
+    yield {
+        "event": "done",
+        "success": True,
+        "analysis": analysis,
+        "provider_used": analysis.get("ai_service", "unknown"),
+        "model_used": analysis.get("model_used", "unknown"),
+        "processing_time": time.time() - start_time,
+        "confidence": analysis.get("confidence", 0.8),
+        "cached": cache_status != "miss"
+    }
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize the service on startup"""
     await free_ai_service.check_providers()
+    await provider_router.start_probing(
+        free_ai_service.probe_provider,
+        ["ollama", "huggingface"],
+        interval=ROUTER_PROBE_INTERVAL,
+        # Providers that were down at startup are picked up once they come back
+        needs_probe=lambda provider: free_ai_service.provider_status.get(provider) != "available"
+    )
+    if free_ai_service.provider_status.get("ollama") == "available":
+        # Preloading can take minutes; serve requests meanwhile
+        asyncio.create_task(model_residency.start(free_ai_service.preload_candidates()))
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop background provider probing and residency tracking"""
+    await provider_router.stop_probing()
+    await model_residency.stop()
 
 @app.get("/health")
 async def health_check():
@@ -676,14 +1001,14 @@ async def analyze_text(request: AIAnalysisRequest):
     ACTIVE_REQUESTS.inc()  # Increment active requests
     
     try:
-        # Use the new fallback analysis method
-        analysis = await free_ai_service.analyze_with_fallback(request)
+        # Use the new fallback analysis method, served from the cache when possible
+        analysis, cached = await analyze_cached(request)
         provider = analysis.get("ai_service", "unknown").lower()
         
         processing_time = time.time() - start_time
         
         # Update metrics
-        provider_name = provider if isinstance(provider, str) else provider.value
+        provider_name = "cache" if cached else provider
         REQUEST_COUNT.labels(provider=provider_name, status="success").inc()
         REQUEST_DURATION.labels(provider=provider_name).observe(processing_time)
         ACTIVE_REQUESTS.dec()  # Decrement active requests
@@ -695,7 +1020,8 @@ async def analyze_text(request: AIAnalysisRequest):
             provider_used=analysis.get("ai_service", "unknown"),
             model_used=analysis.get("model_used", "unknown"),
             processing_time=processing_time,
-            confidence=analysis.get("confidence", 0.8)
+            confidence=analysis.get("confidence", 0.8),
+            cached=cached
         )
         
     except Exception as e:
@@ -718,6 +1044,63 @@ async def analyze_text(request: AIAnalysisRequest):
             error=str(e)
         )
 
+@app.post("/analyze/stream")
+async def analyze_text_stream(
+    request: AIAnalysisRequest,
+    stream_format: str = Query("ndjson", alias="format", pattern="^(ndjson|sse)$")
+):
+    """Analyze text and stream tokens and completed JSON fields as they arrive.
+    
+    Events: `start` (first token), `token`, `field` (a completed top-level JSON
+    field of the analysis), and a final `done` carrying the same payload as
+    `/analyze`. Providers that cannot stream emit only `done`.
+    """
+    async def event_stream():
+        ACTIVE_REQUESTS.inc()
+        try:
+            async for event in stream_analysis_events(request):
+                yield encode_event(event, stream_format)
+            REQUEST_COUNT.labels(provider="stream", status="success").inc()
+        except Exception as e:
+            logger.error(f"Streaming analysis failed: {e}")
+            REQUEST_COUNT.labels(provider="stream", status="failed").inc()
+            yield encode_event({"event": "done", "success": False, "analysis": {}, "error": str(e)}, stream_format)
+        finally:
+            ACTIVE_REQUESTS.dec()
+    
+    media_type = "text/event-stream" if stream_format == "sse" else "application/x-ndjson"
+    return StreamingResponse(event_stream(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+@app.get("/dispatcher/status")
+async def get_dispatcher_status():
+    """Get in-flight and queued generations per provider model"""
+    return provider_dispatcher.get_status()
+
+@app.get("/providers/routing")
+async def get_provider_routing():
+    """Get latency, error rate and circuit state per provider and model"""
+    return {
+        "providers": free_ai_service.provider_status,
+        "hedging": provider_router.hedging,
+        "targets": provider_router.get_status()
+    }
+
+@app.get("/models/residency")
+async def get_model_residency():
+    """Get which Ollama models are loaded, pinned and how often requests hit a cold model"""
+    return model_residency.get_status()
+
+@app.get("/cache/stats")
+async def get_cache_stats():
+    """Get response cache statistics"""
+    return {"enabled": RESPONSE_CACHE_ENABLED, **response_cache.get_stats()}
+
+@app.delete("/cache")
+async def clear_cache():
+    """Clear the in-memory response cache"""
+    response_cache.clear()
+    return {"status": "cleared"}
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -729,6 +1112,9 @@ async def root():
             "health": "/health",
             "models": "/models",
             "analyze": "/analyze",
+            "analyze_stream": "/analyze/stream",
+            "cache_stats": "/cache/stats",
+            "model_residency": "/models/residency",
             "docs": "/docs"
         }
     }
@@ -0,0 +1,179 @@
+"""
+Ollama Model Residency Management
+
+Keeps the preferred Ollama models loaded so requests do not pay the model-load
+time: preferred models are preloaded at startup, every generation carries a
+`keep_alive` hint, and evicted pinned models are warmed again while there is
+room. Model selection can favour models that are already resident when they
+are of an equivalent quality tier. Load, eviction and cold-start events are
+exported as Prometheus metrics.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Dict, List, Optional, Set
+
+import aiohttp
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+MODEL_LOADS = Counter('ollama_model_load_events_total', 'Ollama model loads observed', ['model', 'reason'])
+MODEL_EVICTIONS = Counter('ollama_model_evict_events_total', 'Ollama model evictions observed', ['model'])
+MODEL_COLD_STARTS = Counter('ollama_cold_starts_total', 'Requests that paid the model load time', ['model'])
+MODEL_RESIDENT = Gauge('ollama_model_resident', 'Whether a model is loaded in Ollama (1=resident)', ['model'])
+
+_PARAMETER_SIZE = re.compile(r":(\d+(?:\.\d+)?)b", re.IGNORECASE)
+
+
+def quality_tier(model: str) -> str:
+    """Models of the same parameter size are treated as equivalent"""
+    match = _PARAMETER_SIZE.search(model)
+    return f"{match.group(1)}b" if match else model
+
+
+class ModelResidencyManager:
+    """Tracks and manages which Ollama models are loaded"""
+
+    def __init__(
+        self,
+        ollama_url: str,
+        keep_alive: str = "30m",
+        max_resident: int = 2,
+        refresh_interval: float = 30.0,
+        cold_start_threshold: float = 1.0,
+    ):
+        self.ollama_url = ollama_url
+        self.keep_alive = keep_alive
+        self.max_resident = max_resident
+        self.refresh_interval = refresh_interval
+        self.cold_start_threshold = cold_start_threshold
+        self.pinned: List[str] = []
+        self.resident: Set[str] = set()
+        self.load_times: Dict[str, float] = {}
+        self.cold_starts: Dict[str, int] = {}
+        self.refresh_task: Optional[asyncio.Task] = None
+        self._shutdown = False
+
+    async def start(self, pinned_models: List[str]):
+        """Preload the pinned models and start watching residency"""
+        self.pinned = pinned_models[:self.max_resident]
+        await self.refresh()
+        for model in self.pinned:
+            if model not in self.resident:
+                await self.warm(model, reason="preload")
+        if self.refresh_task is None or self.refresh_task.done():
+            self._shutdown = False
+            self.refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        self._shutdown = True
+        if self.refresh_task and not self.refresh_task.done():
+            self.refresh_task.cancel()
+            try:
+                await self.refresh_task
+            except asyncio.CancelledError:
+                pass
+
+    async def warm(self, model: str, reason: str = "warm") -> bool:
+        """Load a model without generating anything (empty prompt)"""
+        start_time = time.time()
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.post(
+                    f"{self.ollama_url}/api/generate",
+                    json={"model": model, "prompt": "", "keep_alive": self.keep_alive, "stream": False},
+                    timeout=aiohttp.ClientTimeout(total=300)
+                ) as response:
+                    if response.status != 200:
+                        logger.warning(f"⚠️ Could not warm {model}: HTTP {response.status}")
+                        return False
+                    await response.read()
+        except Exception as e:
+            logger.warning(f"⚠️ Could not warm {model}: {e}")
+            return False
+
+        load_time = time.time() - start_time
+        self.load_times[model] = load_time
+        self._mark_resident(model, reason)
+        logger.info(f"🔥 Warmed Ollama model {model} in {load_time:.1f}s ({reason})")
+        return True
+
+    async def refresh(self):
+        """Sync the resident set with Ollama's running models and record evictions"""
+        try:
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"{self.ollama_url}/api/ps", timeout=aiohttp.ClientTimeout(total=5)) as response:
+                    if response.status != 200:
+                        return
+                    data = await response.json()
+        except Exception as e:
+            logger.debug(f"Could not list running Ollama models: {e}")
+            return
+
+        running = {model.get("name") or model.get("model") for model in data.get("models", [])}
+        running.discard(None)
+        for model in self.resident - running:
+            MODEL_EVICTIONS.labels(model=model).inc()
+            MODEL_RESIDENT.labels(model=model).set(0)
+            logger.info(f"📤 Ollama evicted model {model}")
+        for model in running - self.resident:
+            MODEL_LOADS.labels(model=model, reason="external").inc()
+            MODEL_RESIDENT.labels(model=model).set(1)
+        self.resident = running
+
+    async def _refresh_loop(self):
+        while not self._shutdown:
+            try:
+                await asyncio.sleep(self.refresh_interval)
+                await self.refresh()
+                # Re-pin evicted models while Ollama has room for them
+                for model in self.pinned:
+                    if model not in self.resident and len(self.resident) < self.max_resident:
+                        await self.warm(model, reason="repin")
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in model residency loop: {e}")
+
+    def observe_generation(self, model: str, load_duration_ns: Optional[int]):
+        """Record a generation; Ollama reports load_duration in nanoseconds"""
+        load_seconds = (load_duration_ns or 0) / 1e9
+        if load_seconds >= self.cold_start_threshold:
+            MODEL_COLD_STARTS.labels(model=model).inc()
+            self.cold_starts[model] = self.cold_starts.get(model, 0) + 1
+            self.load_times[model] = load_seconds
+            logger.info(f"🧊 Cold start for {model}: {load_seconds:.1f}s load time")
+        if model not in self.resident:
+            self._mark_resident(model, "request")
+
+    def _mark_resident(self, model: str, reason: str):
+        if model not in self.resident:
+            MODEL_LOADS.labels(model=model, reason=reason).inc()
+        self.resident.add(model)
+        MODEL_RESIDENT.labels(model=model).set(1)
+
+    def order_by_residency(self, models: List[str]) -> List[str]:
+        """Within each quality tier, move resident models ahead; tiers keep their order"""
+        tiers: Dict[str, List[str]] = {}
+        for model in models:
+            tiers.setdefault(quality_tier(model), []).append(model)
+
+        ordered: List[str] = []
+        for tier_models in tiers.values():
+            ordered += [m for m in tier_models if m in self.resident]
+            ordered += [m for m in tier_models if m not in self.resident]
+        return ordered
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "keep_alive": self.keep_alive,
+            "max_resident": self.max_resident,
+            "pinned": self.pinned,
+            "resident": sorted(self.resident),
+            "load_times": self.load_times,
+            "cold_starts": self.cold_starts
+        }
@@ -0,0 +1,277 @@
+"""
+Adaptive Provider Routing for the Free AI Service
+
+Tracks EWMA latency and error rate per provider and per provider model, ranks
+providers by expected cost instead of a fixed order, and guards each of them
+with a circuit breaker. Open circuits are re-probed in the background, so a
+slow or failing provider stops being retried on every request. Optionally a
+request is hedged to the next provider once the primary has been running
+longer than its observed p95 latency.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+ROUTER_EWMA_LATENCY = Gauge('ai_router_ewma_latency_seconds', 'EWMA latency per provider target', ['target'])
+ROUTER_ERROR_RATE = Gauge('ai_router_error_rate', 'EWMA error rate per provider target', ['target'])
+ROUTER_CIRCUIT_STATE = Gauge('ai_router_circuit_open', 'Circuit breaker state (1=open, 0.5=half-open, 0=closed)', ['target'])
+ROUTER_HEDGES = Counter('ai_router_hedged_requests_total', 'Requests hedged to a second provider', ['primary', 'secondary', 'winner'])
+
+
+class CircuitState(str, Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class ProviderLoadingError(Exception):
+    """The provider is reachable but not ready (e.g. a Hugging Face model is loading)"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class TargetStats:
+    """Latency, error-rate and circuit state for a provider or a provider model"""
+
+    def __init__(self, name: str, prior_latency: float, window: int = 200):
+        self.name = name
+        self.ewma_latency = prior_latency
+        self.error_rate = 0.0
+        self.samples = 0
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.state = CircuitState.CLOSED
+        self.open_until = 0.0
+        self.open_count = 0
+        self.trial_in_flight = False
+        self.last_error: Optional[str] = None
+        self.last_failure_at = 0.0
+
+    def p95(self) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ewma_latency": round(self.ewma_latency, 3),
+            "error_rate": round(self.error_rate, 3),
+            "samples": self.samples,
+            "p95_latency": self.p95(),
+            "state": self.state.value,
+            "open_for": max(self.open_until - time.monotonic(), 0.0) if self.state == CircuitState.OPEN else 0.0,
+            "consecutive_failures": self.consecutive_failures,
+            "last_error": self.last_error
+        }
+
+
+class AdaptiveRouter:
+    """Ranks providers by EWMA cost and guards them with circuit breakers"""
+
+    def __init__(
+        self,
+        alpha: float = 0.2,
+        failure_threshold: int = 3,
+        error_rate_threshold: float = 0.5,
+        open_seconds: float = 15.0,
+        max_open_seconds: float = 300.0,
+        error_penalty: float = 4.0,
+        error_half_life: float = 60.0,
+        hedging: bool = False,
+        hedge_min_delay: float = 2.0,
+        hedge_min_samples: int = 20,
+        prior_latencies: Optional[Dict[str, float]] = None,
+    ):
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.open_seconds = open_seconds
+        self.max_open_seconds = max_open_seconds
+        self.error_penalty = error_penalty
+        self.error_half_life = error_half_life
+        self.hedging = hedging
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.prior_latencies = prior_latencies or {}
+        self.targets: Dict[str, TargetStats] = {}
+        self.probe_task: Optional[asyncio.Task] = None
+        self._shutdown = False
+
+    def _stats(self, provider: str, model: Optional[str] = None) -> TargetStats:
+        name = f"{provider}/{model}" if model else provider
+        if name not in self.targets:
+            self.targets[name] = TargetStats(name, self.prior_latencies.get(provider, 10.0))
+        return self.targets[name]
+
+    def allows(self, provider: str, model: Optional[str] = None) -> bool:
+        """Whether a request may be sent; a half-open circuit admits one trial at a time"""
+        keys = [self._stats(provider)] + ([self._stats(provider, model)] if model else [])
+        now = time.monotonic()
+        for stats in keys:
+            if stats.state == CircuitState.OPEN:
+                if now < stats.open_until:
+                    return False
+                self._set_state(stats, CircuitState.HALF_OPEN)
+            if stats.state == CircuitState.HALF_OPEN and stats.trial_in_flight:
+                return False
+        return True
+
+    def begin(self, provider: str, model: str):
+        """Mark the start of a request; claims the trial slot of half-open circuits"""
+        for stats in (self._stats(provider), self._stats(provider, model)):
+            if stats.state == CircuitState.HALF_OPEN:
+                stats.trial_in_flight = True
+
+    def cancel(self, provider: str, model: str):
+        """Release trial slots claimed by a request that was cancelled (e.g. a lost hedge)"""
+        for stats in (self._stats(provider), self._stats(provider, model)):
+            stats.trial_in_flight = False
+
+    def record_success(self, provider: str, model: str, latency: float):
+        for stats in (self._stats(provider), self._stats(provider, model)):
+            self._observe(stats, latency, failed=False)
+            stats.consecutive_failures = 0
+            stats.trial_in_flight = False
+            if stats.state != CircuitState.CLOSED:
+                logger.info(f"✅ Circuit for {stats.name} closed")
+                stats.open_count = 0
+                self._set_state(stats, CircuitState.CLOSED)
+
+    def record_failure(self, provider: str, model: str, latency: float, error: Exception):
+        retry_after = getattr(error, "retry_after", None)
+        # A loading model says nothing about the provider as a whole
+        targets = [self._stats(provider, model)]
+        if not isinstance(error, ProviderLoadingError):
+            targets.insert(0, self._stats(provider))
+        else:
+            self._stats(provider).trial_in_flight = False
+
+        for stats in targets:
+            self._observe(stats, latency, failed=True)
+            stats.consecutive_failures += 1
+            stats.trial_in_flight = False
+            stats.last_error = str(error)[:200]
+            stats.last_failure_at = time.monotonic()
+            if (
+                stats.state == CircuitState.HALF_OPEN
+                or retry_after is not None
+                or stats.consecutive_failures >= self.failure_threshold
+                or (stats.samples >= self.failure_threshold and stats.error_rate >= self.error_rate_threshold)
+            ):
+                self._open(stats, retry_after)
+
+    def _observe(self, stats: TargetStats, latency: float, failed: bool):
+        stats.samples += 1
+        stats.error_rate = (1 - self.alpha) * stats.error_rate + self.alpha * (1.0 if failed else 0.0)
+        if not failed:
+            stats.latencies.append(latency)
+            stats.ewma_latency = (1 - self.alpha) * stats.ewma_latency + self.alpha * latency
+        ROUTER_EWMA_LATENCY.labels(target=stats.name).set(stats.ewma_latency)
+        ROUTER_ERROR_RATE.labels(target=stats.name).set(stats.error_rate)
+
+    def _open(self, stats: TargetStats, retry_after: Optional[float] = None):
+        stats.open_count += 1
+        duration = retry_after or min(self.open_seconds * (2 ** (stats.open_count - 1)), self.max_open_seconds)
+        stats.open_until = time.monotonic() + duration
+        if stats.state != CircuitState.OPEN:
+            logger.warning(f"⛔ Circuit for {stats.name} opened for {duration:.0f}s: {stats.last_error}")
+        self._set_state(stats, CircuitState.OPEN)
+
+    def _set_state(self, stats: TargetStats, state: CircuitState):
+        stats.state = state
+        if state != CircuitState.HALF_OPEN:
+            stats.trial_in_flight = False
+        value = {CircuitState.CLOSED: 0.0, CircuitState.HALF_OPEN: 0.5, CircuitState.OPEN: 1.0}[state]
+        ROUTER_CIRCUIT_STATE.labels(target=stats.name).set(value)
+
+    def score(self, provider: str, model: Optional[str] = None) -> float:
+        """Expected cost of a request: latency inflated by the error rate.
+
+        The error rate decays with time since the last failure so that a
+        provider which failed once is not starved of traffic forever.
+        """
+        stats = self._stats(provider, model) if model else self._stats(provider)
+        decay = 0.5 ** ((time.monotonic() - stats.last_failure_at) / self.error_half_life)
+        return stats.ewma_latency * (1 + self.error_penalty * stats.error_rate * decay)
+
+    def rank(self, providers: List[str]) -> List[str]:
+        """Providers whose circuits admit traffic, cheapest first (stable for ties)"""
+        return sorted(
+            [provider for provider in providers if self.allows(provider)],
+            key=self.score
+        )
+
+    def hedge_delay(self, provider: str, model: str) -> Optional[float]:
+        """Delay after which to hedge a request, or None if hedging does not apply"""
+        if not self.hedging:
+            return None
+        stats = self._stats(provider, model)
+        if len(stats.latencies) < self.hedge_min_samples:
+            return None
+        return max(stats.p95() or 0.0, self.hedge_min_delay)
+
+    def record_hedge(self, primary: str, secondary: str, winner: str):
+        ROUTER_HEDGES.labels(primary=primary, secondary=secondary, winner=winner).inc()
+
+    async def start_probing(self, probe: Callable[[str], Awaitable[bool]], providers: List[str],
+                            interval: float = 15.0, needs_probe: Optional[Callable[[str], bool]] = None):
+        """Re-probe providers in the background.
+
+        A provider is probed when its circuit is open and due for a retry, or
+        when needs_probe(provider) says so (e.g. it was unavailable at startup).
+        """
+        if self.probe_task is None or self.probe_task.done():
+            self._shutdown = False
+            self.probe_task = asyncio.create_task(self._probe_loop(probe, providers, interval, needs_probe))
+            logger.info("Started provider re-probing")
+
+    async def stop_probing(self):
+        self._shutdown = True
+        if self.probe_task and not self.probe_task.done():
+            self.probe_task.cancel()
+            try:
+                await self.probe_task
+            except asyncio.CancelledError:
+                pass
+
+    async def _probe_loop(self, probe: Callable[[str], Awaitable[bool]], providers: List[str],
+                          interval: float, needs_probe: Optional[Callable[[str], bool]]):
+        while not self._shutdown:
+            try:
+                await asyncio.sleep(interval)
+                for provider in providers:
+                    stats = self._stats(provider)
+                    due = stats.state == CircuitState.OPEN and time.monotonic() >= stats.open_until
+                    if not due and needs_probe is not None:
+                        due = needs_probe(provider)
+                    if not due:
+                        continue
+
+                    healthy = await probe(provider)
+                    if stats.state == CircuitState.CLOSED:
+                        continue
+                    if healthy:
+                        # Let the next real request through as the trial
+                        self._set_state(stats, CircuitState.HALF_OPEN)
+                    else:
+                        stats.last_error = "background probe failed"
+                        self._open(stats)
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in provider probe loop: {e}")
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: stats.to_dict() for name, stats in self.targets.items()}
@@ -0,0 +1,415 @@
+"""
+Response Cache for the Free AI Service
+
+Caches `/analyze` results keyed by a normalized hash of (analysis type, model,
+scope, prompt) so that the orchestrator, NLP service, Document AI and the prototype
+generators do not pay for the same LLM generation several times per submission.
+
+Tiers:
+1. In-memory LRU with TTL (always on)
+2. MinHash near-duplicate lookup over word shingles (optional, embedding-free);
+   only the prompt may differ, analysis type, model and scope must match exactly
+3. Persistent tier in Redis or on disk (optional)
+
+Concurrent identical requests are collapsed into a single in-flight call.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from prometheus_client import Counter, Gauge
+
+# Try to import Redis for the shared persistent tier
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Prometheus metrics
+CACHE_LOOKUPS = Counter('ai_response_cache_lookups_total', 'Response cache lookups', ['result'])
+CACHE_HIT_RATIO = Gauge('ai_response_cache_hit_ratio', 'Share of /analyze requests served without an LLM call')
+CACHE_SAVED_SECONDS = Counter('ai_response_cache_saved_llm_seconds_total', 'LLM seconds saved by the response cache')
+CACHE_ENTRIES = Gauge('ai_response_cache_entries', 'Entries held in the in-memory response cache')
+
+_WHITESPACE = re.compile(r"\s+")
+_MASK_SEED = 0x5EED
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercase and collapse whitespace so cosmetic differences share a key"""
+    return _WHITESPACE.sub(" ", text or "").strip().lower()
+
+
+class MinHashIndex:
+    """Near-duplicate lookup using MinHash signatures and LSH banding"""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 3,
+                 threshold: float = 0.9, min_shingles: int = 8):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.min_shingles = min_shingles
+
+        rng = random.Random(_MASK_SEED)
+        self._masks = [rng.getrandbits(64) for _ in range(num_perm)]
+        self._buckets: Dict[Tuple[str, int, Tuple[int, ...]], Set[str]] = {}
+        self._signatures: Dict[str, Tuple[str, Tuple[int, ...]]] = {}
+
+    def signature(self, normalized_text: str) -> Optional[Tuple[int, ...]]:
+        """MinHash signature of the word shingles, or None for very short texts"""
+        words = normalized_text.split(" ")
+        if len(words) < self.shingle_size + self.min_shingles - 1:
+            return None
+        hashes = {
+            int.from_bytes(
+                hashlib.blake2b(" ".join(words[i:i + self.shingle_size]).encode(), digest_size=8).digest(),
+                "big"
+            )
+            for i in range(len(words) - self.shingle_size + 1)
+        }
+        return tuple(min(h ^ mask for h in hashes) for mask in self._masks)
+
+    def _band_keys(self, namespace: str, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            start = band * self.rows
+            yield (namespace, band, signature[start:start + self.rows])
+
+    def add(self, key: str, namespace: str, signature: Tuple[int, ...]):
+        self._signatures[key] = (namespace, signature)
+        for band_key in self._band_keys(namespace, signature):
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def remove(self, key: str):
+        entry = self._signatures.pop(key, None)
+        if entry is None:
+            return
+        namespace, signature = entry
+        for band_key in self._band_keys(namespace, signature):
+            bucket = self._buckets.get(band_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band_key]
+
+    def query(self, namespace: str, signature: Tuple[int, ...]) -> Optional[Tuple[str, float]]:
+        """Return the most similar indexed key above the threshold, if any"""
+        candidates: Set[str] = set()
+        for band_key in self._band_keys(namespace, signature):
+            candidates.update(self._buckets.get(band_key, ()))
+
+        best_key, best_similarity = None, 0.0
+        for key in candidates:
+            _, other = self._signatures[key]
+            similarity = sum(1 for a, b in zip(signature, other) if a == b) / self.num_perm
+            if similarity > best_similarity:
+                best_key, best_similarity = key, similarity
+
+        if best_key is not None and best_similarity >= self.threshold:
+            return best_key, best_similarity
+        return None
+
+    def clear(self):
+        self._buckets.clear()
+        self._signatures.clear()
+
+
+class CacheEntry:
+    """A cached analysis result"""
+
+    __slots__ = ("value", "created_at", "expires_at", "llm_seconds")
+
+    def __init__(self, value: Dict[str, Any], created_at: float, expires_at: float, llm_seconds: float):
+        self.value = value
+        self.created_at = created_at
+        self.expires_at = expires_at
+        self.llm_seconds = llm_seconds
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "value": self.value,
+            "created_at": self.created_at,
+            "expires_at": self.expires_at,
+            "llm_seconds": self.llm_seconds
+        })
+
+    @classmethod
+    def from_json(cls, data: str) -> "CacheEntry":
+        payload = json.loads(data)
+        return cls(payload["value"], payload["created_at"], payload["expires_at"], payload["llm_seconds"])
+
+
+class ResponseCache:
+    """Size-bounded LRU response cache with TTL, near-duplicate lookup and request coalescing"""
+
+    def __init__(
+        self,
+        max_entries: int = 1000,
+        ttl_seconds: float = 3600,
+        near_duplicates: bool = False,
+        similarity_threshold: float = 0.9,
+        redis_url: Optional[str] = None,
+        cache_dir: Optional[str] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self.minhash = MinHashIndex(threshold=similarity_threshold) if near_duplicates else None
+        self.cache_dir = cache_dir
+        self.redis_client = None
+        self.key_prefix = "free_ai:response:"
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "near_hits": 0, "persistent_hits": 0, "coalesced": 0, "misses": 0, "saved_llm_seconds": 0.0}
+
+        if redis_url and REDIS_AVAILABLE:
+            try:
+                self.redis_client = redis.from_url(
+                    redis_url,
+                    decode_responses=True,
+                    socket_connect_timeout=2,
+                    socket_timeout=2
+                )
+                self.redis_client.ping()
+                logger.info("✅ Response cache connected to Redis")
+            except Exception as e:
+                logger.warning(f"⚠️ Response cache Redis tier disabled: {e}")
+                self.redis_client = None
+        elif redis_url:
+            logger.warning("⚠️ redis package not installed, response cache Redis tier disabled")
+
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @staticmethod
+    def namespace(analysis_type: str, model: Optional[str], scope: str = "") -> str:
+        """Key parts that must match exactly, also for near-duplicate hits"""
+        return f"{analysis_type}|{model or 'auto'}|{scope}"
+
+    @staticmethod
+    def make_key(analysis_type: str, model: Optional[str], scope: str, prompt: str) -> str:
+        """Normalized hash of (analysis_type, model, scope, prompt)"""
+        material = f"{ResponseCache.namespace(analysis_type, model, scope)}|{normalize_prompt(prompt)}"
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    async def get_or_compute(
+        self,
+        analysis_type: str,
+        model: Optional[str],
+        scope: str,
+        prompt: str,
+        compute: Callable[[], Awaitable[Dict[str, Any]]],
+        cacheable: Callable[[Dict[str, Any]], bool] = lambda value: True,
+    ) -> Tuple[Dict[str, Any], str]:
+        """Return (analysis, cache_status) where cache_status is hit, near_hit, coalesced or miss"""
+        key = self.make_key(analysis_type, model, scope, prompt)
+        namespace = self.namespace(analysis_type, model, scope)
+
+        entry, result, signature = self._lookup_memory(key, namespace, prompt)
+        if entry is not None:
+            return self._served(entry, result)
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            try:
+                value = await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The leading request was cancelled; compute on our own
+                return await self.get_or_compute(analysis_type, model, scope, prompt, compute, cacheable)
+            self._record("coalesced")
+            return copy.deepcopy(value), "coalesced"
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            entry = await self._get_persistent(key)
+            if entry is not None:
+                self._put_memory(key, namespace, signature, entry)
+                future.set_result(entry.value)
+                return self._served(entry, "hit", persistent=True)
+
+            start_time = time.time()
+            value = await compute()
+            llm_seconds = time.time() - start_time
+
+            if cacheable(value):
+                now = time.time()
+                entry = CacheEntry(copy.deepcopy(value), now, now + self.ttl_seconds, llm_seconds)
+                self._put_memory(key, namespace, signature, entry)
+                await self._put_persistent(key, entry)
+
+            future.set_result(value)
+            self._record("miss")
+            return value, "miss"
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved when nobody else was waiting
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    def lookup(self, analysis_type: str, model: Optional[str], scope: str,
+               prompt: str) -> Optional[Tuple[Dict[str, Any], str]]:
+        """Return (analysis, cache_status) from memory without computing anything"""
+        key = self.make_key(analysis_type, model, scope, prompt)
+        entry, result, _ = self._lookup_memory(key, self.namespace(analysis_type, model, scope), prompt)
+        if entry is None:
+            return None
+        return self._served(entry, result)
+
+    async def store(self, analysis_type: str, model: Optional[str], scope: str, prompt: str,
+                    value: Dict[str, Any], llm_seconds: float):
+        """Cache an analysis produced outside get_or_compute, e.g. by a stream"""
+        key = self.make_key(analysis_type, model, scope, prompt)
+        signature = self.minhash.signature(normalize_prompt(prompt)) if self.minhash is not None else None
+        now = time.time()
+        entry = CacheEntry(copy.deepcopy(value), now, now + self.ttl_seconds, llm_seconds)
+        self._put_memory(key, self.namespace(analysis_type, model, scope), signature, entry)
+        await self._put_persistent(key, entry)
+        self._record("miss")
+
+    def _lookup_memory(self, key: str, namespace: str, prompt: str):
+        """Exact lookup, then near-duplicate lookup; returns (entry, result, signature)"""
+        entry = self._get_memory(key)
+        if entry is not None:
+            return entry, "hit", None
+
+        signature = None
+        if self.minhash is not None:
+            signature = self.minhash.signature(normalize_prompt(prompt))
+            if signature is not None:
+                match = self.minhash.query(namespace, signature)
+                if match is not None:
+                    entry = self._get_memory(match[0])
+                    if entry is not None:
+                        return entry, "near_hit", signature
+        return None, "miss", signature
+
+    def _served(self, entry: CacheEntry, result: str, persistent: bool = False) -> Tuple[Dict[str, Any], str]:
+        self._record("persistent_hit" if persistent else result, saved=entry.llm_seconds)
+        return copy.deepcopy(entry.value), result
+
+    def _record(self, result: str, saved: float = 0.0):
+        CACHE_LOOKUPS.labels(result=result).inc()
+        self.stats[{"hit": "hits", "near_hit": "near_hits", "persistent_hit": "persistent_hits",
+                    "coalesced": "coalesced", "miss": "misses"}[result]] += 1
+        if saved:
+            self.stats["saved_llm_seconds"] += saved
+            CACHE_SAVED_SECONDS.inc(saved)
+        CACHE_HIT_RATIO.set(self.hit_ratio())
+
+    def hit_ratio(self) -> float:
+        served = self.stats["hits"] + self.stats["near_hits"] + self.stats["persistent_hits"] + self.stats["coalesced"]
+        total = served + self.stats["misses"]
+        return served / total if total else 0.0
+
+    def _get_memory(self, key: str) -> Optional[CacheEntry]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._evict(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def _put_memory(self, key: str, namespace: str, signature: Optional[Tuple[int, ...]], entry: CacheEntry):
+        if key in self.entries:
+            self._evict(key)
+        self.entries[key] = entry
+        if self.minhash is not None and signature is not None:
+            self.minhash.add(key, namespace, signature)
+        while len(self.entries) > self.max_entries:
+            self._evict(next(iter(self.entries)))
+        CACHE_ENTRIES.set(len(self.entries))
+
+    def _evict(self, key: str):
+        self.entries.pop(key, None)
+        if self.minhash is not None:
+            self.minhash.remove(key)
+        CACHE_ENTRIES.set(len(self.entries))
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f"{key}.json")
+
+    async def _get_persistent(self, key: str) -> Optional[CacheEntry]:
+        if not self.redis_client and not self.cache_dir:
+            return None
+        loop = asyncio.get_running_loop()
+        try:
+            data = await loop.run_in_executor(None, self._read_persistent, key)
+        except Exception as e:
+            logger.warning(f"Response cache persistent read failed: {e}")
+            return None
+        if data is None:
+            return None
+        entry = CacheEntry.from_json(data)
+        return entry if entry.expires_at > time.time() else None
+
+    def _read_persistent(self, key: str) -> Optional[str]:
+        if self.redis_client:
+            return self.redis_client.get(f"{self.key_prefix}{key}")
+        path = self._disk_path(key)
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    async def _put_persistent(self, key: str, entry: CacheEntry):
+        if not self.redis_client and not self.cache_dir:
+            return
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._write_persistent, key, entry.to_json())
+        except Exception as e:
+            logger.warning(f"Response cache persistent write failed: {e}")
+
+    def _write_persistent(self, key: str, data: str):
+        if self.redis_client:
+            self.redis_client.setex(f"{self.key_prefix}{key}", int(self.ttl_seconds), data)
+            return
+        path = self._disk_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def clear(self):
+        """Drop all in-memory entries (the persistent tier expires on its own)"""
+        self.entries.clear()
+        if self.minhash is not None:
+            self.minhash.clear()
+        CACHE_ENTRIES.set(0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hit_ratio": self.hit_ratio(),
+            "in_flight": len(self._inflight),
+            "near_duplicates": self.minhash is not None,
+            "persistent_tier": "redis" if self.redis_client else ("disk" if self.cache_dir else None)
+        }
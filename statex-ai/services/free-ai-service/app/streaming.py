@@ -0,0 +1,103 @@
+"""
+Streaming helpers for the Free AI Service
+
+Incremental JSON parsing of LLM output and event encoding for the
+`/analyze/stream` endpoint (NDJSON or Server-Sent Events).
+"""
+
+import json
+from typing import Any, Dict, Optional
+
+
+class IncrementalJSONParser:
+    """Extracts completed top-level fields of a JSON object as text arrives.
+
+    Models usually wrap the JSON answer in prose, so everything before the first
+    `{` is ignored. Each character is scanned once; a top-level `"key": value`
+    pair is decoded as soon as the `,` or `}` that closes it is seen.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.object_start: Optional[int] = None
+        self.field_start: Optional[int] = None
+        self.finished = False
+        self.fields: Dict[str, Any] = {}
+        self.document: Optional[Dict[str, Any]] = None
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        """Add a chunk of model output and return the fields it completed"""
+        if self.finished or not chunk:
+            return {}
+
+        self.text += chunk
+        completed: Dict[str, Any] = {}
+        text = self.text
+
+        while self.pos < len(text):
+            char = text[self.pos]
+
+            if self.object_start is None:
+                if char == "{":
+                    self.object_start = self.pos
+                    self.field_start = self.pos + 1
+                    self.depth = 1
+                self.pos += 1
+                continue
+
+            if self.in_string:
+                if self.escape:
+                    self.escape = False
+                elif char == "\\":
+                    self.escape = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+            elif char in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    completed.update(self._decode_field(self.field_start, self.pos))
+                    self._finish(self.pos + 1)
+                    self.pos += 1
+                    break
+            elif char == "," and self.depth == 1:
+                completed.update(self._decode_field(self.field_start, self.pos))
+                self.field_start = self.pos + 1
+
+            self.pos += 1
+
+        self.fields.update(completed)
+        return completed
+
+    def _decode_field(self, start: int, end: int) -> Dict[str, Any]:
+        segment = self.text[start:end].strip()
+        if not segment:
+            return {}
+        try:
+            return json.loads("{" + segment + "}")
+        except ValueError:
+            return {}
+
+    def _finish(self, end: int):
+        self.finished = True
+        try:
+            document = json.loads(self.text[self.object_start:end])
+            if isinstance(document, dict):
+                self.document = document
+        except ValueError:
+            self.document = None
+
+
+def encode_event(event: Dict[str, Any], stream_format: str = "ndjson") -> str:
+    """Encode a stream event as an NDJSON line or an SSE message"""
+    data = json.dumps(event, default=str)
+    if stream_format == "sse":
+        return f"event: {event.get('event', 'message')}\ndata: {data}\n\n"
+    return data + "\n"
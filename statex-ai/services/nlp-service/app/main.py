@@ -10,6 +10,8 @@ from typing import Dict, Any, List, Optional
 import uvicorn
 import logging
 
+from .keyword_scanner import KeywordScanner
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -46,18 +48,58 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "service": "nlp-service"}
 
+# Keyword families, all matched in one pass over the request text
+sentiment_keywords = {
+    "positive": ["good", "great", "excellent", "amazing", "wonderful", "fantastic", "love", "like", "best"],
+    "negative": ["bad", "terrible", "awful", "hate", "worst", "problem", "issue", "difficult"]
+}
+
+topic_keywords = {
+    "business": ["business", "company", "enterprise", "organization"],
+    "technology": ["technology", "tech", "software", "digital", "ai", "automation"],
+    "website": ["website", "web", "site", "online", "internet"],
+    "ecommerce": ["ecommerce", "e-commerce", "shop", "store", "selling", "buy", "sell"],
+    "mobile": ["mobile", "app", "smartphone", "ios", "android"],
+    "data": ["data", "analytics", "database", "information"],
+    "marketing": ["marketing", "advertising", "promotion", "brand", "social media"]
+}
+
+industry_keywords = {
+    "automotive": ["car", "auto", "vehicle", "repair", "garage", "mechanic"],
+    "healthcare": ["health", "medical", "clinic", "doctor", "patient", "hospital"],
+    "retail": ["store", "shop", "retail", "ecommerce", "inventory", "sales"],
+    "education": ["school", "education", "learning", "course", "training", "student"],
+    "finance": ["bank", "finance", "money", "investment", "trading", "loan"],
+    "technology": ["tech", "software", "digital", "ai", "automation", "development"]
+}
+
+requirement_keywords = {
+    "website": ["website", "web", "site", "online"],
+    "mobile_app": ["mobile", "app", "smartphone"],
+    "ecommerce": ["ecommerce", "shop", "store", "selling"],
+    "database": ["database", "data", "storage"],
+    "api": ["api", "integration", "connect"],
+    "security": ["security", "secure", "protection"],
+    "scalability": ["scalable", "scale", "growth"],
+    "performance": ["fast", "speed", "performance", "optimization"]
+}
+
+keyword_scanner = KeywordScanner({
+    "sentiment": sentiment_keywords,
+    "topics": topic_keywords,
+    "industry": industry_keywords,
+    "requirements": requirement_keywords
+})
+
 @app.post("/api/analyze", response_model=AnalysisResponse)
 async def analyze_text(request: AnalysisRequest):
     """Analyze text content for business requirements"""
     try:
-        text = request.text.lower()
+        hits = keyword_scanner.scan(request.text)
         
         # Simple sentiment analysis
-        positive_words = ["good", "great", "excellent", "amazing", "wonderful", "fantastic", "love", "like", "best"]
-        negative_words = ["bad", "terrible", "awful", "hate", "worst", "problem", "issue", "difficult"]
-        
-        positive_count = sum(1 for word in positive_words if word in text)
-        negative_count = sum(1 for word in negative_words if word in text)
+        positive_count = sum(1 for word in sentiment_keywords["positive"] if hits.contains(word))
+        negative_count = sum(1 for word in sentiment_keywords["negative"] if hits.contains(word))
         
         if positive_count > negative_count:
             sentiment = "positive"
@@ -67,53 +109,13 @@ async def analyze_text(request: AnalysisRequest):
             sentiment = "neutral"
         
         # Extract topics
-        topics = []
-        topic_keywords = {
-            "business": ["business", "company", "enterprise", "organization"],
-            "technology": ["technology", "tech", "software", "digital", "ai", "automation"],
-            "website": ["website", "web", "site", "online", "internet"],
-            "ecommerce": ["ecommerce", "e-commerce", "shop", "store", "selling", "buy", "sell"],
-            "mobile": ["mobile", "app", "smartphone", "ios", "android"],
-            "data": ["data", "analytics", "database", "information"],
-            "marketing": ["marketing", "advertising", "promotion", "brand", "social media"]
-        }
-        
-        for topic, keywords in topic_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                topics.append(topic)
+        topics = hits.matched_groups("topics")
         
         # Detect industry
-        industry_keywords = {
-            "automotive": ["car", "auto", "vehicle", "repair", "garage", "mechanic"],
-            "healthcare": ["health", "medical", "clinic", "doctor", "patient", "hospital"],
-            "retail": ["store", "shop", "retail", "ecommerce", "inventory", "sales"],
-            "education": ["school", "education", "learning", "course", "training", "student"],
-            "finance": ["bank", "finance", "money", "investment", "trading", "loan"],
-            "technology": ["tech", "software", "digital", "ai", "automation", "development"]
-        }
-        
-        industry = "general"
-        for ind, keywords in industry_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                industry = ind
-                break
+        industry = hits.first_group("industry", "general")
         
         # Extract requirements
-        requirements = []
-        requirement_keywords = {
-            "website": ["website", "web", "site", "online"],
-            "mobile_app": ["mobile", "app", "smartphone"],
-            "ecommerce": ["ecommerce", "shop", "store", "selling"],
-            "database": ["database", "data", "storage"],
-            "api": ["api", "integration", "connect"],
-            "security": ["security", "secure", "protection"],
-            "scalability": ["scalable", "scale", "growth"],
-            "performance": ["fast", "speed", "performance", "optimization"]
-        }
-        
-        for req, keywords in requirement_keywords.items():
-            if any(keyword in text for keyword in keywords):
-                requirements.append(req)
+        requirements = hits.matched_groups("requirements")
         
         # Calculate confidence
         confidence = min(0.9, 0.5 + (len(topics) * 0.1) + (len(requirements) * 0.05))
@@ -3,6 +3,7 @@ Prototype management API endpoints.
 """
 
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 from pydantic import BaseModel
 import logging
@@ -14,13 +15,17 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from job_queue.queue_manager import QueueManager
+from storage.catalog import PrototypeCatalog
+from storage.file_manager import FileManager
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/prototype", tags=["prototype"])
 
-# Initialize queue manager
+# Initialize queue manager and prototype catalog
 queue_manager = QueueManager()
+catalog = PrototypeCatalog(queue_manager.redis_client)
+file_manager = FileManager(catalog=catalog)
 
 class PrototypeInfo(BaseModel):
     """Prototype information model."""
@@ -39,11 +44,27 @@ class PrototypeFile(BaseModel):
     type: str
     path: str
 
+def _prototype_info(entry: dict) -> PrototypeInfo:
+    """PrototypeInfo from a catalog entry."""
+    return PrototypeInfo(
+        project_id=entry["project_id"],
+        title=entry.get("title") or f"Prototype {entry['project_id']}",
+        description=entry.get("description", ""),
+        created_at=entry.get("created_at", ""),
+        expires_at=entry.get("expires_at", ""),
+        file_count=entry["file_count"],
+        total_size=entry["total_size"]
+    )
+
 @router.get("/{project_id}")
 async def get_prototype_info(project_id: str) -> PrototypeInfo:
     """Get prototype information by project ID."""
     try:
-        # Find job by project_id (assuming project_id is derived from submission_id)
+        entry = catalog.get(project_id)
+        if entry:
+            return _prototype_info(entry)
+        
+        # Not indexed: find job by project_id (assuming project_id is derived from submission_id)
         jobs = queue_manager.list_jobs()
         job = None
         
@@ -88,10 +109,37 @@ async def get_prototype_info(project_id: str) -> PrototypeInfo:
         logger.error(f"Error getting prototype info: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to get prototype info: {str(e)}")
 
+def _file_type(filename: str) -> str:
+    """File type reported by the files listing."""
+    if filename.endswith('.html'):
+        return "html"
+    elif filename.endswith('.css'):
+        return "css"
+    elif filename.endswith('.js'):
+        return "javascript"
+    elif filename.endswith('.json'):
+        return "json"
+    elif filename.endswith(('.png', '.jpg', '.jpeg', '.gif', '.svg')):
+        return "image"
+    return "unknown"
+
 @router.get("/{project_id}/files")
 async def list_prototype_files(project_id: str) -> List[PrototypeFile]:
-    """List prototype files by project ID."""
+    """List prototype files by project ID, from its bundle or its directory."""
     try:
+        bundle = file_manager.open_bundle(project_id)
+        if bundle:
+            # Names and sizes come from the bundle index; paths are entry names inside the bundle
+            return [
+                PrototypeFile(
+                    filename=os.path.basename(name),
+                    size=entry["size"],
+                    type=_file_type(name),
+                    path=name
+                )
+                for name, entry in bundle.entries.items()
+            ]
+        
         prototype_dir = f"/app/public/prototypes/{project_id}"
         
         if not os.path.exists(prototype_dir):
@@ -103,24 +151,10 @@ async def list_prototype_files(project_id: str) -> List[PrototypeFile]:
             for filename in filenames:
                 file_path = os.path.join(root, filename)
                 if os.path.exists(file_path):
-                    size = os.path.getsize(file_path)
-                    file_type = "unknown"
-                    
-                    if filename.endswith('.html'):
-                        file_type = "html"
-                    elif filename.endswith('.css'):
-                        file_type = "css"
-                    elif filename.endswith('.js'):
-                        file_type = "javascript"
-                    elif filename.endswith('.json'):
-                        file_type = "json"
-                    elif filename.endswith(('.png', '.jpg', '.jpeg', '.gif', '.svg')):
-                        file_type = "image"
-                    
                     files.append(PrototypeFile(
                         filename=filename,
-                        size=size,
-                        type=file_type,
+                        size=os.path.getsize(file_path),
+                        type=_file_type(filename),
                         path=file_path
                     ))
         
@@ -133,9 +167,18 @@ async def list_prototype_files(project_id: str) -> List[PrototypeFile]:
         raise HTTPException(status_code=500, detail=f"Failed to list prototype files: {str(e)}")
 
 @router.get("/{project_id}/download")
-async def download_prototype(project_id: str) -> dict:
-    """Get download information for prototype."""
+async def download_prototype(project_id: str):
+    """Download a bundled prototype as a zip archive, or get download information for a directory prototype."""
     try:
+        bundle = file_manager.open_bundle(project_id)
+        if bundle:
+            # Streamed straight from the memory-mapped bundle, no archive is built on disk
+            return StreamingResponse(
+                bundle.iter_zip(),
+                media_type="application/zip",
+                headers={"Content-Disposition": f'attachment; filename="{project_id}.zip"'}
+            )
+        
         prototype_dir = f"/app/public/prototypes/{project_id}"
         
         if not os.path.exists(prototype_dir):
@@ -166,6 +209,8 @@ async def delete_prototype(project_id: str) -> dict:
         
         if os.path.exists(prototype_dir):
             shutil.rmtree(prototype_dir)
+        file_manager.delete_prototype(project_id)
+        catalog.remove(project_id)
         
         # Also remove from queue if exists
         jobs = queue_manager.list_jobs()
@@ -188,44 +233,9 @@ async def list_prototypes(
     limit: int = Query(10, ge=1, le=100),
     offset: int = Query(0, ge=0)
 ) -> List[PrototypeInfo]:
-    """List all prototypes with pagination."""
+    """List all prototypes with pagination, newest first, from the catalog index."""
     try:
-        jobs = queue_manager.list_jobs()
-        prototypes = []
-        
-        for job in jobs:
-            if job.status == "completed":
-                project_id = job.submission_id
-                prototype_dir = f"/app/public/prototypes/{project_id}"
-                
-                if os.path.exists(prototype_dir):
-                    # Calculate file count and total size
-                    file_count = 0
-                    total_size = 0
-                    
-                    for root, dirs, files in os.walk(prototype_dir):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            if os.path.exists(file_path):
-                                file_count += 1
-                                total_size += os.path.getsize(file_path)
-                    
-                    prototypes.append(PrototypeInfo(
-                        project_id=project_id,
-                        title=f"Prototype {project_id}",
-                        description=job.requirements[:100] + "..." if len(job.requirements) > 100 else job.requirements,
-                        created_at=job.created_at.isoformat(),
-                        expires_at=job.expires_at.isoformat(),
-                        file_count=file_count,
-                        total_size=total_size
-                    ))
-        
-        # Apply pagination
-        start = offset
-        end = offset + limit
-        paginated_prototypes = prototypes[start:end]
-        
-        return paginated_prototypes
+        return [_prototype_info(entry) for entry in catalog.list(limit=limit, offset=offset)]
         
     except Exception as e:
         logger.error(f"Error listing prototypes: {e}")
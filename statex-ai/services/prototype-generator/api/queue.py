@@ -128,6 +128,7 @@ async def cancel_job(job_id: str) -> dict:
         
         # Remove from queue
         queue_manager.redis_client.lrem(queue_manager.queue_name, 0, job_id)
+        queue_manager.redis_client.zrem(queue_manager.retry_name, job_id)
         
         # Update status to cancelled
         queue_manager.update_job_status(job_id, "cancelled")
@@ -0,0 +1,91 @@
+"""
+Shared keyword checks
+
+Keyword families (e.g. complexity levels, technology patterns, risk patterns)
+are defined in one place, and the text of a submission is lowercased once.
+Every stage that looks at the same text then asks the same KeywordHits, which
+answers each keyword with a single C-level `in` or `str.count` and remembers
+the answer. Keywords that several stages check ("ai", "api", "mobile") are
+searched once, and group checks stop at the first keyword found, as the
+`any(keyword in text ...)` checks they replace did.
+
+tests/benchmark_keyword_scanning.py compares this with the per-stage checks.
+
+This module is copied into ai-orchestrator, nlp-service and prototype-generator.
+Edit the ai-orchestrator copy and run scripts/sync_shared_modules.py;
+tests/test_shared_modules.py fails while the copies differ.
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+
+class KeywordHits:
+    """Memoized keyword checks on one lowercased text"""
+
+    def __init__(self, scanner: "KeywordScanner", text: str):
+        self.scanner = scanner
+        self.text = text
+        self._found: Dict[str, bool] = {}
+        self._counts: Dict[str, int] = {}
+
+    def count(self, keyword: str) -> int:
+        """Non-overlapping occurrences, as str.count would report"""
+        keyword = keyword.lower()
+        count = self._counts.get(keyword)
+        if count is None:
+            count = self._counts[keyword] = self.text.count(keyword)
+            self._found[keyword] = count > 0
+        return count
+
+    def contains(self, keyword: str) -> bool:
+        keyword = keyword.lower()
+        found = self._found.get(keyword)
+        if found is None:
+            found = self._found[keyword] = keyword in self.text
+        return found
+
+    def any(self, keywords: Iterable[str]) -> bool:
+        return any(self.contains(keyword) for keyword in keywords)
+
+    def group_counts(self, family: str) -> Dict[str, Dict[str, int]]:
+        """{group: {keyword: count}} for the keywords of a family that were found"""
+        groups: Dict[str, Dict[str, int]] = {}
+        for group, keywords in self.scanner.families[family].items():
+            found = {keyword: self.count(keyword) for keyword in keywords if self.contains(keyword)}
+            if found:
+                groups[group] = found
+        return groups
+
+    def matched_groups(self, family: str) -> List[str]:
+        """Groups of a family with at least one keyword found, in definition order"""
+        return [group for group in self.scanner.families[family] if self.has_group(family, group)]
+
+    def has_group(self, family: str, group: str) -> bool:
+        return self.any(self.scanner.families[family][group])
+
+    def first_group(self, family: str, default: Optional[str] = None) -> Optional[str]:
+        for group in self.scanner.families[family]:
+            if self.has_group(family, group):
+                return group
+        return default
+
+    def summary(self) -> Dict[str, List[str]]:
+        """Matched groups per family"""
+        return {family: self.matched_groups(family) for family in self.scanner.families}
+
+
+class KeywordScanner:
+    """Keyword families shared by the stages that analyse a text"""
+
+    def __init__(self, families: Dict[str, Dict[str, Iterable[str]]]):
+        self.families: Dict[str, Dict[str, List[str]]] = {
+            family: {group: [keyword.lower() for keyword in keywords] for group, keywords in groups.items()}
+            for family, groups in families.items()
+        }
+        self.keywords = {
+            keyword for groups in self.families.values() for keywords in groups.values() for keyword in keywords
+        }
+
+    def scan(self, text: str) -> KeywordHits:
+        """Hits for a text; keywords are looked up on first use"""
+        return KeywordHits(self, (text or "").lower())
@@ -15,7 +15,7 @@ import time
 import logging
 import asyncio
 import json
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # Import our modules
 import sys
@@ -28,14 +28,28 @@ from generators.html_generator import HTMLGenerator
 from generators.css_generator import CSSGenerator
 from generators.js_generator import JSGenerator
 from generators.content_generator import ContentGenerator
+from generators.pipeline import GenerationPipeline
 from storage.file_manager import FileManager
+from storage.catalog import PrototypeCatalog
 from api.queue import router as queue_router
 from api.prototype import router as prototype_router
+from app.keyword_scanner import KeywordHits, KeywordScanner
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Configuration
+GENERATION_CACHE_SIZE = int(os.getenv("GENERATION_CACHE_SIZE", "256"))
+GENERATION_CACHE_TTL = float(os.getenv("GENERATION_CACHE_TTL", "3600"))
+GENERATION_MAX_CONNECTIONS = int(os.getenv("GENERATION_MAX_CONNECTIONS", "20"))
+PROTOTYPE_STORAGE_FORMAT = os.getenv("PROTOTYPE_STORAGE_FORMAT", "bundle")  # bundle, directory
+QUEUE_WORKER_MODE = os.getenv("QUEUE_WORKER_MODE", "inprocess")  # inprocess, external (python -m job_queue.worker)
+QUEUE_WORKER_CONCURRENCY = int(os.getenv("QUEUE_WORKER_CONCURRENCY", "4"))
+QUEUE_MAX_RETRIES = int(os.getenv("QUEUE_MAX_RETRIES", "3"))
+QUEUE_RETRY_DELAY = int(os.getenv("QUEUE_RETRY_DELAY", "60"))
+QUEUE_VISIBILITY_TIMEOUT = int(os.getenv("QUEUE_VISIBILITY_TIMEOUT", "300"))
+
 # Initialize FastAPI app
 app = FastAPI(
     title="StateX Prototype Generator Service",
@@ -47,14 +61,28 @@ app = FastAPI(
 
 # Initialize services
 queue_manager = QueueManager()
-file_manager = FileManager()
+file_manager = FileManager(
+    catalog=PrototypeCatalog(queue_manager.redis_client),
+    storage_format=PROTOTYPE_STORAGE_FORMAT
+)
 html_generator = HTMLGenerator()
 css_generator = CSSGenerator()
 js_generator = JSGenerator()
 content_generator = ContentGenerator()
+generation_pipeline = GenerationPipeline(
+    content_generator,
+    html_generator,
+    css_generator,
+    js_generator,
+    cache_size=GENERATION_CACHE_SIZE,
+    cache_ttl=GENERATION_CACHE_TTL,
+    max_connections=GENERATION_MAX_CONNECTIONS
+)
 
-# Global worker instance
+# Global worker instance and the task running its slots; the event loop only keeps
+# weak references to tasks, so the handle is held here until shutdown
 worker = None
+worker_task: Optional[asyncio.Task] = None
 
 # CORS middleware
 app.add_middleware(
@@ -72,11 +100,27 @@ app.include_router(prototype_router)
 @app.on_event("startup")
 async def startup_event():
     """Start the queue worker on startup."""
-    global worker
+    global worker, worker_task
+    generation_pipeline.start()
     try:
-        worker = QueueWorker(queue_manager)
-        asyncio.create_task(worker.start())
-        logger.info("Queue worker started")
+        if file_manager.catalog.count() == 0:
+            # One-time index of prototypes saved before the catalog existed
+            await asyncio.to_thread(file_manager.rebuild_catalog)
+    except Exception as e:
+        logger.error(f"Failed to build prototype catalog: {e}")
+    if QUEUE_WORKER_MODE != "inprocess":
+        logger.info(f"Queue worker mode '{QUEUE_WORKER_MODE}', jobs are processed by separate worker processes")
+        return
+    try:
+        worker = QueueWorker(
+            queue_manager,
+            max_retries=QUEUE_MAX_RETRIES,
+            retry_delay=QUEUE_RETRY_DELAY,
+            concurrency=QUEUE_WORKER_CONCURRENCY,
+            visibility_timeout=QUEUE_VISIBILITY_TIMEOUT
+        )
+        worker_task = asyncio.create_task(worker.start())
+        logger.info(f"Queue worker started with {QUEUE_WORKER_CONCURRENCY} slots")
     except Exception as e:
         logger.error(f"Failed to start queue worker: {e}")
         # Continue without worker for now
@@ -84,10 +128,23 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     """Stop the queue worker on shutdown."""
-    global worker
+    global worker, worker_task
     if worker:
-        worker.stop()
+        await worker.stop()
+    if worker_task:
+        # Slots may be blocked in BLMOVE; stop them before the Redis client is closed.
+        # A job cut short here is requeued when its lease expires.
+        worker_task.cancel()
+        try:
+            await worker_task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Queue worker failed: {e}")
+        worker_task = None
         logger.info("Queue worker stopped")
+    await generation_pipeline.close()
+    await queue_manager.close()
 
 class PrototypeRequest(BaseModel):
     requirements: str
@@ -116,13 +173,15 @@ async def health_check():
 async def metrics():
     """Metrics endpoint for monitoring"""
     try:
-        queue_stats = queue_manager.get_stats()
+        queue_stats = queue_manager.get_queue_stats()
         return {
             "service": "prototype-generator",
             "timestamp": datetime.now().isoformat(),
             "version": "1.0.0",
             "queue_stats": queue_stats,
-            "worker_running": worker is not None and worker.running if worker else False
+            "generation": generation_pipeline.get_stats(),
+            "worker_running": worker is not None and worker.running if worker else False,
+            "worker": worker.get_status() if worker else None
         }
     except Exception as e:
         logger.error(f"Metrics collection failed: {e}")
@@ -296,21 +355,13 @@ async def process_prototype_generation(
         # Update job status to processing
         queue_manager.update_job_status(job_id, "processing")
         
-        # Generate content using NLP service
-        logger.info(f"Generating content for job {job_id}")
-        content = await content_generator.generate_content(requirements, analysis, prototype_type)
-        
-        # Generate HTML structure
-        logger.info(f"Generating HTML for job {job_id}")
-        html_content = await html_generator.generate_html(requirements, analysis, prototype_type)
-        
-        # Generate CSS styles
-        logger.info(f"Generating CSS for job {job_id}")
-        css_content = await css_generator.generate_css(html_content, requirements, analysis)
-        
-        # Generate JavaScript functionality
-        logger.info(f"Generating JavaScript for job {job_id}")
-        js_content = await js_generator.generate_js(html_content, requirements, analysis)
+        # Content and HTML concurrently, then CSS and JavaScript in parallel from the HTML
+        logger.info(f"Generating content, HTML, CSS and JavaScript for job {job_id}")
+        outputs = await generation_pipeline.generate(requirements, analysis, prototype_type)
+        content = outputs["content"]
+        html_content = outputs["html"]
+        css_content = outputs["css"]
+        js_content = outputs["js"]
         
         # Create project ID
         project_id = f"project-{int(time.time())}"
@@ -326,7 +377,9 @@ async def process_prototype_generation(
                 "requirements": requirements,
                 "analysis": analysis,
                 "content": content,
+                "job_id": job_id,
                 "created_at": datetime.now().isoformat(),
+                "expires_at": (datetime.now() + timedelta(days=30)).isoformat(),
                 "ai_generated": True
             }, indent=2)
         }
@@ -412,15 +465,29 @@ async def create_prototype(
     
     return prototype
 
+# Keywords looked for in the requirements; each is checked once per request and shared by the extractors
+requirements_scanner = KeywordScanner({
+    "audience": {"business": ["business"], "ecommerce": ["ecommerce"]},
+    "features": {
+        "Contact Form": ["contact", "form"],
+        "E-commerce Functionality": ["ecommerce", "shop"],
+        "Blog System": ["blog"],
+        "User Authentication": ["user", "account"]
+    },
+    "design": {"modern": ["modern"], "blue": ["blue"], "clean": ["clean"]},
+    "complexity": {"high": ["complex", "advanced", "enterprise"], "low": ["simple", "basic", "landing"]}
+})
+
 async def analyze_prototype_requirements(requirements: str, analysis: Dict[str, Any], prototype_type: str) -> Dict[str, Any]:
     """Analyze requirements using AI to extract key information"""
     
     # Extract key information from requirements and analysis
+    hits = requirements_scanner.scan(requirements)
     project_name = extract_project_name(requirements)
     project_description = extract_project_description(requirements, analysis)
-    target_audience = extract_target_audience(requirements, analysis)
-    key_features = extract_key_features(requirements, analysis)
-    design_preferences = extract_design_preferences(requirements, analysis)
+    target_audience = extract_target_audience(requirements, analysis, hits)
+    key_features = extract_key_features(requirements, analysis, hits)
+    design_preferences = extract_design_preferences(requirements, analysis, hits)
     
     return {
         "project_name": project_name,
@@ -428,7 +495,7 @@ async def analyze_prototype_requirements(requirements: str, analysis: Dict[str,
         "target_audience": target_audience,
         "key_features": key_features,
         "design_preferences": design_preferences,
-        "complexity_level": determine_complexity(requirements, analysis),
+        "complexity_level": determine_complexity(requirements, analysis, hits),
         "confidence": 0.85,
         "ai_insights": generate_ai_insights(requirements, analysis)
     }
@@ -459,45 +526,38 @@ def extract_project_description(requirements: str, analysis: Dict[str, Any]) ->
         return analysis["nlp_analysis"]["results"]["text_summary"]
     return requirements[:200] + "..." if len(requirements) > 200 else requirements
 
-def extract_target_audience(requirements: str, analysis: Dict[str, Any]) -> str:
+def extract_target_audience(requirements: str, analysis: Dict[str, Any], hits: Optional[KeywordHits] = None) -> str:
     """Extract target audience from requirements"""
     # Simple extraction - in production, use NLP analysis
-    if "business" in requirements.lower():
+    hits = hits or requirements_scanner.scan(requirements)
+    if hits.has_group("audience", "business"):
         return "Business professionals and entrepreneurs"
-    elif "ecommerce" in requirements.lower():
+    elif hits.has_group("audience", "ecommerce"):
         return "Online shoppers and customers"
     return "General users"
 
-def extract_key_features(requirements: str, analysis: Dict[str, Any]) -> List[str]:
+def extract_key_features(requirements: str, analysis: Dict[str, Any], hits: Optional[KeywordHits] = None) -> List[str]:
     """Extract key features from requirements"""
-    features = []
-    req_lower = requirements.lower()
-    
-    if "contact" in req_lower or "form" in req_lower:
-        features.append("Contact Form")
-    if "ecommerce" in req_lower or "shop" in req_lower:
-        features.append("E-commerce Functionality")
-    if "blog" in req_lower:
-        features.append("Blog System")
-    if "user" in req_lower or "account" in req_lower:
-        features.append("User Authentication")
+    hits = hits or requirements_scanner.scan(requirements)
+    features = hits.matched_groups("features")
     
     return features if features else ["Responsive Design", "SEO Optimization"]
 
-def extract_design_preferences(requirements: str, analysis: Dict[str, Any]) -> Dict[str, str]:
+def extract_design_preferences(requirements: str, analysis: Dict[str, Any], hits: Optional[KeywordHits] = None) -> Dict[str, str]:
     """Extract design preferences from requirements"""
+    hits = hits or requirements_scanner.scan(requirements)
     return {
-        "style": "modern" if "modern" in requirements.lower() else "professional",
-        "color_scheme": "blue" if "blue" in requirements.lower() else "neutral",
-        "layout": "clean" if "clean" in requirements.lower() else "standard"
+        "style": "modern" if hits.has_group("design", "modern") else "professional",
+        "color_scheme": "blue" if hits.has_group("design", "blue") else "neutral",
+        "layout": "clean" if hits.has_group("design", "clean") else "standard"
     }
 
-def determine_complexity(requirements: str, analysis: Dict[str, Any]) -> str:
+def determine_complexity(requirements: str, analysis: Dict[str, Any], hits: Optional[KeywordHits] = None) -> str:
     """Determine project complexity level"""
-    req_lower = requirements.lower()
-    if any(word in req_lower for word in ["complex", "advanced", "enterprise"]):
+    hits = hits or requirements_scanner.scan(requirements)
+    if hits.has_group("complexity", "high"):
         return "high"
-    elif any(word in req_lower for word in ["simple", "basic", "landing"]):
+    elif hits.has_group("complexity", "low"):
         return "low"
     return "medium"
 
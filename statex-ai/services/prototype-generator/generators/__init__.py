@@ -6,5 +6,6 @@ from .html_generator import HTMLGenerator
 from .css_generator import CSSGenerator
 from .js_generator import JSGenerator
 from .content_generator import ContentGenerator
+from .pipeline import GenerationPipeline
 
-__all__ = ["HTMLGenerator", "CSSGenerator", "JSGenerator", "ContentGenerator"]
+__all__ = ["HTMLGenerator", "CSSGenerator", "JSGenerator", "ContentGenerator", "GenerationPipeline"]
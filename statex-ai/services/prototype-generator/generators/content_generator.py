@@ -4,17 +4,21 @@ Content generation using NLP service.
 
 import httpx
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import json
 
+from .shared_client import client_session, note_fallback
+
 logger = logging.getLogger(__name__)
 
 class ContentGenerator:
     """Generates content using NLP service."""
     
-    def __init__(self, free_ai_service_url: str = "http://localhost:8016"):
+    def __init__(self, free_ai_service_url: str = "http://localhost:8016",
+                 client: Optional[httpx.AsyncClient] = None):
         """Initialize content generator."""
         self.free_ai_service_url = free_ai_service_url
+        self.client = client  # Shared pooled client; None opens a client per call
         
     async def generate_content(self, requirements: str, analysis: Dict[str, Any], prototype_type: str) -> Dict[str, Any]:
         """Generate content based on requirements and analysis."""
@@ -25,12 +29,13 @@ class ContentGenerator:
             logger.info("🚀 Calling Free AI Service for content generation")
             
             # Call Free AI Service using the correct /analyze endpoint
-            async with httpx.AsyncClient() as client:
+            async with client_session(self.client) as client:
                 response = await client.post(
                     f"{self.free_ai_service_url}/analyze",
                     json={
                         "text_content": prompt,
                         "analysis_type": "content_generation",
+                        "priority": "background",  # Queue behind interactive analyses
                         "provider": "mock"  # Use mock for now since Ollama/HuggingFace are unavailable
                     },
                     timeout=30.0
@@ -139,6 +144,7 @@ Return the content as a JSON object with the following structure:
     def _generate_fallback_content(self, requirements: str, prototype_type: str) -> Dict[str, Any]:
         """Generate fallback content when NLP service fails."""
         
+        note_fallback("content")
         if prototype_type == "ecommerce":
             return self._get_ecommerce_content(requirements)
         elif prototype_type == "website":
@@ -263,7 +269,7 @@ Return the content as a JSON object with the following structure:
     async def generate_blog_content(self, topic: str, word_count: int = 500) -> str:
         """Generate blog content for a specific topic."""
         try:
-            async with httpx.AsyncClient() as client:
+            async with client_session(self.client) as client:
                 response = await client.post(
                     f"{self.nlp_service_url}/api/generate-blog",
                     json={
@@ -311,7 +317,7 @@ For more information about {topic}, feel free to contact us or explore our other
     async def generate_seo_meta(self, content: Dict[str, Any], prototype_type: str) -> Dict[str, str]:
         """Generate SEO meta tags for the prototype."""
         try:
-            async with httpx.AsyncClient() as client:
+            async with client_session(self.client) as client:
                 response = await client.post(
                     f"{self.nlp_service_url}/api/generate-seo",
                     json={
@@ -4,17 +4,21 @@ CSS styling generator using AI models.
 
 import httpx
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import json
 
+from .shared_client import client_session, note_fallback
+
 logger = logging.getLogger(__name__)
 
 class CSSGenerator:
     """Generates CSS styles using AI models."""
     
-    def __init__(self, free_ai_service_url: str = "http://localhost:8016"):
+    def __init__(self, free_ai_service_url: str = "http://localhost:8016",
+                 client: Optional[httpx.AsyncClient] = None):
         """Initialize CSS generator."""
         self.free_ai_service_url = free_ai_service_url
+        self.client = client  # Shared pooled client; None opens a client per call
         
     async def generate_css(self, html_content: str, requirements: str, analysis: Dict[str, Any]) -> str:
         """Generate CSS styles based on HTML content and requirements."""
@@ -25,12 +29,13 @@ class CSSGenerator:
             logger.info("🚀 Calling Free AI Service for CSS generation")
             
             # Call Free AI Service using the correct /analyze endpoint
-            async with httpx.AsyncClient() as client:
+            async with client_session(self.client) as client:
                 response = await client.post(
                     f"{self.free_ai_service_url}/analyze",
                     json={
                         "text_content": prompt,
                         "analysis_type": "content_generation",
+                        "priority": "background",  # Queue behind interactive analyses
                         "provider": "mock"  # Use mock for now since Ollama/HuggingFace are unavailable
                     },
                     timeout=30.0
@@ -153,6 +158,7 @@ body {
     def _generate_fallback_css(self, html_content: str, requirements: str) -> str:
         """Generate fallback CSS when AI service fails."""
         
+        note_fallback("css")
         return """/* Modern CSS Framework */
 :root {
     --primary-color: #3b82f6;
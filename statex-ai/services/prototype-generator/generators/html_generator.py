@@ -4,17 +4,24 @@ HTML structure generator using AI models.
 
 import httpx
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import json
 
+from .shared_client import client_session, note_fallback
+
 logger = logging.getLogger(__name__)
 
 class HTMLGenerator:
     """Generates HTML structure using AI models."""
     
-    def __init__(self, free_ai_service_url: str = "http://localhost:8016"):
+    # Analysis fields the HTML is built from; the stream is abandoned once both arrive
+    REQUIRED_ANALYSIS_FIELDS = ("key_insights", "recommendations")
+    
+    def __init__(self, free_ai_service_url: str = "http://localhost:8016",
+                 client: Optional[httpx.AsyncClient] = None):
         """Initialize HTML generator."""
         self.free_ai_service_url = free_ai_service_url
+        self.client = client  # Shared pooled client; None opens a client per call
         
     async def generate_html(self, requirements: str, analysis: Dict[str, Any], prototype_type: str) -> str:
         """Generate HTML structure based on requirements."""
@@ -24,21 +31,26 @@ class HTMLGenerator:
             
             logger.info(f"🚀 Calling Free AI Service for HTML generation: {prototype_type}")
             
-            # Call Free AI Service using the correct /analyze endpoint
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    f"{self.free_ai_service_url}/analyze",
-                    json={
-                        "text_content": prompt,
-                        "analysis_type": "content_generation",
-                        "provider": "mock"  # Use mock for now since Ollama/HuggingFace are unavailable
-                    },
-                    timeout=30.0
-                )
+            # Call Free AI Service, streaming so HTML generation can start on partial output
+            async with client_session(self.client) as client:
+                payload = {
+                    "text_content": prompt,
+                    "analysis_type": "content_generation",
+                    "priority": "background",  # Queue behind interactive analyses
+                    "provider": "mock"  # Use mock for now since Ollama/HuggingFace are unavailable
+                }
+                result = await self._stream_analysis(client, payload)
+                response = None
+                if result is None:
+                    response = await client.post(
+                        f"{self.free_ai_service_url}/analyze",
+                        json=payload,
+                        timeout=30.0
+                    )
+                    if response.status_code == 200:
+                        result = response.json()
                 
-                if response.status_code == 200:
-                    result = response.json()
-                    
+                if result is not None:
                     if result.get("success", False):
                         # Extract HTML from the analysis response
                         analysis_data = result.get("analysis", {})
@@ -77,6 +89,40 @@ class HTMLGenerator:
             logger.error(f"❌ Error generating HTML: {e}", exc_info=True)
             return self._generate_fallback_html(prototype_type, requirements)
     
+    async def _stream_analysis(self, client: httpx.AsyncClient, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Read /analyze/stream until the required fields or the final result arrive.
+        
+        Returns a result shaped like the /analyze response, or None when the
+        stream endpoint is unavailable so the caller can fall back to /analyze.
+        """
+        partial: Dict[str, Any] = {}
+        try:
+            async with client.stream(
+                "POST",
+                f"{self.free_ai_service_url}/analyze/stream",
+                json=payload,
+                timeout=30.0
+            ) as response:
+                if response.status_code != 200:
+                    return None
+                
+                async for line in response.aiter_lines():
+                    if not line:
+                        continue
+                    event = json.loads(line)
+                    if event.get("event") == "field":
+                        partial[event["field"]] = event["value"]
+                        if all(field in partial for field in self.REQUIRED_ANALYSIS_FIELDS):
+                            logger.info("⚡ Required analysis fields streamed, starting HTML generation early")
+                            return {"success": True, "analysis": partial, "provider_used": "Ollama (streamed)"}
+                    elif event.get("event") == "done":
+                        return event
+        except httpx.TimeoutException:
+            raise
+        except Exception as e:
+            logger.warning(f"⚠️ Streaming analysis unavailable, using /analyze: {e}")
+        return None
+    
     def _create_html_prompt(self, requirements: str, analysis: Dict[str, Any], prototype_type: str) -> str:
         """Create prompt for HTML generation."""
         
@@ -495,6 +541,7 @@ Include these specific sections:
     def _generate_fallback_html(self, prototype_type: str, requirements: str) -> str:
         """Generate fallback HTML when AI service fails."""
         
+        note_fallback("html")
         if prototype_type == "ecommerce":
             return self._get_ecommerce_template(requirements)
         elif prototype_type == "website":
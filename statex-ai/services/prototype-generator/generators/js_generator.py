@@ -4,17 +4,21 @@ JavaScript functionality generator using AI models.
 
 import httpx
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import json
 
+from .shared_client import client_session, note_fallback
+
 logger = logging.getLogger(__name__)
 
 class JSGenerator:
     """Generates JavaScript functionality using AI models."""
     
-    def __init__(self, free_ai_service_url: str = "http://localhost:8016"):
+    def __init__(self, free_ai_service_url: str = "http://localhost:8016",
+                 client: Optional[httpx.AsyncClient] = None):
         """Initialize JS generator."""
         self.free_ai_service_url = free_ai_service_url
+        self.client = client  # Shared pooled client; None opens a client per call
         
     async def generate_js(self, html_content: str, requirements: str, analysis: Dict[str, Any]) -> str:
         """Generate JavaScript functionality based on HTML content and requirements."""
@@ -25,12 +29,13 @@ class JSGenerator:
             logger.info("🚀 Calling Free AI Service for JavaScript generation")
             
             # Call Free AI Service using the correct /analyze endpoint
-            async with httpx.AsyncClient() as client:
+            async with client_session(self.client) as client:
                 response = await client.post(
                     f"{self.free_ai_service_url}/analyze",
                     json={
                         "text_content": prompt,
                         "analysis_type": "content_generation",
+                        "priority": "background",  # Queue behind interactive analyses
                         "provider": "mock"  # Use mock for now since Ollama/HuggingFace are unavailable
                     },
                     timeout=30.0
@@ -120,6 +125,7 @@ Return ONLY the JavaScript code, no explanations or markdown formatting.
     def _generate_fallback_js(self, html_content: str, requirements: str) -> str:
         """Generate fallback JavaScript when AI service fails."""
         
+        note_fallback("js")
         return """// Modern JavaScript for Prototype
 document.addEventListener('DOMContentLoaded', function() {
     // Initialize all functionality
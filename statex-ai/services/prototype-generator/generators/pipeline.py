@@ -0,0 +1,168 @@
+"""
+Generation pipeline for prototype files.
+
+Content and HTML are generated concurrently; CSS and JavaScript only depend
+on the HTML, so they run in parallel as soon as it is ready. All generators
+share one pooled HTTP client to the Free AI Service instead of opening a
+client per call. Outputs are cached by prototype type and a hash of the
+normalized requirements and analysis, so regenerating an unchanged prototype
+skips the AI calls entirely; concurrent requests for the same key share one
+generation. Outputs where a generator fell back to its template (AI service
+down or unusable response) are not cached, so the next request retries.
+"""
+
+import asyncio
+import copy
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from .content_generator import ContentGenerator
+from .css_generator import CSSGenerator
+from .html_generator import HTMLGenerator
+from .js_generator import JSGenerator
+from .shared_client import track_fallbacks
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_requirements(requirements: str) -> str:
+    """Requirements with whitespace collapsed, so reformatting does not miss the cache."""
+    return " ".join((requirements or "").split())
+
+
+class GenerationPipeline:
+    """Runs the generators as a dependency graph with a shared client and an output cache."""
+    
+    def __init__(self, content_generator: ContentGenerator, html_generator: HTMLGenerator,
+                 css_generator: CSSGenerator, js_generator: JSGenerator,
+                 cache_size: int = 256, cache_ttl: float = 3600.0, max_connections: int = 20):
+        """Initialize generation pipeline."""
+        self.content_generator = content_generator
+        self.html_generator = html_generator
+        self.css_generator = css_generator
+        self.js_generator = js_generator
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self.max_connections = max_connections
+        self.client: Optional[httpx.AsyncClient] = None
+        self.cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.in_flight: Dict[str, asyncio.Future] = {}
+        self.stats = {"generated": 0, "cache_hits": 0, "coalesced": 0, "fallbacks": 0}
+    
+    @property
+    def generators(self):
+        return (self.content_generator, self.html_generator, self.css_generator, self.js_generator)
+    
+    def start(self):
+        """Create the pooled client and hand it to every generator."""
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_connections)
+            )
+            for generator in self.generators:
+                generator.client = self.client
+    
+    async def close(self):
+        if self.client is not None:
+            for generator in self.generators:
+                generator.client = None
+            await self.client.aclose()
+            self.client = None
+    
+    @staticmethod
+    def cache_key(prototype_type: str, requirements: str, analysis: Dict[str, Any]) -> str:
+        # The analysis feeds every prompt, so it is part of the key alongside the requirements
+        payload = json.dumps(
+            {"requirements": normalize_requirements(requirements), "analysis": analysis or {}},
+            sort_keys=True, default=str
+        )
+        return f"{prototype_type}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+    
+    def _cache_get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        stored_at, outputs = entry
+        if time.time() - stored_at > self.cache_ttl:
+            del self.cache[key]
+            return None
+        self.cache.move_to_end(key)
+        return outputs
+    
+    def _cache_put(self, key: str, outputs: Dict[str, Any]):
+        self.cache[key] = (time.time(), outputs)
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+    
+    async def _run_graph(self, requirements: str, analysis: Dict[str, Any], prototype_type: str) -> Dict[str, Any]:
+        async def html_branch():
+            html_content = await self.html_generator.generate_html(requirements, analysis, prototype_type)
+            css_content, js_content = await asyncio.gather(
+                self.css_generator.generate_css(html_content, requirements, analysis),
+                self.js_generator.generate_js(html_content, requirements, analysis)
+            )
+            return html_content, css_content, js_content
+        
+        content, (html_content, css_content, js_content) = await asyncio.gather(
+            self.content_generator.generate_content(requirements, analysis, prototype_type),
+            html_branch()
+        )
+        return {"content": content, "html": html_content, "css": css_content, "js": js_content}
+    
+    async def generate(self, requirements: str, analysis: Dict[str, Any], prototype_type: str) -> Dict[str, Any]:
+        """Content, HTML, CSS and JS for a prototype; "cached" tells whether the AI calls were skipped."""
+        key = self.cache_key(prototype_type, requirements, analysis)
+        outputs = self._cache_get(key)
+        if outputs is not None:
+            self.stats["cache_hits"] += 1
+            logger.info(f"⚡ Reusing cached generator outputs for {prototype_type} prototype")
+            return {**copy.deepcopy(outputs), "cached": True}
+        
+        pending = self.in_flight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            outputs = await asyncio.shield(pending)
+            return {**copy.deepcopy(outputs), "cached": True}
+        
+        future = asyncio.get_running_loop().create_future()
+        self.in_flight[key] = future
+        try:
+            start_time = time.perf_counter()
+            with track_fallbacks() as fallbacks:
+                outputs = await self._run_graph(requirements, analysis, prototype_type)
+            self.stats["generated"] += 1
+            logger.info(f"✅ Generated {prototype_type} prototype files in {time.perf_counter() - start_time:.2f}s")
+            if fallbacks:
+                self.stats["fallbacks"] += 1
+                logger.warning(f"⚠️ Not caching {prototype_type} outputs, fallback templates used for: {', '.join(sorted(fallbacks))}")
+            else:
+                self._cache_put(key, outputs)
+            future.set_result(outputs)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; retrieve it here so an unawaited future does not log a warning
+            future.exception()
+            raise
+        finally:
+            del self.in_flight[key]
+        return {**copy.deepcopy(outputs), "cached": False}
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cached_prototypes": len(self.cache),
+            "in_flight": len(self.in_flight),
+            "shared_client": self.client is not None,
+            **self.stats
+        }
@@ -0,0 +1,36 @@
+"""
+HTTP client handling and fallback tracking shared by the generators.
+"""
+
+import contextlib
+from contextvars import ContextVar
+from typing import Iterator, Optional, Set
+
+import httpx
+
+_fallbacks: ContextVar[Optional[Set[str]]] = ContextVar("generator_fallbacks", default=None)
+
+
+def client_session(client: Optional[httpx.AsyncClient]):
+    """Borrow the shared pooled client, or open a one-off client when none was provided."""
+    if client is not None:
+        return contextlib.nullcontext(client)
+    return httpx.AsyncClient()
+
+
+@contextlib.contextmanager
+def track_fallbacks() -> Iterator[Set[str]]:
+    """Collect the generators that fell back to a template inside the block, including in tasks it starts."""
+    fallbacks: Set[str] = set()
+    token = _fallbacks.set(fallbacks)
+    try:
+        yield fallbacks
+    finally:
+        _fallbacks.reset(token)
+
+
+def note_fallback(generator: str):
+    """Record that a generator returned its template instead of AI output."""
+    fallbacks = _fallbacks.get()
+    if fallbacks is not None:
+        fallbacks.add(generator)
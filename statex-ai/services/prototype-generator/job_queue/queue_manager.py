@@ -1,12 +1,21 @@
 """
 Redis-based queue manager for prototype generation jobs.
+
+Workers claim jobs with reliable-queue semantics: BLMOVE moves a job id from
+the queue into a processing list and records a lease deadline, so a job whose
+worker dies is returned to the queue once its visibility timeout expires
+instead of being lost. Failed jobs wait in a scheduled retry set until they
+are due. Worker-side operations use the asyncio Redis client so they never
+block the event loop.
 """
 
 import json
+import time
 import uuid
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any
 import redis
+import redis.asyncio as aioredis
 import logging
 from pydantic import BaseModel
 
@@ -24,6 +33,7 @@ class PrototypeJob(BaseModel):
     updated_at: datetime
     expires_at: datetime
     error_message: Optional[str] = None
+    retry_count: int = 0
 
 class QueueManager:
     """Manages prototype generation job queue using Redis."""
@@ -33,10 +43,27 @@ class QueueManager:
         if redis_url is None:
             import os
             redis_url = os.getenv('REDIS_URL', 'redis://localhost:6379/1')
+        self.redis_url = redis_url
         self.redis_client = redis.from_url(redis_url, decode_responses=False)
+        self._async_client: Optional[aioredis.Redis] = None
         self.queue_name = "prototype_generation"
+        self.processing_name = f"{self.queue_name}:processing"
+        self.leases_name = f"{self.queue_name}:leases"
+        self.retry_name = f"{self.queue_name}:retry"
         self.job_prefix = "prototype_job:"
         self.expiry_days = 30
+    
+    @property
+    def async_client(self) -> aioredis.Redis:
+        """asyncio Redis client for the workers, created on first use."""
+        if self._async_client is None:
+            self._async_client = aioredis.from_url(self.redis_url, decode_responses=False)
+        return self._async_client
+    
+    async def close(self):
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
         
     def enqueue_job(self, user_id: str, submission_id: str, requirements: str) -> str:
         """Enqueue a new prototype generation job."""
@@ -82,8 +109,10 @@ class QueueManager:
     def get_job(self, job_id: str) -> Optional[PrototypeJob]:
         """Get job by ID."""
         job_key = f"{self.job_prefix}{job_id}"
-        job_data = self.redis_client.hgetall(job_key)
-        
+        return self._parse_job(job_id, self.redis_client.hgetall(job_key))
+    
+    def _parse_job(self, job_id: str, job_data: Dict[bytes, bytes]) -> Optional[PrototypeJob]:
+        """Build a job from its raw Redis hash."""
         if not job_data:
             return None
             
@@ -112,6 +141,25 @@ class QueueManager:
         if not self.redis_client.exists(job_key):
             return False
             
+        self.redis_client.hset(job_key, mapping=self._status_updates(status, error_message, generated_files))
+        
+        logger.info(f"Updated job {job_id} status to {status}")
+        return True
+    
+    async def update_job_status_async(self, job_id: str, status: str, error_message: str = None,
+                                      generated_files: Dict = None) -> bool:
+        """update_job_status on the asyncio client."""
+        job_key = f"{self.job_prefix}{job_id}"
+        
+        if not await self.async_client.exists(job_key):
+            return False
+        
+        await self.async_client.hset(job_key, mapping=self._status_updates(status, error_message, generated_files))
+        
+        logger.info(f"Updated job {job_id} status to {status}")
+        return True
+    
+    def _status_updates(self, status: str, error_message: str = None, generated_files: Dict = None) -> Dict[str, str]:
         updates = {
             "status": status,
             "updated_at": datetime.now().isoformat()
@@ -123,10 +171,7 @@ class QueueManager:
         if generated_files:
             updates["generated_files"] = json.dumps(generated_files)
             
-        self.redis_client.hset(job_key, mapping=updates)
-        
-        logger.info(f"Updated job {job_id} status to {status}")
-        return True
+        return updates
     
     def get_next_job(self) -> Optional[PrototypeJob]:
         """Get next job from queue (blocking)."""
@@ -139,6 +184,68 @@ class QueueManager:
         job_id = result[1]
         return self.get_job(job_id)
     
+    async def claim_next_job(self, timeout: float, visibility_timeout: float) -> Optional[PrototypeJob]:
+        """Move the next job into the processing list and lease it for visibility_timeout seconds.
+        
+        Waits up to timeout seconds for a job without blocking the event loop.
+        """
+        job_id = await self.async_client.blmove(self.queue_name, self.processing_name, timeout, "RIGHT", "LEFT")
+        if not job_id:
+            return None
+        job_id = job_id.decode('utf-8')
+        await self.async_client.zadd(self.leases_name, {job_id: time.time() + visibility_timeout})
+        
+        job = self._parse_job(job_id, await self.async_client.hgetall(f"{self.job_prefix}{job_id}"))
+        if job is None:
+            # Job data expired or was deleted; drop the orphaned id
+            await self.ack_job(job_id)
+        return job
+    
+    async def extend_lease(self, job_id: str, visibility_timeout: float) -> bool:
+        """Push a running job's lease deadline out; False if the lease was already reclaimed."""
+        return bool(await self.async_client.zadd(
+            self.leases_name, {job_id: time.time() + visibility_timeout}, xx=True, ch=True
+        ))
+    
+    async def ack_job(self, job_id: str):
+        """Remove a finished job from the processing list and drop its lease."""
+        async with self.async_client.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_name, 0, job_id)
+            pipe.zrem(self.leases_name, job_id)
+            await pipe.execute()
+    
+    async def schedule_retry(self, job_id: str, delay: float) -> int:
+        """Release a failed job and schedule it to re-enter the queue after delay seconds; returns its retry count."""
+        job_key = f"{self.job_prefix}{job_id}"
+        async with self.async_client.pipeline(transaction=True) as pipe:
+            pipe.hincrby(job_key, "retry_count", 1)
+            pipe.lrem(self.processing_name, 0, job_id)
+            pipe.zrem(self.leases_name, job_id)
+            pipe.zadd(self.retry_name, {job_id: time.time() + delay})
+            results = await pipe.execute()
+        return int(results[0])
+    
+    async def promote_due_retries(self, limit: int = 100) -> int:
+        """Move retries whose delay has passed back onto the queue."""
+        promoted = 0
+        for job_id in await self.async_client.zrangebyscore(self.retry_name, "-inf", time.time(), start=0, num=limit):
+            # ZREM succeeds for exactly one worker, so a job is never queued twice
+            if await self.async_client.zrem(self.retry_name, job_id):
+                await self.async_client.lpush(self.queue_name, job_id)
+                promoted += 1
+        return promoted
+    
+    async def requeue_expired_leases(self, limit: int = 100) -> int:
+        """Return jobs whose worker stopped renewing the lease (crashed or hung) to the front of the queue."""
+        requeued = 0
+        for job_id in await self.async_client.zrangebyscore(self.leases_name, "-inf", time.time(), start=0, num=limit):
+            # Whoever removes the id from the processing list owns it; a late ack finds nothing to remove
+            if await self.async_client.lrem(self.processing_name, 0, job_id):
+                await self.async_client.rpush(self.queue_name, job_id)
+                requeued += 1
+            await self.async_client.zrem(self.leases_name, job_id)
+        return requeued
+    
     def list_jobs(self, user_id: str = None, status: str = None) -> List[PrototypeJob]:
         """List jobs with optional filtering."""
         jobs = []
@@ -225,6 +332,8 @@ class QueueManager:
         
         return {
             "queue_length": queue_length,
+            "processing": self.redis_client.llen(self.processing_name),
+            "scheduled_retries": self.redis_client.zcard(self.retry_name),
             "total_jobs": total_jobs,
             "status_counts": status_counts
         }
@@ -1,11 +1,24 @@
 """
 Queue worker for processing prototype generation jobs.
+
+A QueueWorker runs a configurable number of async worker slots that claim
+jobs with a non-blocking BLMOVE into the processing list. A slot renews its
+job's lease while it works on it; jobs whose lease expires (a crashed or hung
+worker) are returned to the queue by whichever worker sees it first. Failed
+jobs are parked in the scheduled retry set instead of sleeping in the worker,
+so one bad job never holds up the rest of the queue.
+
+The worker runs inside the API process by default, or as its own process:
+
+    python -m job_queue.worker
 """
 
 import asyncio
 import logging
+import os
+import socket
 import time
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, Optional
 from datetime import datetime
 
 from .queue_manager import QueueManager, PrototypeJob
@@ -13,94 +26,133 @@ from .queue_manager import QueueManager, PrototypeJob
 logger = logging.getLogger(__name__)
 
 class QueueWorker:
-    """Worker that processes prototype generation jobs from the queue."""
+    """Worker pool that processes prototype generation jobs from the queue."""
     
-    def __init__(self, queue_manager: QueueManager, max_retries: int = 3, retry_delay: int = 60):
+    def __init__(self, queue_manager: QueueManager, max_retries: int = 3, retry_delay: int = 60,
+                 concurrency: int = 1, visibility_timeout: int = 300, poll_timeout: int = 5,
+                 handler: Optional[Callable[[PrototypeJob], Awaitable[None]]] = None,
+                 worker_id: Optional[str] = None):
         """Initialize queue worker."""
         self.queue_manager = queue_manager
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+        self.concurrency = max(1, concurrency)
+        self.visibility_timeout = visibility_timeout
+        self.poll_timeout = poll_timeout
+        self.handler = handler or self.simulate_prototype_generation
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
         self.running = False
-        self.current_job: Optional[PrototypeJob] = None
-        
+        self.current_jobs: Dict[int, Optional[str]] = {}
+        self.slot_stats: Dict[int, Dict[str, Any]] = {}
+    
+    @property
+    def current_job(self) -> Optional[str]:
+        """Id of a job in progress, if any (kept for single-worker callers)."""
+        return next((job_id for job_id in self.current_jobs.values() if job_id), None)
+    
     async def start(self):
-        """Start the worker."""
+        """Start the worker slots and the retry/lease maintenance loop."""
         self.running = True
-        logger.info("Queue worker started")
+        logger.info(f"Queue worker {self.worker_id} started with {self.concurrency} slots")
+        
+        await asyncio.gather(
+            *(self._run_slot(slot) for slot in range(self.concurrency)),
+            self._maintenance_loop()
+        )
+    
+    async def _run_slot(self, slot: int):
+        stats = self.slot_stats[slot] = {
+            "processed": 0, "failed": 0, "retried": 0, "busy_seconds": 0.0, "last_job_at": None
+        }
+        self.current_jobs[slot] = None
         
         while self.running:
             try:
-                # Get next job from queue
-                job = self.queue_manager.get_next_job()
-                
+                job = await self.queue_manager.claim_next_job(self.poll_timeout, self.visibility_timeout)
                 if not job:
-                    # No jobs available, wait a bit
-                    await asyncio.sleep(1)
                     continue
-                    
-                self.current_job = job
-                logger.info(f"Processing job {job.id} for user {job.user_id}")
                 
-                # Update job status to processing
-                self.queue_manager.update_job_status(job.id, "processing")
+                if job.status == "cancelled":
+                    await self.queue_manager.ack_job(job.id)
+                    continue
+                
+                self.current_jobs[slot] = job.id
+                logger.info(f"Worker {self.worker_id}/{slot} processing job {job.id} for user {job.user_id}")
+                await self.queue_manager.update_job_status_async(job.id, "processing")
                 
-                # Process the job
-                success = await self.process_job(job)
+                start_time = time.time()
+                success = await self._process_with_lease(job)
+                stats["busy_seconds"] += time.time() - start_time
+                stats["last_job_at"] = datetime.now().isoformat()
                 
                 if success:
-                    self.queue_manager.update_job_status(
-                        job.id, 
+                    await self.queue_manager.update_job_status_async(
+                        job.id,
                         "completed",
                         generated_files={"status": "generated"}
                     )
+                    await self.queue_manager.ack_job(job.id)
+                    stats["processed"] += 1
                     logger.info(f"Successfully completed job {job.id}")
+                elif job.retry_count < self.max_retries:
+                    # Park the job in the retry set; this slot moves straight on to the next job
+                    retry_count = await self.queue_manager.schedule_retry(job.id, self.retry_delay)
+                    await self.queue_manager.update_job_status_async(
+                        job.id,
+                        "pending",
+                        error_message=f"Retry {retry_count}/{self.max_retries}"
+                    )
+                    stats["retried"] += 1
+                    logger.warning(f"Job {job.id} failed, retrying in {self.retry_delay}s ({retry_count}/{self.max_retries})")
                 else:
-                    # Handle retry logic
-                    retry_count = getattr(job, 'retry_count', 0)
-                    
-                    if retry_count < self.max_retries:
-                        retry_count += 1
-                        logger.warning(f"Job {job.id} failed, retrying ({retry_count}/{self.max_retries})")
-                        
-                        # Update retry count and re-queue
-                        self.queue_manager.update_job_status(
-                            job.id, 
-                            "pending",
-                            error_message=f"Retry {retry_count}/{self.max_retries}"
-                        )
-                        
-                        # Re-queue the job
-                        self.queue_manager.redis_client.lpush(
-                            self.queue_manager.queue_name, 
-                            job.id
-                        )
-                        
-                        # Wait before retry
-                        await asyncio.sleep(self.retry_delay)
-                    else:
-                        # Max retries exceeded, mark as failed
-                        self.queue_manager.update_job_status(
-                            job.id, 
-                            "failed",
-                            error_message="Max retries exceeded"
-                        )
-                        logger.error(f"Job {job.id} failed after {self.max_retries} retries")
-                
-                self.current_job = None
-                
-            except Exception as e:
-                logger.error(f"Error in worker loop: {e}")
-                if self.current_job:
-                    self.queue_manager.update_job_status(
-                        self.current_job.id, 
+                    # Max retries exceeded, mark as failed
+                    await self.queue_manager.update_job_status_async(
+                        job.id,
                         "failed",
-                        error_message=str(e)
+                        error_message="Max retries exceeded"
                     )
-                    self.current_job = None
+                    await self.queue_manager.ack_job(job.id)
+                    stats["failed"] += 1
+                    logger.error(f"Job {job.id} failed after {self.max_retries} retries")
+            
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # The job stays leased and is requeued when the lease expires
+                logger.error(f"Error in worker slot {slot}: {e}")
                 await asyncio.sleep(5)  # Wait before continuing
+            finally:
+                self.current_jobs[slot] = None
+    
+    async def _process_with_lease(self, job: PrototypeJob) -> bool:
+        """Run the job while renewing its lease, so long jobs are not handed to another worker."""
+        async def renew_lease():
+            while True:
+                await asyncio.sleep(self.visibility_timeout / 3)
+                if not await self.queue_manager.extend_lease(job.id, self.visibility_timeout):
+                    logger.warning(f"Lease on job {job.id} was reclaimed while it was running")
+                    return
+        
+        renewer = asyncio.create_task(renew_lease())
+        try:
+            return await self.process_job(job)
+        finally:
+            renewer.cancel()
+    
+    async def _maintenance_loop(self):
+        """Promote due retries and reclaim jobs from workers whose lease expired."""
+        while self.running:
+            try:
+                promoted = await self.queue_manager.promote_due_retries()
+                requeued = await self.queue_manager.requeue_expired_leases()
+                if promoted or requeued:
+                    logger.info(f"Queue maintenance: {promoted} retries due, {requeued} expired leases requeued")
+            except Exception as e:
+                logger.error(f"Error in queue maintenance: {e}")
+            await asyncio.sleep(1)
     
     async def stop(self):
-        """Stop the worker."""
+        """Stop the worker; slots finish their current job, unfinished jobs are requeued on lease expiry."""
         self.running = False
         logger.info("Queue worker stopped")
     
@@ -109,15 +161,13 @@ class QueueWorker:
         try:
             start_time = time.time()
             
-            # TODO: Implement actual prototype generation
-            # This is a placeholder that simulates the generation process
-            await self.simulate_prototype_generation(job)
+            await self.handler(job)
             
             generation_time = time.time() - start_time
             logger.info(f"Job {job.id} processed in {generation_time:.2f} seconds")
             
             return True
-            
+        
         except Exception as e:
             logger.error(f"Error processing job {job.id}: {e}")
             return False
@@ -147,7 +197,33 @@ class QueueWorker:
     def get_status(self) -> dict:
         """Get worker status."""
         return {
+            "worker_id": self.worker_id,
             "running": self.running,
-            "current_job": self.current_job.id if self.current_job else None,
-            "queue_stats": self.queue_manager.get_queue_stats()
+            "concurrency": self.concurrency,
+            "current_jobs": [job_id for job_id in self.current_jobs.values() if job_id],
+            "slots": {
+                slot: {**stats, "current_job": self.current_jobs.get(slot)}
+                for slot, stats in self.slot_stats.items()
+            }
         }
+
+
+async def run_worker_process():
+    """Run a standalone worker process configured from the environment."""
+    logging.basicConfig(level=logging.INFO)
+    queue_manager = QueueManager()
+    worker = QueueWorker(
+        queue_manager,
+        max_retries=int(os.getenv("QUEUE_MAX_RETRIES", "3")),
+        retry_delay=int(os.getenv("QUEUE_RETRY_DELAY", "60")),
+        concurrency=int(os.getenv("QUEUE_WORKER_CONCURRENCY", "4")),
+        visibility_timeout=int(os.getenv("QUEUE_VISIBILITY_TIMEOUT", "300"))
+    )
+    try:
+        await worker.start()
+    finally:
+        await queue_manager.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(run_worker_process())
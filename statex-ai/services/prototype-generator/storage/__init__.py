@@ -5,5 +5,7 @@ File storage and management for prototype generation.
 from .file_manager import FileManager
 from .metadata import MetadataManager
 from .asset_manager import AssetManager
+from .catalog import PrototypeCatalog
+from .bundle import PrototypeBundle, write_bundle
 
-__all__ = ["FileManager", "MetadataManager", "AssetManager"]
+__all__ = ["FileManager", "MetadataManager", "AssetManager", "PrototypeCatalog", "PrototypeBundle", "write_bundle"]
@@ -0,0 +1,194 @@
+"""
+Packed single-file bundles for prototype storage.
+
+A bundle holds every file of a prototype in one file: a small header, a JSON
+index of entries (name, offset, stored length, size, codec, CRC-32) and the
+entry data. Entries are compressed one by one with zstd when the zstandard
+package is installed, otherwise with raw deflate, and stored as-is when that
+does not make them smaller. Bundles are written to a temporary file and
+renamed into place, so readers never see a partial bundle.
+
+Readers memory-map the bundle and slice entries out of the mapping. Because
+deflate entries are already in zip's format, a bundle streams as a zip
+archive without recompressing anything but zstd entries.
+"""
+
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+import zlib
+from typing import Dict, Any, Iterator, List, Optional, Union
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+BUNDLE_MAGIC = b"SXPB"
+BUNDLE_VERSION = 1
+BUNDLE_SUFFIX = ".bundle"
+_HEADER = struct.Struct("<4sBI")  # magic, version, index length
+
+_ZIP_CHUNK = 64 * 1024
+_ZIP_UTF8_FLAG = 0x0800
+_ZIP_STORED = 0
+_ZIP_DEFLATED = 8
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    if codec == "deflate":
+        compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+        return compressor.compress(data) + compressor.flush()
+    return data
+
+def _decompress(data: bytes, codec: str, size: int) -> bytes:
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=size)
+    if codec == "deflate":
+        return zlib.decompress(data, -15)
+    return data
+
+def write_bundle(path: Union[str, os.PathLike], files: Dict[str, Union[str, bytes]],
+                 codec: Optional[str] = None) -> Dict[str, int]:
+    """Atomically write files into a bundle at path; returns the uncompressed size of each entry."""
+    if codec is None:
+        codec = "zstd" if ZSTD_AVAILABLE else "deflate"
+    
+    entries = []
+    blobs = []
+    offset = 0
+    for name, content in files.items():
+        data = content.encode('utf-8') if isinstance(content, str) else bytes(content)
+        stored = _compress(data, codec)
+        entry_codec = codec
+        if len(stored) >= len(data):
+            stored, entry_codec = data, "raw"
+        entries.append({
+            "name": name,
+            "offset": offset,
+            "length": len(stored),
+            "size": len(data),
+            "codec": entry_codec,
+            "crc32": zlib.crc32(data)
+        })
+        blobs.append(stored)
+        offset += len(stored)
+    
+    index = json.dumps({"entries": entries}, separators=(",", ":")).encode('utf-8')
+    directory = os.path.dirname(os.fspath(path)) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".bundle-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(_HEADER.pack(BUNDLE_MAGIC, BUNDLE_VERSION, len(index)))
+            f.write(index)
+            for blob in blobs:
+                f.write(blob)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    
+    return {entry["name"]: entry["size"] for entry in entries}
+
+class PrototypeBundle:
+    """Read-only, memory-mapped view of a bundle."""
+    
+    def __init__(self, path: Union[str, os.PathLike]):
+        """Open and map a bundle."""
+        self.path = os.fspath(path)
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            self.mtime = stat.st_mtime
+            # A rewrite replaces the file, so inode and mtime identify this version of the bundle
+            self.version_key = (stat.st_ino, stat.st_mtime_ns)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        magic, version, index_length = _HEADER.unpack_from(self._map, 0)
+        if magic != BUNDLE_MAGIC or version != BUNDLE_VERSION:
+            self._map.close()
+            raise ValueError(f"Not a prototype bundle: {self.path}")
+        
+        index = json.loads(self._map[_HEADER.size:_HEADER.size + index_length])
+        self._data_start = _HEADER.size + index_length
+        self.entries: Dict[str, Dict[str, Any]] = {entry["name"]: entry for entry in index["entries"]}
+    
+    def close(self):
+        self._map.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def names(self) -> List[str]:
+        return list(self.entries)
+    
+    def total_size(self) -> int:
+        """Uncompressed size of all entries."""
+        return sum(entry["size"] for entry in self.entries.values())
+    
+    def _stored(self, entry: Dict[str, Any]) -> memoryview:
+        start = self._data_start + entry["offset"]
+        return memoryview(self._map)[start:start + entry["length"]]
+    
+    def read(self, name: str) -> Optional[bytes]:
+        entry = self.entries.get(name)
+        if entry is None:
+            return None
+        with self._stored(entry) as stored:
+            return _decompress(bytes(stored), entry["codec"], entry["size"])
+    
+    def read_text(self, name: str) -> Optional[str]:
+        data = self.read(name)
+        return data.decode('utf-8') if data is not None else None
+    
+    def read_all(self) -> Dict[str, bytes]:
+        return {name: self.read(name) for name in self.entries}
+    
+    def iter_zip(self) -> Iterator[bytes]:
+        """Stream the bundle as a zip archive; deflate and raw entries are copied straight from the mapping."""
+        if len(self.entries) >= 0xFFFF:
+            raise ValueError("Too many entries for a zip archive without zip64")
+        
+        local_time = time.localtime(self.mtime)
+        dos_time = (local_time.tm_hour << 11) | (local_time.tm_min << 5) | (local_time.tm_sec // 2)
+        dos_date = ((max(local_time.tm_year, 1980) - 1980) << 9) | (local_time.tm_mon << 5) | local_time.tm_mday
+        
+        central_directory = []
+        offset = 0
+        for entry in self.entries.values():
+            name = entry["name"].encode('utf-8')
+            if entry["codec"] == "deflate":
+                method, data = _ZIP_DEFLATED, self._stored(entry)
+            elif entry["codec"] == "raw":
+                method, data = _ZIP_STORED, self._stored(entry)
+            else:
+                method, data = _ZIP_STORED, memoryview(self.read(entry["name"]))
+            if len(data) >= 0xFFFFFFFF or entry["size"] >= 0xFFFFFFFF:
+                raise ValueError("Entry too large for a zip archive without zip64")
+            
+            fields = (20, _ZIP_UTF8_FLAG, method, dos_time, dos_date, entry["crc32"], len(data), entry["size"], len(name))
+            local_header = struct.pack("<IHHHHHIIIHH", 0x04034B50, *fields, 0) + name
+            central_directory.append(
+                struct.pack("<IH", 0x02014B50, 20) + struct.pack("<HHHHHIIIHH", *fields, 0)
+                + struct.pack("<HHHII", 0, 0, 0, 0, offset) + name
+            )
+            
+            yield local_header
+            for start in range(0, len(data), _ZIP_CHUNK):
+                yield bytes(data[start:start + _ZIP_CHUNK])
+            offset += len(local_header) + len(data)
+        
+        directory = b"".join(central_directory)
+        yield directory
+        yield struct.pack("<IHHHHIIH", 0x06054B50, 0, 0, len(central_directory), len(central_directory),
+                          len(directory), offset, 0)
@@ -0,0 +1,127 @@
+"""
+Prototype catalog index for prototype generation.
+
+Listing prototypes used to load every job from Redis and walk every
+prototype directory to count files and bytes. The catalog keeps that
+information up to date as files and metadata are saved: one Redis hash per
+prototype with its listing fields, a per-prototype hash of file sizes, and a
+sorted set ordered by creation time, so a page of prototypes is one range
+read plus one hash read per entry.
+"""
+
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+class PrototypeCatalog:
+    """Redis-backed index of saved prototypes, ordered by creation time."""
+    
+    def __init__(self, redis_client: redis.Redis, prefix: str = "prototype_catalog"):
+        """Initialize prototype catalog."""
+        self.redis_client = redis_client
+        self.index_name = prefix
+        self.entry_prefix = f"{prefix}:"
+    
+    def _entry_key(self, project_id: str) -> str:
+        return f"{self.entry_prefix}{project_id}"
+    
+    def _files_key(self, project_id: str) -> str:
+        return f"{self.entry_prefix}{project_id}:files"
+    
+    @staticmethod
+    def _timestamp(value: Any) -> float:
+        try:
+            return datetime.fromisoformat(str(value)).timestamp()
+        except (TypeError, ValueError):
+            return time.time()
+    
+    def record_files(self, project_id: str, file_sizes: Dict[str, int]):
+        """Record the sizes of files just written and refresh the prototype's totals."""
+        try:
+            files_key = self._files_key(project_id)
+            if file_sizes:
+                self.redis_client.hset(files_key, mapping=file_sizes)
+            sizes = [int(size) for size in self.redis_client.hvals(files_key)]
+            now = datetime.now().isoformat()
+            
+            with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.hsetnx(self._entry_key(project_id), "created_at", now)
+                pipe.hset(self._entry_key(project_id), mapping={
+                    "project_id": project_id,
+                    "file_count": len(sizes),
+                    "total_size": sum(sizes),
+                    "updated_at": now
+                })
+                # Only a first save sets the position; metadata may move it to the real creation time
+                pipe.zadd(self.index_name, {project_id: time.time()}, nx=True)
+                pipe.execute()
+        except Exception as e:
+            logger.error(f"Error updating catalog files for {project_id}: {e}")
+    
+    def record_metadata(self, project_id: str, metadata: Dict[str, Any]):
+        """Store the listing fields from a prototype's metadata."""
+        try:
+            requirements = metadata.get("requirements") or ""
+            fields = {
+                "project_id": project_id,
+                "title": metadata.get("title") or f"Prototype {project_id}",
+                "description": requirements[:100] + "..." if len(requirements) > 100 else requirements,
+                "prototype_type": metadata.get("prototype_type") or "",
+                "created_at": metadata.get("created_at") or datetime.now().isoformat(),
+                "expires_at": metadata.get("expires_at") or "",
+                "updated_at": metadata.get("updated_at") or datetime.now().isoformat()
+            }
+            if metadata.get("job_id"):
+                fields["job_id"] = metadata["job_id"]
+            
+            with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.hset(self._entry_key(project_id), mapping=fields)
+                pipe.zadd(self.index_name, {project_id: self._timestamp(fields["created_at"])})
+                pipe.execute()
+        except Exception as e:
+            logger.error(f"Error updating catalog metadata for {project_id}: {e}")
+    
+    def remove(self, project_id: str):
+        """Drop a prototype from the catalog."""
+        try:
+            with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.zrem(self.index_name, project_id)
+                pipe.delete(self._entry_key(project_id), self._files_key(project_id))
+                pipe.execute()
+        except Exception as e:
+            logger.error(f"Error removing {project_id} from catalog: {e}")
+    
+    def _decode(self, entry: Dict[bytes, bytes]) -> Dict[str, Any]:
+        entry = {
+            (k.decode('utf-8') if isinstance(k, bytes) else k): (v.decode('utf-8') if isinstance(v, bytes) else v)
+            for k, v in entry.items()
+        }
+        entry["file_count"] = int(entry.get("file_count", 0))
+        entry["total_size"] = int(entry.get("total_size", 0))
+        return entry
+    
+    def get(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Catalog entry for one prototype, or None if it is not indexed."""
+        entry = self.redis_client.hgetall(self._entry_key(project_id))
+        return self._decode(entry) if entry else None
+    
+    def list(self, limit: int = 10, offset: int = 0) -> List[Dict[str, Any]]:
+        """A page of prototypes, newest first."""
+        project_ids = self.redis_client.zrevrange(self.index_name, offset, offset + limit - 1)
+        if not project_ids:
+            return []
+        
+        with self.redis_client.pipeline(transaction=False) as pipe:
+            for project_id in project_ids:
+                pipe.hgetall(self._entry_key(project_id.decode('utf-8') if isinstance(project_id, bytes) else project_id))
+            entries = pipe.execute()
+        
+        return [self._decode(entry) for entry in entries if entry]
+    
+    def count(self) -> int:
+        return self.redis_client.zcard(self.index_name)
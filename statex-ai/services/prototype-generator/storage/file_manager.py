@@ -1,24 +1,87 @@
 """
 File management for prototype generation.
+
+Prototypes are stored as packed bundles (one file per prototype, see
+bundle.py) by default; the directory-per-prototype layout is still read for
+prototypes saved before bundles, and can be kept with storage_format="directory".
 """
 
 import os
 import shutil
 import json
 import logging
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 from pathlib import Path
 
+from .bundle import BUNDLE_SUFFIX, PrototypeBundle, write_bundle
+from .catalog import PrototypeCatalog
+
 logger = logging.getLogger(__name__)
 
 class FileManager:
     """Manages file storage for generated prototypes."""
     
-    def __init__(self, base_path: str = "./prototypes"):
+    def __init__(self, base_path: str = "./prototypes", catalog: Optional[PrototypeCatalog] = None,
+                 storage_format: str = "bundle", open_bundles: int = 64):
         """Initialize file manager."""
         self.base_path = Path(base_path)
         self.base_path.mkdir(parents=True, exist_ok=True)
+        self.catalog = catalog
+        self.storage_format = storage_format  # bundle, directory
+        self.open_bundles = open_bundles
+        self._bundles: "OrderedDict[str, PrototypeBundle]" = OrderedDict()
+    
+    def bundle_path(self, project_id: str) -> Path:
+        return self.base_path / f"{project_id}{BUNDLE_SUFFIX}"
+    
+    def open_bundle(self, project_id: str) -> Optional[PrototypeBundle]:
+        """Memory-mapped bundle for a prototype, reused until the bundle file is replaced."""
+        path = self.bundle_path(project_id)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            self._bundles.pop(project_id, None)
+            return None
+        
+        bundle = self._bundles.get(project_id)
+        if bundle is None or bundle.version_key != (stat.st_ino, stat.st_mtime_ns):
+            # Replaced bundles are not closed here: a download may still be streaming from the old mapping
+            bundle = PrototypeBundle(path)
+            self._bundles[project_id] = bundle
+            while len(self._bundles) > self.open_bundles:
+                self._bundles.popitem(last=False)
+        self._bundles.move_to_end(project_id)
+        return bundle
+    
+    def _project_ids(self) -> Iterator[str]:
+        """Every stored prototype, bundled or directory."""
+        seen = set()
+        for path in self.base_path.iterdir():
+            if path.is_dir():
+                project_id = path.name
+            elif path.is_file() and path.name.endswith(BUNDLE_SUFFIX):
+                project_id = path.name[:-len(BUNDLE_SUFFIX)]
+            else:
+                continue
+            if project_id not in seen:
+                seen.add(project_id)
+                yield project_id
+    
+    def _load_metadata(self, project_id: str) -> Optional[Dict[str, Any]]:
+        content = self.get_file_content(project_id, "metadata.json")
+        return json.loads(content) if content else None
+    
+    def _index_saved_files(self, project_id: str, file_sizes: Dict[str, int], files: Dict[str, str]):
+        if not self.catalog:
+            return
+        self.catalog.record_files(project_id, file_sizes)
+        if "metadata.json" in files:
+            try:
+                self.catalog.record_metadata(project_id, json.loads(files["metadata.json"]))
+            except ValueError as e:
+                logger.error(f"Error indexing metadata for {project_id}: {e}")
         
     def create_prototype_directory(self, project_id: str) -> Path:
         """Create directory for a new prototype."""
@@ -34,9 +97,13 @@ class FileManager:
         return prototype_dir
     
     def save_prototype_files(self, project_id: str, files: Dict[str, str]) -> Dict[str, str]:
-        """Save generated files to prototype directory."""
+        """Save generated files to the prototype's bundle (or directory)."""
+        if self.storage_format == "bundle":
+            return self._save_to_bundle(project_id, files)
+        
         prototype_dir = self.create_prototype_directory(project_id)
         saved_files = {}
+        file_sizes = {}
         
         for filename, content in files.items():
             file_path = prototype_dir / filename
@@ -50,16 +117,45 @@ class FileManager:
                     f.write(content)
                 
                 saved_files[filename] = str(file_path)
+                file_sizes[filename] = file_path.stat().st_size
                 logger.info(f"Saved file: {filename}")
                 
             except Exception as e:
                 logger.error(f"Error saving file {filename}: {e}")
                 continue
         
+        self._index_saved_files(project_id, file_sizes, {k: v for k, v in files.items() if k in saved_files})
+        
         return saved_files
     
+    def _save_to_bundle(self, project_id: str, files: Dict[str, str]) -> Dict[str, str]:
+        """Merge files into the prototype's bundle and replace it atomically."""
+        path = self.bundle_path(project_id)
+        try:
+            existing = self.open_bundle(project_id)
+            contents = existing.read_all() if existing else {}
+            contents.update(files)
+            file_sizes = write_bundle(path, contents)
+        except Exception as e:
+            logger.error(f"Error saving bundle for {project_id}: {e}")
+            return {}
+        
+        logger.info(f"Saved {len(files)} files to bundle {path}")
+        self._index_saved_files(project_id, {name: file_sizes[name] for name in files}, files)
+        return {filename: f"{path}#{filename}" for filename in files}
+    
     def get_prototype_files(self, project_id: str) -> Dict[str, str]:
         """Get all files for a prototype."""
+        bundle = self.open_bundle(project_id)
+        if bundle:
+            files = {}
+            for name in bundle.names():
+                try:
+                    files[name] = bundle.read_text(name)
+                except Exception as e:
+                    logger.error(f"Error reading {name} from bundle {project_id}: {e}")
+            return files
+        
         prototype_dir = self.base_path / project_id
         
         if not prototype_dir.exists():
@@ -81,6 +177,10 @@ class FileManager:
     
     def get_file_content(self, project_id: str, filename: str) -> Optional[str]:
         """Get content of a specific file."""
+        bundle = self.open_bundle(project_id)
+        if bundle:
+            return bundle.read_text(filename)
+        
         file_path = self.base_path / project_id / filename
         
         if not file_path.exists():
@@ -95,6 +195,9 @@ class FileManager:
     
     def update_file_content(self, project_id: str, filename: str, content: str) -> bool:
         """Update content of a specific file."""
+        if self.bundle_path(project_id).exists():
+            return bool(self._save_to_bundle(project_id, {filename: content}))
+        
         file_path = self.base_path / project_id / filename
         
         try:
@@ -104,6 +207,9 @@ class FileManager:
             with open(file_path, 'w', encoding='utf-8') as f:
                 f.write(content)
             
+            if self.catalog:
+                self.catalog.record_files(project_id, {filename: file_path.stat().st_size})
+            
             logger.info(f"Updated file: {filename}")
             return True
             
@@ -112,14 +218,21 @@ class FileManager:
             return False
     
     def delete_prototype(self, project_id: str) -> bool:
-        """Delete entire prototype directory."""
+        """Delete the prototype's bundle and directory."""
         prototype_dir = self.base_path / project_id
+        bundle_path = self.bundle_path(project_id)
         
-        if not prototype_dir.exists():
+        if not prototype_dir.exists() and not bundle_path.exists():
             return False
         
         try:
-            shutil.rmtree(prototype_dir)
+            self._bundles.pop(project_id, None)
+            if bundle_path.exists():
+                bundle_path.unlink()
+            if prototype_dir.exists():
+                shutil.rmtree(prototype_dir)
+            if self.catalog:
+                self.catalog.remove(project_id)
             logger.info(f"Deleted prototype: {project_id}")
             return True
             
@@ -131,28 +244,59 @@ class FileManager:
         """List all prototypes with metadata."""
         prototypes = []
         
-        for project_dir in self.base_path.iterdir():
-            if project_dir.is_dir():
-                metadata_file = project_dir / "metadata.json"
-                
-                if metadata_file.exists():
-                    try:
-                        with open(metadata_file, 'r') as f:
-                            metadata = json.load(f)
-                        prototypes.append({
-                            "project_id": project_dir.name,
-                            "metadata": metadata,
-                            "created_at": metadata.get("created_at"),
-                            "file_count": len(list(project_dir.rglob("*")))
-                        })
-                    except Exception as e:
-                        logger.error(f"Error reading metadata for {project_dir.name}: {e}")
-                        continue
+        for project_id in self._project_ids():
+            try:
+                metadata = self._load_metadata(project_id)
+                if metadata is None:
+                    continue
+                bundle = self.open_bundle(project_id)
+                prototypes.append({
+                    "project_id": project_id,
+                    "metadata": metadata,
+                    "created_at": metadata.get("created_at"),
+                    "file_count": len(bundle.entries) if bundle else len(list((self.base_path / project_id).rglob("*")))
+                })
+            except Exception as e:
+                logger.error(f"Error reading metadata for {project_id}: {e}")
+                continue
         
         return sorted(prototypes, key=lambda x: x.get("created_at", ""), reverse=True)
     
+    def rebuild_catalog(self) -> int:
+        """Index every prototype on disk; used once when the catalog is empty."""
+        if not self.catalog:
+            return 0
+        
+        indexed = 0
+        for project_id in self._project_ids():
+            bundle = self.open_bundle(project_id)
+            if bundle:
+                file_sizes = {name: entry["size"] for name, entry in bundle.entries.items()}
+            else:
+                project_dir = self.base_path / project_id
+                file_sizes = {
+                    str(file_path.relative_to(project_dir)): file_path.stat().st_size
+                    for file_path in project_dir.rglob("*") if file_path.is_file()
+                }
+            self.catalog.record_files(project_id, file_sizes)
+            
+            try:
+                metadata = self._load_metadata(project_id)
+                if metadata:
+                    self.catalog.record_metadata(project_id, metadata)
+            except Exception as e:
+                logger.error(f"Error indexing metadata for {project_id}: {e}")
+            indexed += 1
+        
+        logger.info(f"Indexed {indexed} prototypes into the catalog")
+        return indexed
+    
     def get_prototype_size(self, project_id: str) -> int:
         """Get total size of prototype files in bytes."""
+        bundle = self.open_bundle(project_id)
+        if bundle:
+            return bundle.total_size()
+        
         prototype_dir = self.base_path / project_id
         
         if not prototype_dir.exists():
@@ -171,32 +315,32 @@ class FileManager:
         cleaned_prototypes = []
         cutoff_date = datetime.now() - timedelta(days=expiry_days)
         
-        for project_dir in self.base_path.iterdir():
-            if not project_dir.is_dir():
+        for project_id in list(self._project_ids()):
+            try:
+                metadata = self._load_metadata(project_id)
+            except Exception as e:
+                logger.error(f"Error checking expiry for {project_id}: {e}")
                 continue
             
-            metadata_file = project_dir / "metadata.json"
-            
-            if metadata_file.exists():
+            if metadata:
                 try:
-                    with open(metadata_file, 'r') as f:
-                        metadata = json.load(f)
-                    
                     created_at = datetime.fromisoformat(metadata.get("created_at", ""))
                     
                     if created_at < cutoff_date:
-                        if self.delete_prototype(project_dir.name):
-                            cleaned_prototypes.append(project_dir.name)
+                        if self.delete_prototype(project_id):
+                            cleaned_prototypes.append(project_id)
                             
                 except Exception as e:
-                    logger.error(f"Error checking expiry for {project_dir.name}: {e}")
+                    logger.error(f"Error checking expiry for {project_id}: {e}")
                     continue
             else:
-                # If no metadata, check directory modification time
-                dir_mtime = datetime.fromtimestamp(project_dir.stat().st_mtime)
-                if dir_mtime < cutoff_date:
-                    if self.delete_prototype(project_dir.name):
-                        cleaned_prototypes.append(project_dir.name)
+                # If no metadata, check bundle or directory modification time
+                path = self.bundle_path(project_id)
+                if not path.exists():
+                    path = self.base_path / project_id
+                if datetime.fromtimestamp(path.stat().st_mtime) < cutoff_date:
+                    if self.delete_prototype(project_id):
+                        cleaned_prototypes.append(project_id)
         
         logger.info(f"Cleaned up {len(cleaned_prototypes)} expired prototypes")
         return cleaned_prototypes
@@ -206,12 +350,23 @@ class FileManager:
         import zipfile
         
         prototype_dir = self.base_path / project_id
+        zip_path = self.base_path / f"{project_id}.zip"
+        
+        bundle = self.open_bundle(project_id)
+        if bundle:
+            try:
+                with open(zip_path, 'wb') as f:
+                    for chunk in bundle.iter_zip():
+                        f.write(chunk)
+                logger.info(f"Created zip archive: {zip_path}")
+                return str(zip_path)
+            except Exception as e:
+                logger.error(f"Error creating zip archive for {project_id}: {e}")
+                return None
         
         if not prototype_dir.exists():
             return None
         
-        zip_path = self.base_path / f"{project_id}.zip"
-        
         try:
             with zipfile.ZipFile(zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
                 for file_path in prototype_dir.rglob("*"):
@@ -240,6 +395,12 @@ class FileManager:
                     if file_path.is_file():
                         total_files += 1
                         total_size += file_path.stat().st_size
+            elif project_dir.name.endswith(BUNDLE_SUFFIX):
+                bundle = self.open_bundle(project_dir.name[:-len(BUNDLE_SUFFIX)])
+                if bundle:
+                    total_prototypes += 1
+                    total_files += len(bundle.entries)
+                    total_size += project_dir.stat().st_size
         
         return {
             "total_prototypes": total_prototypes,
@@ -252,10 +413,14 @@ class FileManager:
     def validate_prototype_structure(self, project_id: str) -> Dict[str, Any]:
         """Validate prototype file structure."""
         prototype_dir = self.base_path / project_id
+        bundle = self.open_bundle(project_id)
         
-        if not prototype_dir.exists():
+        if not bundle and not prototype_dir.exists():
             return {"valid": False, "error": "Prototype directory not found"}
         
+        def has_file(filename: str) -> bool:
+            return filename in bundle.entries if bundle else (prototype_dir / filename).exists()
+        
         required_files = ["index.html"]
         optional_files = ["styles.css", "script.js", "metadata.json"]
         
@@ -268,8 +433,7 @@ class FileManager:
         
         # Check required files
         for filename in required_files:
-            file_path = prototype_dir / filename
-            if file_path.exists():
+            if has_file(filename):
                 validation_result["present_files"].append(filename)
             else:
                 validation_result["missing_files"].append(filename)
@@ -277,19 +441,16 @@ class FileManager:
         
         # Check optional files
         for filename in optional_files:
-            file_path = prototype_dir / filename
-            if file_path.exists():
+            if has_file(filename):
                 validation_result["present_files"].append(filename)
         
         # Check for index.html content
-        index_file = prototype_dir / "index.html"
-        if index_file.exists():
+        if has_file("index.html"):
             try:
-                with open(index_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                    if len(content.strip()) < 100:
-                        validation_result["errors"].append("index.html appears to be empty or too short")
-                        validation_result["valid"] = False
+                content = self.get_file_content(project_id, "index.html") or ""
+                if len(content.strip()) < 100:
+                    validation_result["errors"].append("index.html appears to be empty or too short")
+                    validation_result["valid"] = False
             except Exception as e:
                 validation_result["errors"].append(f"Error reading index.html: {e}")
                 validation_result["valid"] = False
@@ -8,14 +8,17 @@ from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List
 from pathlib import Path
 
+from .catalog import PrototypeCatalog
+
 logger = logging.getLogger(__name__)
 
 class MetadataManager:
     """Manages metadata for generated prototypes."""
     
-    def __init__(self, base_path: str = "./prototypes"):
+    def __init__(self, base_path: str = "./prototypes", catalog: Optional[PrototypeCatalog] = None):
         """Initialize metadata manager."""
         self.base_path = Path(base_path)
+        self.catalog = catalog
         
     def create_metadata(self, project_id: str, prototype_type: str, requirements: str, analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Create metadata for a new prototype."""
@@ -44,6 +47,9 @@ class MetadataManager:
             with open(metadata_file, 'w', encoding='utf-8') as f:
                 json.dump(metadata, f, indent=2, ensure_ascii=False)
             
+            if self.catalog:
+                self.catalog.record_metadata(project_id, metadata)
+            
             logger.info(f"Metadata saved for project {project_id}")
             return True
             
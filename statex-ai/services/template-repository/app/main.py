@@ -15,10 +15,20 @@ import time
 import logging
 from datetime import datetime
 
+from .template_catalog import load_templates
+from .template_index import TemplateIndex
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Configuration
+TEMPLATE_CATALOG_PATH = os.getenv("TEMPLATE_CATALOG_PATH", "")
+
+# Template catalog, loaded and indexed once
+template_index = TemplateIndex(load_templates(TEMPLATE_CATALOG_PATH))
+logger.info(f"✅ Indexed {len(template_index)} templates")
+
 # Initialize FastAPI app
 app = FastAPI(
     title="StateX Template Repository Service",
@@ -58,7 +68,8 @@ async def health_check():
         "status": "healthy",
         "service": "template-repository",
         "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0"
+        "version": "1.0.0",
+        "template_index": template_index.get_stats()
     }
 
 @app.post("/api/find-templates", response_model=TemplateMatchResponse)
@@ -101,152 +112,8 @@ async def find_matching_templates(
 ) -> List[Dict[str, Any]]:
     """Find templates that match the requirements"""
     
-    # Simulate template matching algorithm
-    templates = [
-        {
-            "template_id": "business-website-001",
-            "name": "Professional Business Website",
-            "type": "website",
-            "industry": "general",
-            "description": "Clean, professional website template for businesses",
-            "features": ["hero", "about", "services", "contact", "blog"],
-            "tech_stack": ["Next.js", "Tailwind CSS", "TypeScript"],
-            "match_score": 0.92,
-            "popularity": 0.85,
-            "last_updated": "2024-01-15",
-            "preview_url": "https://templates.statex.cz/business-website-001",
-            "repository_url": "https://github.com/statex/templates/business-website-001",
-            "customization_level": "medium",
-            "estimated_setup_time": "2-3 hours"
-        },
-        {
-            "template_id": "ecommerce-store-002",
-            "name": "Modern E-commerce Store",
-            "type": "ecommerce",
-            "industry": "retail",
-            "description": "Complete e-commerce solution with modern design",
-            "features": ["product_catalog", "shopping_cart", "checkout", "user_account", "admin_panel"],
-            "tech_stack": ["Next.js", "Stripe", "PostgreSQL", "Prisma"],
-            "match_score": 0.88,
-            "popularity": 0.78,
-            "last_updated": "2024-01-10",
-            "preview_url": "https://templates.statex.cz/ecommerce-store-002",
-            "repository_url": "https://github.com/statex/templates/ecommerce-store-002",
-            "customization_level": "advanced",
-            "estimated_setup_time": "4-6 hours"
-        },
-        {
-            "template_id": "saas-dashboard-003",
-            "name": "SaaS Application Dashboard",
-            "type": "app",
-            "industry": "technology",
-            "description": "Modern SaaS application with dashboard and user management",
-            "features": ["dashboard", "user_management", "billing", "api", "analytics"],
-            "tech_stack": ["Next.js", "Prisma", "PostgreSQL", "NextAuth.js"],
-            "match_score": 0.85,
-            "popularity": 0.82,
-            "last_updated": "2024-01-12",
-            "preview_url": "https://templates.statex.cz/saas-dashboard-003",
-            "repository_url": "https://github.com/statex/templates/saas-dashboard-003",
-            "customization_level": "advanced",
-            "estimated_setup_time": "6-8 hours"
-        },
-        {
-            "template_id": "landing-page-004",
-            "name": "High-Converting Landing Page",
-            "type": "landing_page",
-            "industry": "marketing",
-            "description": "Single page landing site optimized for conversions",
-            "features": ["hero", "features", "testimonials", "pricing", "contact"],
-            "tech_stack": ["Next.js", "Tailwind CSS", "Framer Motion"],
-            "match_score": 0.90,
-            "popularity": 0.88,
-            "last_updated": "2024-01-08",
-            "preview_url": "https://templates.statex.cz/landing-page-004",
-            "repository_url": "https://github.com/statex/templates/landing-page-004",
-            "customization_level": "basic",
-            "estimated_setup_time": "1-2 hours"
-        },
-        {
-            "template_id": "portfolio-site-005",
-            "name": "Creative Portfolio Website",
-            "type": "website",
-            "industry": "creative",
-            "description": "Portfolio website for creative professionals",
-            "features": ["portfolio", "about", "services", "contact", "blog"],
-            "tech_stack": ["Next.js", "Tailwind CSS", "MDX"],
-            "match_score": 0.75,
-            "popularity": 0.70,
-            "last_updated": "2024-01-05",
-            "preview_url": "https://templates.statex.cz/portfolio-site-005",
-            "repository_url": "https://github.com/statex/templates/portfolio-site-005",
-            "customization_level": "medium",
-            "estimated_setup_time": "2-3 hours"
-        }
-    ]
-    
-    # Filter templates based on criteria
-    filtered_templates = []
-    
-    for template in templates:
-        score = calculate_match_score(template, requirements, analysis, template_type, industry, features)
-        if score > 0.5:  # Only include templates with decent match
-            template["match_score"] = score
-            filtered_templates.append(template)
-    
-    # Sort by match score
-    filtered_templates.sort(key=lambda x: x["match_score"], reverse=True)
-    
-    return filtered_templates[:5]  # Return top 5 matches
-
-def calculate_match_score(
-    template: Dict[str, Any],
-    requirements: str,
-    analysis: Dict[str, Any],
-    template_type: Optional[str],
-    industry: Optional[str],
-    features: Optional[List[str]]
-) -> float:
-    """Calculate how well a template matches the requirements"""
-    
-    score = 0.0
-    
-    # Type matching
-    if template_type and template["type"] == template_type:
-        score += 0.3
-    elif not template_type:
-        score += 0.1  # Neutral score if no type specified
-    
-    # Industry matching
-    if industry and template["industry"] == industry:
-        score += 0.2
-    elif not industry:
-        score += 0.1  # Neutral score if no industry specified
-    
-    # Feature matching
-    if features:
-        template_features = template["features"]
-        matching_features = set(features) & set(template_features)
-        feature_score = len(matching_features) / len(features) if features else 0
-        score += feature_score * 0.3
-    
-    # Requirements keyword matching
-    requirements_lower = requirements.lower()
-    template_name_lower = template["name"].lower()
-    template_desc_lower = template["description"].lower()
-    
-    keyword_matches = 0
-    keywords = ["business", "website", "ecommerce", "app", "dashboard", "landing", "portfolio"]
-    
-    for keyword in keywords:
-        if keyword in requirements_lower and keyword in (template_name_lower + " " + template_desc_lower):
-            keyword_matches += 1
-    
-    if keywords:
-        keyword_score = keyword_matches / len(keywords)
-        score += keyword_score * 0.2
-    
-    return min(score, 1.0)  # Cap at 1.0
+    # Top 5 templates with a decent match, from the index built at startup
+    return template_index.search(requirements, template_type, industry, features, top_k=5, min_score=0.5)
 
 @app.get("/api/templates")
 async def get_all_templates():
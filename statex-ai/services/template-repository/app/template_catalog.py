@@ -0,0 +1,107 @@
+"""
+Template catalog for the template repository.
+
+The built-in templates are used unless TEMPLATE_CATALOG_PATH points to a JSON
+file with a list of templates in the same shape. The catalog is loaded once
+at startup and indexed by template_index.TemplateIndex.
+"""
+
+import json
+import logging
+from typing import Dict, Any, List
+
+logger = logging.getLogger(__name__)
+
+
+BUILTIN_TEMPLATES: List[Dict[str, Any]] = [
+    {
+        "template_id": "business-website-001",
+        "name": "Professional Business Website",
+        "type": "website",
+        "industry": "general",
+        "description": "Clean, professional website template for businesses",
+        "features": ["hero", "about", "services", "contact", "blog"],
+        "tech_stack": ["Next.js", "Tailwind CSS", "TypeScript"],
+        "match_score": 0.92,
+        "popularity": 0.85,
+        "last_updated": "2024-01-15",
+        "preview_url": "https://templates.statex.cz/business-website-001",
+        "repository_url": "https://github.com/statex/templates/business-website-001",
+        "customization_level": "medium",
+        "estimated_setup_time": "2-3 hours"
+    },
+    {
+        "template_id": "ecommerce-store-002",
+        "name": "Modern E-commerce Store",
+        "type": "ecommerce",
+        "industry": "retail",
+        "description": "Complete e-commerce solution with modern design",
+        "features": ["product_catalog", "shopping_cart", "checkout", "user_account", "admin_panel"],
+        "tech_stack": ["Next.js", "Stripe", "PostgreSQL", "Prisma"],
+        "match_score": 0.88,
+        "popularity": 0.78,
+        "last_updated": "2024-01-10",
+        "preview_url": "https://templates.statex.cz/ecommerce-store-002",
+        "repository_url": "https://github.com/statex/templates/ecommerce-store-002",
+        "customization_level": "advanced",
+        "estimated_setup_time": "4-6 hours"
+    },
+    {
+        "template_id": "saas-dashboard-003",
+        "name": "SaaS Application Dashboard",
+        "type": "app",
+        "industry": "technology",
+        "description": "Modern SaaS application with dashboard and user management",
+        "features": ["dashboard", "user_management", "billing", "api", "analytics"],
+        "tech_stack": ["Next.js", "Prisma", "PostgreSQL", "NextAuth.js"],
+        "match_score": 0.85,
+        "popularity": 0.82,
+        "last_updated": "2024-01-12",
+        "preview_url": "https://templates.statex.cz/saas-dashboard-003",
+        "repository_url": "https://github.com/statex/templates/saas-dashboard-003",
+        "customization_level": "advanced",
+        "estimated_setup_time": "6-8 hours"
+    },
+    {
+        "template_id": "landing-page-004",
+        "name": "High-Converting Landing Page",
+        "type": "landing_page",
+        "industry": "marketing",
+        "description": "Single page landing site optimized for conversions",
+        "features": ["hero", "features", "testimonials", "pricing", "contact"],
+        "tech_stack": ["Next.js", "Tailwind CSS", "Framer Motion"],
+        "match_score": 0.90,
+        "popularity": 0.88,
+        "last_updated": "2024-01-08",
+        "preview_url": "https://templates.statex.cz/landing-page-004",
+        "repository_url": "https://github.com/statex/templates/landing-page-004",
+        "customization_level": "basic",
+        "estimated_setup_time": "1-2 hours"
+    },
+    {
+        "template_id": "portfolio-site-005",
+        "name": "Creative Portfolio Website",
+        "type": "website",
+        "industry": "creative",
+        "description": "Portfolio website for creative professionals",
+        "features": ["portfolio", "about", "services", "contact", "blog"],
+        "tech_stack": ["Next.js", "Tailwind CSS", "MDX"],
+        "match_score": 0.75,
+        "popularity": 0.70,
+        "last_updated": "2024-01-05",
+        "preview_url": "https://templates.statex.cz/portfolio-site-005",
+        "repository_url": "https://github.com/statex/templates/portfolio-site-005",
+        "customization_level": "medium",
+        "estimated_setup_time": "2-3 hours"
+    }
+]
+
+
+def load_templates(path: str = "") -> List[Dict[str, Any]]:
+    """Templates from a JSON catalog file, or the built-in templates when no path is given"""
+    if not path:
+        return [dict(template) for template in BUILTIN_TEMPLATES]
+    with open(path, 'r', encoding='utf-8') as f:
+        templates = json.load(f)
+    logger.info(f"Loaded {len(templates)} templates from {path}")
+    return templates
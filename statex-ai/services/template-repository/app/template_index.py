@@ -0,0 +1,226 @@
+"""
+Inverted-index template matching
+
+The template catalog is indexed once: every template's name, description,
+type, industry, features and tech stack are tokenized into an inverted index
+with precomputed BM25 term weights, and its features get their own postings.
+Postings are split by (type, industry), which fixes part of the score, so a
+search visits the most promising partitions first, skips text postings that
+cannot change the top k (MaxScore) and keeps the best matches in a heap. Its
+cost depends on how many templates share the query's terms, not on the size
+of the catalog.
+
+Scores keep the weighting of the original matcher: type 0.3, industry 0.2,
+feature overlap 0.3 and requirements text 0.2, where the text part is the
+BM25 relevance squashed into [0, 1).
+"""
+
+import heapq
+import math
+import re
+from collections import Counter, defaultdict
+from itertools import chain
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_JOINED_HYPHEN = re.compile(r"(?<=[a-z])-(?=[a-z])")  # e-commerce -> ecommerce
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have i in is it its me my need of on or our that the this to "
+    "we with want would like should can will".split()
+)
+
+# BM25 parameters and the relevance at which the text part of the score reaches one half
+BM25_K1 = 1.2
+BM25_B = 0.75
+TEXT_SCORE_HALF = 2.0
+
+
+def _stem(token: str) -> str:
+    """Minimal plural folding so "services" matches "service" and "businesses" matches "business"."""
+    if len(token) <= 3:
+        return token
+    if token.endswith("ies"):
+        return token[:-3] + "y"
+    if token.endswith("es") and token[-3] in "sxz":
+        return token[:-2]
+    if token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    text = _JOINED_HYPHEN.sub("", (text or "").lower())
+    return [_stem(token) for token in _TOKEN.findall(text) if token not in _STOPWORDS]
+
+
+def _text_score(relevance: float) -> float:
+    """Squash BM25 relevance into the [0, 0.2) text part of a match score."""
+    return relevance / (relevance + TEXT_SCORE_HALF) * 0.2
+
+
+class _Partition:
+    """Templates sharing one (type, industry) pair, with postings local to them."""
+
+    __slots__ = ("type", "industry", "text_postings", "max_weights", "feature_postings")
+
+    def __init__(self, template_type: str, industry: str):
+        self.type = template_type
+        self.industry = industry
+        self.text_postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        self.max_weights: Dict[str, float] = defaultdict(float)
+        self.feature_postings: Dict[str, List[int]] = defaultdict(list)
+
+
+class TemplateIndex:
+    """BM25 inverted index over a template catalog with heap-based top-k retrieval."""
+
+    def __init__(self, templates: Iterable[Dict[str, Any]]):
+        self.templates: List[Dict[str, Any]] = list(templates)
+        self.doc_weights: List[Dict[str, float]] = []
+        self.idf: Dict[str, float] = {}
+        self.partitions: Dict[Tuple[str, str], _Partition] = {}
+        self._build()
+
+    @staticmethod
+    def _template_text(template: Dict[str, Any]) -> str:
+        parts = [template.get("name", ""), template.get("description", ""),
+                 template.get("type", "").replace("_", " "), template.get("industry", "")]
+        parts.extend(feature.replace("_", " ") for feature in template.get("features", []))
+        parts.extend(template.get("tech_stack", []))
+        return " ".join(parts)
+
+    def _build(self):
+        term_frequencies: List[Dict[str, int]] = []
+        document_frequencies: Dict[str, int] = defaultdict(int)
+        for template in self.templates:
+            frequencies: Dict[str, int] = defaultdict(int)
+            for token in tokenize(self._template_text(template)):
+                frequencies[token] += 1
+            for token in frequencies:
+                document_frequencies[token] += 1
+            term_frequencies.append(frequencies)
+
+        doc_count = len(self.templates)
+        lengths = [sum(frequencies.values()) for frequencies in term_frequencies]
+        average_length = (sum(lengths) / doc_count) if doc_count else 1.0
+        self.idf = {
+            token: math.log(1 + (doc_count - frequency + 0.5) / (frequency + 0.5))
+            for token, frequency in document_frequencies.items()
+        }
+
+        for doc_id, (template, frequencies) in enumerate(zip(self.templates, term_frequencies)):
+            # Length normalisation is folded into the stored weight, so a query only multiplies by idf
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[doc_id] / (average_length or 1.0))
+            weights = {token: tf * (BM25_K1 + 1) / (tf + norm) for token, tf in frequencies.items()}
+            self.doc_weights.append(weights)
+
+            key = (template.get("type", ""), template.get("industry", ""))
+            partition = self.partitions.get(key)
+            if partition is None:
+                partition = self.partitions[key] = _Partition(*key)
+            for token, weight in weights.items():
+                partition.text_postings[token].append((doc_id, weight))
+                if weight > partition.max_weights[token]:
+                    partition.max_weights[token] = weight
+            for feature in set(template.get("features", [])):
+                partition.feature_postings[feature].append(doc_id)
+
+    def __len__(self) -> int:
+        return len(self.templates)
+
+    def search(self, requirements: str, template_type: Optional[str] = None, industry: Optional[str] = None,
+               features: Optional[List[str]] = None, top_k: int = 5, min_score: float = 0.5) -> List[Dict[str, Any]]:
+        """Top k templates scoring above min_score, best first, as copies with match_score set."""
+        query_idf = {token: self.idf[token] for token in set(tokenize(requirements)) if token in self.idf}
+        requested_features = frozenset(features or [])
+        feature_max = 0.3 if requested_features else 0.0
+
+        # Type and industry give every template of a partition the same base score, so
+        # partitions are grouped by base and visited best first; the rest are skipped once even
+        # a perfect feature and text match could not beat min_score or the current k-th best
+        groups: Dict[float, List[_Partition]] = defaultdict(list)
+        for partition in self.partitions.values():
+            base = 0.1 if not template_type else (0.3 if partition.type == template_type else 0.0)
+            base += 0.1 if not industry else (0.2 if partition.industry == industry else 0.0)
+            groups[base].append(partition)
+
+        heap: List[Tuple[float, int]] = []
+        for base in sorted(groups, reverse=True):
+            partitions = groups[base]
+            threshold = max(min_score, heap[0][0]) if len(heap) >= top_k else min_score
+            if base + feature_max + 0.2 <= threshold:
+                break
+
+            feature_hits = Counter(chain.from_iterable(
+                partition.feature_postings.get(feature, ())
+                for partition in partitions for feature in requested_features
+            ))
+
+            # MaxScore over the text postings: with tokens ordered by upper bound, the weakest
+            # ones whose bounds together cannot lift a template without feature hits past the
+            # threshold are not walked; they are added back from the forward index for the
+            # templates that get scored
+            lists = []
+            for token, idf in query_idf.items():
+                postings = [partition.text_postings[token] for partition in partitions
+                            if token in partition.text_postings]
+                if postings:
+                    bound = idf * max(partition.max_weights.get(token, 0.0) for partition in partitions)
+                    lists.append((bound, token, postings))
+            lists.sort()
+            text_bound = _text_score(sum(bound for bound, _, _ in lists))
+            essential = len(lists)
+            prefix_bound = 0.0
+            for position, (bound, _, _) in enumerate(lists):
+                prefix_bound += bound
+                if base + _text_score(prefix_bound) >= threshold:
+                    essential = position
+                    break
+
+            relevance: Dict[int, float] = defaultdict(float)
+            for _, token, postings in lists[essential:]:
+                idf = query_idf[token]
+                for doc_id, weight in chain.from_iterable(postings):
+                    relevance[doc_id] += idf * weight
+            skipped_tokens = [(token, query_idf[token]) for _, token, _ in lists[:essential]]
+            skipped_bound = sum(bound for bound, _, _ in lists[:essential])
+
+            # Templates with the most matching features first, so the threshold rises early
+            # and the loop can stop at the first template that cannot make the cut
+            candidates = dict.fromkeys(relevance, 0)
+            candidates.update(feature_hits)
+            for doc_id, hits in sorted(candidates.items(), key=itemgetter(1), reverse=True):
+                score = base + (hits / len(requested_features) * 0.3 if requested_features else 0.0)
+                if score + text_bound < threshold:
+                    break
+                text_relevance = relevance.get(doc_id, 0.0)
+                if skipped_tokens:
+                    if score + _text_score(text_relevance + skipped_bound) < threshold:
+                        continue
+                    weights = self.doc_weights[doc_id]
+                    text_relevance += sum(idf * weights[token] for token, idf in skipped_tokens if token in weights)
+                score = min(score + _text_score(text_relevance), 1.0)
+                if score <= min_score:
+                    continue
+                entry = (score, -doc_id)
+                if len(heap) < top_k:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+                if len(heap) >= top_k:
+                    threshold = max(min_score, heap[0][0])
+
+        return [
+            {**self.templates[-negative_id], "match_score": score}
+            for score, negative_id in sorted(heap, reverse=True)
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "templates": len(self.templates),
+            "terms": len(self.idf),
+            "partitions": len(self.partitions),
+            "features": len({feature for partition in self.partitions.values()
+                             for feature in partition.feature_postings})
+        }
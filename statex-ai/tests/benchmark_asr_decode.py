@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the ASR decode-once audio pipeline
+
+Compares the previous local-Whisper preprocessing (decode at the native rate for
+quality features, decode again at 16 kHz and write a converted WAV, then let
+Whisper read that WAV back) with the decode-once pipeline (one 16 kHz decode,
+features from the same buffer, array passed straight to Whisper). Whisper
+itself is not run; only the preprocessing it is fed by is measured.
+
+Clips are synthetic 44.1 kHz stereo recordings of the given lengths, encoded
+as MP3 when libsndfile supports it and FLAC otherwise.
+
+Usage:
+    python statex-ai/tests/benchmark_asr_decode.py [--minutes 1 5 10] [--repeat 2]
+"""
+
+import argparse
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services", "asr-service"))
+
+from app.audio_pipeline import DecodedAudio, compute_quality_features, decode_and_analyze  # noqa: E402
+
+SOURCE_RATE = 44100
+
+
+def make_clip(directory: str, minutes: float) -> str:
+    """Write a speech-like clip: voiced bursts with pauses over a noise floor"""
+    rng = np.random.default_rng(int(minutes * 100))
+    t = np.arange(int(minutes * 60 * SOURCE_RATE)) / SOURCE_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.3 * t)
+    voiced = np.sin(2 * np.pi * np.cumsum(pitch) / SOURCE_RATE)
+    voiced += 0.5 * np.sin(4 * np.pi * np.cumsum(pitch) / SOURCE_RATE)
+    envelope = (np.sin(2 * np.pi * 0.4 * t) > -0.3).astype(np.float32)
+    mono = 0.3 * voiced * envelope + 0.01 * rng.standard_normal(t.size)
+    stereo = np.stack([mono, mono * 0.9], axis=1).astype(np.float32)
+
+    for fmt, ext in (("MP3", ".mp3"), ("FLAC", ".flac")):
+        path = os.path.join(directory, f"clip_{minutes:g}min{ext}")
+        try:
+            sf.write(path, stereo, SOURCE_RATE, format=fmt)
+            return path
+        except Exception:
+            continue
+    raise RuntimeError("libsndfile can write neither MP3 nor FLAC")
+
+
+def whisper_read(path: str) -> np.ndarray:
+    """How Whisper loads a file path: ffmpeg to 16 kHz mono, or a plain WAV read without ffmpeg"""
+    if shutil.which("ffmpeg"):
+        cmd = ["ffmpeg", "-nostdin", "-threads", "0", "-i", path, "-f", "s16le", "-ac", "1",
+               "-acodec", "pcm_s16le", "-ar", "16000", "-"]
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+        return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+    samples, _ = sf.read(path, dtype="float32")
+    return samples
+
+
+def previous_pipeline(path: str, workdir: str) -> int:
+    """Returns bytes written to disk"""
+    y, sr = librosa.load(path, sr=None)
+    compute_quality_features(DecodedAudio(y, sr, None, 0.0))
+    y16, _ = librosa.load(path, sr=16000)
+    converted = os.path.join(workdir, "converted.wav")
+    sf.write(converted, y16, 16000, format="WAV")
+    written = os.path.getsize(converted)
+    whisper_read(converted)
+    os.unlink(converted)
+    return written
+
+
+def decode_once_pipeline(path: str, workdir: str) -> int:
+    audio, _ = decode_and_analyze(path)
+    assert audio.samples.dtype == np.float32
+    return 0
+
+
+def measure(pipeline, path: str, workdir: str, repeat: int):
+    best = None
+    for _ in range(repeat):
+        cpu_start = time.process_time()
+        children_start = resource.getrusage(resource.RUSAGE_CHILDREN)
+        wall_start = time.perf_counter()
+        written = pipeline(path, workdir)
+        wall = time.perf_counter() - wall_start
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        cpu = time.process_time() - cpu_start
+        cpu += (children.ru_utime - children_start.ru_utime) + (children.ru_stime - children_start.ru_stime)
+        if best is None or cpu < best[0]:
+            best = (cpu, wall, written)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="asr_bench_")
+    try:
+        # Warm up librosa's lazily compiled kernels so the first clip is not penalised
+        previous_pipeline(make_clip(workdir, 0.05), workdir)
+
+        print(f"🧪 ASR preprocessing, best of {args.repeat} (ffmpeg: {'yes' if shutil.which('ffmpeg') else 'no'})")
+        print(f"{'clip':>16} {'old cpu s':>10} {'new cpu s':>10} {'saved':>7} {'old wall s':>11} "
+              f"{'new wall s':>11} {'old MB written':>15}")
+        for minutes in args.minutes:
+            path = make_clip(workdir, minutes)
+            old_cpu, old_wall, old_written = measure(previous_pipeline, path, workdir, args.repeat)
+            new_cpu, new_wall, _ = measure(decode_once_pipeline, path, workdir, args.repeat)
+            label = f"{minutes:g} min {os.path.splitext(path)[1][1:]}"
+            print(f"{label:>16} {old_cpu:10.2f} {new_cpu:10.2f} {1 - new_cpu / old_cpu:7.0%} {old_wall:11.2f} "
+                  f"{new_wall:11.2f} {old_written / 1e6:15.1f}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
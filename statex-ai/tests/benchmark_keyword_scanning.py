@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the business analysis keyword checks
+
+Compares the previous checks, where every analysis step lowercased the
+combined text again and ran its own `in` / `str.count` scans, with one
+KeywordHits shared by all steps, which lowercases once and checks each
+keyword at most once. The text stands in for a transcript plus extracted
+document text; the queries are the ones the aggregator's steps make.
+
+Usage:
+    python statex-ai/tests/benchmark_keyword_scanning.py [--sizes 2000 50000 300000] [--runs 50]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services", "ai-orchestrator"))
+
+from app.business_analysis_aggregator import BusinessAnalysisAggregator  # noqa: E402
+
+WORDS = ["the", "client", "needs", "a", "system", "for", "their", "team", "with", "reports", "and", "clear",
+         "workflow", "users", "login", "form", "page", "online", "booking", "support", "email", "orders", "we",
+         "would", "like", "to", "manage", "customers", "invoices", "schedule", "appointments", "staff", "mobile",
+         "dashboard", "payment", "integration", "budget", "deadline", "simple", "custom", "data", "security"]
+
+STEP_SIGNALS = [
+    ["frontend", "backend", "python_ai", "data", "analytics", "document_db", "ai_ml", "mobile"],
+    ["integration", "urgency", "competition"],
+    ["ecommerce", "automation", "mobile"],
+    ["ai_or_ml", "mobile_first"]
+]
+
+
+def make_text(size: int, rng: random.Random) -> str:
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word.title() if rng.random() < 0.1 else word)
+        length += len(word) + 1
+    return " ".join(words)
+
+
+def previous_checks(aggregator: BusinessAnalysisAggregator, text: str) -> int:
+    """The steps' checks before the shared hits (copied for comparison)"""
+    found = 0
+    all_text = text.lower()
+    for keywords in aggregator.complexity_keywords.values():
+        for keyword in keywords:
+            found += all_text.count(keyword)
+    for indicator in aggregator.signal_keywords["enterprise"]:
+        found += indicator in all_text
+    all_text = text.lower()
+    for keywords in aggregator.technology_patterns.values():
+        found += any(keyword in all_text for keyword in keywords)
+    for groups in STEP_SIGNALS:
+        all_text = text.lower()
+        for group in groups:
+            found += any(keyword in all_text for keyword in aggregator.signal_keywords[group])
+    return found
+
+
+def shared_checks(aggregator: BusinessAnalysisAggregator, text: str) -> int:
+    found = 0
+    hits = aggregator.scanner.scan(text)
+    for keywords in aggregator.complexity_keywords.values():
+        for keyword in keywords:
+            found += hits.count(keyword)
+    for indicator in aggregator.signal_keywords["enterprise"]:
+        found += hits.contains(indicator)
+    found += len(hits.matched_groups("technology"))
+    for groups in STEP_SIGNALS:
+        for group in groups:
+            found += hits.has_group("signals", group)
+    return found
+
+
+def measure(check, runs: int):
+    latencies = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        check()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.mean(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 50000, 300000])
+    parser.add_argument("--runs", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    aggregator = BusinessAnalysisAggregator()
+
+    print(f"🧪 Keyword checks of one analysis, {args.runs} runs per text size")
+    print(f"{'chars':>8} {'old mean ms':>12} {'old p95 ms':>11} {'new mean ms':>12} {'new p95 ms':>11} {'speedup':>8}")
+    for size in args.sizes:
+        text = make_text(size, rng)
+        assert previous_checks(aggregator, text) == shared_checks(aggregator, text)
+        old_mean, old_p95 = measure(lambda: previous_checks(aggregator, text), args.runs)
+        new_mean, new_p95 = measure(lambda: shared_checks(aggregator, text), args.runs)
+        print(f"{size:>8} {old_mean:12.3f} {old_p95:11.3f} {new_mean:12.3f} {new_p95:11.3f} "
+              f"{old_mean / new_mean:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
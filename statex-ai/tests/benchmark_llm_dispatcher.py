@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the Free AI Service provider dispatcher
+
+Runs a burst of Ollama analyses through FreeAIService against a local mock
+Ollama server and reports throughput and latency for several dispatcher
+concurrency limits. The mock server processes requests with processor sharing
+and loses efficiency for every generation above its capacity, the way a single
+Ollama instance thrashes when too many generations run in parallel.
+
+Usage:
+    python statex-ai/tests/benchmark_llm_dispatcher.py [--requests 40] [--interactive 4]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+from aiohttp import web
+
+MOCK_PORT = 18434
+os.environ["OLLAMA_URL"] = f"http://127.0.0.1:{MOCK_PORT}"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services", "free-ai-service"))
+
+from app import main as free_ai  # noqa: E402
+from app.dispatcher import ProviderDispatcher  # noqa: E402
+
+
+class MockOllama:
+    """Processor-sharing mock of one Ollama instance with a thrashing penalty"""
+
+    def __init__(self, generation_seconds: float = 0.25, capacity: int = 2, thrash_penalty: float = 0.15):
+        self.generation_seconds = generation_seconds
+        self.capacity = capacity
+        self.thrash_penalty = thrash_penalty
+        self.active = {}
+        self.peak_in_flight = 0
+
+    async def tick(self):
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(0.005)
+            now = time.monotonic()
+            elapsed, last = now - last, now
+            n = len(self.active)
+            if not n:
+                continue
+            share = min(1.0, self.capacity / n) / (1 + self.thrash_penalty * max(0, n - self.capacity))
+            for key, (remaining, event) in list(self.active.items()):
+                remaining -= elapsed * share
+                if remaining <= 0:
+                    del self.active[key]
+                    event.set()
+                else:
+                    self.active[key] = (remaining, event)
+
+    async def generate(self, request: web.Request) -> web.Response:
+        event = asyncio.Event()
+        self.active[id(event)] = (self.generation_seconds, event)
+        self.peak_in_flight = max(self.peak_in_flight, len(self.active))
+        await event.wait()
+        body = {"response": json.dumps({"summary": "ok", "confidence": 0.8}), "done": True}
+        return web.json_response(body)
+
+
+async def run_burst(total: int, interactive: int, concurrency: int):
+    mock = MockOllama()
+    app = web.Application()
+    app.router.add_post("/api/generate", mock.generate)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", MOCK_PORT).start()
+    ticker = asyncio.create_task(mock.tick())
+
+    free_ai.provider_dispatcher = ProviderDispatcher(concurrency={"ollama": concurrency})
+    service = free_ai.FreeAIService()
+
+    async def one(index: int, priority: str):
+        request = free_ai.AIAnalysisRequest(
+            text_content=f"Benchmark submission {index}",
+            model="llama2:7b",
+            priority=priority
+        )
+        start = time.monotonic()
+        await service.analyze_with_ollama(request)
+        return priority, time.monotonic() - start
+
+    try:
+        start = time.monotonic()
+        tasks = [asyncio.create_task(one(i, "background")) for i in range(total - interactive)]
+        await asyncio.sleep(0.05)
+        tasks += [asyncio.create_task(one(i, "interactive")) for i in range(interactive)]
+        results = await asyncio.gather(*tasks)
+        wall = time.monotonic() - start
+    finally:
+        ticker.cancel()
+        await runner.cleanup()
+
+    def percentile(values, p):
+        values = sorted(values)
+        return values[min(len(values) - 1, int(len(values) * p))]
+
+    latencies = [latency for _, latency in results]
+    interactive_latencies = [latency for priority, latency in results if priority == "interactive"] or [0.0]
+    return {
+        "concurrency": concurrency,
+        "wall_seconds": wall,
+        "throughput": total / wall,
+        "p50": statistics.median(latencies),
+        "p95": percentile(latencies, 0.95),
+        "interactive_p50": statistics.median(interactive_latencies),
+        "peak_in_flight": mock.peak_in_flight,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--interactive", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"🧪 {args.requests} requests ({args.interactive} interactive) against mock Ollama")
+    print(f"{'limit':>8} {'wall s':>8} {'req/s':>8} {'p50 s':>8} {'p95 s':>8} {'inter p50':>10} {'peak':>6}")
+    for concurrency in (1, 2, 4, 8, args.requests):
+        r = await run_burst(args.requests, args.interactive, concurrency)
+        label = "none" if concurrency == args.requests else str(concurrency)
+        print(f"{label:>8} {r['wall_seconds']:8.2f} {r['throughput']:8.2f} {r['p50']:8.2f} "
+              f"{r['p95']:8.2f} {r['interactive_p50']:10.2f} {r['peak_in_flight']:6d}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
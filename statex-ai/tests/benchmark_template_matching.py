@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Benchmark for template-repository matching
+
+Compares the previous matcher (score every template per request, substring
+scan of the requirements per keyword) with the inverted-index matcher
+(TemplateIndex built once, postings walk and heap top-k) on synthetic
+catalogs of growing size. Queries mix requirements text with type, industry
+and feature filters, the way /api/find-templates is called; vocabulary sizes
+are in the range of a real template catalog.
+
+Usage:
+    python statex-ai/tests/benchmark_template_matching.py [--sizes 100 1000 5000 20000] [--queries 200]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import os
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "services", "template-repository"))
+
+from app.template_catalog import BUILTIN_TEMPLATES  # noqa: E402
+from app.template_index import TemplateIndex  # noqa: E402
+
+TYPES = ["website", "ecommerce", "app", "landing_page"]
+INDUSTRIES = ["general", "technology", "retail", "healthcare", "finance", "education", "creative", "marketing",
+              "hospitality", "real_estate", "nonprofit", "legal"]
+FEATURES = ["hero", "about", "services", "contact", "blog", "product_catalog", "shopping_cart", "checkout",
+            "user_account", "admin_panel", "dashboard", "user_management", "billing", "api", "analytics",
+            "features", "testimonials", "pricing", "portfolio", "booking", "chat", "search", "newsletter",
+            "gallery", "faq", "team", "careers", "events", "map", "reviews", "wishlist", "subscriptions",
+            "notifications", "reports", "calendar", "file_upload", "multilingual", "social_login", "video", "forum"]
+WORDS = ["modern", "clean", "professional", "business", "website", "store", "online", "dashboard", "saas",
+         "landing", "portfolio", "creative", "responsive", "booking", "clinic", "school", "bank", "startup",
+         "agency", "restaurant", "shop", "platform", "marketplace", "analytics", "conversion", "mobile",
+         "community", "events", "travel", "fitness", "realestate", "consulting", "nonprofit", "media",
+         "minimal", "elegant", "bold", "dark", "colorful", "corporate", "personal", "photography", "music",
+         "fashion", "jewelry", "furniture", "grocery", "bakery", "cafe", "hotel", "resort", "airline", "tour",
+         "dentist", "hospital", "pharmacy", "therapy", "yoga", "gym", "coach", "university", "course",
+         "tutoring", "library", "insurance", "accounting", "crypto", "investment", "lending", "law", "notary",
+         "charity", "church", "wedding", "conference", "magazine", "podcast", "gaming", "esports", "automotive",
+         "construction", "architecture", "interior", "logistics", "manufacturing", "agriculture", "energy"]
+REQUIREMENT_TEMPLATES = [
+    "I need a {a} {b} for my {c} with {d} and {e}",
+    "Build a {a} {b} that supports {d}, {e} and a {c} section",
+    "We want an {a} {b} similar to a {c} {d} site",
+]
+
+
+def make_catalog(size: int, rng: random.Random):
+    templates = [dict(template) for template in BUILTIN_TEMPLATES]
+    while len(templates) < size:
+        number = len(templates)
+        words = rng.sample(WORDS, 6)
+        templates.append({
+            "template_id": f"synthetic-{number:06d}",
+            "name": f"{words[0].title()} {words[1].title()} Template",
+            "type": rng.choice(TYPES),
+            "industry": rng.choice(INDUSTRIES),
+            "description": f"{' '.join(words[2:])} template for {rng.choice(WORDS)} businesses",
+            "features": rng.sample(FEATURES, 5),
+            "tech_stack": ["Next.js", "Tailwind CSS"],
+            "match_score": 0.0,
+            "popularity": round(rng.random(), 2)
+        })
+    return templates[:size]
+
+
+def make_queries(count: int, rng: random.Random):
+    queries = []
+    for _ in range(count):
+        words = rng.sample(WORDS, 5)
+        queries.append({
+            "requirements": rng.choice(REQUIREMENT_TEMPLATES).format(a=words[0], b=words[1], c=words[2],
+                                                                     d=words[3], e=words[4]),
+            "template_type": rng.choice(TYPES + [None]),
+            "industry": rng.choice(INDUSTRIES + [None, None]),
+            "features": rng.sample(FEATURES, rng.randint(0, 4)) or None
+        })
+    return queries
+
+
+def previous_match_score(template, requirements, template_type, industry, features):
+    """The matcher's score before the index (copied for comparison)"""
+    score = 0.0
+    if template_type and template["type"] == template_type:
+        score += 0.3
+    elif not template_type:
+        score += 0.1
+    if industry and template["industry"] == industry:
+        score += 0.2
+    elif not industry:
+        score += 0.1
+    if features:
+        matching_features = set(features) & set(template["features"])
+        score += len(matching_features) / len(features) * 0.3
+    requirements_lower = requirements.lower()
+    template_name_lower = template["name"].lower()
+    template_desc_lower = template["description"].lower()
+    keyword_matches = 0
+    keywords = ["business", "website", "ecommerce", "app", "dashboard", "landing", "portfolio"]
+    for keyword in keywords:
+        if keyword in requirements_lower and keyword in (template_name_lower + " " + template_desc_lower):
+            keyword_matches += 1
+    score += keyword_matches / len(keywords) * 0.2
+    return min(score, 1.0)
+
+
+def previous_search(templates, query):
+    matches = []
+    for template in [dict(template) for template in templates]:
+        score = previous_match_score(template, query["requirements"], query["template_type"],
+                                     query["industry"], query["features"])
+        if score > 0.5:
+            template["match_score"] = score
+            matches.append(template)
+    matches.sort(key=lambda x: x["match_score"], reverse=True)
+    return matches[:5]
+
+
+def measure(search, queries):
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        search(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    return statistics.mean(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000, 20000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    queries = make_queries(args.queries, rng)
+
+    print(f"🧪 Template matching, {args.queries} queries per catalog size")
+    print(f"{'templates':>10} {'build ms':>9} {'old mean ms':>12} {'old p95 ms':>11} "
+          f"{'new mean ms':>12} {'new p95 ms':>11} {'speedup':>8}")
+    for size in args.sizes:
+        templates = make_catalog(size, rng)
+        build_start = time.perf_counter()
+        index = TemplateIndex(templates)
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        old_mean, old_p95 = measure(lambda query: previous_search(templates, query), queries)
+        new_mean, new_p95 = measure(lambda query: index.search(
+            query["requirements"], query["template_type"], query["industry"], query["features"]
+        ), queries)
+        print(f"{size:>10} {build_ms:9.1f} {old_mean:12.3f} {old_p95:11.3f} "
+              f"{new_mean:12.3f} {new_p95:11.3f} {old_mean / new_mean:7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Check that modules copied into several services are identical
+
+Services are built from their own directories, so shared modules such as
+keyword_scanner.py are copied into each service. This fails as soon as a copy
+differs from the source of truth listed in scripts/sync_shared_modules.py.
+
+Usage:
+    python -m pytest statex-ai/tests/test_shared_modules.py
+    python statex-ai/tests/test_shared_modules.py
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
+from sync_shared_modules import SHARED_MODULES, drifted_copies  # noqa: E402
+
+
+def test_shared_modules_in_sync():
+    drifted = drifted_copies()
+    assert not drifted, (
+        f"Copies differ from their source of truth: {', '.join(drifted)}. "
+        "Edit the first service's copy and run scripts/sync_shared_modules.py"
+    )
+
+
+if __name__ == "__main__":
+    test_shared_modules_in_sync()
+    print(f"✅ {sum(len(services) for services in SHARED_MODULES.values())} shared module copies are in sync")
@@ -0,0 +1,246 @@
+"""
+Adaptive Health Prober
+
+Runs health probes for all monitored targets over a single pooled aiohttp
+session. Due targets are probed together in one concurrent wave, each under its
+own deadline, and every target keeps its own probe interval: it is tightened
+while the target is unhealthy and relaxed while the target stays healthy.
+Probe results are kept in memory as bounded time series so status endpoints
+never have to probe on the request path.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# probe(session, name, config) -> status model with a ``status`` attribute
+ProbeFunc = Callable[[aiohttp.ClientSession, str, Dict[str, Any]], Awaitable[Any]]
+# on_wave(results) where results maps target name -> status model or Exception
+WaveCallback = Callable[[Dict[str, Any]], Awaitable[None]]
+
+
+class ProbeTarget:
+    """Scheduling state and result history of one monitored target"""
+
+    def __init__(self, name: str, config: Dict[str, Any], probe: ProbeFunc,
+                 interval: float, deadline: float, history_size: int):
+        self.name = name
+        self.config = config
+        self.probe = probe
+        self.interval = interval
+        self.deadline = deadline
+        self.next_due = 0.0
+        self.healthy: Optional[bool] = None
+        self.consecutive_successes = 0
+        self.consecutive_failures = 0
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+
+
+class HealthProber:
+    """Schedules concurrent, deadline-bounded health probes with adaptive intervals"""
+
+    def __init__(
+        self,
+        base_interval: float = 30.0,
+        min_interval: float = 5.0,
+        max_interval: float = 120.0,
+        backoff_factor: float = 1.5,
+        stable_threshold: int = 3,
+        probe_timeout: float = 5.0,
+        history_size: int = 240,
+        coalesce_window: float = 1.0,
+        max_connections: int = 50,
+    ):
+        self.base_interval = base_interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff_factor = backoff_factor
+        self.stable_threshold = stable_threshold
+        self.probe_timeout = probe_timeout
+        self.history_size = history_size
+        self.coalesce_window = coalesce_window
+        self.max_connections = max_connections
+
+        self.targets: Dict[str, ProbeTarget] = {}
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.wave_callbacks: List[WaveCallback] = []
+        self.probe_task: Optional[asyncio.Task] = None
+        self.waves_completed = 0
+        self._wakeup = asyncio.Event()
+        self._shutdown = False
+
+    def add_target(self, name: str, config: Dict[str, Any], probe: ProbeFunc):
+        """Register a target; it is probed in the next wave"""
+        self.targets[name] = ProbeTarget(
+            name=name,
+            config=config,
+            probe=probe,
+            interval=self.base_interval,
+            deadline=float(config.get("timeout", self.probe_timeout)),
+            history_size=self.history_size,
+        )
+        self._wakeup.set()
+
+    def on_wave(self, callback: WaveCallback):
+        """Register a coroutine called with the results of every probe wave"""
+        self.wave_callbacks.append(callback)
+
+    async def start(self):
+        """Open the pooled session and start the probe scheduler"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                ttl_dns_cache=300,
+                keepalive_timeout=max(self.max_interval, 30.0),
+            )
+            self.session = aiohttp.ClientSession(connector=connector)
+        if self.probe_task is None or self.probe_task.done():
+            self._shutdown = False
+            self.probe_task = asyncio.create_task(self._probe_loop())
+            logger.info(f"Started health prober for {len(self.targets)} targets")
+
+    async def stop(self):
+        """Stop the scheduler and close the pooled session"""
+        self._shutdown = True
+        self._wakeup.set()
+        if self.probe_task and not self.probe_task.done():
+            self.probe_task.cancel()
+            try:
+                await self.probe_task
+            except asyncio.CancelledError:
+                pass
+        if self.session and not self.session.closed:
+            await self.session.close()
+        logger.info("Stopped health prober")
+
+    async def _probe_loop(self):
+        """Probe due targets in waves, sleeping until the next target is due"""
+        while not self._shutdown:
+            try:
+                now = time.monotonic()
+                due = [
+                    target for target in self.targets.values()
+                    if target.next_due <= now + self.coalesce_window
+                ]
+                if due:
+                    await self.probe_wave(due)
+
+                self._wakeup.clear()
+                if self.targets:
+                    sleep_for = min(t.next_due for t in self.targets.values()) - time.monotonic()
+                else:
+                    sleep_for = self.base_interval
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(sleep_for, 0.1))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Error in health prober loop: {e}")
+                await asyncio.sleep(1)
+
+    async def probe_wave(self, targets: Optional[List[ProbeTarget]] = None) -> Dict[str, Any]:
+        """Probe the given targets (default: all) concurrently, one deadline each"""
+        if targets is None:
+            targets = list(self.targets.values())
+        if self.session is None or self.session.closed:
+            await self.start()
+
+        results = await asyncio.gather(
+            *[self._probe_target(target) for target in targets],
+            return_exceptions=True
+        )
+        wave_results = {target.name: result for target, result in zip(targets, results)}
+
+        for target, result in zip(targets, results):
+            self._record(target, result)
+        self.waves_completed += 1
+
+        for callback in self.wave_callbacks:
+            try:
+                await callback(wave_results)
+            except Exception as e:
+                logger.error(f"Health prober wave callback failed: {e}")
+
+        return wave_results
+
+    async def _probe_target(self, target: ProbeTarget):
+        try:
+            return await asyncio.wait_for(
+                target.probe(self.session, target.name, target.config),
+                timeout=target.deadline
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"Probe deadline of {target.deadline:.1f}s exceeded")
+
+    def _record(self, target: ProbeTarget, result: Any):
+        """Append the result to the target's time series and reschedule it"""
+        if isinstance(result, Exception):
+            healthy = False
+            sample = {
+                "timestamp": datetime.now().isoformat(),
+                "status": "error",
+                "response_time": None,
+                "error_message": str(result),
+            }
+        else:
+            healthy = getattr(result, "status", None) == "healthy"
+            sample = {
+                "timestamp": datetime.now().isoformat(),
+                "status": result.status,
+                "response_time": getattr(result, "response_time", getattr(result, "processing_time", None)),
+                "error_message": getattr(result, "error_message", None),
+            }
+        target.history.append(sample)
+        self._reschedule(target, healthy)
+
+    def _reschedule(self, target: ProbeTarget, healthy: bool):
+        """Probe fast while unhealthy, back off geometrically while stable"""
+        recovered = healthy and target.healthy is False
+        target.healthy = healthy
+
+        if healthy:
+            target.consecutive_failures = 0
+            target.consecutive_successes += 1
+            if recovered:
+                target.interval = self.base_interval
+            elif target.consecutive_successes >= self.stable_threshold:
+                target.interval = min(target.interval * self.backoff_factor, self.max_interval)
+        else:
+            target.consecutive_successes = 0
+            target.consecutive_failures += 1
+            target.interval = self.min_interval
+
+        target.next_due = time.monotonic() + target.interval
+
+    def get_history(self, name: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return the recorded samples of a target, oldest first"""
+        target = self.targets.get(name)
+        if target is None:
+            return []
+        samples = list(target.history)
+        return samples[-limit:] if limit else samples
+
+    def get_schedule(self) -> Dict[str, Dict[str, Any]]:
+        """Return the current probe interval and health streaks for every target"""
+        now = time.monotonic()
+        return {
+            name: {
+                "interval": target.interval,
+                "next_probe_in": max(target.next_due - now, 0.0),
+                "deadline": target.deadline,
+                "healthy": target.healthy,
+                "consecutive_successes": target.consecutive_successes,
+                "consecutive_failures": target.consecutive_failures,
+                "samples": len(target.history),
+            }
+            for name, target in self.targets.items()
+        }
@@ -22,6 +22,8 @@ from prometheus_client.core import CollectorRegistry
 # import docker  # Disabled due to API compatibility issues
 import psutil
 
+from .health_prober import HealthProber
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -176,6 +178,21 @@ CORE_SERVICES = {
     }
 }
 
+# Probe scheduling
+MONITOR_INTERVAL = float(os.getenv("MONITOR_INTERVAL", "30"))
+MONITOR_MIN_INTERVAL = float(os.getenv("MONITOR_MIN_INTERVAL", "5"))
+MONITOR_MAX_INTERVAL = float(os.getenv("MONITOR_MAX_INTERVAL", "120"))
+MONITOR_PROBE_TIMEOUT = float(os.getenv("MONITOR_PROBE_TIMEOUT", "5"))
+MONITOR_HISTORY_SIZE = int(os.getenv("MONITOR_HISTORY_SIZE", "240"))
+
+health_prober = HealthProber(
+    base_interval=MONITOR_INTERVAL,
+    min_interval=MONITOR_MIN_INTERVAL,
+    max_interval=MONITOR_MAX_INTERVAL,
+    probe_timeout=MONITOR_PROBE_TIMEOUT,
+    history_size=MONITOR_HISTORY_SIZE
+)
+
 # Docker client - disabled for now due to API compatibility issues
 # docker_client = docker.from_env()
 
@@ -249,6 +266,21 @@ async def get_system_metrics():
     """Get system metrics"""
     return monitoring_data["system_metrics"]
 
+@app.get("/api/schedule")
+async def get_probe_schedule():
+    """Get the adaptive probe schedule of all monitored targets"""
+    return health_prober.get_schedule()
+
+@app.get("/api/history/{target_name}")
+async def get_target_history(target_name: str, limit: Optional[int] = None):
+    """Get the recorded probe time series of a service or AI agent"""
+    if target_name not in health_prober.targets:
+        raise HTTPException(status_code=404, detail=f"Unknown target: {target_name}")
+    return {
+        "name": target_name,
+        "samples": health_prober.get_history(target_name, limit)
+    }
+
 @app.get("/api/alerts")
 async def get_alerts():
     """Get current alerts"""
@@ -280,35 +312,34 @@ async def receive_alertmanager_webhook(alert_data: Dict[str, Any]):
         logger.error(f"Error processing AlertManager webhook: {e}")
         raise HTTPException(status_code=500, detail=f"Error processing alert: {str(e)}")
 
-async def check_service_health(service_name: str, service_config: Dict[str, Any]) -> ServiceStatus:
+async def check_service_health(session: aiohttp.ClientSession, service_name: str, service_config: Dict[str, Any]) -> ServiceStatus:
     """Check health of a single service"""
     start_time = time.time()
     
     try:
-        async with aiohttp.ClientSession() as session:
-            async with session.get(
-                f"{service_config['url']}/health",
-                timeout=aiohttp.ClientTimeout(total=5)
-            ) as response:
-                response_time = time.time() - start_time
-                
-                if response.status == 200:
-                    data = await response.json()
-                    return ServiceStatus(
-                        name=service_name,
-                        status="healthy",
-                        response_time=response_time,
-                        last_check=datetime.now(),
-                        metrics=data
-                    )
-                else:
-                    return ServiceStatus(
-                        name=service_name,
-                        status="unhealthy",
-                        response_time=response_time,
-                        last_check=datetime.now(),
-                        error_message=f"HTTP {response.status}"
-                    )
+        async with session.get(
+            f"{service_config['url']}/health",
+            timeout=aiohttp.ClientTimeout(total=MONITOR_PROBE_TIMEOUT)
+        ) as response:
+            response_time = time.time() - start_time
+            
+            if response.status == 200:
+                data = await response.json()
+                return ServiceStatus(
+                    name=service_name,
+                    status="healthy",
+                    response_time=response_time,
+                    last_check=datetime.now(),
+                    metrics=data
+                )
+            else:
+                return ServiceStatus(
+                    name=service_name,
+                    status="unhealthy",
+                    response_time=response_time,
+                    last_check=datetime.now(),
+                    error_message=f"HTTP {response.status}"
+                )
     except Exception as e:
         response_time = time.time() - start_time
         return ServiceStatus(
@@ -319,67 +350,64 @@ async def check_service_health(service_name: str, service_config: Dict[str, Any]
             error_message=str(e)
         )
 
-async def check_ai_agent_performance(agent_name: str, agent_config: Dict[str, Any]) -> AIAgentStatus:
+async def _fetch_optional_json(session: aiohttp.ClientSession, url: str,
+                               timeout: float = MONITOR_PROBE_TIMEOUT) -> Dict[str, Any]:
+    """Fetch an optional JSON endpoint, returning {} on any failure"""
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            if response.status == 200:
+                return await response.json()
+    except Exception:
+        pass
+    return {}
+
+async def check_ai_agent_performance(session: aiohttp.ClientSession, agent_name: str, agent_config: Dict[str, Any]) -> AIAgentStatus:
     """Check performance of an AI agent"""
     start_time = time.time()
+    # Everything has to finish within the prober's deadline for this target, with a
+    # margin; /metrics and /models only get what /health left of it
+    budget = float(agent_config.get("timeout", MONITOR_PROBE_TIMEOUT)) * 0.9
     
     try:
-        async with aiohttp.ClientSession() as session:
-            # Check health
-            async with session.get(
-                f"{agent_config['url']}/health",
-                timeout=aiohttp.ClientTimeout(total=5)
-            ) as response:
-                response_time = time.time() - start_time
-                
-                if response.status == 200:
-                    health_data = await response.json()
-                    
-                    # Get performance metrics if available
-                    performance_metrics = {}
-                    try:
-                        async with session.get(
-                            f"{agent_config['url']}/metrics",
-                            timeout=aiohttp.ClientTimeout(total=5)
-                        ) as metrics_response:
-                            if metrics_response.status == 200:
-                                performance_metrics = await metrics_response.json()
-                    except:
-                        pass
-                    
-                    # Get model info if available
-                    model_info = {}
-                    try:
-                        async with session.get(
-                            f"{agent_config['url']}/models",
-                            timeout=aiohttp.ClientTimeout(total=5)
-                        ) as models_response:
-                            if models_response.status == 200:
-                                model_info = await models_response.json()
-                    except:
-                        pass
-                    
-                    return AIAgentStatus(
-                        name=agent_name,
-                        status="healthy",
-                        processing_time=response_time,
-                        success_rate=0.95,  # This would come from actual metrics
-                        queue_size=0,  # This would come from actual queue monitoring
-                        last_activity=datetime.now(),
-                        model_info=model_info,
-                        performance_metrics=performance_metrics
-                    )
-                else:
-                    return AIAgentStatus(
-                        name=agent_name,
-                        status="unhealthy",
-                        processing_time=response_time,
-                        success_rate=0.0,
-                        queue_size=0,
-                        last_activity=datetime.now(),
-                        model_info={},
-                        performance_metrics={}
-                    )
+        # Check health
+        async with session.get(
+            f"{agent_config['url']}/health",
+            timeout=aiohttp.ClientTimeout(total=budget)
+        ) as response:
+            response_time = time.time() - start_time
+            healthy = response.status == 200
+        
+        if healthy:
+            # Get performance metrics and model info if available; best effort
+            remaining = budget - (time.time() - start_time)
+            performance_metrics, model_info = {}, {}
+            if remaining > 0.1:
+                performance_metrics, model_info = await asyncio.gather(
+                    _fetch_optional_json(session, f"{agent_config['url']}/metrics", remaining),
+                    _fetch_optional_json(session, f"{agent_config['url']}/models", remaining)
+                )
+            
+            return AIAgentStatus(
+                name=agent_name,
+                status="healthy",
+                processing_time=response_time,
+                success_rate=0.95,  # This would come from actual metrics
+                queue_size=0,  # This would come from actual queue monitoring
+                last_activity=datetime.now(),
+                model_info=model_info,
+                performance_metrics=performance_metrics
+            )
+        else:
+            return AIAgentStatus(
+                name=agent_name,
+                status="unhealthy",
+                processing_time=response_time,
+                success_rate=0.0,
+                queue_size=0,
+                last_activity=datetime.now(),
+                model_info={},
+                performance_metrics={}
+            )
     except Exception as e:
         response_time = time.time() - start_time
         return AIAgentStatus(
@@ -443,113 +471,117 @@ async def get_system_metrics() -> Dict[str, Any]:
         logger.error(f"Error getting system metrics: {e}")
         return {}
 
-async def update_prometheus_metrics():
-    """Update Prometheus metrics based on current monitoring data"""
+async def update_prometheus_metrics(service_names: List[str], agent_names: List[str]):
+    """Update Prometheus metrics for the targets probed in the latest wave"""
     # Update AI agent metrics
-    for agent_name, agent_data in monitoring_data["ai_agents"].items():
-        status = 1 if agent_data["status"] == "healthy" else 0
+    for agent_name in agent_names:
+        agent_data = monitoring_data["ai_agents"][agent_name]
         ai_agent_requests_total.labels(agent_name=agent_name, status=agent_data["status"]).inc()
         ai_agent_processing_duration.labels(agent_name=agent_name).observe(agent_data["processing_time"])
         ai_agent_success_rate.labels(agent_name=agent_name).set(agent_data["success_rate"])
         ai_agent_queue_size.labels(agent_name=agent_name).set(agent_data["queue_size"])
     
     # Update service health metrics
-    for service_name, service_data in monitoring_data["services"].items():
+    for service_name in service_names:
+        service_data = monitoring_data["services"][service_name]
         status = 1 if service_data["status"] == "healthy" else 0
         service_health.labels(service_name=service_name, service_type=service_data.get("type", "unknown")).set(status)
         service_response_time.labels(service_name=service_name, endpoint="health").observe(service_data["response_time"])
 
+def update_alerts():
+    """Rebuild the alert list from the in-memory monitoring data"""
+    alerts = []
+    for service_name, service_data in monitoring_data["services"].items():
+        if service_data["status"] != "healthy":
+            alerts.append(f"Service {service_name} is {service_data['status']}")
+    
+    for agent_name, agent_data in monitoring_data["ai_agents"].items():
+        if agent_data["status"] != "healthy":
+            alerts.append(f"AI Agent {agent_name} is {agent_data['status']}")
+    
+    monitoring_data["alerts"] = alerts
+
+async def apply_probe_results(results: Dict[str, Any]):
+    """Store the results of a probe wave in the in-memory monitoring data"""
+    service_names = [name for name in results if name in CORE_SERVICES]
+    agent_names = [name for name in results if name in AI_AGENTS]
+    
+    for service_name in service_names:
+        result = results[service_name]
+        if isinstance(result, Exception):
+            monitoring_data["services"][service_name] = {
+                "status": "error",
+                "response_time": 0.0,
+                "last_check": datetime.now().isoformat(),
+                "error_message": str(result),
+                "type": CORE_SERVICES[service_name]["type"]
+            }
+        else:
+            monitoring_data["services"][service_name] = {
+                "status": result.status,
+                "response_time": result.response_time,
+                "last_check": result.last_check.isoformat(),
+                "error_message": result.error_message,
+                "type": CORE_SERVICES[service_name]["type"],
+                "metrics": result.metrics
+            }
+    
+    for agent_name in agent_names:
+        result = results[agent_name]
+        if isinstance(result, Exception):
+            monitoring_data["ai_agents"][agent_name] = {
+                "status": "error",
+                "processing_time": 0.0,
+                "success_rate": 0.0,
+                "queue_size": 0,
+                "last_activity": datetime.now().isoformat(),
+                "model_info": {},
+                "performance_metrics": {}
+            }
+        else:
+            monitoring_data["ai_agents"][agent_name] = {
+                "status": result.status,
+                "processing_time": result.processing_time,
+                "success_rate": result.success_rate,
+                "queue_size": result.queue_size,
+                "last_activity": result.last_activity.isoformat(),
+                "model_info": result.model_info,
+                "performance_metrics": result.performance_metrics
+            }
+    
+    # Update Prometheus metrics
+    await update_prometheus_metrics(service_names, agent_names)
+    
+    # Check for alerts
+    update_alerts()
+    
+    logger.debug(f"Probe wave completed: {len(service_names)} services, {len(agent_names)} AI agents")
+
 async def monitor_services():
     """Main monitoring loop"""
     logger.info("Starting service monitoring...")
     
+    # All targets share one pooled session and are probed in a single
+    # concurrent wave whenever they are due
+    for service_name, service_config in CORE_SERVICES.items():
+        health_prober.add_target(service_name, service_config, check_service_health)
+    for agent_name, agent_config in AI_AGENTS.items():
+        health_prober.add_target(agent_name, agent_config, check_ai_agent_performance)
+    health_prober.on_wave(apply_probe_results)
+    await health_prober.start()
+    
     while True:
         try:
-            # Check core services
-            service_tasks = []
-            for service_name, service_config in CORE_SERVICES.items():
-                task = check_service_health(service_name, service_config)
-                service_tasks.append((service_name, task))
-            
-            # Check AI agents
-            ai_agent_tasks = []
-            for agent_name, agent_config in AI_AGENTS.items():
-                task = check_ai_agent_performance(agent_name, agent_config)
-                ai_agent_tasks.append((agent_name, task))
-            
-            # Execute all checks in parallel
-            service_results = await asyncio.gather(*[task for _, task in service_tasks], return_exceptions=True)
-            ai_agent_results = await asyncio.gather(*[task for _, task in ai_agent_tasks], return_exceptions=True)
-            
-            # Update monitoring data
-            for i, (service_name, _) in enumerate(service_tasks):
-                result = service_results[i]
-                if isinstance(result, Exception):
-                    monitoring_data["services"][service_name] = {
-                        "status": "error",
-                        "response_time": 0.0,
-                        "last_check": datetime.now().isoformat(),
-                        "error_message": str(result),
-                        "type": CORE_SERVICES[service_name]["type"]
-                    }
-                else:
-                    monitoring_data["services"][service_name] = {
-                        "status": result.status,
-                        "response_time": result.response_time,
-                        "last_check": result.last_check.isoformat(),
-                        "error_message": result.error_message,
-                        "type": CORE_SERVICES[service_name]["type"],
-                        "metrics": result.metrics
-                    }
-            
-            for i, (agent_name, _) in enumerate(ai_agent_tasks):
-                result = ai_agent_results[i]
-                if isinstance(result, Exception):
-                    monitoring_data["ai_agents"][agent_name] = {
-                        "status": "error",
-                        "processing_time": 0.0,
-                        "success_rate": 0.0,
-                        "queue_size": 0,
-                        "last_activity": datetime.now().isoformat(),
-                        "model_info": {},
-                        "performance_metrics": {}
-                    }
-                else:
-                    monitoring_data["ai_agents"][agent_name] = {
-                        "status": result.status,
-                        "processing_time": result.processing_time,
-                        "success_rate": result.success_rate,
-                        "queue_size": result.queue_size,
-                        "last_activity": result.last_activity.isoformat(),
-                        "model_info": result.model_info,
-                        "performance_metrics": result.performance_metrics
-                    }
-            
             # Update system metrics
             monitoring_data["system_metrics"] = await get_system_metrics()
             
-            # Update Prometheus metrics
-            await update_prometheus_metrics()
-            
-            # Check for alerts
-            alerts = []
-            for service_name, service_data in monitoring_data["services"].items():
-                if service_data["status"] != "healthy":
-                    alerts.append(f"Service {service_name} is {service_data['status']}")
-            
-            for agent_name, agent_data in monitoring_data["ai_agents"].items():
-                if agent_data["status"] != "healthy":
-                    alerts.append(f"AI Agent {agent_name} is {agent_data['status']}")
-            
-            monitoring_data["alerts"] = alerts
-            
             logger.info(f"Monitoring update completed. Services: {len(monitoring_data['services'])}, AI Agents: {len(monitoring_data['ai_agents'])}")
             
         except Exception as e:
             logger.error(f"Error in monitoring loop: {e}")
         
         # Wait before next check
-        await asyncio.sleep(30)  # Check every 30 seconds
+        await asyncio.sleep(MONITOR_INTERVAL)
 
 @app.on_event("startup")
 async def startup_event():
@@ -557,6 +589,11 @@ async def startup_event():
     asyncio.create_task(monitor_services())
     logger.info("StateX Monitoring Service started")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop probing and release the pooled session"""
+    await health_prober.stop()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -42,6 +42,7 @@ app.add_middleware(
 
 # AI Configuration
 FREE_AI_SERVICE_URL = os.getenv("FREE_AI_SERVICE_URL", "http://free-ai-service:8016")
+FREE_AI_MAX_CONNECTIONS = int(os.getenv("FREE_AI_MAX_CONNECTIONS", "20"))
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 
@@ -51,6 +52,7 @@ NLP_REQUEST_DURATION = Histogram('nlp_request_duration_seconds', 'NLP request du
 NLP_ACTIVE_REQUESTS = Gauge('nlp_active_requests', 'Active NLP requests')
 NLP_AGENT_STATUS = Gauge('nlp_agent_status', 'NLP agent status', ['agent_name'])
 NLP_TOKEN_COUNT = Counter('nlp_tokens_total', 'Total tokens processed', ['provider', 'type'])
+NLP_STAGE_DURATION = Histogram('nlp_analysis_stage_duration_seconds', 'Comprehensive analysis stage duration', ['stage'])
 
 class TextAnalysisRequest(BaseModel):
     text_content: str
@@ -154,25 +156,40 @@ class FreeAIClient:
     def __init__(self):
         self.base_url = FREE_AI_SERVICE_URL
         self.timeout = aiohttp.ClientTimeout(total=60)
+        self._session: Optional[aiohttp.ClientSession] = None
+    
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Shared session, so concurrent stages reuse pooled keep-alive connections"""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(limit=FREE_AI_MAX_CONNECTIONS, keepalive_timeout=30)
+            )
+        return self._session
+    
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
     
     async def analyze_business_requirements(self, text_content: str, user_name: str = "User") -> Dict[str, Any]:
         """Analyze business requirements using Free AI Service"""
         try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                payload = {
-                    "text_content": text_content,
-                    "user_name": user_name,
-                    "analysis_type": "business_analysis"
-                }
-                
-                async with session.post(f"{self.base_url}/analyze", json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result.get("analysis", {})
-                    else:
-                        error_text = await response.text()
-                        logger.error(f"Free AI Service error: {response.status} - {error_text}")
-                        return self._fallback_business_analysis(text_content, user_name)
+            session = self._get_session()
+            payload = {
+                "text_content": text_content,
+                "user_name": user_name,
+                "analysis_type": "business_analysis"
+            }
+            
+            async with session.post(f"{self.base_url}/analyze", json=payload) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    return result.get("analysis", {})
+                else:
+                    error_text = await response.text()
+                    logger.error(f"Free AI Service error: {response.status} - {error_text}")
+                    return self._fallback_business_analysis(text_content, user_name)
         except Exception as e:
             logger.error(f"Failed to connect to Free AI Service: {e}")
             return self._fallback_business_analysis(text_content, user_name)
@@ -180,19 +197,19 @@ class FreeAIClient:
     async def analyze_technical_requirements(self, text_content: str, user_name: str = "User") -> Dict[str, Any]:
         """Analyze technical requirements using Free AI Service"""
         try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                payload = {
-                    "text_content": text_content,
-                    "user_name": user_name,
-                    "analysis_type": "technical_analysis"
-                }
-                
-                async with session.post(f"{self.base_url}/analyze", json=payload) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        return result.get("analysis", {})
-                    else:
-                        return self._fallback_technical_analysis(text_content)
+            session = self._get_session()
+            payload = {
+                "text_content": text_content,
+                "user_name": user_name,
+                "analysis_type": "technical_analysis"
+            }
+            
+            async with session.post(f"{self.base_url}/analyze", json=payload) as response:
+                if response.status == 200:
+                    result = await response.json()
+                    return result.get("analysis", {})
+                else:
+                    return self._fallback_technical_analysis(text_content)
         except Exception as e:
             logger.error(f"Failed to get technical analysis: {e}")
             return self._fallback_technical_analysis(text_content)
@@ -231,39 +248,64 @@ class FreeAIClient:
             "ai_service": "Fallback Analysis"
         }
 
+# One pooled client shared by every analysis request
+free_ai_client = FreeAIClient()
+
+@app.on_event("shutdown")
+async def close_free_ai_client():
+    await free_ai_client.close()
+
 class BusinessAnalysisEngine:
     """Enhanced business analysis engine with Free AI integration"""
     
     def __init__(self):
-        self.ai_client = FreeAIClient()
+        self.ai_client = free_ai_client
     
     async def perform_comprehensive_analysis(self, request: BusinessAnalysisRequest) -> Dict[str, Any]:
-        """Perform comprehensive business analysis"""
+        """Perform comprehensive business analysis
         
-        # Get AI-powered business analysis
-        business_analysis = await self.ai_client.analyze_business_requirements(
-            request.text_content, 
-            request.user_name
-        )
+        The stages run as a small dependency graph: the business and technical
+        AI calls, market insights and risk assessment start together, and the
+        technology stack is chosen as soon as business_type is known, so the
+        request takes about as long as the slowest AI call.
+        """
+        text_content = request.text_content
         
-        # Enhance with market research
-        market_insights = await self.generate_market_insights(
-            request.text_content,
-            request.industry,
-            request.target_market
-        )
+        # Independent stages
+        business_task = asyncio.create_task(self._timed_stage(
+            "business_analysis",
+            self.ai_client.analyze_business_requirements(text_content, request.user_name)
+        ))
+        tech_analysis_task = asyncio.create_task(self._timed_stage(
+            "technical_analysis",
+            self.ai_client.analyze_technical_requirements(text_content)
+        ))
+        market_task = asyncio.create_task(self._timed_stage(
+            "market_insights",
+            self.generate_market_insights(text_content, request.industry, request.target_market)
+        ))
+        risk_task = asyncio.create_task(self._timed_stage(
+            "risk_assessment",
+            self.assess_project_risks(text_content, request.budget_range)
+        ))
         
-        # Get technology recommendations
-        tech_recommendations = await self.generate_technology_recommendations(
-            request.text_content,
-            business_analysis.get("business_type", "general")
-        )
+        async def technology_stage() -> Dict[str, Any]:
+            # Only needs business_type from the business analysis
+            business_analysis = await business_task
+            return await self.generate_technology_recommendations(
+                text_content,
+                business_analysis.get("business_type", "general"),
+                tech_analysis=await tech_analysis_task
+            )
         
-        # Perform risk assessment
-        risk_assessment = await self.assess_project_risks(
-            request.text_content,
-            request.budget_range
-        )
+        tech_task = asyncio.create_task(self._timed_stage("technology_recommendations", technology_stage()))
+        stages = [business_task, tech_analysis_task, market_task, risk_task, tech_task]
+        try:
+            business_analysis, _, market_insights, risk_assessment, tech_recommendations = await asyncio.gather(*stages)
+        except BaseException:
+            for stage in stages:
+                stage.cancel()
+            raise
         
         # Generate implementation strategy
         implementation_strategy = self.generate_implementation_strategy(
@@ -280,6 +322,13 @@ class BusinessAnalysisEngine:
             "implementation_strategy": implementation_strategy
         }
     
+    async def _timed_stage(self, stage: str, coroutine):
+        start_time = time.time()
+        try:
+            return await coroutine
+        finally:
+            NLP_STAGE_DURATION.labels(stage=stage).observe(time.time() - start_time)
+    
     async def generate_market_insights(self, text_content: str, industry: Optional[str], target_market: Optional[str]) -> Dict[str, Any]:
         """Generate market research insights"""
         
@@ -327,11 +376,13 @@ class BusinessAnalysisEngine:
             "market_entry_strategy": self._suggest_market_entry(detected_industry)
         }
     
-    async def generate_technology_recommendations(self, text_content: str, business_type: str) -> Dict[str, Any]:
+    async def generate_technology_recommendations(self, text_content: str, business_type: str,
+                                                  tech_analysis: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Generate technology stack recommendations"""
         
-        # Get AI-powered technical analysis
-        tech_analysis = await self.ai_client.analyze_technical_requirements(text_content)
+        # Get AI-powered technical analysis, unless it was already fetched
+        if tech_analysis is None:
+            tech_analysis = await self.ai_client.analyze_technical_requirements(text_content)
         
         # Business-specific technology recommendations
         tech_stacks = {
@@ -674,8 +725,8 @@ async def analyze_business_comprehensive(request: BusinessAnalysisRequest):
     try:
         analysis_id = f"nlp_business_{int(time.time())}"
         
-        # Initialize Free AI client
-        ai_client = FreeAIClient()
+        # Shared Free AI client
+        ai_client = free_ai_client
         
         # Get AI-powered business analysis
         business_analysis = await ai_client.analyze_business_requirements(